@@ -62,7 +62,7 @@ export function ActionMenu({
             <Pencil />
             レポート名編集
           </MenuItem>
-          {(report.status === "ready" || report.status === "error") && (
+          {(report.status === "ready" || report.status === "error" || report.status === "cancelled") && (
             <MenuItem
               value="duplicate"
               textStyle="body/md/bold"
@@ -59,6 +59,13 @@ export function useReportProgressPoll(slug: string) {
             setProgress(data.current_step);
           }
 
+          if (data.status === "cancelled") {
+            setErrorMessage("レポート生成はキャンセルされました。");
+            setIsError(true);
+            setIsPolling(false);
+            return;
+          }
+
           if (data.status === "error") {
             setErrorMessage(data.error_message || "レポート生成に失敗しました。");
             setErrorLogExcerpt(data.error_log_excerpt || null);
@@ -15,7 +15,7 @@ export enum ReportVisibility {
 }
 
 // report
-type ReportStatus = "ready" | "processing" | "error";
+type ReportStatus = "ready" | "processing" | "error" | "cancelled";
 
 type ReportBase = {
   slug: string;
@@ -43,7 +43,7 @@ type ReadyReport = ReportBase & {
 };
 
 type ProcessingOrErrorReport = ReportBase & {
-  status: "processing" | "error";
+  status: "processing" | "error" | "cancelled";
 };
 
 export type Report = ReadyReport | ProcessingOrErrorReport;
@@ -32,6 +32,14 @@ class Settings(BaseSettings):
     INPUT_DIR: Path = TOOL_DIR / "pipeline" / "inputs"
     DATA_DIR: Path = BASE_DIR / "data"
 
+    # レポート生成ジョブの設定
+    # 同時に実行する analysis-core のジョブ数の上限 (超えた分はキューで待機する)
+    ANALYSIS_MAX_CONCURRENT_JOBS: int = Field(env="ANALYSIS_MAX_CONCURRENT_JOBS", default=2)
+    # 依存ライブラリを import 済みの状態で待機させておくワーカープロセスの数 (0 で無効)
+    ANALYSIS_WARM_WORKERS: int = Field(env="ANALYSIS_WARM_WORKERS", default=1)
+    # ジョブ 1 件あたりの RSS の上限 (MB)。指定すると analysis-core を低メモリモードで実行する
+    ANALYSIS_MEMORY_BUDGET_MB: int | None = Field(env="ANALYSIS_MEMORY_BUDGET_MB", default=None)
+
     # ストレージ設定
     STORAGE_TYPE: StorageType = Field(env="STORAGE_TYPE", default="local")
     AZURE_BLOB_STORAGE_ACCOUNT_NAME: str | None = Field(env="AZURE_BLOB_STORAGE_ACCOUNT_NAME", default=None)
@@ -7,6 +7,7 @@ from fastapi.responses import ORJSONResponse
 from src.config import settings
 from src.middleware.security_middleware import register_security_middleware
 from src.routers import router
+from src.services.report_launcher import start_job_runner, stop_job_runner
 from src.services.report_status import load_status
 from src.services.report_sync import initialize_from_storage
 from src.utils.logger import setup_logger
@@ -45,7 +46,11 @@ async def lifespan(app: FastAPI):
 
     # ステータスファイルをロード
     load_status()
+
+    # 前回の起動時に残ったジョブキューを再開し、待機ワーカーを起動する
+    start_job_runner()
     yield
+    stop_job_runner()
 
 
 app = get_app()
@@ -1,15 +1,21 @@
 import csv
 
+import polars as pl
+
 from src.config import settings
 from src.core.exceptions import ClusterCSVParseError, ClusterFileNotFound
 from src.schemas.cluster import ClusterResponse, ClusterUpdate
 from src.utils.logger import setup_logger
+from src.utils.report_artifacts import resolve_artifact_path
 
 slogger = setup_logger()
 
 
 class ClusterRepository:
-    """クラスタの中間ファイル（csvファイル）を読み書きするrepository"""
+    """クラスタの中間ファイル（Parquet または CSV ファイル）を読み書きするrepository
+
+    analysis-core の設定 ``artifact_format`` によって形式が異なるため、存在するファイルの形式で読み込み、同じ形式で書き戻す。
+    """
 
     FIELDS = [
         "level",
@@ -22,13 +28,25 @@ class ClusterRepository:
         "density_rank",
         "density_rank_percentile",
     ]
+    # Parquet で書き戻すときの列の型
+    SCHEMA = {
+        "level": pl.Int64,
+        "id": pl.Utf8,
+        "label": pl.Utf8,
+        "description": pl.Utf8,
+        "value": pl.Int64,
+        "parent": pl.Utf8,
+        "density": pl.Float64,
+        "density_rank": pl.Int64,
+        "density_rank_percentile": pl.Float64,
+    }
 
     def __init__(self, slug: str):
         self.slug = slug
-        self.labels_path = settings.REPORT_DIR / slug / "hierarchical_merge_labels.csv"
+        self.labels_path = resolve_artifact_path(settings.REPORT_DIR / slug, "hierarchical_merge_labels.csv")
 
     def read_from_csv(self) -> list[ClusterResponse]:
-        """中間ファイル（CSVファイル）からクラスタのラベル・説明を読み込む"""
+        """中間ファイルからクラスタのラベル・説明を読み込む"""
 
         clusters = []
         # ファイルが存在しない場合は、ClusterFileNotFound例外を発生させる
@@ -36,27 +54,23 @@ class ClusterRepository:
             raise ClusterFileNotFound(f"File not found: {self.labels_path}")
 
         try:
-            with open(self.labels_path, encoding="utf-8") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    try:
-                        cluster = ClusterResponse(
-                            level=int(row["level"]),
-                            id=row["id"],
-                            label=row["label"],
-                            description=row["description"],
-                            value=int(row["value"]),
-                            parent=row["parent"],
-                            density=float(row["density"]) if row["density"] else None,
-                            density_rank=int(float(row["density_rank"])) if row["density_rank"] else None,
-                            density_rank_percentile=float(row["density_rank_percentile"])
-                            if row["density_rank_percentile"]
-                            else None,
-                        )
-                        clusters.append(cluster)
-                    except KeyError as e:
-                        slogger.warning(f"KeyError: {e} in row: {row}")
-                        continue
+            for row in self._read_rows():
+                try:
+                    cluster = ClusterResponse(
+                        level=int(row["level"]),
+                        id=row["id"],
+                        label=row["label"],
+                        description=row["description"],
+                        value=int(row["value"]),
+                        parent=row["parent"] or "",
+                        density=_optional(row["density"], float),
+                        density_rank=_optional(row["density_rank"], lambda rank: int(float(rank))),
+                        density_rank_percentile=_optional(row["density_rank_percentile"], float),
+                    )
+                    clusters.append(cluster)
+                except KeyError as e:
+                    slogger.warning(f"KeyError: {e} in row: {row}")
+                    continue
 
             return clusters
         except FileNotFoundError:
@@ -67,7 +81,7 @@ class ClusterRepository:
             raise ClusterCSVParseError(f"Error reading CSV file: {e}") from e
 
     def update_csv(self, updated_cluster: ClusterUpdate) -> bool:
-        """中間ファイル（CSVファイル）を更新する"""
+        """中間ファイルを更新する"""
         try:
             # 現在のクラスタ情報を読み込む
             current_cluster_models = self.read_from_csv()
@@ -81,6 +95,13 @@ class ClusterRepository:
                     cluster["description"] = updated_cluster.description
                 merged_clusters.append(cluster)
 
+            if self.labels_path.suffix == ".parquet":
+                pl.DataFrame(
+                    [{field: cluster[field] for field in self.FIELDS} for cluster in merged_clusters],
+                    schema=self.SCHEMA,
+                ).write_parquet(self.labels_path, compression="zstd")
+                return True
+
             with open(self.labels_path, mode="w", encoding="utf-8", newline="") as csvfile:
                 writer = csv.DictWriter(csvfile, fieldnames=self.FIELDS)
 
@@ -91,3 +112,17 @@ class ClusterRepository:
         except Exception as e:
             slogger.error(f"Error writing CSV file: {e}")
             return False
+
+    def _read_rows(self) -> list[dict]:
+        """行ごとの dict を返す。CSV の値は文字列、Parquet の値は列の型のまま"""
+        if self.labels_path.suffix == ".parquet":
+            return pl.read_parquet(self.labels_path).to_dicts()
+        with open(self.labels_path, encoding="utf-8") as csvfile:
+            return list(csv.DictReader(csvfile))
+
+
+def _optional(value, cast):
+    """空文字列（CSV）と None（Parquet）を None として扱う"""
+    if value is None or value == "":
+        return None
+    return cast(value)
@@ -29,7 +29,12 @@ from src.schemas.visualization_config import ReportDisplayConfig
 from src.services.llm_models import get_models_by_provider
 from src.services.llm_pricing import LLMPricing
 from src.services.report_duplicate import duplicate_report
-from src.services.report_launcher import execute_aggregation, launch_report_generation
+from src.services.report_launcher import (
+    cancel_report_job,
+    execute_aggregation,
+    get_job_queue,
+    launch_report_generation,
+)
 from src.services.report_status import (
     add_analysis_data,
     invalidate_report_cache,
@@ -44,6 +49,8 @@ from src.utils.slug_utils import validate_slug
 slogger = setup_logger()
 router = APIRouter()
 MAX_ERROR_LOG_CHARS = 4000
+# analysis-core が進捗の書き出しごとに更新する、ステータスの主要なキーだけを持つスナップショット
+STATUS_SNAPSHOT_FILENAME = "hierarchical_status_snapshot.json"
 
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 
@@ -99,6 +106,25 @@ async def create_report(
         raise HTTPException(status_code=500, detail="Internal server error") from e
 
 
+@router.get("/admin/jobs")
+async def get_report_jobs(api_key: str = Depends(verify_admin_api_key)) -> list[dict]:
+    """実行中・待機中のレポート生成ジョブの一覧 (待機中のジョブは実行順)"""
+    return get_job_queue().list_jobs()
+
+
+@router.post("/admin/reports/{slug}/cancel", status_code=202)
+async def cancel_report(slug: str, api_key: str = Depends(verify_admin_api_key)) -> dict:
+    """レポート生成をキャンセルする
+
+    待機中のジョブはキューから取り除く。実行中のジョブは analysis-core が実行中の LLM 呼び出しを打ち切り、
+    途中結果を書き出して終了した時点でステータスが ``cancelled`` になる。
+    """
+    validate_slug(slug)
+    if not cancel_report_job(slug):
+        raise HTTPException(status_code=404, detail="No queued or running job for this report")
+    return {"success": True}
+
+
 @router.post("/admin/reports/{slug}/duplicate", status_code=202)
 async def duplicate_report_endpoint(
     slug: str,
@@ -118,7 +144,7 @@ async def duplicate_report_endpoint(
             raise HTTPException(status_code=404, detail="Source report not found")
         if source_report.status == ReportStatus.DELETED:
             raise HTTPException(status_code=409, detail="Source report is deleted")
-        if source_report.status not in (ReportStatus.READY, ReportStatus.ERROR):
+        if source_report.status not in (ReportStatus.READY, ReportStatus.ERROR, ReportStatus.CANCELLED):
             raise HTTPException(status_code=409, detail="Source report is not duplicatable")
 
         user_api_key = request.headers.get("x-user-api-key")
@@ -185,11 +211,16 @@ def _read_error_log_excerpt(log_path: Path) -> str | None:
 async def get_current_step(slug: str) -> dict:
     validate_slug(slug)
     status_file = settings.REPORT_DIR / slug / "hierarchical_status.json"
+    snapshot_file = settings.REPORT_DIR / slug / STATUS_SNAPSHOT_FILENAME
     try:
         # ステータスファイルが存在しない場合は "loading" を返す
         if not status_file.exists():
             return {"current_step": "loading"}
 
+        # analysis-core が書き出す小さなスナップショットを優先する。API 側でステータスファイルだけを
+        # 更新した場合 (異常終了時など) はステータスファイルの方が新しくなるので、そちらを読む
+        if snapshot_file.exists() and snapshot_file.stat().st_mtime >= status_file.stat().st_mtime:
+            status_file = snapshot_file
         with open(status_file) as f:
             status = json.load(f)
 
@@ -1,7 +1,7 @@
 import json
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Security
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, Security
 from fastapi.security.api_key import APIKeyHeader
 from pydantic import ValidationError
 
@@ -9,6 +9,7 @@ from src.config import settings
 from src.schemas.public_report_result import PublicReportResult
 from src.schemas.report import Report, ReportStatus, ReportVisibility
 from src.schemas.visualization_config import DEFAULT_REPORT_DISPLAY_CONFIG, ReportDisplayConfig
+from src.services.report_attribute_stats import ATTRIBUTE_STATS_FILENAME, read_attribute_stats
 from src.services.report_status import load_status_as_reports
 from src.utils.slug_utils import validate_slug
 
@@ -16,6 +17,10 @@ logger = logging.getLogger("uvicorn")
 
 router = APIRouter()
 
+# analysis-core の hierarchical_aggregation (sharded_output) が書き出すシャードの配置
+RESULT_SHARD_DIRNAME = "hierarchical_result_shards"
+RESULT_SHARD_MANIFEST_FILENAME = "manifest.json"
+
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
 
 
@@ -49,10 +54,8 @@ async def reports() -> list[Report]:
     return ready_reports
 
 
-@router.get("/reports/{slug}")
-async def report(slug: str, api_key: str = Depends(verify_public_api_key)) -> dict:
-    validate_slug(slug)
-    report_path = settings.REPORT_DIR / slug / "hierarchical_result.json"
+def _get_public_report_status(slug: str):
+    """公開APIから参照可能なレポートのステータスを返す（存在しない・未完了・非公開なら404）"""
     all_reports = load_status_as_reports()
     target_report_status = next((report for report in all_reports if report.slug == slug), None)
 
@@ -62,14 +65,10 @@ async def report(slug: str, api_key: str = Depends(verify_public_api_key)) -> di
         raise HTTPException(status_code=404, detail="Report is not ready")
     if target_report_status.visibility == ReportVisibility.PRIVATE:
         raise HTTPException(status_code=404, detail="Report is private")
-    if not report_path.exists():
-        raise HTTPException(status_code=404, detail="Report not found")
-
-    report_result = _load_validated_report_result(slug)
+    return target_report_status
 
-    # レポートにvisibilityを追加
-    report_result["visibility"] = target_report_status.visibility.value
 
+def _attach_visualization_config(slug: str, payload: dict) -> None:
     # 可視化設定をマージ（存在する場合）
     # snake_case JSONをpydanticで検証し、camelCaseに変換して返す
     visualization_config_path = settings.REPORT_DIR / slug / "visualization_config.json"
@@ -80,16 +79,99 @@ async def report(slug: str, api_key: str = Depends(verify_public_api_key)) -> di
             # pydanticで検証（snake_case/camelCase両対応、populate_by_name=True）
             validated_config = ReportDisplayConfig.model_validate(raw_config)
             # camelCaseで出力（by_alias=True）
-            report_result["visualizationConfig"] = validated_config.model_dump(by_alias=True)
+            payload["visualizationConfig"] = validated_config.model_dump(by_alias=True)
         except (json.JSONDecodeError, OSError) as e:
             logger.warning(f"Failed to load visualization config for {slug}: {e}")
         except ValidationError as e:
             logger.warning(f"Invalid visualization config for {slug}, using default: {e}")
-            report_result["visualizationConfig"] = DEFAULT_REPORT_DISPLAY_CONFIG.model_dump(by_alias=True)
+            payload["visualizationConfig"] = DEFAULT_REPORT_DISPLAY_CONFIG.model_dump(by_alias=True)
+
+
+def _load_shard_manifest(slug: str) -> dict:
+    manifest_path = settings.REPORT_DIR / slug / RESULT_SHARD_DIRNAME / RESULT_SHARD_MANIFEST_FILENAME
+    if not manifest_path.exists():
+        raise HTTPException(status_code=404, detail="Sharded report result not found")
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@router.get("/reports/{slug}")
+async def report(slug: str, api_key: str = Depends(verify_public_api_key)) -> dict:
+    validate_slug(slug)
+    report_path = settings.REPORT_DIR / slug / "hierarchical_result.json"
+    target_report_status = _get_public_report_status(slug)
+    if not report_path.exists():
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    report_result = _load_validated_report_result(slug)
+
+    # レポートにvisibilityを追加
+    report_result["visibility"] = target_report_status.visibility.value
+    _attach_visualization_config(slug, report_result)
 
     return report_result
 
 
+@router.get("/reports/{slug}/manifest")
+async def report_manifest(slug: str, api_key: str = Depends(verify_public_api_key)) -> dict:
+    """シャード形式のレポート結果のマニフェスト（クラスタ・概要・設定と各シャードのハッシュ）を返す"""
+    validate_slug(slug)
+    target_report_status = _get_public_report_status(slug)
+    manifest = _load_shard_manifest(slug)
+
+    manifest["visibility"] = target_report_status.visibility.value
+    _attach_visualization_config(slug, manifest)
+    return manifest
+
+
+@router.get("/reports/{slug}/shards/{shard_name}")
+async def report_shard(
+    slug: str,
+    shard_name: str,
+    api_key: str = Depends(verify_public_api_key),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """マニフェストに記載されたシャードを返す。ETag にはシャードの SHA-256 を使う"""
+    validate_slug(slug)
+    _get_public_report_status(slug)
+    manifest = _load_shard_manifest(slug)
+
+    shards = manifest.get("shards", {})
+    entries = [shards.get("points", {}), *shards.get("arguments", [])]
+    entry = next((entry for entry in entries if entry.get("file") == shard_name), None)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Shard not found")
+
+    etag = f'"{entry["sha256"]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    shard_path = settings.REPORT_DIR / slug / RESULT_SHARD_DIRNAME / entry["file"]
+    if not shard_path.exists():
+        raise HTTPException(status_code=404, detail="Shard not found")
+    return Response(content=shard_path.read_bytes(), media_type="application/json", headers=headers)
+
+
+@router.get("/reports/{slug}/attribute-stats")
+async def report_attribute_stats(
+    slug: str,
+    attribute: str | None = None,
+    level: int | None = None,
+    cluster_id: str | None = None,
+    api_key: str = Depends(verify_public_api_key),
+) -> list[dict]:
+    """クラスタごとの属性値の意見数（事前集計済み）を返す。クエリで属性・階層・クラスタを絞り込める"""
+    validate_slug(slug)
+    _get_public_report_status(slug)
+    stats = read_attribute_stats(
+        settings.REPORT_DIR / slug / ATTRIBUTE_STATS_FILENAME, attribute=attribute, level=level, cluster_id=cluster_id
+    )
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Attribute stats not found")
+    return stats
+
+
 @router.get("/test-error")
 async def test_error():
     logger.info("This is a test log message")
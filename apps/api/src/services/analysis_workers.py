@@ -0,0 +1,79 @@
+import json
+import subprocess
+import threading
+from pathlib import Path
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# analysis-core の重い依存を import 済みの状態で待機し、標準入力からジョブを 1 件受け取って実行するプロセス
+WARM_WORKER_COMMAND = ["python", "-m", "analysis_core.worker"]
+
+
+class WarmWorkerPool:
+    """事前に起動した analysis-core のワーカープロセスのプール
+
+    レポートごとに ``python -m analysis_core`` を起動すると、インタプリタの起動と numpy / polars / umap などの
+    import に毎回数秒かかる。ここでは ``size`` 個のワーカーを先に起動しておき、ジョブの開始時に 1 つ取り出して
+    ジョブを渡す。ワーカーは 1 ジョブで終了するので、取り出すたびに補充する。
+    """
+
+    def __init__(self, size: int, command: list[str] | None = None):
+        self.size = size
+        self.command = command or WARM_WORKER_COMMAND
+        self._idle: list[subprocess.Popen] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        with self._lock:
+            self._started = True
+            self._fill_locked()
+
+    def take(self) -> subprocess.Popen | None:
+        """待機中のワーカーを 1 つ取り出す。起動していない・すべて終了している場合は None"""
+        with self._lock:
+            if not self._started:
+                return None
+            worker = None
+            while self._idle and worker is None:
+                candidate = self._idle.pop(0)
+                if candidate.poll() is None:
+                    worker = candidate
+            self._fill_locked()
+            return worker
+
+    def shutdown(self) -> None:
+        """待機中のワーカーを終了する (標準入力を閉じるとジョブを受け取らずに終了する)"""
+        with self._lock:
+            self._started = False
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            try:
+                worker.stdin.close()
+            except OSError:
+                pass
+
+    def _fill_locked(self) -> None:
+        while len(self._idle) < self.size:
+            try:
+                self._idle.append(
+                    subprocess.Popen(
+                        self.command,
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                    )
+                )
+            except OSError as e:
+                logger.error(f"Failed to start analysis worker: {e}")
+                return
+
+
+def send_job(worker: subprocess.Popen, args: list[str], env: dict[str, str], log_path: Path) -> None:
+    """ワーカーにジョブを渡す。環境変数 (ユーザーの API キーを含む) はパイプでのみ渡し、ファイルには書かない"""
+    job = {"args": args, "env": env, "log_path": str(log_path)}
+    worker.stdin.write(json.dumps(job) + "\n")
+    worker.stdin.close()
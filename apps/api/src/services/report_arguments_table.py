@@ -0,0 +1,41 @@
+"""analysis-core の hierarchical_aggregation が書き出す意見テーブル（Parquet）の読み込み
+
+``hierarchical_result.json`` 全体を ``json.load`` せずに、件数や特定の列だけを取得するために使う。
+古いレポートにはこのファイルが存在しないため、読めない場合は ``None`` を返し、呼び出し側で JSON にフォールバックする。
+"""
+
+import logging
+from pathlib import Path
+
+import polars as pl
+
+logger = logging.getLogger("uvicorn")
+
+ARGUMENTS_TABLE_FILENAME = "hierarchical_result_arguments.parquet"
+
+
+def read_arguments_table_counts(path: Path) -> dict[str, int] | None:
+    """意見数・コメント数・level 1 クラスタ数をファイルのメタデータだけから読み込む"""
+    if not path.exists():
+        return None
+    try:
+        metadata = pl.read_parquet_metadata(path)
+        return {
+            "arguments_num": pl.scan_parquet(path).select(pl.len()).collect().item(),
+            "comment_num": int(metadata.get("comment_num", 0)),
+            "cluster_num": int(metadata.get("cluster_num", 0)),
+        }
+    except Exception as e:
+        logger.warning(f"Failed to read arguments table metadata from {path}: {e}")
+        return None
+
+
+def read_arguments_table_columns(path: Path, columns: list[str]) -> list[dict] | None:
+    """指定した列だけを読み込み、行ごとの dict のリストとして返す"""
+    if not path.exists():
+        return None
+    try:
+        return pl.scan_parquet(path).select(columns).collect().to_dicts()
+    except Exception as e:
+        logger.warning(f"Failed to read columns {columns} from {path}: {e}")
+        return None
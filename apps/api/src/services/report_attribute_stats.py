@@ -0,0 +1,31 @@
+"""analysis-core の hierarchical_aggregation が書き出す属性別集計（Parquet）の読み込み
+
+(階層, クラスタ, 属性, 値) ごとの意見数が縦持ちで保存されているため、意見そのものを読み込まずに
+クラスタごとの属性の内訳を返せる。属性を持たないレポートでは空のファイルになり、古いレポートにはこのファイルが存在しない。
+"""
+
+from pathlib import Path
+
+import polars as pl
+
+ATTRIBUTE_STATS_FILENAME = "hierarchical_result_attribute_stats.parquet"
+
+
+def read_attribute_stats(
+    path: Path,
+    attribute: str | None = None,
+    level: int | None = None,
+    cluster_id: str | None = None,
+) -> list[dict] | None:
+    """条件に一致する集計行（level, cluster_id, attribute, value, count）を返す。ファイルがなければ None"""
+    if not path.exists():
+        return None
+
+    stats = pl.scan_parquet(path)
+    if attribute is not None:
+        stats = stats.filter(pl.col("attribute") == attribute)
+    if level is not None:
+        stats = stats.filter(pl.col("level") == level)
+    if cluster_id is not None:
+        stats = stats.filter(pl.col("cluster_id") == cluster_id)
+    return stats.collect().to_dicts()
@@ -11,10 +11,12 @@ from fastapi import HTTPException
 from src.config import settings
 from src.schemas.admin_report import ReportDuplicateOverrides, ReportDuplicateRequest
 from src.schemas.report_config import ReportConfig
+from src.services.report_arguments_table import ARGUMENTS_TABLE_FILENAME, read_arguments_table_columns
 from src.services.report_launcher import launch_report_generation_from_config
 from src.services.report_status import add_new_report_to_status_from_config, delete_report_from_status, slug_exists
 from src.services.report_sync import ReportSyncService
 from src.utils.logger import setup_logger
+from src.utils.report_artifacts import artifact_file_names, resolve_artifact_path
 from src.utils.slug_utils import validate_slug
 
 logger = setup_logger()
@@ -22,6 +24,7 @@ logger = setup_logger()
 LOCK_TTL_SECONDS = 10 * 60
 LOCK_DIR_NAME = ".duplicate_locks"
 
+# 表形式の中間ファイルは論理名 (CSV のファイル名) で指定し、Parquet があればそちらを使う
 REUSE_ARTIFACTS = (
     "args.csv",
     "relations.csv",
@@ -136,6 +139,17 @@ def _load_report_result(slug: str) -> dict:
         raise HTTPException(status_code=500, detail=f"Failed to read source report result: {e}") from e
 
 
+def _load_source_arguments(slug: str) -> list[dict]:
+    """Load argument texts for a slug, preferring the arguments table over the full hierarchical_result.json."""
+    table_path = settings.REPORT_DIR / slug / ARGUMENTS_TABLE_FILENAME
+    if not table_path.exists():
+        ReportSyncService().download_report_artifacts(slug, (ARGUMENTS_TABLE_FILENAME,))
+    arguments = read_arguments_table_columns(table_path, ["arg_id", "argument", "url"])
+    if arguments is not None:
+        return arguments
+    return _load_report_result(slug).get("arguments") or []
+
+
 def _build_analysis_core_config_from_embedded_config(embedded_config: dict) -> dict:
     """Build a valid analysis-core config dict from embedded config in hierarchical_result.json."""
     try:
@@ -250,8 +264,9 @@ def _ensure_source_input(slug: str) -> Path:
 def _ensure_source_artifacts(slug: str, file_names: tuple[str, ...]) -> None:
     missing = []
     for name in file_names:
-        if not (settings.REPORT_DIR / slug / name).exists():
-            missing.append(name)
+        candidates = artifact_file_names(name)
+        if not any((settings.REPORT_DIR / slug / candidate).exists() for candidate in candidates):
+            missing.extend(candidates)
 
     if not missing:
         return
@@ -301,12 +316,11 @@ def duplicate_report(
         if source_input_path.exists():
             shutil.copy2(source_input_path, new_input_path)
         else:
-            if source_result is None:
-                source_result = _load_report_result(source_slug)
-            input_limit_override = _write_input_csv_from_arguments(
-                source_result.get("arguments") or [],
-                new_input_path,
-            )
+            if source_result is not None:
+                source_arguments = source_result.get("arguments") or []
+            else:
+                source_arguments = _load_source_arguments(source_slug)
+            input_limit_override = _write_input_csv_from_arguments(source_arguments, new_input_path)
         created_any = True
 
         config["name"] = new_slug
@@ -330,9 +344,9 @@ def duplicate_report(
 
             source_output_dir = settings.REPORT_DIR / source_slug
             for name in REUSE_ARTIFACTS:
-                src = source_output_dir / name
+                src = resolve_artifact_path(source_output_dir, name)
                 if src.exists():
-                    shutil.copy2(src, output_dir / name)
+                    shutil.copy2(src, output_dir / src.name)
 
             status_src = source_output_dir / "hierarchical_status.json"
             if status_src.exists():
@@ -341,7 +355,7 @@ def duplicate_report(
                 logger.warning(f"hierarchical_status.json not found for {source_slug}")
 
         # Always remove overview/result to force regeneration
-        for name in ("hierarchical_result.json", "hierarchical_overview.txt"):
+        for name in ("hierarchical_result.json", "hierarchical_overview.txt", ARGUMENTS_TABLE_FILENAME):
             target = output_dir / name
             if target.exists():
                 target.unlink()
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+JOB_QUEUE_FILENAME = "report_jobs.json"
+DEFAULT_PRIORITY = 0
+# キャンセル (SIGTERM) 後、analysis-core が途中結果を書き出して終了するまで待つ時間 (秒)。過ぎたら強制終了する
+CANCEL_GRACE_SECONDS = 30
+# 集約のみの再実行は数秒で終わるため、分析全体のジョブより先に実行する
+AGGREGATION_PRIORITY = 10
+
+
+@dataclass
+class ReportJob:
+    slug: str
+    args: list[str]
+    priority: int = DEFAULT_PRIORITY
+    seq: int = 0
+    state: str = "queued"  # queued | running
+    enqueued_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: str | None = None
+    has_user_api_key: bool = False
+    # 以下はファイルに保存しない (ユーザーの API キーを含むため)
+    env_overrides: dict[str, str] = field(default_factory=dict, repr=False)
+    process: Any = field(default=None, repr=False)
+    cancel_requested: bool = field(default=False, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        del data["env_overrides"], data["process"], data["cancel_requested"]
+        return data
+
+
+class ReportJobQueue:
+    """レポート生成ジョブの優先度付きキュー
+
+    同時に実行する analysis-core のプロセス数を ``max_workers`` に制限し、空きがなければジョブを待たせる。
+    優先度の高い順、同じ優先度なら登録順に実行する。キューの内容は ``state_path`` に保存し、API の再起動後も
+    待機中のジョブを引き継ぐ。
+
+    Args:
+        state_path: キューを保存するファイル
+        max_workers: 同時に実行するジョブ数の上限
+        start_job: ジョブのプロセスを起動して返す関数。プロセスが終了したら ``job_finished`` を呼ぶこと
+        on_job_failed: 起動に失敗した、または再起動で失われたジョブを通知する関数 (slug, メッセージ)
+    """
+
+    def __init__(
+        self,
+        state_path: Path,
+        max_workers: int,
+        start_job: Callable[[ReportJob], Any],
+        on_job_failed: Callable[[str, str], None] | None = None,
+    ):
+        self.state_path = Path(state_path)
+        self.max_workers = max(1, max_workers)
+        self.start_job = start_job
+        self.on_job_failed = on_job_failed
+        self._jobs: dict[str, ReportJob] = {}
+        self._seq = 0
+        self._lock = threading.RLock()
+
+    def submit(
+        self,
+        slug: str,
+        args: list[str],
+        env_overrides: dict[str, str] | None = None,
+        priority: int = DEFAULT_PRIORITY,
+    ) -> ReportJob:
+        """ジョブを登録し、空きがあればすぐに開始する。開始時のエラーは呼び出し元に送出する"""
+        env_overrides = env_overrides or {}
+        with self._lock:
+            if slug in self._jobs:
+                raise ValueError(f"slug {slug} already has a queued or running job")
+            self._seq += 1
+            job = ReportJob(
+                slug=slug,
+                args=args,
+                priority=priority,
+                seq=self._seq,
+                has_user_api_key="USER_API_KEY" in env_overrides,
+                env_overrides=env_overrides,
+            )
+            self._jobs[slug] = job
+            self._save_locked()
+            try:
+                self._dispatch_locked(raise_for=slug)
+            except Exception:
+                self._jobs.pop(slug, None)
+                self._save_locked()
+                raise
+            return job
+
+    def job_finished(self, slug: str) -> None:
+        """実行中のジョブが終了したことを通知し、次のジョブを開始する"""
+        with self._lock:
+            self._jobs.pop(slug, None)
+            self._dispatch_locked()
+            self._save_locked()
+
+    def cancel(self, slug: str) -> str | None:
+        """ジョブをキャンセルし、キャンセル時の状態 (``queued`` / ``running``) を返す。ジョブがなければ None
+
+        待機中のジョブはキューから取り除く。実行中のジョブは analysis-core に SIGTERM を送り、途中結果を
+        書き出して終了させる。``CANCEL_GRACE_SECONDS`` 以内に終了しなければ強制終了する。
+        """
+        with self._lock:
+            job = self._jobs.get(slug)
+            if job is None:
+                return None
+            if job.state == "queued":
+                del self._jobs[slug]
+                self._save_locked()
+                return "queued"
+            job.cancel_requested = True
+            process = job.process
+        # 実行中のジョブはプロセスの終了後に job_finished で取り除かれる
+        if process is not None and process.poll() is None:
+            process.terminate()
+            timer = threading.Timer(CANCEL_GRACE_SECONDS, _kill_if_running, args=(process,))
+            timer.daemon = True
+            timer.start()
+        return "running"
+
+    def get(self, slug: str) -> ReportJob | None:
+        with self._lock:
+            return self._jobs.get(slug)
+
+    def list_jobs(self) -> list[dict[str, Any]]:
+        """実行中のジョブと、実行順に並べた待機中のジョブ"""
+        with self._lock:
+            running = [job for job in self._jobs.values() if job.state == "running"]
+            queued = self._queued_locked()
+        return [
+            *({**job.to_dict(), "position": None} for job in running),
+            *({**job.to_dict(), "position": position} for position, job in enumerate(queued, start=1)),
+        ]
+
+    def restore(self) -> None:
+        """保存したキューを読み込む
+
+        実行中だったジョブは API の再起動でプロセスの監視が途切れているため失敗として扱う。ユーザーの API キーは
+        保存していないので、キーを指定して登録されたジョブも再開できない。
+        """
+        try:
+            saved = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        with self._lock:
+            for data in saved.get("jobs", []):
+                job = ReportJob(**data)
+                self._seq = max(self._seq, job.seq)
+                if job.state == "running":
+                    self._fail(job.slug, "The analysis was interrupted because the API server restarted")
+                elif job.has_user_api_key:
+                    self._fail(
+                        job.slug, "The queued analysis was dropped on restart because user API keys are not stored"
+                    )
+                else:
+                    self._jobs[job.slug] = job
+            self._dispatch_locked()
+            self._save_locked()
+
+    def _queued_locked(self) -> list[ReportJob]:
+        queued = [job for job in self._jobs.values() if job.state == "queued"]
+        return sorted(queued, key=lambda job: (-job.priority, job.seq))
+
+    def _dispatch_locked(self, raise_for: str | None = None) -> None:
+        running = sum(job.state == "running" for job in self._jobs.values())
+        for job in self._queued_locked():
+            if running >= self.max_workers:
+                break
+            # start_job の中でジョブが終了して次のジョブが開始されている場合がある
+            if self._jobs.get(job.slug) is not job or job.state != "queued":
+                continue
+            job.state = "running"
+            job.started_at = datetime.now().isoformat()
+            try:
+                job.process = self.start_job(job)
+            except Exception as e:
+                if job.slug == raise_for:
+                    raise
+                logger.error(f"Failed to start queued report job {job.slug}: {e}")
+                self._jobs.pop(job.slug, None)
+                self._fail(job.slug, f"Failed to launch analysis-core: {e}")
+                continue
+            running += 1
+
+    def _fail(self, slug: str, message: str) -> None:
+        if self.on_job_failed is not None:
+            try:
+                self.on_job_failed(slug, message)
+            except Exception as e:
+                logger.error(f"Failed to record failure of report job {slug}: {e}")
+
+    def _save_locked(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        jobs = sorted(self._jobs.values(), key=lambda job: job.seq)
+        tmp_path.write_text(
+            json.dumps({"jobs": [job.to_dict() for job in jobs]}, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+        os.replace(tmp_path, self.state_path)
+
+
+def _kill_if_running(process: Any) -> None:
+    if process.poll() is None:
+        logger.warning(f"Analysis process {process.pid} did not exit after cancellation; killing it")
+        process.kill()
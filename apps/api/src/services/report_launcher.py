@@ -2,6 +2,7 @@ import json
 import os
 import subprocess
 import threading
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
@@ -9,13 +10,25 @@ import polars as pl
 
 from src.config import settings
 from src.schemas.admin_report import ReportInput
+from src.services.analysis_workers import WarmWorkerPool, send_job
+from src.services.report_job_queue import (
+    AGGREGATION_PRIORITY,
+    DEFAULT_PRIORITY,
+    JOB_QUEUE_FILENAME,
+    ReportJob,
+    ReportJobQueue,
+)
 from src.services.report_status import add_new_report_to_status, set_status, update_token_usage
 from src.services.report_sync import ReportSyncService
 from src.utils.logger import setup_logger
+from src.utils.tracing import Span, inject_traceparent, open_span, use_span
 
 logger = setup_logger()
 ANALYSIS_LOG_FILENAME = "analysis.log"
 MAX_ERROR_LOG_CHARS = 4000
+# キャンセルされた analysis-core の終了コード (analysis_core.core.cancellation.EXIT_CANCELLED と同じ値)
+ANALYSIS_EXIT_CANCELLED = 3
+CANCELLED_MESSAGE = "Report generation was cancelled"
 
 
 def _build_config(report_input: ReportInput) -> dict[str, Any]:
@@ -183,6 +196,31 @@ def _ensure_error_status_payload(slug: str, error_override: str | None = None) -
         json.dump(status_data, f, indent=2, ensure_ascii=False)
 
 
+def _ensure_cancelled_status_payload(slug: str) -> None:
+    """analysis-core が書き出せなかった場合 (起動前・強制終了) も含め、ステータスファイルをキャンセル済みにする"""
+    status_file = settings.REPORT_DIR / slug / "hierarchical_status.json"
+    status_data: dict[str, Any] = {}
+    if status_file.exists():
+        try:
+            with open(status_file, encoding="utf-8") as f:
+                status_data = json.load(f)
+        except Exception as exc:
+            logger.warning(f"Failed to load status file for {slug}: {exc}")
+
+    status_data["status"] = "cancelled"
+    status_data["current_job"] = status_data.get("current_job") or "cancelled"
+    status_data["error"] = CANCELLED_MESSAGE
+
+    status_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(status_file, "w", encoding="utf-8") as f:
+        json.dump(status_data, f, indent=2, ensure_ascii=False)
+
+
+def _is_cancel_requested(slug: str) -> bool:
+    job = get_job_queue().get(slug)
+    return job is not None and job.cancel_requested
+
+
 def _monitor_process(process: subprocess.Popen, slug: str, log_file: Any | None = None) -> None:
     """
     サブプロセスの実行を監視し、完了時にステータスを更新する
@@ -241,6 +279,10 @@ def _monitor_process(process: subprocess.Popen, slug: str, log_file: Any | None
             # ステータスファイルをストレージに同期
             report_sync_service.sync_status_file_to_storage()
 
+        elif retcode == ANALYSIS_EXIT_CANCELLED or _is_cancel_requested(slug):
+            logger.info(f"Report generation for {slug} was cancelled")
+            _ensure_cancelled_status_payload(slug)
+            set_status(slug, "cancelled")
         else:
             _ensure_error_status_payload(slug)
             set_status(slug, "error")
@@ -249,19 +291,137 @@ def _monitor_process(process: subprocess.Popen, slug: str, log_file: Any | None
             log_file.close()
 
 
-def _launch_analysis_process(cmd: list[str], slug: str, env: dict[str, str]) -> subprocess.Popen:
+def _monitor_traced_process(
+    process: subprocess.Popen,
+    slug: str,
+    log_file: Any | None = None,
+    span: Span | None = None,
+    on_exit: Callable[[], None] | None = None,
+) -> None:
+    """サブプロセスの実行からストレージ同期までを 1 つのスパンとして記録する"""
+    try:
+        with use_span(span):
+            _monitor_process(process, slug, log_file)
+            if span is not None:
+                span.set_attribute("process.exit_code", process.returncode)
+    finally:
+        if on_exit is not None:
+            on_exit()
+
+
+def _launch_analysis_process(
+    cmd: list[str], slug: str, env: dict[str, str], on_exit: Callable[[], None] | None = None
+) -> subprocess.Popen:
     report_dir = settings.REPORT_DIR / slug
     report_dir.mkdir(parents=True, exist_ok=True)
-    log_file = _analysis_log_path(slug).open("w", encoding="utf-8")
-    try:
-        process = subprocess.Popen(cmd, env=env, stdout=log_file, stderr=subprocess.STDOUT)
-    except Exception:
-        log_file.close()
-        raise
-    threading.Thread(target=_monitor_process, args=(process, slug, log_file), daemon=True).start()
+    # analysis-core 側のスパンはこのスパンの子として記録される
+    span = open_span("analysis.subprocess", {"report.slug": slug, "process.command": " ".join(cmd)})
+    inject_traceparent(env, span)
+
+    # 待機中のワーカーがあればジョブを渡し、なければ新しいプロセスを起動する
+    process = _start_on_warm_worker(cmd, slug, env)
+    log_file = None
+    if process is None:
+        log_file = _analysis_log_path(slug).open("w", encoding="utf-8")
+        try:
+            process = subprocess.Popen(cmd, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+        except Exception as e:
+            log_file.close()
+            if span is not None:
+                span.set_error(f"{type(e).__name__}: {e}")
+                span.end()
+            raise
+    threading.Thread(target=_monitor_traced_process, args=(process, slug, log_file, span, on_exit), daemon=True).start()
     return process
 
 
+def _start_on_warm_worker(cmd: list[str], slug: str, env: dict[str, str]) -> subprocess.Popen | None:
+    if cmd[:3] != ["python", "-m", "analysis_core"]:
+        return None
+    worker = get_warm_worker_pool().take()
+    if worker is None:
+        return None
+    try:
+        send_job(worker, cmd[3:], env, _analysis_log_path(slug))
+    except OSError as e:
+        logger.warning(f"Analysis worker was not available, starting a new process instead: {e}")
+        return None
+    return worker
+
+
+_warm_worker_pool: WarmWorkerPool | None = None
+_job_queue: ReportJobQueue | None = None
+_singleton_lock = threading.Lock()
+
+
+def get_warm_worker_pool() -> WarmWorkerPool:
+    global _warm_worker_pool
+    with _singleton_lock:
+        if _warm_worker_pool is None:
+            _warm_worker_pool = WarmWorkerPool(settings.ANALYSIS_WARM_WORKERS)
+        return _warm_worker_pool
+
+
+def get_job_queue() -> ReportJobQueue:
+    global _job_queue
+    with _singleton_lock:
+        if _job_queue is None:
+            _job_queue = ReportJobQueue(
+                settings.DATA_DIR / JOB_QUEUE_FILENAME,
+                settings.ANALYSIS_MAX_CONCURRENT_JOBS,
+                start_job=_start_queued_job,
+                on_job_failed=_mark_job_failed,
+            )
+        return _job_queue
+
+
+def _start_queued_job(job: ReportJob) -> subprocess.Popen:
+    env = os.environ.copy()
+    if settings.ANALYSIS_MEMORY_BUDGET_MB:
+        # analysis-core は ANALYSIS_MEMORY_BUDGET_MB が設定されていると低メモリモードで実行する
+        env["ANALYSIS_MEMORY_BUDGET_MB"] = str(settings.ANALYSIS_MEMORY_BUDGET_MB)
+    env.update(job.env_overrides)
+    return _launch_analysis_process(
+        ["python", "-m", "analysis_core", *job.args],
+        job.slug,
+        env,
+        on_exit=lambda: get_job_queue().job_finished(job.slug),
+    )
+
+
+def _mark_job_failed(slug: str, message: str) -> None:
+    _ensure_error_status_payload(slug, error_override=message)
+    _set_report_status_if_present(slug, "error")
+
+
+def _enqueue_analysis(cmd: list[str], slug: str, user_api_key: str | None, priority: int = DEFAULT_PRIORITY) -> None:
+    env_overrides = {"USER_API_KEY": user_api_key} if user_api_key else {}
+    get_job_queue().submit(slug, cmd[3:], env_overrides, priority=priority)
+
+
+def start_job_runner() -> None:
+    """API の起動時に、保存されたキューの再開と待機ワーカーの起動を行う"""
+    get_warm_worker_pool().start()
+    get_job_queue().restore()
+
+
+def stop_job_runner() -> None:
+    get_warm_worker_pool().shutdown()
+
+
+def cancel_report_job(slug: str) -> bool:
+    """レポート生成をキャンセルする。キャンセルするジョブがなければ False
+
+    待機中のジョブはその場でキャンセル済みにする。実行中のジョブは analysis-core が途中結果を書き出して
+    終了した後、``_monitor_process`` がキャンセル済みにする。
+    """
+    state = get_job_queue().cancel(slug)
+    if state == "queued":
+        _ensure_cancelled_status_payload(slug)
+        _set_report_status_if_present(slug, "cancelled")
+    return state is not None
+
+
 def _set_report_status_if_present(slug: str, status: str) -> None:
     try:
         set_status(slug, status)
@@ -279,11 +439,7 @@ def launch_report_generation(report_input: ReportInput, user_api_key: str | None
         save_input_file(report_input)
         cmd = _build_analysis_core_command(config_path)
 
-        env = os.environ.copy()
-        if user_api_key:
-            env["USER_API_KEY"] = user_api_key
-
-        _launch_analysis_process(cmd, report_input.input, env)
+        _enqueue_analysis(cmd, report_input.input, user_api_key)
     except Exception as e:
         _ensure_error_status_payload(report_input.input, error_override=f"Failed to launch analysis-core: {e}")
         _set_report_status_if_present(report_input.input, "error")
@@ -298,11 +454,7 @@ def launch_report_generation_from_config(config_path: Path, slug: str, user_api_
     try:
         cmd = _build_analysis_core_command(config_path)
 
-        env = os.environ.copy()
-        if user_api_key:
-            env["USER_API_KEY"] = user_api_key
-
-        _launch_analysis_process(cmd, slug, env)
+        _enqueue_analysis(cmd, slug, user_api_key)
     except Exception as e:
         _ensure_error_status_payload(slug, error_override=f"Failed to launch analysis-core: {e}")
         _set_report_status_if_present(slug, "error")
@@ -318,11 +470,7 @@ def execute_aggregation(slug: str, user_api_key: str | None = None) -> bool:
         config_path = settings.CONFIG_DIR / f"{slug}.json"
         cmd = _build_analysis_core_command(config_path, only="hierarchical_aggregation")
 
-        env = os.environ.copy()
-        if user_api_key:
-            env["USER_API_KEY"] = user_api_key
-
-        _launch_analysis_process(cmd, slug, env)
+        _enqueue_analysis(cmd, slug, user_api_key, priority=AGGREGATION_PRIORITY)
         return True
     except Exception as e:
         _ensure_error_status_payload(slug, error_override=f"Failed to launch analysis-core: {e}")
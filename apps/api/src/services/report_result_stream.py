@@ -0,0 +1,56 @@
+"""hierarchical_result.json の逐次読み込み
+
+analysis-core の hierarchical_aggregation は ``streaming_output`` を指定すると、``arguments`` と ``propertyMap``
+をバッチ単位で 1 行ずつ書き出す（``analysis_core.core.result_stream`` を参照）。
+この形式のファイルは行ごとに読み進めることで、全体を ``json.load`` せずに件数などを取得できる。
+それ以外の形式のファイルは従来どおり全体を読み込む。
+"""
+
+import json
+from typing import Any, TextIO
+
+STREAMED_RESULT_HEADER = '{"arguments":['
+_ARGUMENTS_CLOSE = "],"
+_PROPERTY_MAP_CLOSE = "},"
+
+
+def read_result_counts(f: TextIO) -> dict[str, int]:
+    """開いた hierarchical_result.json から意見数・コメント数・level 1 クラスタ数を読み込む
+
+    ストリーミング形式では意見をバッチごとに数え、propertyMap は解析せずに読み飛ばす。
+    """
+    first_line = f.readline()
+    if first_line.rstrip("\n") != STREAMED_RESULT_HEADER:
+        result = json.loads(first_line + f.read())
+        return _counts(result, len(result.get("arguments", [])))
+
+    lines = (line.rstrip("\n") for line in f)
+    arguments_num = 0
+    for line in lines:
+        if line == _ARGUMENTS_CLOSE:
+            break
+        arguments_num += len(json.loads("[" + line.rstrip(",") + "]"))
+
+    next(lines)  # "propertyMap":{
+    for line in lines:
+        if line == _PROPERTY_MAP_CLOSE:
+            break
+        # プロパティごとのブロックを閉じ括弧まで読み飛ばす
+        for entries in lines:
+            if entries in ("}", "},"):
+                break
+
+    result: dict[str, Any] = {}
+    for line in lines:
+        if line == "}":
+            break
+        result.update(json.loads("{" + line.rstrip(",") + "}"))
+    return _counts(result, arguments_num)
+
+
+def _counts(result: dict[str, Any], arguments_num: int) -> dict[str, int]:
+    return {
+        "comment_num": result.get("comment_num", 0),
+        "arguments_num": arguments_num,
+        "cluster_num": sum(1 for c in result.get("clusters", []) if c.get("level") == 1),
+    }
@@ -10,6 +10,8 @@ from src.schemas.admin_report import ReportInput
 from src.schemas.report import AnalysisData, Report, ReportStatus, ReportVisibility
 from src.schemas.report_config import ReportConfigUpdate
 from src.services.llm_pricing import LLMPricing
+from src.services.report_arguments_table import ARGUMENTS_TABLE_FILENAME, read_arguments_table_counts
+from src.services.report_result_stream import read_result_counts
 
 # ロガーの設定
 logger = logging.getLogger("uvicorn")
@@ -276,16 +278,16 @@ def add_analysis_data(report: Report) -> Report:
     if report.status != ReportStatus.READY:
         return report
 
+    # 意見テーブルがあればメタデータだけで件数を取得する
+    counts = read_arguments_table_counts(settings.REPORT_DIR / report.slug / ARGUMENTS_TABLE_FILENAME)
+    if counts is not None:
+        return report.model_copy(update={"analysis": AnalysisData(**counts)})
+
     report_path = settings.REPORT_DIR / report.slug / "hierarchical_result.json"
     try:
+        # ストリーミング形式の結果は意見と propertyMap を展開せずに件数だけ数える
         with open(report_path) as f:
-            report_result = json.load(f)
-
-        analysis_data = AnalysisData(
-            comment_num=report_result.get("comment_num", 0),
-            arguments_num=len(report_result.get("arguments", [])),
-            cluster_num=get_cluster_num(report_result),
-        )
+            analysis_data = AnalysisData(**read_result_counts(f))
 
         return report.model_copy(update={"analysis": analysis_data})
 
@@ -5,6 +5,7 @@ from pathlib import Path
 from src.config import settings
 from src.services.storage import get_storage_service
 from src.utils.logger import setup_logger
+from src.utils.tracing import start_span
 
 logger = setup_logger()
 
@@ -21,10 +22,17 @@ class ReportSyncService:
         "embeddings.pkl",
         "hierarchical_initial_labels.csv",
         "hierarchical_merge_labels.csv",
+        "hierarchical_initial_labels.parquet",
+        "hierarchical_merge_labels.parquet",
         "hierarchical_result.json",
+        "hierarchical_result_arguments.parquet",
+        "hierarchical_result_attribute_stats.parquet",
         "args.csv",
         "hierarchical_clusters.csv",
         "relations.csv",
+        "args.parquet",
+        "hierarchical_clusters.parquet",
+        "relations.parquet",
         "hierarchical_overview.txt",
     )
     # ``report.html`` is intentionally excluded. The Web product uses
@@ -42,7 +50,8 @@ class ReportSyncService:
             return
 
         remote_status_file_path = f"{self.REMOTE_STATUS_FILE_PREFIX}/report_status.json"
-        self.storage_service.upload_file(str(self.LOCAL_STATUS_FILE_PATH), remote_status_file_path)
+        with start_span("storage.upload_status_file"):
+            self.storage_service.upload_file(str(self.LOCAL_STATUS_FILE_PATH), remote_status_file_path)
 
     def _cleanup_report_files(self, report_dir: Path) -> bool:
         """レポートディレクトリから保持すべきファイル以外を削除する
@@ -97,7 +106,10 @@ class ReportSyncService:
         remote_dir_prefix = f"{self.REMOTE_REPORT_DIR_PREFIX}/{slug}"
 
         # ファイルをストレージにアップロード
-        upload_success = self.storage_service.upload_directory(str(local_dir), remote_dir_prefix)
+        with start_span("storage.upload_report_files", {"report.slug": slug}) as span:
+            upload_success = self.storage_service.upload_directory(str(local_dir), remote_dir_prefix)
+            if span is not None:
+                span.set_attribute("storage.success", bool(upload_success))
 
         # アップロードが成功した場合、保持すべきファイル以外を削除
         if upload_success:
@@ -113,7 +125,8 @@ class ReportSyncService:
         remote_input_file_path = f"{self.REMOTE_INPUT_DIR_PREFIX}/{slug}.csv"
 
         # ファイルをストレージにアップロード
-        self.storage_service.upload_file(str(input_file_path), remote_input_file_path)
+        with start_span("storage.upload_input_file", {"report.slug": slug}):
+            self.storage_service.upload_file(str(input_file_path), remote_input_file_path)
 
     def sync_config_file_to_storage(self, slug: str) -> None:
         """設定ファイルをストレージにアップロードする"""
@@ -123,7 +136,8 @@ class ReportSyncService:
             return
 
         remote_config_file_path = f"{self.REMOTE_CONFIG_DIR_PREFIX}/{slug}.json"
-        self.storage_service.upload_file(str(config_file_path), remote_config_file_path)
+        with start_span("storage.upload_config_file", {"report.slug": slug}):
+            self.storage_service.upload_file(str(config_file_path), remote_config_file_path)
 
     def download_status_file_from_storage(self) -> bool:
         """ステータスファイルをストレージからダウンロードする
@@ -143,7 +157,8 @@ class ReportSyncService:
 
         try:
             remote_status_file_path = f"{self.REMOTE_STATUS_FILE_PREFIX}/report_status.json"
-            return self.storage_service.download_file(remote_status_file_path, str(self.LOCAL_STATUS_FILE_PATH))
+            with start_span("storage.download_status_file"):
+                return self.storage_service.download_file(remote_status_file_path, str(self.LOCAL_STATUS_FILE_PATH))
         except FileNotFoundError:
             logger.warning(f"ストレージにステータスファイルが存在しません: {remote_status_file_path}")
             return False
@@ -166,11 +181,12 @@ class ReportSyncService:
             bool: ダウンロードに成功した場合はTrue、失敗した場合はFalse
         """
         try:
-            return self.storage_service.download_directory(
-                remote_dir_prefix,
-                str(local_dir),
-                target_suffixes=target_suffixes,
-            )
+            with start_span("storage.download_directory", {"storage.prefix": remote_dir_prefix}):
+                return self.storage_service.download_directory(
+                    remote_dir_prefix,
+                    str(local_dir),
+                    target_suffixes=target_suffixes,
+                )
         except FileNotFoundError:
             logger.warning(f"ストレージに{file_type_name}が存在しません: {remote_dir_prefix}")
             return False
@@ -214,7 +230,8 @@ class ReportSyncService:
         local_input_file_path = settings.INPUT_DIR / f"{slug}.csv"
         try:
             local_input_file_path.parent.mkdir(parents=True, exist_ok=True)
-            self.storage_service.download_file(remote_input_file_path, str(local_input_file_path))
+            with start_span("storage.download_input_file", {"report.slug": slug}):
+                self.storage_service.download_file(remote_input_file_path, str(local_input_file_path))
             return local_input_file_path.exists()
         except Exception as e:
             logger.error(f"入力ファイルのダウンロードに失敗しました: {e}")
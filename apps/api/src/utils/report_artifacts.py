@@ -0,0 +1,34 @@
+"""analysis-core が書き出す表形式の中間ファイル（Parquet または CSV）のファイル名の解決
+
+analysis-core は ``args`` / ``relations`` / ``hierarchical_clusters`` / ``hierarchical_initial_labels`` /
+``hierarchical_merge_labels`` を設定 ``artifact_format`` に従って Parquet（既定）または CSV で書き出す。
+古いレポートには CSV しかないため、両方の形式を受け付ける。
+規則は analysis-core の ``analysis_core.core.artifacts`` と同じ（API は analysis_core を import しないため複製している）。
+"""
+
+from pathlib import Path
+
+# 論理名（CSV のファイル名）
+TABLE_ARTIFACTS = (
+    "args.csv",
+    "relations.csv",
+    "hierarchical_clusters.csv",
+    "hierarchical_initial_labels.csv",
+    "hierarchical_merge_labels.csv",
+)
+
+
+def artifact_file_names(name: str) -> tuple[str, ...]:
+    """論理名に対応する実際のファイル名の候補（Parquet を優先）。表形式の中間ファイルでなければ論理名のみ"""
+    if name not in TABLE_ARTIFACTS:
+        return (name,)
+    return (str(Path(name).with_suffix(".parquet")), name)
+
+
+def resolve_artifact_path(report_dir: Path, name: str) -> Path:
+    """存在するファイルのパスを返す。どちらの形式もなければ論理名のパスを返す"""
+    candidates = [report_dir / file_name for file_name in artifact_file_names(name)]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return candidates[-1]
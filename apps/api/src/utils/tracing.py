@@ -0,0 +1,132 @@
+"""OTLP-JSON ファイルへのトレース出力
+
+環境変数 ``KOUCHOU_TRACE_FILE`` が設定されている場合のみ、レポート生成のサブプロセスやストレージ同期のスパンを
+OTLP/JSON 形式 (``ExportTraceServiceRequest`` を 1 行 1 件) で追記する。サブプロセスには ``TRACEPARENT``
+環境変数でスパンを引き継ぎ、analysis-core 側のステップや LLM 呼び出しのスパンが同じトレースにぶら下がる。
+
+API は analysis-core を import しないため、analysis_core.core.tracing と同じ形式をここでも実装している。
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+TRACE_FILE_ENV = "KOUCHOU_TRACE_FILE"
+TRACEPARENT_ENV = "TRACEPARENT"
+SERVICE_NAME = "kouchou-ai-api"
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_trace_span", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name: str, path: str, attributes: Mapping[str, Any] | None = None):
+        parent = _current_span.get()
+        self.name = name
+        self.path = path
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.parent_span_id = parent.span_id if parent else None
+        self.span_id = secrets.token_hex(8)
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.start_time_ns = time.time_ns()
+        self.status_code = STATUS_OK
+        self.status_message = ""
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+
+    def end(self) -> None:
+        """スパンを終了してファイルに書き出す。書き出しに失敗しても処理は止めない"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(time.time_ns()),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+            "status": {"code": self.status_code, **({"message": self.status_message} if self.status_message else {})},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": "kouchou_ai_api"}, "spans": [span]}],
+                }
+            ]
+        }
+        try:
+            with _write_lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError:
+            pass
+
+
+def open_span(name: str, attributes: Mapping[str, Any] | None = None) -> Span | None:
+    """スパンを開始する。``use_span`` で終了するまで開いたままになる。トレースが無効なら None"""
+    path = os.environ.get(TRACE_FILE_ENV)
+    if not path:
+        return None
+    return Span(name, path, attributes)
+
+
+@contextmanager
+def use_span(span: Span | None) -> Iterator[Span | None]:
+    """``with`` ブロックの間 ``span`` を現在のスパンにし、終了時に書き出す (別スレッドで終了する場合に使う)"""
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def start_span(name: str, attributes: Mapping[str, Any] | None = None) -> Iterator[Span | None]:
+    """``with`` ブロックの間のスパンを記録する"""
+    with use_span(open_span(name, attributes)) as span:
+        yield span
+
+
+def inject_traceparent(env: dict[str, str], span: Span | None) -> dict[str, str]:
+    """サブプロセスの環境変数に ``span`` を親とする ``TRACEPARENT`` を設定する"""
+    if span is not None:
+        env[TRACEPARENT_ENV] = span.traceparent
+    return env
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
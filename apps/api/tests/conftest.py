@@ -32,6 +32,19 @@ def use_test_settings(test_settings):
             yield test_settings
 
 
+@pytest.fixture(autouse=True)
+def isolated_job_queue(tmp_path):
+    """ジョブキューをテストごとに作り直し、キューのファイルを一時ディレクトリに書く"""
+    from src.services import report_launcher
+
+    with (
+        patch.object(report_launcher.settings, "DATA_DIR", tmp_path),
+        patch.object(report_launcher, "_job_queue", None),
+        patch.object(report_launcher, "_warm_worker_pool", None),
+    ):
+        yield
+
+
 @pytest.fixture
 def temp_report_dir():
     """テスト用の一時レポートディレクトリを提供するフィクスチャ"""
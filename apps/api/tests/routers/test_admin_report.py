@@ -196,6 +196,22 @@ class TestDownloadReportJson:
         assert response.json()["detail"] == "JSON file not found"
 
 
+class TestCancelReport:
+    def test_cancel_report_cancels_job(self, client):
+        with patch.object(admin_report, "cancel_report_job", return_value=True) as cancel:
+            response = client.post("/admin/reports/test-slug/cancel", headers={"x-api-key": "test-api-key"})
+
+        assert response.status_code == 202
+        assert response.json() == {"success": True}
+        cancel.assert_called_once_with("test-slug")
+
+    def test_cancel_report_without_job_returns_404(self, client):
+        with patch.object(admin_report, "cancel_report_job", return_value=False):
+            response = client.post("/admin/reports/test-slug/cancel", headers={"x-api-key": "test-api-key"})
+
+        assert response.status_code == 404
+
+
 class TestDuplicateReport:
     def _setup_duplicate_env(self, tmp_path: Path, source_slug: str) -> dict:
         config_dir = tmp_path / "configs"
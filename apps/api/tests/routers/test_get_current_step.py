@@ -1,4 +1,5 @@
 import json
+import os
 from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -49,6 +50,8 @@ def create_mock_path(exists: bool):
 @contextmanager
 def mock_status_response(status_data: dict):
     mock_status_file = create_mock_path(exists=True)
+    # ステータスファイルとスナップショットは同じモックを返すので、更新時刻も同じにする
+    mock_status_file.stat.return_value.st_mtime = 0.0
 
     with patch("src.routers.admin_report.settings") as mock_settings:
         mock_settings.REPORT_DIR.__truediv__ = MagicMock(return_value=MagicMock())
@@ -208,3 +211,26 @@ async def test_get_current_step_exception(async_client, test_slug):
         assert data["token_usage_input"] == 0
         assert data["token_usage_output"] == 0
         assert data["error_message"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_current_step_prefers_newer_snapshot(async_client, test_slug, tmp_path):
+    """analysis-core のスナップショットがステータスファイルより新しければ、そちらを読む"""
+    report_dir = tmp_path / test_slug
+    report_dir.mkdir()
+    status_file = report_dir / "hierarchical_status.json"
+    snapshot_file = report_dir / "hierarchical_status_snapshot.json"
+    status_file.write_text(json.dumps({"status": "running", "current_job": "extraction"}), encoding="utf-8")
+    snapshot_file.write_text(json.dumps({"status": "running", "current_job": "embedding"}), encoding="utf-8")
+    os.utime(status_file, (1000, 1000))
+    os.utime(snapshot_file, (2000, 2000))
+
+    with patch("src.routers.admin_report.settings.REPORT_DIR", tmp_path):
+        response = await async_client.get(f"/admin/reports/{test_slug}/status/step-json")
+        assert response.json()["current_step"] == "embedding"
+
+        # API 側で異常終了を書き込んだ場合はステータスファイルの方が新しい
+        status_file.write_text(json.dumps({"status": "error", "current_job": "embedding"}), encoding="utf-8")
+        os.utime(status_file, (3000, 3000))
+        response = await async_client.get(f"/admin/reports/{test_slug}/status/step-json")
+        assert response.json()["status"] == "error"
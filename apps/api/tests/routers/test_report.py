@@ -1,8 +1,10 @@
 """Test cases for public report endpoints."""
 
+import hashlib
 import json
 from unittest.mock import patch
 
+import polars as pl
 from fastapi.testclient import TestClient
 
 from src.schemas.report import ReportStatus, ReportVisibility
@@ -225,3 +227,131 @@ class TestVisualizationConfigMerge:
         assert response.status_code == 200
         data = response.json()
         assert "visualizationConfig" not in data
+
+
+class TestShardedReportEndpoints:
+    """Test cases for /reports/{slug}/manifest and /reports/{slug}/shards/{shard_name}."""
+
+    def _write_shards(self, report_dir):
+        shard_dir = report_dir / "hierarchical_result_shards"
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        points = json.dumps({"arg_id": ["A1_0"], "x": [0.1], "y": [0.2], "cluster_ids": [["0", "1_0"]]}).encode()
+        (shard_dir / "points.json").write_bytes(points)
+        manifest = {
+            "config": {"question": "テスト"},
+            "overview": "概要",
+            "clusters": [],
+            "shards": {
+                "points": {"file": "points.json", "sha256": hashlib.sha256(points).hexdigest(), "count": 1},
+                "arguments": [{"cluster_id": "1_0", "file": "arguments-000.json", "sha256": "abc", "count": 1}],
+            },
+        }
+        (shard_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        return points
+
+    def _mock_reports(self, slug, visibility=ReportVisibility.PUBLIC):
+        return [type("Report", (), {"slug": slug, "status": ReportStatus.READY, "visibility": visibility})()]
+
+    def test_get_manifest_and_shard_with_etag(self, client: TestClient, temp_report_dir, test_settings):
+        """正常系：マニフェストとシャードを取得でき、ETagが一致すれば304を返す"""
+        slug = "test-sharded-report"
+        points = self._write_shards(temp_report_dir / slug)
+        headers = {"x-api-key": test_settings.PUBLIC_API_KEY}
+
+        with (
+            patch("src.routers.report.settings.REPORT_DIR", temp_report_dir),
+            patch("src.routers.report.load_status_as_reports", return_value=self._mock_reports(slug)),
+        ):
+            manifest_response = client.get(f"/reports/{slug}/manifest", headers=headers)
+            shard_response = client.get(f"/reports/{slug}/shards/points.json", headers=headers)
+            cached_response = client.get(
+                f"/reports/{slug}/shards/points.json",
+                headers={**headers, "If-None-Match": shard_response.headers["etag"]},
+            )
+
+        assert manifest_response.status_code == 200
+        assert manifest_response.json()["visibility"] == "public"
+        assert manifest_response.json()["shards"]["points"]["file"] == "points.json"
+
+        assert shard_response.status_code == 200
+        assert shard_response.content == points
+        assert shard_response.headers["etag"] == f'"{hashlib.sha256(points).hexdigest()}"'
+
+        assert cached_response.status_code == 304
+
+    def test_shard_not_listed_in_manifest_returns_404(self, client: TestClient, temp_report_dir, test_settings):
+        """マニフェストにないファイル名は（パスを含めて）返さない"""
+        slug = "test-sharded-report"
+        self._write_shards(temp_report_dir / slug)
+        (temp_report_dir / slug / "hierarchical_result_shards" / "other.json").write_text("{}", encoding="utf-8")
+
+        with (
+            patch("src.routers.report.settings.REPORT_DIR", temp_report_dir),
+            patch("src.routers.report.load_status_as_reports", return_value=self._mock_reports(slug)),
+        ):
+            response = client.get(
+                f"/reports/{slug}/shards/other.json", headers={"x-api-key": test_settings.PUBLIC_API_KEY}
+            )
+
+        assert response.status_code == 404
+
+    def test_manifest_of_private_or_unsharded_report_returns_404(
+        self, client: TestClient, temp_report_dir, test_settings
+    ):
+        """非公開レポート、シャード出力のないレポートのマニフェストは404"""
+        headers = {"x-api-key": test_settings.PUBLIC_API_KEY}
+        self._write_shards(temp_report_dir / "private-report")
+        (temp_report_dir / "plain-report").mkdir()
+        mock_reports = [
+            *self._mock_reports("private-report", ReportVisibility.PRIVATE),
+            *self._mock_reports("plain-report"),
+        ]
+
+        with (
+            patch("src.routers.report.settings.REPORT_DIR", temp_report_dir),
+            patch("src.routers.report.load_status_as_reports", return_value=mock_reports),
+        ):
+            private_response = client.get("/reports/private-report/manifest", headers=headers)
+            plain_response = client.get("/reports/plain-report/manifest", headers=headers)
+
+        assert private_response.status_code == 404
+        assert plain_response.status_code == 404
+
+
+class TestAttributeStatsEndpoint:
+    """Test cases for /reports/{slug}/attribute-stats."""
+
+    def _mock_reports(self, slug):
+        return [
+            type("Report", (), {"slug": slug, "status": ReportStatus.READY, "visibility": ReportVisibility.PUBLIC})()
+        ]
+
+    def test_get_attribute_stats_with_filters(self, client: TestClient, temp_report_dir, test_settings):
+        """正常系：事前集計された属性の内訳を、階層・属性で絞り込んで取得できる"""
+        slug = "test-attribute-report"
+        report_dir = temp_report_dir / slug
+        report_dir.mkdir(parents=True, exist_ok=True)
+        pl.DataFrame(
+            {
+                "level": [0, 0, 1, 1, 1],
+                "cluster_id": ["0", "0", "1_0", "1_1", "1_1"],
+                "attribute": ["age", "gender", "age", "age", "gender"],
+                "value": ["20", "female", "20", "40", "female"],
+                "count": [3, 2, 2, 1, 2],
+            }
+        ).write_parquet(report_dir / "hierarchical_result_attribute_stats.parquet")
+        headers = {"x-api-key": test_settings.PUBLIC_API_KEY}
+
+        with (
+            patch("src.routers.report.settings.REPORT_DIR", temp_report_dir),
+            patch("src.routers.report.load_status_as_reports", return_value=self._mock_reports(slug)),
+        ):
+            response = client.get(f"/reports/{slug}/attribute-stats?level=1&attribute=age", headers=headers)
+            missing_response = client.get("/reports/other-report/attribute-stats", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"level": 1, "cluster_id": "1_0", "attribute": "age", "value": "20", "count": 2},
+            {"level": 1, "cluster_id": "1_1", "attribute": "age", "value": "40", "count": 1},
+        ]
+        assert missing_response.status_code == 404
@@ -115,3 +115,23 @@ def test_duplicate_report_reuses_workflow_artifacts_and_launches_from_config(mon
     assert not (new_output_dir / "hierarchical_overview.txt").exists()
 
     assert status_calls == [(new_slug, written_config, source_slug)]
+
+
+def test_ensure_source_artifacts_accepts_parquet_and_downloads_both_formats_when_missing(monkeypatch, tmp_path):
+    from src.services import report_duplicate
+
+    monkeypatch.setattr(report_duplicate.settings, "REPORT_DIR", tmp_path)
+    (tmp_path / "source").mkdir()
+    (tmp_path / "source" / "args.parquet").write_bytes(b"parquet")
+    (tmp_path / "source" / "embeddings.pkl").write_bytes(b"pickle")
+    requested = []
+
+    class FakeSyncService:
+        def download_report_artifacts(self, slug, patterns):
+            requested.append((slug, patterns))
+
+    monkeypatch.setattr(report_duplicate, "ReportSyncService", FakeSyncService)
+
+    report_duplicate._ensure_source_artifacts("source", ("args.csv", "embeddings.pkl", "relations.csv"))
+
+    assert requested == [("source", ["relations.parquet", "relations.csv"])]
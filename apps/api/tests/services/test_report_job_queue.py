@@ -0,0 +1,179 @@
+import json
+import subprocess
+
+import pytest
+
+from src.services.analysis_workers import WarmWorkerPool, send_job
+from src.services.report_job_queue import AGGREGATION_PRIORITY, ReportJobQueue
+
+
+class DummyProcess:
+    def __init__(self):
+        self.terminated = False
+
+    def poll(self):
+        return 0 if self.terminated else None
+
+    def terminate(self):
+        self.terminated = True
+
+
+def make_queue(tmp_path, max_workers=1, failed=None):
+    started = []
+
+    def start_job(job):
+        started.append(job)
+        return DummyProcess()
+
+    def on_job_failed(slug, message):
+        failed.append((slug, message))
+
+    queue = ReportJobQueue(
+        tmp_path / "report_jobs.json",
+        max_workers,
+        start_job=start_job,
+        on_job_failed=on_job_failed if failed is not None else None,
+    )
+    return queue, started
+
+
+def test_jobs_beyond_max_workers_wait_and_run_by_priority_then_fifo(tmp_path):
+    queue, started = make_queue(tmp_path, max_workers=1)
+
+    queue.submit("first", ["--config", "first.json"])
+    queue.submit("second", ["--config", "second.json"])
+    queue.submit("third", ["--config", "third.json"])
+    queue.submit("aggregation", ["--config", "a.json"], priority=AGGREGATION_PRIORITY)
+
+    assert [job.slug for job in started] == ["first"]
+    assert [(job["slug"], job["position"]) for job in queue.list_jobs()] == [
+        ("first", None),
+        ("aggregation", 1),
+        ("second", 2),
+        ("third", 3),
+    ]
+
+    queue.job_finished("first")
+    queue.job_finished("aggregation")
+    queue.job_finished("second")
+
+    assert [job.slug for job in started] == ["first", "aggregation", "second", "third"]
+
+
+def test_submit_rejects_a_slug_that_already_has_a_job(tmp_path):
+    queue, _ = make_queue(tmp_path)
+    queue.submit("report", [])
+
+    with pytest.raises(ValueError):
+        queue.submit("report", [])
+
+
+def test_submit_raises_start_error_and_forgets_the_job(tmp_path):
+    def start_job(job):
+        raise OSError("no python")
+
+    queue = ReportJobQueue(tmp_path / "report_jobs.json", 1, start_job=start_job)
+
+    with pytest.raises(OSError):
+        queue.submit("report", [])
+    assert queue.list_jobs() == []
+
+
+def test_cancel_removes_queued_job_and_terminates_running_job(tmp_path):
+    queue, started = make_queue(tmp_path, max_workers=1)
+    queue.submit("running", [])
+    queue.submit("queued", [])
+
+    assert queue.cancel("queued") == "queued"
+    assert queue.get("queued") is None
+    assert queue.cancel("running") == "running"
+    assert queue.get("running").process.terminated
+    assert queue.get("running").cancel_requested
+    assert queue.cancel("missing") is None
+
+    queue.job_finished("running")
+    assert [job.slug for job in started] == ["running"]
+
+
+def test_queue_is_persisted_without_user_api_keys(tmp_path):
+    queue, _ = make_queue(tmp_path, max_workers=1)
+    queue.submit("running", ["--config", "running.json"])
+    queue.submit("queued", ["--config", "queued.json"], env_overrides={"USER_API_KEY": "sk-secret"})
+
+    saved = (tmp_path / "report_jobs.json").read_text(encoding="utf-8")
+    assert "sk-secret" not in saved
+    assert [(job["slug"], job["state"], job["has_user_api_key"]) for job in json.loads(saved)["jobs"]] == [
+        ("running", "running", False),
+        ("queued", "queued", True),
+    ]
+
+
+def test_restore_requeues_waiting_jobs_and_fails_interrupted_ones(tmp_path):
+    queue, _ = make_queue(tmp_path, max_workers=1)
+    queue.submit("interrupted", ["--config", "interrupted.json"])
+    queue.submit("with-key", [], env_overrides={"USER_API_KEY": "sk-secret"})
+    queue.submit("waiting", ["--config", "waiting.json"])
+
+    failed = []
+    restarted, started = make_queue(tmp_path, max_workers=1, failed=failed)
+    restarted.restore()
+
+    assert [slug for slug, _ in failed] == ["interrupted", "with-key"]
+    assert [(job.slug, job.args) for job in started] == [("waiting", ["--config", "waiting.json"])]
+    restarted.submit("new", [])
+    assert restarted.get("new").seq > restarted.get("waiting").seq
+
+
+class DummyWorker:
+    def __init__(self, *args, **kwargs):
+        self.args = args[0]
+        self.stdin = DummyStdin()
+        self.alive = True
+
+    def poll(self):
+        return None if self.alive else 1
+
+
+class DummyStdin:
+    def __init__(self):
+        self.written = ""
+        self.closed = False
+
+    def write(self, data):
+        self.written += data
+
+    def close(self):
+        self.closed = True
+
+
+def test_warm_worker_pool_refills_and_skips_dead_workers(monkeypatch, tmp_path):
+    spawned = []
+
+    def fake_popen(*args, **kwargs):
+        worker = DummyWorker(*args, **kwargs)
+        spawned.append(worker)
+        return worker
+
+    monkeypatch.setattr(subprocess, "Popen", fake_popen)
+    pool = WarmWorkerPool(1)
+    assert pool.take() is None
+
+    pool.start()
+    spawned[0].alive = False
+    assert pool.take() is None
+    worker = pool.take()
+
+    assert worker is spawned[1]
+    assert len(spawned) == 3
+    assert worker.args == ["python", "-m", "analysis_core.worker"]
+
+    send_job(worker, ["--config", "c.json"], {"USER_API_KEY": "sk"}, tmp_path / "analysis.log")
+    assert json.loads(worker.stdin.written) == {
+        "args": ["--config", "c.json"],
+        "env": {"USER_API_KEY": "sk"},
+        "log_path": str(tmp_path / "analysis.log"),
+    }
+    assert worker.stdin.closed
+
+    pool.shutdown()
+    assert spawned[2].stdin.closed
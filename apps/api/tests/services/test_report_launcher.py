@@ -794,3 +794,141 @@ def test_execute_aggregation_records_launch_error_payload(monkeypatch, tmp_path)
     assert status_data["error"] == "Failed to launch analysis-core: spawn blocked"
     assert status_data["error_log_path"] == "analysis.log"
     assert status_data["error_log_excerpt"] is None
+
+
+def test_launch_propagates_trace_context_to_subprocess(monkeypatch, tmp_path):
+    import json
+
+    from src.services import report_launcher
+    from src.utils.tracing import start_span
+
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setenv("KOUCHOU_TRACE_FILE", str(trace_file))
+    monkeypatch.setattr(report_launcher.settings, "REPORT_DIR", tmp_path / "reports")
+    calls = {}
+
+    class DummyPopen:
+        returncode = 0
+
+        def __init__(self, *args, **kwargs):
+            calls["env"] = kwargs.get("env", {})
+
+    class ImmediateThread:
+        def __init__(self, target=None, args=(), kwargs=None, **_):
+            self.target = target
+            self.args = args
+
+        def start(self):
+            self.target(*self.args)
+
+    def fake_monitor_process(process, slug, log_file=None):
+        log_file.close()
+        with start_span("storage.upload_report_files", {"report.slug": slug}):
+            pass
+
+    monkeypatch.setattr(subprocess, "Popen", DummyPopen)
+    monkeypatch.setattr(threading, "Thread", ImmediateThread)
+    monkeypatch.setattr(report_launcher, "_monitor_process", fake_monitor_process)
+
+    report_launcher._launch_analysis_process(["python", "-m", "analysis_core"], "demo", {})
+
+    spans = {
+        span["name"]: span
+        for line in trace_file.read_text(encoding="utf-8").splitlines()
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    }
+    process_span = spans["analysis.subprocess"]
+    assert calls["env"]["TRACEPARENT"] == f"00-{process_span['traceId']}-{process_span['spanId']}-01"
+    assert {"key": "process.exit_code", "value": {"intValue": "0"}} in process_span["attributes"]
+    assert spans["storage.upload_report_files"]["parentSpanId"] == process_span["spanId"]
+
+
+def test_launch_does_not_set_traceparent_when_tracing_is_disabled(monkeypatch):
+    from src.services import report_launcher
+
+    monkeypatch.delenv("KOUCHOU_TRACE_FILE", raising=False)
+    called = patch_subprocess_launch(monkeypatch)
+    report_launcher.launch_report_generation(make_report_input())
+    assert "TRACEPARENT" not in called["env"]
+
+
+def test_reports_beyond_concurrency_limit_are_queued(monkeypatch, tmp_path):
+    from src.services import report_launcher
+
+    monkeypatch.setattr(report_launcher.settings, "ANALYSIS_MAX_CONCURRENT_JOBS", 1)
+    monkeypatch.setattr(report_launcher, "add_new_report_to_status", lambda report_input: None)
+    monkeypatch.setattr(report_launcher, "save_config_file", lambda report_input: tmp_path / "config.json")
+    monkeypatch.setattr(report_launcher, "save_input_file", lambda report_input: None)
+    launched = []
+    monkeypatch.setattr(
+        report_launcher,
+        "_launch_analysis_process",
+        lambda cmd, slug, env, on_exit=None: launched.append((slug, on_exit)),
+    )
+
+    report_launcher.launch_report_generation(make_report_input(input="first"))
+    report_launcher.launch_report_generation(make_report_input(input="second"), "sk-second")
+
+    assert [slug for slug, _ in launched] == ["first"]
+    assert [(job["slug"], job["state"]) for job in report_launcher.get_job_queue().list_jobs()] == [
+        ("first", "running"),
+        ("second", "queued"),
+    ]
+
+    # 実行中のプロセスが終了すると、待機中のジョブが開始される
+    launched[0][1]()
+    assert [slug for slug, _ in launched] == ["first", "second"]
+
+
+def test_monitor_process_marks_cancelled_run_as_cancelled(monkeypatch, tmp_path):
+    import json
+
+    from src.services import report_launcher
+
+    slug = "demo"
+    report_dir = tmp_path / "reports"
+    (report_dir / slug).mkdir(parents=True)
+    (report_dir / slug / "hierarchical_status.json").write_text(
+        json.dumps({"status": "cancelled", "current_job": "extraction", "error": "Pipeline was cancelled"}),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(report_launcher.settings, "REPORT_DIR", report_dir)
+    statuses = []
+    monkeypatch.setattr(report_launcher, "set_status", lambda current_slug, status: statuses.append(status))
+
+    class DummyProcess:
+        def wait(self):
+            return report_launcher.ANALYSIS_EXIT_CANCELLED
+
+    report_launcher._monitor_process(DummyProcess(), slug)
+
+    status_data = json.loads((report_dir / slug / "hierarchical_status.json").read_text(encoding="utf-8"))
+    assert status_data["status"] == "cancelled"
+    assert status_data["current_job"] == "extraction"
+    assert statuses == ["cancelled"]
+
+
+def test_cancel_report_job_cancels_queued_report_immediately(monkeypatch, tmp_path):
+    import json
+
+    from src.services import report_launcher
+
+    monkeypatch.setattr(report_launcher.settings, "ANALYSIS_MAX_CONCURRENT_JOBS", 1)
+    monkeypatch.setattr(report_launcher.settings, "REPORT_DIR", tmp_path)
+    monkeypatch.setattr(report_launcher, "add_new_report_to_status", lambda report_input: None)
+    monkeypatch.setattr(report_launcher, "save_config_file", lambda report_input: tmp_path / "config.json")
+    monkeypatch.setattr(report_launcher, "save_input_file", lambda report_input: None)
+    monkeypatch.setattr(report_launcher, "_launch_analysis_process", lambda cmd, slug, env, on_exit=None: None)
+    statuses = []
+    monkeypatch.setattr(report_launcher, "set_status", lambda slug, status: statuses.append((slug, status)))
+
+    report_launcher.launch_report_generation(make_report_input(input="running"))
+    report_launcher.launch_report_generation(make_report_input(input="queued"))
+
+    assert report_launcher.cancel_report_job("queued")
+    assert not report_launcher.cancel_report_job("missing")
+
+    assert statuses == [("queued", "cancelled")]
+    assert [job["slug"] for job in report_launcher.get_job_queue().list_jobs()] == ["running"]
+    status_data = json.loads((tmp_path / "queued" / "hierarchical_status.json").read_text(encoding="utf-8"))
+    assert status_data["status"] == "cancelled"
@@ -3,6 +3,7 @@ from copy import deepcopy
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
+import polars as pl
 import pytest
 
 from src.schemas.report import Report, ReportStatus, ReportVisibility
@@ -237,6 +238,60 @@ class TestAddAnalysisData:
         assert updated.analysis.arguments_num == 3
         assert updated.analysis.cluster_num == 1  # level 1 のみ
 
+    @patch("src.services.report_status.settings")
+    def test_add_analysis_data_reads_counts_from_arguments_table(self, mock_settings, ready_report, tmp_path):
+        """意見テーブル（Parquet）があれば hierarchical_result.json を開かずに件数を取得する"""
+        mock_settings.REPORT_DIR = tmp_path
+        report_dir = tmp_path / ready_report.slug
+        report_dir.mkdir()
+        pl.DataFrame({"arg_id": ["A1_0", "A1_1"], "x": [0.0, 1.0]}).write_parquet(
+            report_dir / "hierarchical_result_arguments.parquet",
+            metadata={"comment_num": "5", "cluster_num": "3"},
+        )
+
+        with patch("builtins.open", side_effect=AssertionError("JSON should not be read")):
+            updated = add_analysis_data(ready_report)
+
+        assert updated.analysis is not None
+        assert updated.analysis.comment_num == 5
+        assert updated.analysis.arguments_num == 2
+        assert updated.analysis.cluster_num == 3
+
+    @patch("src.services.report_status.settings")
+    def test_add_analysis_data_counts_streamed_result(self, mock_settings, ready_report, tmp_path):
+        """ストリーミング形式の結果は意見をバッチごとに数え、propertyMap を読み飛ばす"""
+        mock_settings.REPORT_DIR = tmp_path
+        report_dir = tmp_path / ready_report.slug
+        report_dir.mkdir()
+        (report_dir / "hierarchical_result.json").write_text(
+            "\n".join(
+                [
+                    '{"arguments":[',
+                    '{"arg_id":"A1_0","argument":"],"},{"arg_id":"A1_1","argument":"b"},',
+                    '{"arg_id":"A2_0","argument":"c"}',
+                    "],",
+                    '"propertyMap":{',
+                    '"age":{',
+                    '"A1_0":"},","A1_1":null',
+                    "},",
+                    '"gender":{',
+                    "}",
+                    "},",
+                    '"clusters":[{"id":"0","level":0},{"id":"1_0","level":1},{"id":"1_1","level":1}],',
+                    '"comment_num":7',
+                    "}",
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        updated = add_analysis_data(ready_report)
+
+        assert updated.analysis is not None
+        assert updated.analysis.comment_num == 7
+        assert updated.analysis.arguments_num == 3
+        assert updated.analysis.cluster_num == 2
+
     @patch("src.services.report_status.settings")
     def test_add_analysis_data_file_not_found(self, mock_settings, ready_report):
         mock_settings.REPORT_DIR = Path("/fake/path")
@@ -1,8 +1,10 @@
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
+import polars as pl
 import pytest
 
+from src.config import settings
 from src.core.exceptions import ClusterCSVParseError, ClusterFileNotFound
 from src.repositories.cluster_repository import ClusterRepository
 from src.schemas.cluster import ClusterResponse, ClusterUpdate
@@ -226,3 +228,85 @@ class TestClusterRepository:
 
         # 検証
         assert result is False
+
+
+class TestClusterRepositoryParquet:
+    """Parquet で書き出されたクラスタの中間ファイルのテスト"""
+
+    @pytest.fixture
+    def report_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "REPORT_DIR", tmp_path)
+        report_dir = tmp_path / "test-slug"
+        report_dir.mkdir()
+        return report_dir
+
+    @pytest.fixture
+    def expected_clusters(self):
+        return [
+            ClusterResponse(
+                level=1,
+                id="1_0",
+                label="ラベル1",
+                description="説明1",
+                value=10,
+                parent="0",
+                density=0.8,
+                density_rank=1,
+                density_rank_percentile=0.9,
+            ),
+            ClusterResponse(
+                level=2,
+                id="2_0",
+                label="ラベル2",
+                description="説明2",
+                value=5,
+                parent="1_0",
+                density=0.6,
+                density_rank=2,
+                density_rank_percentile=0.7,
+            ),
+            ClusterResponse(
+                level=2,
+                id="2_1",
+                label="ラベル3",
+                description="説明3",
+                value=5,
+                parent="1_0",
+                density=None,
+                density_rank=None,
+                density_rank_percentile=None,
+            ),
+        ]
+
+    def test_reads_and_updates_parquet_in_place(self, report_dir, expected_clusters):
+        pl.DataFrame([cluster.model_dump() for cluster in expected_clusters]).write_parquet(
+            report_dir / "hierarchical_merge_labels.parquet"
+        )
+        repository = ClusterRepository("test-slug")
+
+        assert repository.labels_path == report_dir / "hierarchical_merge_labels.parquet"
+        assert [cluster.model_dump() for cluster in repository.read_from_csv()] == [
+            cluster.model_dump() for cluster in expected_clusters
+        ]
+
+        updated = ClusterUpdate(id="2_0", label="更新されたラベル", description="更新された説明")
+        assert repository.update_csv(updated) is True
+
+        assert not (report_dir / "hierarchical_merge_labels.csv").exists()
+        labels = pl.read_parquet(report_dir / "hierarchical_merge_labels.parquet")
+        assert labels.row(1, named=True)["label"] == "更新されたラベル"
+        assert labels.schema["density_rank"] == pl.Int64
+        assert labels["density"].to_list() == [0.8, 0.6, None]
+
+    def test_falls_back_to_csv_for_older_reports(self, report_dir):
+        (report_dir / "hierarchical_merge_labels.csv").write_text(
+            "level,id,label,description,value,parent,density,density_rank,density_rank_percentile\n"
+            "1,1_0,ラベル,説明,3,0,0.0,1.0,\n",
+            encoding="utf-8",
+        )
+
+        clusters = ClusterRepository("test-slug").read_from_csv()
+
+        assert clusters[0].density == 0.0
+        assert clusters[0].density_rank == 1
+        assert clusters[0].density_rank_percentile is None
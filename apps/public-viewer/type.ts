@@ -64,6 +64,8 @@ export type Result = {
   comments: Comments; // コメント情報
   // biome-ignore lint/suspicious/noExplicitAny:
   propertyMap: Record<string, any>; // プロパティマッピング情報
+  propertyMapEncoding?: "categorical"; // 指定時の propertyMap は { prop: { values: 値の辞書, codes: arguments 順のコード } }
+  attributeStats?: Record<string, Record<string, Record<string, number>>>; // 属性 -> クラスタID -> 属性値 -> 意見数
   // biome-ignore lint/suspicious/noExplicitAny:
   translations: Record<string, any>; // 翻訳情報
   overview: string; // 解析概要
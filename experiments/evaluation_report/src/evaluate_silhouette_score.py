@@ -5,6 +5,7 @@ from typing import Literal
 
 import numpy as np
 import pandas as pd
+from report_artifacts import read_artifact
 from sklearn.metrics import pairwise_distances, silhouette_samples
 
 # 5段階評価用閾値
@@ -27,13 +28,13 @@ def load_vectors(dataset_path: Path, source: Literal["embedding", "umap"]):
         vectors = np.vstack(df["embedding"].values)
         arg_ids = df["arg-id"].tolist()
     else:
-        df = pd.read_csv(dataset_path / "hierarchical_clusters.csv")
+        df = read_artifact(dataset_path, "hierarchical_clusters.csv")
         vectors = df[["x", "y"]].values
         arg_ids = df["arg-id"].astype(str).tolist()
     return vectors, arg_ids
 
 def load_cluster_labels(dataset_path: Path, level: int):
-    df = pd.read_csv(dataset_path / "hierarchical_clusters.csv")
+    df = read_artifact(dataset_path, "hierarchical_clusters.csv")
     col = f"cluster-level-{level}-id"
     df["arg-id"] = df["arg-id"].astype(str)
     return df[["arg-id", col]].rename(columns={col: "cluster_id"})
@@ -11,8 +11,8 @@ import random
 from pathlib import Path
 from typing import Literal
 
-import pandas as pd
 from analysis_core.services.llm import request_to_chat_ai
+from report_artifacts import read_artifact
 
 
 def get_criteria_clarity() -> str:
@@ -147,9 +147,9 @@ def evaluate_all_criteria_prompt_only(cluster_data: dict, output_path: Path = No
     else:
         print(prompt)
 def load_cluster_data(dataset_path: Path, level: int, max_samples: int) -> dict:
-    args_df = pd.read_csv(dataset_path / "args.csv")
-    labels_df = pd.read_csv(dataset_path / "hierarchical_merge_labels.csv")
-    clusters_df = pd.read_csv(dataset_path / "hierarchical_clusters.csv")
+    args_df = read_artifact(dataset_path, "args.csv")
+    labels_df = read_artifact(dataset_path, "hierarchical_merge_labels.csv")
+    clusters_df = read_artifact(dataset_path, "hierarchical_clusters.csv")
 
     cluster_col = f"cluster-level-{level}-id"
     cluster_data = {}
@@ -272,9 +272,9 @@ def save_results(results: dict, output_path: Path):
     print(f"✓ 結果を保存しました: {output_path}")
 
 def load_cluster_data(dataset_path: Path, level: int, max_samples: int) -> dict:
-    args_df = pd.read_csv(dataset_path / "args.csv")
-    labels_df = pd.read_csv(dataset_path / "hierarchical_merge_labels.csv")
-    clusters_df = pd.read_csv(dataset_path / "hierarchical_clusters.csv")
+    args_df = read_artifact(dataset_path, "args.csv")
+    labels_df = read_artifact(dataset_path, "hierarchical_merge_labels.csv")
+    clusters_df = read_artifact(dataset_path, "hierarchical_clusters.csv")
 
     cluster_col = f"cluster-level-{level}-id"
     cluster_data = {}
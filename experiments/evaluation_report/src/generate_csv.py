@@ -4,6 +4,7 @@ import sys
 from pathlib import Path
 
 import pandas as pd
+from report_artifacts import read_artifact
 
 
 # -----------------------------
@@ -31,8 +32,8 @@ data_dir = Path("inputs") / data_id
 output_dir = Path("outputs") / data_id
 
 # 入力ファイルパス
-LABEL_CSV = data_dir / "hierarchical_merge_labels.csv"
 RESULT_JSON = data_dir / "hierarchical_result.json"
+RESULT_ARGUMENTS_PARQUET = data_dir / "hierarchical_result_arguments.parquet"
 EVAL_LLM_JSON_L1 = data_dir / "evaluation_consistency_llm_level1.json"
 EVAL_LLM_JSON_L2 = data_dir / "evaluation_consistency_llm_level2.json"
 SIL_UMAP_CLUSTER_JSON_L1 = data_dir / "silhouette_umap_level1_clusters.json"
@@ -47,7 +48,7 @@ OUT_COMMENT_CSV = output_dir / "comment_evaluation.csv"
 # クラスタ単位の出力
 # -----------------------------
 def generate_cluster_csv():
-    df = pd.read_csv(LABEL_CSV)
+    df = read_artifact(data_dir, "hierarchical_merge_labels.csv")
 
     if "cluster_id" not in df.columns:
         if "id" in df.columns:
@@ -94,11 +95,27 @@ def generate_cluster_csv():
 # -----------------------------
 # 意見単位の出力
 # -----------------------------
+def load_arguments():
+    """意見テーブル（Parquet）があれば hierarchical_result.json 全体を読まずに必要な列だけ読み込む"""
+    if not RESULT_ARGUMENTS_PARQUET.exists():
+        return load_json_with_fallback(RESULT_JSON).get("arguments", [])
+
+    df = pd.read_parquet(RESULT_ARGUMENTS_PARQUET)
+    level_columns = sorted(
+        [col for col in df.columns if col.startswith("cluster_level_")],
+        key=lambda col: int(col.split("_")[2]),
+    )
+    arguments = []
+    for row in df[["arg_id", "argument", *level_columns]].itertuples(index=False):
+        cluster_ids = ["0"] + [str(value) for value in row[2:] if pd.notna(value)]
+        arguments.append({"arg_id": row[0], "argument": row[1], "cluster_ids": cluster_ids})
+    return arguments
+
+
 def generate_comment_csv():
-    result_data = load_json_with_fallback(RESULT_JSON)
     point_scores = load_json_with_fallback(SIL_POINTS_JSON)
 
-    arguments = result_data.get("arguments", [])
+    arguments = load_arguments()
     rows = []
     for arg in arguments:
         comment_id = arg["arg_id"]
@@ -0,0 +1,25 @@
+"""analysis-core の表形式の中間ファイル（Parquet または CSV）の読み込み
+
+analysis-core は ``args`` / ``hierarchical_clusters`` / ``hierarchical_merge_labels`` などを
+設定 ``artifact_format`` に従って Parquet（既定）または CSV で書き出す。
+古いレポートには CSV しかないため、Parquet があればそれを、なければ CSV を読む。
+規則は analysis-core の ``analysis_core.core.artifacts`` と同じ。
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+
+def resolve_artifact_path(dataset_path: Path, name: str) -> Path:
+    """``args.csv`` のような論理名から、存在するファイルのパスを返す。どちらもなければ CSV のパス"""
+    csv_path = Path(dataset_path) / name
+    parquet_path = csv_path.with_suffix(".parquet")
+    return parquet_path if parquet_path.exists() else csv_path
+
+
+def read_artifact(dataset_path: Path, name: str) -> pd.DataFrame:
+    path = resolve_artifact_path(dataset_path, name)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
@@ -7,11 +7,16 @@ Usage:
 """
 
 import argparse
+import os
+import signal
 import sys
+import tracemalloc
 from pathlib import Path
 
 from analysis_core import __version__
 from analysis_core.core import plan_requires_input, validate_input_file
+from analysis_core.core.cancellation import EXIT_CANCELLED, install_cancel_signal_handler
+from analysis_core.core.step_profile import format_profile_table
 from analysis_core.orchestrator import PipelineOrchestrator
 
 
@@ -68,6 +73,29 @@ def main() -> int:
         type=str,
         help="Reuse intermediate outputs from another job directory or output name",
     )
+    parser.add_argument(
+        "--parallel-steps",
+        type=int,
+        help="Run up to N workflow steps concurrently when they do not depend on each other "
+        "(overrides workflow_max_workers in the config)",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Read inputs lazily, spill large intermediate tables to Parquet and run steps one at a time "
+        "(overrides low_memory in the config)",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        help="Fail a step when the process RSS stays above this many MB; implies --low-memory "
+        "(overrides memory_budget_mb in the config and ANALYSIS_MEMORY_BUDGET_MB)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Track peak Python memory allocation per step with tracemalloc (slows the pipeline down)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -112,6 +140,13 @@ def main() -> int:
             reuse_from=args.reuse_from,
         )
 
+        if args.parallel_steps is not None:
+            orchestrator.config["workflow_max_workers"] = args.parallel_steps
+        if args.low_memory:
+            orchestrator.config["low_memory"] = True
+        if args.memory_budget_mb is not None:
+            orchestrator.config["memory_budget_mb"] = args.memory_budget_mb
+
         plan = orchestrator.get_plan()
         should_validate_input = args.validate_input or args.dry_run or (
             not args.validate_config and plan_requires_input(plan)
@@ -146,13 +181,23 @@ def main() -> int:
         print(f"  Output: {orchestrator.output_base_dir}")
         print()
 
-        result = orchestrator.run_default()
+        if args.trace_memory:
+            tracemalloc.start()
+        # API からのキャンセル (SIGTERM) を受けたら、実行中のステップを途中で止めて状態を書き出す
+        previous_handler = signal.getsignal(signal.SIGTERM)
+        install_cancel_signal_handler()
+        try:
+            result = orchestrator.run_default()
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
 
         # Report results
         print()
         print("=" * 40)
         if result.success:
             print("Pipeline completed successfully!")
+        elif result.cancelled:
+            print("Pipeline cancelled.")
         else:
             print("Pipeline failed!")
             if result.error:
@@ -175,6 +220,18 @@ def main() -> int:
                 if step.error:
                     print(f"         Error: {step.error}")
 
+        profiles = [step.profile for step in result.steps if step.profile]
+        if profiles:
+            print()
+            print("Step profile:")
+            print(format_profile_table(profiles))
+
+        if result.cancelled:
+            # 取り消した LLM 呼び出しのうち実行中だったものは完了を待たずに終了する
+            # (通常の終了ではスレッドプールのワーカースレッドの終了を待ってしまう)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(EXIT_CANCELLED)
         return 0 if result.success else 1
 
     except Exception as e:
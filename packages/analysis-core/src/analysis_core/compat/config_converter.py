@@ -108,6 +108,10 @@ def normalize_config(config: dict[str, Any], include_source_code: bool = True) -
     llm_grouping.setdefault("group_count", None)
     llm_grouping.setdefault("discovery_sample_size", 80)
     llm_grouping.setdefault("assignment_batch_size", 25)
+    llm_grouping.setdefault("workers", 1)
+    llm_grouping.setdefault("assignment_mode", "llm")
+    llm_grouping.setdefault("embedding_margin", 0.05)
+    llm_grouping.setdefault("sub_group_count", None)
     if not llm_grouping.get("discovery_prompt"):
         llm_grouping["discovery_prompt"] = get_default_prompt("llm_grouping_discovery") or ""
     if not llm_grouping.get("assignment_prompt"):
@@ -122,6 +126,7 @@ def normalize_config(config: dict[str, Any], include_source_code: bool = True) -
     initial_labelling.setdefault("prompt", get_default_prompt("hierarchical_initial_labelling") or "")
     initial_labelling.setdefault("model", result["model"])
     initial_labelling.setdefault("workers", 3)
+    initial_labelling.setdefault("use_cache", True)
     if "hierarchical_initial_labelling" in source_codes:
         initial_labelling.setdefault("source_code", source_codes["hierarchical_initial_labelling"])
 
@@ -131,6 +136,7 @@ def normalize_config(config: dict[str, Any], include_source_code: bool = True) -
     merge_labelling.setdefault("prompt", get_default_prompt("hierarchical_merge_labelling") or "")
     merge_labelling.setdefault("model", result["model"])
     merge_labelling.setdefault("workers", 3)
+    merge_labelling.setdefault("use_cache", True)
     if "hierarchical_merge_labelling" in source_codes:
         merge_labelling.setdefault("source_code", source_codes["hierarchical_merge_labelling"])
 
@@ -138,12 +144,21 @@ def normalize_config(config: dict[str, Any], include_source_code: bool = True) -
     overview = result.setdefault("hierarchical_overview", {})
     overview.setdefault("prompt", get_default_prompt("hierarchical_overview") or "")
     overview.setdefault("model", result["model"])
+    overview.setdefault("target_level", 1)
+    overview.setdefault("map_reduce", False)
+    overview.setdefault("max_input_tokens", 8000)
+    if not overview.get("map_prompt"):
+        overview["map_prompt"] = get_default_prompt("hierarchical_overview_map") or ""
+    overview.setdefault("workers", 1)
     if "hierarchical_overview" in source_codes:
         overview.setdefault("source_code", source_codes["hierarchical_overview"])
 
     # Aggregation defaults
     aggregation = result.setdefault("hierarchical_aggregation", {})
     aggregation.setdefault("hidden_properties", {})
+    aggregation.setdefault("sharded_output", False)
+    aggregation.setdefault("streaming_output", False)
+    aggregation.setdefault("property_map_encoding", "mapping")
     if "hierarchical_aggregation" in source_codes:
         aggregation.setdefault("source_code", source_codes["hierarchical_aggregation"])
 
@@ -0,0 +1,94 @@
+"""Content hashes of step artifacts for input-based step invalidation.
+
+各ステップの完了時に、出力ファイルのハッシュ (``output_hash``) と、実行時点の依存ステップの出力のハッシュ
+(``input_hashes``) を ``completed_jobs`` に記録する。上流のステップが再実行されても出力が前回と同じであれば、
+下流のステップは入力が変わっていないものとして実行を省略できる (Make / Bazel と同じ考え方)。
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+
+from analysis_core.core.artifacts import resolve_artifact_path
+
+_CHUNK_SIZE = 1 << 20
+# 同じプロセス内で同じファイルを何度もハッシュしないよう、(パス, 更新時刻, サイズ) でキャッシュする
+_hash_cache: dict[tuple[str, int, int], str] = {}
+
+
+def hash_file(path: Path | str) -> str:
+    """ファイル内容の SHA-256"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    cached = _hash_cache.get(key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    _hash_cache[key] = digest.hexdigest()
+    return _hash_cache[key]
+
+
+def hash_path(path: Path | str) -> str | None:
+    """ファイルまたはディレクトリ (配下のファイルの相対パスと内容) のハッシュ。存在しなければ None"""
+    path = Path(path)
+    if path.is_file():
+        return hash_file(path)
+    if not path.is_dir():
+        return None
+
+    digest = hashlib.sha256()
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(file.relative_to(path).as_posix().encode("utf-8") + b"\0")
+        digest.update(hash_file(file).encode("ascii"))
+    return digest.hexdigest()
+
+
+def step_output_paths(spec: dict[str, Any], output_dir: Path) -> list[Path]:
+    """ステップの出力ファイル。extraction は relations.csv も出力する
+
+    表形式の成果物は、Parquet と CSV のうち実際に存在するファイルを返す。
+    """
+    paths = [resolve_artifact_path(output_dir / spec["filename"])]
+    if spec["step"] == "extraction":
+        paths.append(resolve_artifact_path(output_dir / "relations.csv"))
+    return paths
+
+
+def hash_step_output(spec: dict[str, Any], output_dir: Path) -> str | None:
+    """ステップの出力全体のハッシュ。出力がひとつでも欠けていれば None"""
+    hashes = [hash_path(path) for path in step_output_paths(spec, output_dir)]
+    if any(h is None for h in hashes):
+        return None
+    if len(hashes) == 1:
+        return hashes[0]
+    return hashlib.sha256("".join(hashes).encode("ascii")).hexdigest()
+
+
+def step_input_hashes(spec: dict[str, Any], specs: list[dict[str, Any]], output_dir: Path) -> dict[str, str | None]:
+    """依存ステップごとの、現在の出力のハッシュ"""
+    specs_by_name = {s["step"]: s for s in specs}
+    return {
+        dep: hash_step_output(specs_by_name[dep], output_dir)
+        for dep in spec["dependencies"]["steps"]
+        if dep in specs_by_name
+    }
+
+
+def inputs_unchanged(
+    spec: dict[str, Any],
+    specs: list[dict[str, Any]],
+    previous_job: dict[str, Any] | None,
+    output_dir: Path,
+) -> bool:
+    """前回の実行時から依存ステップの出力が変わっておらず、自身の出力も残っているかどうか"""
+    if not previous_job or not previous_job.get("input_hashes"):
+        return False
+    if hash_step_output(spec, output_dir) is None:
+        return False
+    current = step_input_hashes(spec, specs, output_dir)
+    return None not in current.values() and current == previous_job["input_hashes"]
@@ -0,0 +1,55 @@
+"""File format of the intermediate table artifacts.
+
+``args`` / ``relations`` / ``hierarchical_clusters`` / ``hierarchical_initial_labels`` /
+``hierarchical_merge_labels`` は、設定ファイルの ``artifact_format`` に従って Parquet (zstd 圧縮、既定) または
+CSV で書き出す。Parquet は列の型を保持するため、後続のステップで型推論をやり直す必要がなく、
+``comment-id`` が数値か文字列かで揺れることもない。
+
+仕様 (``specs/*.json``) やプラグインの成果物では従来どおり ``args.csv`` のような CSV のファイル名を
+論理名として使い、実際のファイルは ``resolve_artifact_path`` で解決する。Parquet があればそれを、
+なければ CSV を返すので、過去の実行で書き出された CSV もそのまま読める。
+
+このモジュールは CLI の事前検証からも import されるため、polars を import しない
+(読み書きは ``analysis_core.core.frames``)。
+"""
+
+from pathlib import Path
+from typing import Any
+
+ARTIFACT_FORMAT_CSV = "csv"
+ARTIFACT_FORMAT_PARQUET = "parquet"
+ARTIFACT_FORMATS = (ARTIFACT_FORMAT_CSV, ARTIFACT_FORMAT_PARQUET)
+DEFAULT_ARTIFACT_FORMAT = ARTIFACT_FORMAT_PARQUET
+
+# artifact_format に従って書き出す中間ファイル (論理名)
+TABLE_ARTIFACTS = (
+    "args.csv",
+    "relations.csv",
+    "hierarchical_clusters.csv",
+    "hierarchical_initial_labels.csv",
+    "hierarchical_merge_labels.csv",
+)
+
+
+def artifact_format(config: dict[str, Any]) -> str:
+    value = config.get("artifact_format") or DEFAULT_ARTIFACT_FORMAT
+    if value not in ARTIFACT_FORMATS:
+        raise ValueError(f"artifact_format must be one of {list(ARTIFACT_FORMATS)}: {value}")
+    return value
+
+
+def artifact_candidates(path: str | Path) -> list[Path]:
+    """論理名に対応する実際のファイルの候補 (優先順)。表形式の成果物でなければ論理名そのもの"""
+    path = Path(path)
+    if path.name not in TABLE_ARTIFACTS:
+        return [path]
+    return [path.with_suffix(".parquet"), path]
+
+
+def resolve_artifact_path(path: str | Path) -> Path:
+    """存在するファイルを返す。どちらの形式もなければ論理名のパスを返す"""
+    candidates = artifact_candidates(path)
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return candidates[-1]
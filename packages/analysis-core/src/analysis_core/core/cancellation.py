@@ -0,0 +1,107 @@
+"""Cooperative cancellation of a pipeline run.
+
+API からのキャンセルは analysis-core のプロセスに SIGTERM として届く。``install_cancel_signal_handler`` で
+登録したハンドラはプロセス全体のキャンセルフラグを立てるだけで、実際の停止はワークフローエンジン
+(ステップの開始前) と、LLM を呼び出すステップのループ (バッチ・クラスタごと) がフラグを確認して
+``PipelineCancelled`` を送出することで行う。
+
+キャンセル時、まだ開始していない LLM 呼び出しは取り消し、実行中の呼び出しの完了は待たない。
+途中までの結果は各ステップがチェックポイント (抽出結果のジャーナルやラベルキャッシュ) に書き出し、
+再実行時に再利用する。
+"""
+
+import signal
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# キャンセルされたときの CLI の終了コード
+EXIT_CANCELLED = 3
+# 完了待ちの間にキャンセルフラグを確認する間隔 (秒)
+CANCEL_POLL_INTERVAL = 0.5
+
+_cancel_event = threading.Event()
+
+
+class PipelineCancelled(Exception):
+    """Raised inside a step when the pipeline run has been cancelled."""
+
+    def __init__(self, message: str = "Pipeline was cancelled"):
+        super().__init__(message)
+
+
+def request_cancel() -> None:
+    """実行中のパイプラインにキャンセルを要求する"""
+    _cancel_event.set()
+
+
+def clear_cancel_request() -> None:
+    _cancel_event.clear()
+
+
+def is_cancel_requested() -> bool:
+    return _cancel_event.is_set()
+
+
+def raise_if_cancelled() -> None:
+    """キャンセルが要求されていれば ``PipelineCancelled`` を送出する"""
+    if _cancel_event.is_set():
+        raise PipelineCancelled()
+
+
+def install_cancel_signal_handler() -> None:
+    """SIGTERM でキャンセルを要求するハンドラを登録する (メインスレッドからのみ呼べる)"""
+
+    def handle(signum, frame) -> None:
+        print(f"Received signal {signum}, cancelling the pipeline...", flush=True)
+        request_cancel()
+
+    signal.signal(signal.SIGTERM, handle)
+
+
+def wait_or_cancel(futures: Iterable[Future], timeout: float | None = None) -> tuple[set[Future], set[Future]]:
+    """``concurrent.futures.wait`` (ALL_COMPLETED) と同じだが、待っている間にキャンセルされたら
+    まだ開始していない Future を取り消して ``PipelineCancelled`` を送出する
+    """
+    pending = set(futures)
+    done: set[Future] = set()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while pending:
+        interval = CANCEL_POLL_INTERVAL
+        if deadline is not None:
+            interval = min(interval, deadline - time.monotonic())
+            if interval <= 0:
+                break
+        finished, pending = wait(pending, timeout=interval, return_when=FIRST_COMPLETED)
+        done |= finished
+        if pending and _cancel_event.is_set():
+            for future in pending:
+                future.cancel()
+            raise PipelineCancelled()
+    return done, pending
+
+
+def cancellable_map(fn: Callable[[T], R], items: Iterable[T], max_workers: int) -> Iterator[R]:
+    """``ThreadPoolExecutor.map`` と同じ順序で結果を返す。キャンセルされたら残りの呼び出しを取り消し、
+    実行中の呼び出しの完了を待たずに ``PipelineCancelled`` を送出する
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    cancelled = False
+    try:
+        futures = [executor.submit(fn, item) for item in items]
+        for future in futures:
+            if not future.done():
+                try:
+                    wait_or_cancel([future])
+                except PipelineCancelled:
+                    cancelled = True
+                    raise
+            yield future.result()
+    finally:
+        # 例外で抜けた場合も未開始の呼び出しは取り消す。キャンセル時は実行中の呼び出しを待たない
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
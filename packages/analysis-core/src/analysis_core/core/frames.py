@@ -0,0 +1,127 @@
+"""Reading and writing tables, and spilling intermediate frames in low-memory mode.
+
+通常モードでは表をそのまま読み込む。低メモリモード (``analysis_core.core.memory``) では
+``pl.scan_csv`` / ``pl.scan_parquet`` の遅延読み込みから必要な列だけをストリーミングエンジンで集計し、
+大きな中間テーブルは出力ディレクトリの ``.spill`` に Parquet として書き出してから読み直す。
+
+ステップ間で受け渡す表形式の成果物は ``read_artifact`` / ``write_artifact`` で読み書きする
+(形式は ``analysis_core.core.artifacts``)。
+"""
+
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+from analysis_core.core.artifacts import (
+    ARTIFACT_FORMAT_PARQUET,
+    artifact_candidates,
+    artifact_format,
+    resolve_artifact_path,
+)
+from analysis_core.core.memory import is_low_memory
+
+SPILL_DIRNAME = ".spill"
+# CSV では数値に推論されることがあるため、常に文字列として扱う列
+STRING_COLUMNS = ("arg-id", "comment-id")
+
+
+def scan_table(path: str | Path, schema_overrides: dict[str, pl.DataType] | None = None) -> pl.LazyFrame:
+    """拡張子に応じて CSV または Parquet を遅延読み込みする"""
+    if Path(path).suffix == ".parquet":
+        return pl.scan_parquet(path)
+    return pl.scan_csv(path, schema_overrides=schema_overrides)
+
+
+def read_table(
+    path: str | Path,
+    config: dict[str, Any],
+    columns: list[str] | None = None,
+    schema_overrides: dict[str, pl.DataType] | None = None,
+) -> pl.DataFrame:
+    """テーブルを読み込む。低メモリモードでは指定した列だけをストリーミングで読む
+
+    ``schema_overrides`` は CSV を読むときだけ使う (Parquet は書き出したときの型を持っている)。
+    """
+    if is_low_memory(config):
+        frame = scan_table(path, schema_overrides)
+        if columns is not None:
+            frame = frame.select(columns)
+        return frame.collect(engine="streaming")
+    if Path(path).suffix == ".parquet":
+        return pl.read_parquet(path, columns=columns)
+    return pl.read_csv(path, columns=columns, schema_overrides=schema_overrides)
+
+
+def read_artifact(path: str | Path, config: dict[str, Any], columns: list[str] | None = None) -> pl.DataFrame:
+    """表形式の成果物を、Parquet と CSV のどちらで書き出されていても読み込む"""
+    return read_table(resolve_artifact_path(path), config, columns, schema_overrides=_string_overrides())
+
+
+def scan_artifact(path: str | Path) -> pl.LazyFrame:
+    return scan_table(resolve_artifact_path(path), _string_overrides())
+
+
+def write_artifact(frame: pl.DataFrame, path: str | Path, config: dict[str, Any]) -> Path:
+    """``artifact_format`` の形式で書き出し、もう一方の形式の古いファイルがあれば削除する
+
+    Args:
+        frame: 書き出す表
+        path: 論理名のパス (``args.csv`` など)
+        config: ``artifact_format`` を含む設定
+
+    Returns:
+        実際に書き出したファイルのパス
+    """
+    candidates = artifact_candidates(path)
+    if len(candidates) != 2:
+        raise ValueError(f"Not a table artifact: {path}")
+    parquet_path, csv_path = candidates
+    frame = frame.with_columns(pl.col(col).cast(pl.Utf8) for col in STRING_COLUMNS if col in frame.columns)
+    if artifact_format(config) == ARTIFACT_FORMAT_PARQUET:
+        target, stale = parquet_path, csv_path
+        frame.write_parquet(target, compression="zstd")
+    else:
+        target, stale = csv_path, parquet_path
+        frame.write_csv(target)
+    stale.unlink(missing_ok=True)
+    return target
+
+
+def _string_overrides() -> dict[str, pl.DataType]:
+    return {col: pl.Utf8 for col in STRING_COLUMNS}
+
+
+def column_names(frame: pl.DataFrame | pl.LazyFrame) -> list[str]:
+    """DataFrame と LazyFrame のどちらからも列名を取得する"""
+    return frame.collect_schema().names()
+
+
+def count_rows(frame: pl.DataFrame | pl.LazyFrame) -> int:
+    if isinstance(frame, pl.LazyFrame):
+        return frame.select(pl.len()).collect(engine="streaming").item()
+    return frame.height
+
+
+def spill_frame(frame: pl.DataFrame | pl.LazyFrame, spill_dir: Path, name: str) -> pl.LazyFrame:
+    """フレームを Parquet に書き出し、それを遅延読み込みする LazyFrame を返す"""
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    path = spill_dir / f"{name}.parquet"
+    if isinstance(frame, pl.LazyFrame):
+        frame.sink_parquet(path, compression="zstd")
+    else:
+        frame.write_parquet(path, compression="zstd")
+    return pl.scan_parquet(path)
+
+
+@contextmanager
+def spill_directory(output_dir: str | Path) -> Iterator[Path]:
+    """ステップの間だけ使う spill 用ディレクトリ。終了時 (失敗時も) に削除する"""
+    path = Path(output_dir) / SPILL_DIRNAME
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,128 @@
+"""Persistent cache for cluster labelling results.
+
+ラベリング結果を (プロンプト, プロバイダー, モデル, クラスタに属する意見の ID と本文) のハッシュで保存し、
+設定の一部だけを変えた再実行でメンバーが変わっていないクラスタの LLM 呼び出しを省略する。
+抽出をやり直すと同じ arg-id に別の本文が入ることがあるため、ID だけでなく本文もキーに含める。
+
+各エントリにはステップ名を記録し、ステップが最後まで完了したときに、そのステップで今回使わなかった
+エントリを削除する (古い設定のラベルが溜まり続けないようにするため)。
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+LABEL_CACHE_FILENAME = "label_cache.json"
+
+
+def build_label_cache_key(
+    *,
+    step: str,
+    prompt: str,
+    provider: str,
+    model: str,
+    members: list[tuple[Any, str]],
+    context: str = "",
+) -> str:
+    """ラベリング結果のキャッシュキーを生成する
+
+    Args:
+        step: ステップ名
+        prompt: LLMへのプロンプト
+        provider: LLMプロバイダー
+        model: 使用するLLMモデル名
+        members: クラスタに属する意見の (arg-id, 本文) (順序は問わない)
+        context: 子クラスタのラベルなど、結果に影響するその他の入力
+
+    Returns:
+        SHA-256 の16進文字列
+    """
+    payload = json.dumps(
+        {
+            "step": step,
+            "prompt": prompt,
+            "provider": provider,
+            "model": model,
+            "members": sorted([str(arg_id), str(text)] for arg_id, text in members),
+            "context": context,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LabelCache:
+    """出力ディレクトリに保存されるラベリング結果のキャッシュ
+
+    ThreadPoolExecutor のワーカーから並行して参照・更新されるため、内部でロックを取る。
+    初期ラベリングとマージラベリングは同じファイルを共有し、エントリの ``step`` で区別する。
+    """
+
+    def __init__(self, path: Path | str, enabled: bool = True, step: str = ""):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.step = step
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, str]] = {}
+        self._used: set[str] = set()
+        if enabled and self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"ラベルキャッシュを読み込めませんでした: {e}")
+                self._entries = {}
+
+    @classmethod
+    def from_config(cls, config: dict, step: str) -> "LabelCache":
+        """ステップ設定からキャッシュを生成する (`use_cache: false` で無効化)"""
+        output_base_dir = config.get("_output_base_dir", "outputs")
+        enabled = config.get(step, {}).get("use_cache", True)
+        return cls(
+            Path(output_base_dir) / config["output_dir"] / LABEL_CACHE_FILENAME, enabled=bool(enabled), step=step
+        )
+
+    def get(self, key: str) -> dict[str, str] | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.get("step", "") != self.step:
+                return None
+            self.hits += 1
+            self._used.add(key)
+            return {"label": entry["label"], "description": entry["description"]}
+
+    def set(self, key: str, label: str, description: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = {"step": self.step, "label": label, "description": description}
+            self._used.add(key)
+
+    def save(self, prune: bool = False) -> None:
+        """キャッシュをアトミックに書き出す
+
+        Args:
+            prune: このステップのエントリのうち、今回参照も更新もしなかったものを削除する。
+                ステップが最後まで完了したときだけ指定する (キャンセル時は未処理のクラスタのエントリを残す)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if prune:
+                self._entries = {
+                    key: entry
+                    for key, entry in self._entries.items()
+                    if key in self._used or entry.get("step", self.step) != self.step
+                }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
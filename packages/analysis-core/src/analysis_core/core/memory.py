@@ -0,0 +1,83 @@
+"""Memory-bounded execution mode.
+
+1 台の VM で複数のレポートを並行して生成できるように、パイプラインのメモリ使用量を抑えるモードを提供する。
+
+- ``low_memory: true`` (設定ファイル) で低メモリモードになる。ステップは CSV を ``pl.scan_csv`` で遅延読み込みして
+  必要な列だけをストリーミングで集計し、大きな中間テーブルは Parquet に書き出して (spill) から読み直す
+  (``analysis_core.core.frames``)。依存関係のないステップの同時実行も行わない。
+- ``memory_budget_mb`` (設定ファイル) または環境変数 ``ANALYSIS_MEMORY_BUDGET_MB`` でプロセスの RSS の上限を
+  指定すると、低メモリモードも有効になる。
+
+上限は協調的に守る。ステップは大きなデータを読み込んだ後やバッチごとに ``check_memory_budget`` を呼び、
+RSS が上限を超えていればガベージコレクションの後に再確認して、なお超えていれば ``MemoryBudgetExceeded``
+を送出してステップを失敗させる。``RLIMIT_AS`` によるハードリミットは polars や BLAS が確保する仮想メモリで
+すぐに到達し、Python の例外にならずにプロセスが異常終了するため使わない。
+
+このモジュールは CLI の事前検証からも import されるため、polars などの重い依存を import しない。
+"""
+
+import gc
+import os
+import sys
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+MEMORY_BUDGET_ENV = "ANALYSIS_MEMORY_BUDGET_MB"
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """Raised when the process RSS stays above the configured memory budget."""
+
+    def __init__(self, where: str, rss_mb: float, budget_mb: int):
+        super().__init__(f"Memory budget exceeded in {where}: RSS {rss_mb:.0f} MB > budget {budget_mb} MB")
+        self.where = where
+        self.rss_mb = rss_mb
+        self.budget_mb = budget_mb
+
+
+def memory_budget_mb(config: dict[str, Any]) -> int | None:
+    """設定ファイル、なければ環境変数で指定された RSS の上限 (MB) を返す。指定がなければ None"""
+    budget = config.get("memory_budget_mb") or os.getenv(MEMORY_BUDGET_ENV)
+    if not budget:
+        return None
+    budget = int(budget)
+    if budget <= 0:
+        raise ValueError(f"memory_budget_mb must be positive: {budget}")
+    return budget
+
+
+def is_low_memory(config: dict[str, Any]) -> bool:
+    return bool(config.get("low_memory")) or memory_budget_mb(config) is not None
+
+
+def current_rss_mb() -> float | None:
+    """現在の RSS (MB)。/proc を読めない環境では最大 RSS で代用し、それも計測できなければ None"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB 単位、macOS はバイト単位
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def check_memory_budget(config: dict[str, Any], where: str) -> None:
+    """RSS が上限を超えていれば、ガベージコレクションの後に再確認して ``MemoryBudgetExceeded`` を送出する"""
+    budget = memory_budget_mb(config)
+    if budget is None:
+        return
+    rss = current_rss_mb()
+    if rss is None or rss <= budget:
+        return
+    gc.collect()
+    rss = current_rss_mb()
+    if rss is not None and rss > budget:
+        raise MemoryBudgetExceeded(where, rss, budget)
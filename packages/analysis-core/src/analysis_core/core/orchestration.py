@@ -5,6 +5,7 @@ Migrated from apps/api/broadlistening/pipeline/hierarchical_utils.py
 with configurable paths and reduced external dependencies.
 """
 
+import csv
 import inspect
 import json
 import os
@@ -14,9 +15,15 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Callable
 
-import polars as pl
 from dotenv import load_dotenv
 
+from analysis_core.core.artifact_hash import hash_step_output, inputs_unchanged, step_input_hashes
+from analysis_core.core.artifacts import resolve_artifact_path
+from analysis_core.core.label_cache import LABEL_CACHE_FILENAME
+from analysis_core.core.progress_journal import get_progress_journal, read_status_snapshot
+from analysis_core.core.step_profile import StepProfiler
+from analysis_core.core.tracing import start_span
+
 # Default specs - can be overridden
 _specs: list[dict[str, Any]] = []
 
@@ -99,13 +106,13 @@ def _seed_reused_outputs(
         if not source_job:
             continue
 
-        source_artifact = source_dir / step_spec["filename"]
+        source_artifact = resolve_artifact_path(source_dir / step_spec["filename"])
         if not source_artifact.exists():
             continue
 
         copied_files = [source_artifact]
         if step_name == "extraction":
-            relations = source_dir / "relations.csv"
+            relations = resolve_artifact_path(source_dir / "relations.csv")
             if not relations.exists():
                 continue
             copied_files.append(relations)
@@ -121,6 +128,11 @@ def _seed_reused_outputs(
     if not reusable_steps:
         raise RuntimeError(f"No reusable artifacts found in {source_dir}")
 
+    # ラベルキャッシュも引き継ぎ、設定の小さな変更ではLLMを呼ばずにラベルを再利用できるようにする
+    label_cache = source_dir / LABEL_CACHE_FILENAME
+    if label_cache.exists():
+        shutil.copy2(label_cache, dest_dir / LABEL_CACHE_FILENAME)
+
     seeded_jobs = []
     for step_spec in specs:
         step_name = step_spec["step"]
@@ -258,6 +270,9 @@ def validate_config(config: dict[str, Any], specs: list[dict[str, Any]] | None =
         "without_html",
         "without-html",
         "reuse_from",
+        "low_memory",
+        "memory_budget_mb",
+        "artifact_format",
     ]
     step_names = [x["step"] for x in specs]
 
@@ -292,13 +307,15 @@ def validate_input_file(config: dict[str, Any], input_base_dir: Path, plan: list
     if not input_path.exists():
         raise RuntimeError(f"Input CSV not found: {input_path}")
 
+    # ヘッダー行だけを読めばよいので、polars を import せずに csv モジュールで読む
     try:
-        comments = pl.read_csv(input_path, n_rows=0)
+        with open(input_path, encoding="utf-8-sig", newline="") as f:
+            columns = next(csv.reader(f))
     except Exception as exc:
         raise RuntimeError(f"Failed to read input CSV header: {input_path}") from exc
 
     required_columns = {"comment-id", "comment-body"}
-    missing_columns = sorted(required_columns - set(comments.columns))
+    missing_columns = sorted(required_columns - set(columns))
     if missing_columns:
         raise RuntimeError(
             f"Input CSV is missing required columns {missing_columns}. "
@@ -306,11 +323,10 @@ def validate_input_file(config: dict[str, Any], input_base_dir: Path, plan: list
         )
 
     property_columns = config.get("extraction", {}).get("properties", [])
-    missing_properties = [column for column in property_columns if column not in comments.columns]
+    missing_properties = [column for column in property_columns if column not in columns]
     if missing_properties:
         raise RuntimeError(
-            f"Input CSV is missing extraction.properties columns {missing_properties}. "
-            f"Available columns: {comments.columns}"
+            f"Input CSV is missing extraction.properties columns {missing_properties}. Available columns: {columns}"
         )
 
     return input_path
@@ -339,13 +355,7 @@ def decide_what_to_run(
     if output_base_dir is None:
         output_base_dir = Path("outputs")
 
-    # Find last previously tracked jobs
-    previous_jobs: list[dict[str, Any]] = []
-    _previous = config.get("previous", None)
-    while _previous and _previous.get("previous", None) is not None:
-        _previous = _previous["previous"]
-    if _previous:
-        previous_jobs = _previous.get("completed_jobs", []) + _previous.get("previously_completed_jobs", [])
+    previous_jobs = _previous_jobs(config)
 
     def different_params(step: dict[str, Any]) -> list[str]:
         """Check if step parameters changed from previous run."""
@@ -370,6 +380,7 @@ def decide_what_to_run(
         stepname = step["step"]
         run = True
         reason = None
+        check_inputs = False
         found_prev = len([x for x in previous_jobs if x["step"] == step["step"]]) > 0
 
         if stepname == "hierarchical_visualization" and config.get("without-html", False):
@@ -384,13 +395,18 @@ def decide_what_to_run(
             reason = "forced this step with -o"
         elif not found_prev:
             reason = "no trace of previous run"
-        elif not os.path.exists(output_base_dir / config["output_dir"] / step["filename"]):
+        elif not resolve_artifact_path(output_base_dir / config["output_dir"] / step["filename"]).exists():
             reason = "previous data not found"
         else:
             deps = step["dependencies"]["steps"]
             changing_deps = [x["step"] for x in plan if (x["step"] in deps and x["run"])]
             if len(changing_deps) > 0:
                 reason = "some dependent steps will re-run: " + (", ".join(changing_deps))
+                previous_job = _find_job(previous_jobs, stepname)
+                if previous_job and previous_job.get("input_hashes") and not different_params(step):
+                    # 上流の出力が前回と同じなら実行時に省略する (run_step / ワークフロー実行時に判定)
+                    reason += " (skipped if their outputs are unchanged)"
+                    check_inputs = True
             else:
                 diff_params = different_params(step)
                 if len(diff_params) > 0:
@@ -399,11 +415,83 @@ def decide_what_to_run(
                     run = False
                     reason = "nothing changed"
 
-        plan.append({"step": stepname, "run": run, "reason": reason})
+        entry = {"step": stepname, "run": run, "reason": reason}
+        if check_inputs:
+            entry["check_inputs"] = True
+        plan.append(entry)
 
     return plan
 
 
+def _previous_jobs(config: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the completed jobs of the last previously tracked run."""
+    _previous = config.get("previous", None)
+    while _previous and _previous.get("previous", None) is not None:
+        _previous = _previous["previous"]
+    if not _previous:
+        return []
+    return _previous.get("completed_jobs", []) + _previous.get("previously_completed_jobs", [])
+
+
+def _find_job(jobs: list[dict[str, Any]], step: str) -> dict[str, Any] | None:
+    return next((job for job in jobs if job["step"] == step), None)
+
+
+def _find_spec(step: str, specs: list[dict[str, Any]] | None = None) -> dict[str, Any] | None:
+    return next((spec for spec in (specs if specs is not None else _specs) if spec["step"] == step), None)
+
+
+def skip_if_inputs_unchanged(
+    step: str,
+    config: dict[str, Any],
+    output_base_dir: Path | None = None,
+    specs: list[dict[str, Any]] | None = None,
+) -> bool:
+    """
+    Skip a step planned with ``check_inputs`` when the outputs of its dependencies are unchanged.
+
+    The plan entry is updated in place so that the status file records why the step was skipped.
+
+    Returns:
+        True if the step should be skipped
+    """
+    plan = next((x for x in config.get("plan", []) if x["step"] == step), None)
+    spec = _find_spec(step, specs)
+    if not plan or not plan.get("check_inputs") or spec is None:
+        return False
+    output_dir = (output_base_dir or Path(config.get("_output_base_dir") or "outputs")) / config["output_dir"]
+    previous_job = _find_job(_previous_jobs(config), step)
+    if not inputs_unchanged(spec, specs if specs is not None else _specs, previous_job, output_dir):
+        return False
+
+    print(f"Skipping '{step}': outputs of its dependencies are unchanged")
+    plan["run"] = False
+    plan["reason"] = "outputs of dependent steps are unchanged"
+    return True
+
+
+def step_hashes(
+    step: str,
+    config: dict[str, Any],
+    output_base_dir: Path | None = None,
+    specs: list[dict[str, Any]] | None = None,
+    *,
+    inputs: bool = True,
+    output: bool = True,
+) -> dict[str, Any]:
+    """Content hashes to record in a completed job (``input_hashes`` and/or ``output_hash``)."""
+    spec = _find_spec(step, specs)
+    if spec is None:
+        return {}
+    output_dir = (output_base_dir or Path(config.get("_output_base_dir") or "outputs")) / config["output_dir"]
+    hashes: dict[str, Any] = {}
+    if inputs:
+        hashes["input_hashes"] = step_input_hashes(spec, specs if specs is not None else _specs, output_dir)
+    if output:
+        hashes["output_hash"] = hash_step_output(spec, output_dir)
+    return hashes
+
+
 def update_status(
     config: dict[str, Any],
     updates: dict[str, Any],
@@ -438,6 +526,7 @@ def update_status(
     status_file = output_base_dir / output_dir / "hierarchical_status.json"
     with open(status_file, "w", encoding="utf-8") as file:
         json.dump(config, file, indent=2, ensure_ascii=False)
+    get_progress_journal(status_file.parent).update_snapshot(config)
 
 
 def update_progress(
@@ -449,6 +538,9 @@ def update_progress(
     """
     Update step progress.
 
+    Setting the total rewrites the status file once per step. Increments only go to the throttled progress
+    journal and the status snapshot (see ``analysis_core.core.progress_journal``).
+
     Args:
         config: Pipeline configuration
         incr: Increment current progress by this amount
@@ -458,7 +550,16 @@ def update_progress(
     if total is not None:
         update_status(config, {"current_job_progress": 0, "current_jop_tasks": total}, output_base_dir)
     elif incr is not None:
-        update_status(config, {"current_job_progress": config["current_job_progress"] + incr}, output_base_dir)
+        if output_base_dir is None:
+            output_base_dir = Path(config.get("_output_base_dir") or "outputs")
+        config["current_job_progress"] = config["current_job_progress"] + incr
+        tasks = config.get("current_jop_tasks")
+        get_progress_journal(output_base_dir / config["output_dir"]).record(
+            config.get("current_job"),
+            config["current_job_progress"],
+            tasks,
+            force=tasks is not None and config["current_job_progress"] >= tasks,
+        )
 
 
 def run_step(
@@ -483,6 +584,11 @@ def run_step(
     if not plan["run"]:
         print(f"Skipping '{step}'")
         return
+    if skip_if_inputs_unchanged(step, config, output_base_dir):
+        return
+
+    # 依存ステップの出力は実行中に変わらないので、実行前にハッシュを取る
+    input_hashes = step_hashes(step, config, output_base_dir, output=False)
 
     # Update status before running
     update_status(
@@ -497,9 +603,18 @@ def run_step(
 
     # Run the step
     token_usage_before = config.get("total_token_usage", 0)
-    func(config)
+    token_input_before = config.get("token_usage_input", 0)
+    token_output_before = config.get("token_usage_output", 0)
+    with start_span(f"step {step}", {"step.id": step}, thread_root=True) as span, StepProfiler(step) as profiler:
+        func(config)
+        span.set_attribute("llm.tokens.total", config.get("total_token_usage", token_usage_before) - token_usage_before)
     token_usage_after = config.get("total_token_usage", token_usage_before)
     token_usage_step = token_usage_after - token_usage_before
+    profiler.set_tokens(
+        token_usage_step,
+        config.get("token_usage_input", token_input_before) - token_input_before,
+        config.get("token_usage_output", token_output_before) - token_output_before,
+    )
 
     # Calculate estimated cost
     estimated_cost = 0.0
@@ -529,6 +644,9 @@ def run_step(
                     ).total_seconds(),
                     "params": config[step],
                     "token_usage": token_usage_step,
+                    "profile": profiler.profile.to_dict(),
+                    **input_hashes,
+                    **step_hashes(step, config, output_base_dir, inputs=False),
                 }
             ],
             "estimated_cost": estimated_cost,
@@ -642,9 +760,14 @@ def initialization(
         # Try to include source code from steps module
         if steps_module is not None:
             try:
-                step_func = getattr(steps_module, step, None)
-                if step_func is not None:
-                    config[step]["source_code"] = inspect.getsource(step_func)
+                # ステップのモジュールを import せずにソースを取得できればそちらを使う (起動を速くするため)
+                get_step_source = getattr(steps_module, "get_step_source", None)
+                source_code = get_step_source(step) if get_step_source is not None else None
+                if source_code is None:
+                    step_func = getattr(steps_module, step, None)
+                    source_code = inspect.getsource(step_func) if step_func is not None else None
+                if source_code is not None:
+                    config[step]["source_code"] = source_code
             except Exception:
                 print(f"Warning: could not get source code for step '{step}'")
 
@@ -671,6 +794,11 @@ def initialization(
             if not config[step].get("assignment_prompt"):
                 config[step]["assignment_prompt"] = get_default_prompt("llm_grouping_assignment") or ""
 
+        if step == "hierarchical_overview" and not config[step].get("map_prompt"):
+            from analysis_core.prompts import get_default_prompt
+
+            config[step]["map_prompt"] = get_default_prompt("hierarchical_overview_map") or ""
+
     # Create output directory if needed
     output_path = output_base_dir / output_dir
     if not output_path.exists():
@@ -689,6 +817,10 @@ def initialization(
     # Crash if job is already running and locked
     if previous and isinstance(previous, dict) and previous.get("status") == "running":
         lock_until = previous.get("lock_until")
+        # 進捗の書き出しではスナップショットのロック期限だけが延長される
+        snapshot = read_status_snapshot(status_file.parent) or {}
+        if snapshot.get("lock_until") and (not lock_until or snapshot["lock_until"] > lock_until):
+            lock_until = snapshot["lock_until"]
         if lock_until and datetime.fromisoformat(lock_until) > datetime.now():
             print("Job already running and locked. Try again in 5 minutes.")
             raise Exception("Job already running.")
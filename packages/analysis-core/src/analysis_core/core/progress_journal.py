@@ -0,0 +1,145 @@
+"""Append-only progress journal and compact status snapshot.
+
+``hierarchical_status.json`` は設定全体 (プロンプトを含む) を持つため、進捗のたびに書き直すと
+バッチ数に比例した数 KB の書き込みが発生し、ポーリングする側も毎回全体を読み込むことになる。
+ここでは進捗を次の 2 つのファイルに分けて書き出す。
+
+- ``hierarchical_progress.jsonl``: 進捗の追記専用ジャーナル。一定間隔内の更新はまとめて 1 行にする
+- ``hierarchical_status_snapshot.json``: 読み込み側向けに、ステータス・進捗・トークン使用量などの
+  小さなキーだけを持つスナップショット
+
+``hierarchical_status.json`` はステップの開始・完了などステータスが変わったときだけ書き直す。
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+PROGRESS_JOURNAL_FILENAME = "hierarchical_progress.jsonl"
+STATUS_SNAPSHOT_FILENAME = "hierarchical_status_snapshot.json"
+# 進捗をジャーナルに書き出す最短間隔 (秒)
+PROGRESS_FLUSH_INTERVAL = 1.0
+LOCK_DURATION = timedelta(minutes=5)
+
+SNAPSHOT_KEYS = (
+    "status",
+    "current_job",
+    "current_job_started",
+    "current_job_progress",
+    "current_jop_tasks",
+    "total_token_usage",
+    "token_usage_input",
+    "token_usage_output",
+    "estimated_cost",
+    "provider",
+    "model",
+    "error",
+    "error_log_path",
+    "error_log_excerpt",
+    "start_time",
+    "end_time",
+    "lock_until",
+)
+
+
+def build_status_snapshot(status: dict[str, Any]) -> dict[str, Any]:
+    """ステータス全体からスナップショットに含めるキーだけを取り出す"""
+    return {key: status[key] for key in SNAPSHOT_KEYS if key in status}
+
+
+def write_status_snapshot(output_dir: Path | str, snapshot: dict[str, Any]) -> None:
+    """スナップショットを書き出す。読み込み側が書きかけのファイルを読まないよう rename で置き換える"""
+    path = Path(output_dir) / STATUS_SNAPSHOT_FILENAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def read_status_snapshot(output_dir: Path | str) -> dict[str, Any] | None:
+    """スナップショットを読み込む。存在しない・壊れている場合は None"""
+    path = Path(output_dir) / STATUS_SNAPSHOT_FILENAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class ProgressJournal:
+    """出力ディレクトリごとの進捗ジャーナル
+
+    ``record`` された進捗は ``interval`` 秒に 1 回だけジャーナルへの追記とスナップショットの更新を行い、
+    その間の更新は最新の値にまとめる。
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        interval: float = PROGRESS_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.clock = clock
+        self.snapshot: dict[str, Any] = read_status_snapshot(self.output_dir) or {}
+        self.appends = 0
+        self._pending: dict[str, Any] | None = None
+        self._last_flush: float | None = None
+        self._lock = threading.Lock()
+
+    def update_snapshot(self, status: dict[str, Any]) -> None:
+        """ステータスの更新に合わせてスナップショットを書き直す (未書き出しの進捗は先に書き出す)"""
+        with self._lock:
+            self._flush_locked()
+            self.snapshot = build_status_snapshot(status)
+            write_status_snapshot(self.output_dir, self.snapshot)
+
+    def record(self, job: str | None, progress: int, tasks: int | None, force: bool = False) -> bool:
+        """進捗を記録する。書き出した場合は True"""
+        with self._lock:
+            self._pending = {"job": job, "progress": progress, "tasks": tasks}
+            now = self.clock()
+            if not force and self._last_flush is not None and now - self._last_flush < self.interval:
+                return False
+            self._flush_locked()
+            return True
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending is None:
+            return
+        pending, self._pending = self._pending, None
+        self._last_flush = self.clock()
+        entry = {"time": datetime.now().isoformat(), **pending}
+        with open(self.output_dir / PROGRESS_JOURNAL_FILENAME, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.appends += 1
+
+        # ロックの期限も進捗に合わせて延長し、長いステップの途中で期限切れにならないようにする
+        self.snapshot.update(
+            {
+                "current_job_progress": pending["progress"],
+                "current_jop_tasks": pending["tasks"],
+                "lock_until": (datetime.now() + LOCK_DURATION).isoformat(),
+            }
+        )
+        write_status_snapshot(self.output_dir, self.snapshot)
+
+
+_journals: dict[Path, ProgressJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_progress_journal(output_dir: Path | str) -> ProgressJournal:
+    """出力ディレクトリの進捗ジャーナルを返す (プロセス内で共有)"""
+    key = Path(os.path.abspath(output_dir))
+    with _journals_lock:
+        if key not in _journals:
+            _journals[key] = ProgressJournal(key)
+        return _journals[key]
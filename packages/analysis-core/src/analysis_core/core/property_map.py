@@ -0,0 +1,62 @@
+"""Categorical encoding of the ``propertyMap`` in ``hierarchical_result.json``.
+
+従来の ``propertyMap`` は ``{prop: {arg_id: value}}`` の形で、プロパティの数だけ全意見の arg_id を繰り返す。
+``property_map_encoding: "categorical"`` を指定した場合は、プロパティごとに値の辞書と、``arguments`` と
+同じ順序に並んだ整数コード (値がなければ ``null``) の配列を書き出す。
+
+.. code-block:: json
+
+    {
+      "propertyMapEncoding": "categorical",
+      "propertyMap": {"age": {"values": ["20", "40"], "codes": [0, 0, null, 1]}}
+    }
+
+読み込み側は ``decode_property_map`` で従来の形に戻せる。
+"""
+
+from typing import Any
+
+import polars as pl
+
+PROPERTY_MAP_ENCODING_KEY = "propertyMapEncoding"
+MAPPING_ENCODING = "mapping"
+CATEGORICAL_ENCODING = "categorical"
+
+
+def encode_property_frame(property_frame: pl.DataFrame) -> dict[str, dict[str, list]]:
+    """Encode a property table (``arg_id`` plus one string column per property) as values and codes.
+
+    値の辞書は出現順に並べる。コードは ``pl.Enum`` の物理表現をそのまま使う。
+    """
+    encoded = {}
+    for prop in property_frame.columns:
+        if prop == "arg_id":
+            continue
+        column = property_frame[prop]
+        values = column.drop_nulls().unique(maintain_order=True)
+        encoded[prop] = {
+            "values": values.to_list(),
+            "codes": column.cast(pl.Enum(values)).to_physical().to_list(),
+        }
+    return encoded
+
+
+def is_categorical(result: dict[str, Any]) -> bool:
+    """``propertyMap`` がカテゴリ符号化されているかどうか"""
+    return result.get(PROPERTY_MAP_ENCODING_KEY) == CATEGORICAL_ENCODING
+
+
+def decode_property_map(result: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Return the ``propertyMap`` of a result as ``{prop: {arg_id: value}}`` regardless of its encoding."""
+    property_map = result.get("propertyMap") or {}
+    if not is_categorical(result):
+        return property_map
+
+    arg_ids = [argument["arg_id"] for argument in result.get("arguments") or []]
+    return {
+        prop: {
+            arg_id: None if code is None else encoded["values"][code]
+            for arg_id, code in zip(arg_ids, encoded["codes"], strict=True)
+        }
+        for prop, encoded in property_map.items()
+    }
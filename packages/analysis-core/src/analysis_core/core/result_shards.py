@@ -0,0 +1,108 @@
+"""Sharded, lazily loadable form of ``hierarchical_result.json``.
+
+``hierarchical_result.json`` には全意見・座標・属性が含まれるため、概要だけを表示する場合でも
+全体のダウンロードが必要になる。ここではそれを次のファイルに分割して書き出す。
+
+- ``manifest.json``: クラスタ・概要・設定など意見単位ではないデータと、各シャードのファイル名・件数・ハッシュ
+- ``points.json``: 全意見の座標とクラスタIDを列指向でまとめた軽量なシャード
+- ``arguments-NNN.json``: level 1 クラスタごとの意見本体と propertyMap
+
+各シャードの SHA-256 をマニフェストに記録し、配信側でキャッシュの検証 (ETag) に使えるようにする。
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from analysis_core.core.property_map import PROPERTY_MAP_ENCODING_KEY, is_categorical
+
+SHARD_DIRNAME = "hierarchical_result_shards"
+MANIFEST_FILENAME = "manifest.json"
+POINTS_SHARD_FILENAME = "points.json"
+SHARD_FORMAT_VERSION = 1
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+# 意見単位のデータはシャードに分け、マニフェストには含めない
+_SHARDED_KEYS = ("arguments", "propertyMap", "layouts")
+
+
+def write_result_shards(result: dict[str, Any], output_dir: str | Path) -> dict[str, Any]:
+    """``hierarchical_result.json`` 相当の結果をシャードに分割して書き出す
+
+    Args:
+        result: hierarchical_result.json の内容
+        output_dir: レポートの出力ディレクトリ。``output_dir/hierarchical_result_shards`` に書き出す
+
+    Returns:
+        書き出したマニフェスト
+    """
+    shard_dir = Path(output_dir) / SHARD_DIRNAME
+    if shard_dir.exists():
+        # 前回実行時のシャードが残らないように作り直す
+        shutil.rmtree(shard_dir)
+    shard_dir.mkdir(parents=True)
+
+    arguments = result.get("arguments") or []
+    property_map = result.get("propertyMap") or {}
+
+    points = {
+        "arg_id": [argument["arg_id"] for argument in arguments],
+        "x": [argument["x"] for argument in arguments],
+        "y": [argument["y"] for argument in arguments],
+        "cluster_ids": [argument["cluster_ids"] for argument in arguments],
+    }
+    if result.get("layouts"):
+        points["layouts"] = result["layouts"]
+
+    indices_by_cluster: dict[str, list[int]] = {}
+    for position, argument in enumerate(arguments):
+        cluster_ids = argument.get("cluster_ids") or ["0"]
+        top_cluster_id = cluster_ids[1] if len(cluster_ids) > 1 else cluster_ids[0]
+        indices_by_cluster.setdefault(str(top_cluster_id), []).append(position)
+
+    argument_shards = []
+    for index, (cluster_id, positions) in enumerate(indices_by_cluster.items()):
+        cluster_arguments = [arguments[position] for position in positions]
+        if is_categorical(result):
+            # 値の辞書はそのまま、コード配列をシャード内の意見の順に切り出す
+            cluster_property_map = {
+                prop: {"values": encoded["values"], "codes": [encoded["codes"][position] for position in positions]}
+                for prop, encoded in property_map.items()
+            }
+        else:
+            arg_ids = [argument["arg_id"] for argument in cluster_arguments]
+            cluster_property_map = {
+                prop: {arg_id: values[arg_id] for arg_id in arg_ids if arg_id in values}
+                for prop, values in property_map.items()
+            }
+        shard = {"cluster_id": cluster_id, "arguments": cluster_arguments, "propertyMap": cluster_property_map}
+        if is_categorical(result):
+            shard[PROPERTY_MAP_ENCODING_KEY] = result[PROPERTY_MAP_ENCODING_KEY]
+        entry = _write_shard(shard_dir / f"arguments-{index:03d}.json", shard)
+        argument_shards.append({"cluster_id": cluster_id, "count": len(cluster_arguments), **entry})
+
+    manifest = {key: value for key, value in result.items() if key not in _SHARDED_KEYS}
+    manifest["shard_format_version"] = SHARD_FORMAT_VERSION
+    manifest["argument_count"] = len(arguments)
+    manifest["property_names"] = list(property_map.keys())
+    manifest["shards"] = {
+        "points": {"count": len(arguments), **_write_shard(shard_dir / POINTS_SHARD_FILENAME, points)},
+        "arguments": argument_shards,
+    }
+    (shard_dir / MANIFEST_FILENAME).write_bytes(orjson.dumps(manifest, option=_ORJSON_OPTIONS))
+    print(f"Wrote {len(argument_shards) + 1} result shards to {shard_dir}")
+    return manifest
+
+
+def has_result_shards(output_dir: str | Path) -> bool:
+    """出力ディレクトリにシャード形式の結果が存在するかどうか"""
+    return (Path(output_dir) / SHARD_DIRNAME / MANIFEST_FILENAME).exists()
+
+
+def _write_shard(path: Path, payload: dict[str, Any]) -> dict[str, Any]:
+    content = orjson.dumps(payload, option=_ORJSON_OPTIONS)
+    path.write_bytes(content)
+    return {"file": path.name, "sha256": hashlib.sha256(content).hexdigest(), "bytes": len(content)}
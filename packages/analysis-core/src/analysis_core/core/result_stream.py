@@ -0,0 +1,208 @@
+"""Streaming writer and incremental reader for ``hierarchical_result.json``.
+
+``hierarchical_result.json`` をひとつの dict として組み立ててから書き出すと、意見数が多いレポートでは
+出力サイズの数倍のメモリが必要になる。ここでは ``arguments`` と ``propertyMap`` をバッチごとに書き出し、
+読み込み側もバッチ単位で処理できるよう、次の行構成の JSON を書き出す。
+
+.. code-block:: text
+
+    {"arguments":[
+    {...},{...},...,          <- 意見のバッチ (1 行 1 バッチ、行末の "," はバッチ区切り)
+    {...},{...}
+    ],
+    "propertyMap":{
+    "age":{                   <- プロパティごとのブロック
+    "A1_0":"20",...,          <- プロパティ値のバッチ
+    "A9_0":"40"
+    },
+    "gender":{
+    ...
+    }
+    },
+    "clusters":[...],         <- 残りのキー (1 行 1 キー)
+    "comment_num":3
+    }
+
+ファイル全体としては通常の JSON なので、既存の読み込み側 (``json.load`` やフロントエンド) はそのまま使える。
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import orjson
+import polars as pl
+
+STREAM_BATCH_SIZE = 10_000
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+_ARGUMENTS_OPEN = b'{"arguments":['
+_ARGUMENTS_CLOSE = b"],"
+_PROPERTY_MAP_OPEN = b'"propertyMap":{'
+_PROPERTY_MAP_CLOSE = b"},"
+_STREAMED_KEYS = ("arguments", "propertyMap")
+
+
+def write_result_stream(
+    path: str | Path,
+    result: dict[str, Any],
+    arguments: pl.DataFrame | pl.LazyFrame | None = None,
+    property_frame: pl.DataFrame | pl.LazyFrame | None = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> None:
+    """Write ``hierarchical_result.json`` batch by batch.
+
+    Args:
+        path: 出力先
+        result: ``arguments`` / ``propertyMap`` 以外のキー。``arguments`` を省略した場合はここに含まれる
+            ``arguments`` / ``propertyMap`` を使う
+        arguments: 意見テーブル (1 行 1 意見)。``Argument`` と同じ列を持つ。LazyFrame の場合はバッチごとに
+            集計するため、全体をメモリに載せない
+        property_frame: ``arg_id`` 列とプロパティごとの列を持つ DataFrame (または LazyFrame)
+        batch_size: 1 行に書き出す意見の数
+    """
+    if arguments is None:
+        arguments = result.get("arguments") or []
+    if property_frame is None:
+        property_map = result.get("propertyMap") or {}
+        property_batches = {prop: _dict_batches(values, batch_size) for prop, values in property_map.items()}
+    else:
+        property_batches = {
+            prop: _frame_batches(property_frame.select("arg_id", prop), batch_size)
+            for prop in property_frame.collect_schema().names()
+            if prop != "arg_id"
+        }
+
+    with open(path, "wb") as f:
+        f.write(_ARGUMENTS_OPEN + b"\n")
+        _write_batches(f, _argument_batches(arguments, batch_size))
+        f.write(_ARGUMENTS_CLOSE + b"\n" + _PROPERTY_MAP_OPEN + b"\n")
+        for index, (prop, batches) in enumerate(property_batches.items()):
+            f.write(orjson.dumps(prop) + b":{\n")
+            _write_batches(f, batches)
+            f.write(b"}" + (b"," if index < len(property_batches) - 1 else b"") + b"\n")
+        f.write(_PROPERTY_MAP_CLOSE + b"\n")
+        rest = [(key, value) for key, value in result.items() if key not in _STREAMED_KEYS]
+        for index, (key, value) in enumerate(rest):
+            separator = b"," if index < len(rest) - 1 else b""
+            f.write(orjson.dumps(key) + b":" + orjson.dumps(value, option=_ORJSON_OPTIONS) + separator + b"\n")
+        f.write(b"}\n")
+
+
+def is_streamed_result(path: str | Path) -> bool:
+    """``write_result_stream`` で書き出されたファイルかどうか"""
+    try:
+        with open(path, "rb") as f:
+            return f.readline().rstrip(b"\n") == _ARGUMENTS_OPEN
+    except FileNotFoundError:
+        return False
+
+
+def iter_result_arguments(path: str | Path) -> Iterator[list[dict[str, Any]]]:
+    """Yield the ``arguments`` of a result file in batches without loading the rest of it."""
+    if not is_streamed_result(path):
+        yield json.loads(Path(path).read_bytes()).get("arguments", [])
+        return
+    with open(path, "rb") as f:
+        f.readline()
+        for line in f:
+            line = line.rstrip(b"\n")
+            if line == _ARGUMENTS_CLOSE:
+                return
+            yield orjson.loads(b"[" + line.rstrip(b",") + b"]")
+
+
+def read_result(
+    path: str | Path,
+    include_arguments: bool = True,
+    include_property_map: bool = True,
+) -> dict[str, Any]:
+    """Read a result file, skipping ``arguments`` / ``propertyMap`` without parsing them when not needed.
+
+    ``write_result_stream`` 以外で書き出されたファイルは全体を読み込んでから不要なキーを取り除く。
+    """
+    if not is_streamed_result(path):
+        result = json.loads(Path(path).read_bytes())
+        if not include_arguments:
+            result.pop("arguments", None)
+        if not include_property_map:
+            result.pop("propertyMap", None)
+        return result
+
+    result: dict[str, Any] = {}
+    with open(path, "rb") as f:
+        lines = (line.rstrip(b"\n") for line in f)
+        next(lines)
+        arguments: list[dict[str, Any]] = []
+        for line in lines:
+            if line == _ARGUMENTS_CLOSE:
+                break
+            if include_arguments:
+                arguments.extend(orjson.loads(b"[" + line.rstrip(b",") + b"]"))
+        if include_arguments:
+            result["arguments"] = arguments
+
+        next(lines)  # "propertyMap":{
+        property_map: dict[str, dict[str, Any]] = {}
+        for line in lines:
+            if line == _PROPERTY_MAP_CLOSE:
+                break
+            values: dict[str, Any] = {}
+            for entries in lines:
+                if entries in (b"}", b"},"):
+                    break
+                if include_property_map:
+                    values.update(orjson.loads(b"{" + entries.rstrip(b",") + b"}"))
+            property_map[orjson.loads(line[: -len(b":{")])] = values
+        if include_property_map:
+            result["propertyMap"] = property_map
+
+        for line in lines:
+            if line == b"}":
+                break
+            result.update(orjson.loads(b"{" + line.rstrip(b",") + b"}"))
+    return result
+
+
+def _write_batches(f, batches: Iterator[bytes]) -> None:
+    """Write serialized arrays / objects one per line without their outer brackets, comma separated."""
+    previous = None
+    for batch in batches:
+        body = batch[1:-1]
+        if not body:
+            continue
+        if previous is not None:
+            f.write(previous + b",\n")
+        previous = body
+    if previous is not None:
+        f.write(previous + b"\n")
+
+
+def _argument_batches(
+    arguments: pl.DataFrame | pl.LazyFrame | list[dict[str, Any]], batch_size: int
+) -> Iterator[bytes]:
+    if isinstance(arguments, (pl.DataFrame, pl.LazyFrame)):
+        for batch in _slices(arguments, batch_size):
+            yield orjson.dumps(batch.to_dicts(), option=_ORJSON_OPTIONS)
+        return
+    for start in range(0, len(arguments), batch_size):
+        yield orjson.dumps(arguments[start : start + batch_size], option=_ORJSON_OPTIONS)
+
+
+def _frame_batches(frame: pl.DataFrame | pl.LazyFrame, batch_size: int) -> Iterator[bytes]:
+    for batch in _slices(frame, batch_size):
+        keys, values = batch.to_series(0).to_list(), batch.to_series(1).to_list()
+        yield orjson.dumps(dict(zip(keys, values, strict=True)), option=_ORJSON_OPTIONS)
+
+
+def _slices(frame: pl.DataFrame | pl.LazyFrame, batch_size: int) -> Iterator[pl.DataFrame]:
+    if isinstance(frame, pl.LazyFrame):
+        return iter(frame.collect_batches(chunk_size=batch_size))
+    return frame.iter_slices(batch_size)
+
+
+def _dict_batches(values: dict[str, Any], batch_size: int) -> Iterator[bytes]:
+    items = list(values.items())
+    for start in range(0, len(items), batch_size):
+        yield orjson.dumps(dict(items[start : start + batch_size]), option=_ORJSON_OPTIONS)
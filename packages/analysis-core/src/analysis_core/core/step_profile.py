@@ -0,0 +1,192 @@
+"""Per-step performance profile.
+
+ステップごとに実行時間・CPU 時間・メモリのピーク・LLM リクエスト数・レイテンシ・リトライ回数・トークン数を
+記録し、``hierarchical_status.json`` の ``completed_jobs[].profile`` に保存する。
+
+LLM 呼び出しは ``analysis_core.services.llm`` から ``record_llm_call`` / ``record_llm_retry`` で記録され、
+呼び出したスレッドで実行中のステップ (なければ最後に開始したステップ) に集計される。ステップ内で独自に
+起動したスレッドプールからの呼び出しは、複数のステップを同時に実行している場合は正しく振り分けられないことがある。
+"""
+
+import math
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+_current_profiler: ContextVar["StepProfiler | None"] = ContextVar("current_step_profiler", default=None)
+_active_profilers: list["StepProfiler"] = []
+_active_lock = threading.Lock()
+
+
+@dataclass
+class StepProfile:
+    """Measurements of a single step run."""
+
+    step: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    # プロセス全体の RSS の最大値 (ステップ終了時点)。計測できない環境では None
+    peak_rss_mb: float | None = None
+    # tracemalloc が有効な場合のみ、ステップ中に Python が確保したメモリのピーク
+    peak_traced_mb: float | None = None
+    llm_requests: int = 0
+    llm_errors: int = 0
+    llm_retries: int = 0
+    llm_latency_p50: float | None = None
+    llm_latency_p95: float | None = None
+    token_usage: int = 0
+    token_input: int = 0
+    token_output: int = 0
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        profile = asdict(self)
+        del profile["latencies"]
+        return profile
+
+
+class StepProfiler:
+    """Context manager measuring one step.
+
+    Example:
+        with StepProfiler("extraction") as profiler:
+            run_extraction(config)
+        profiler.profile.to_dict()
+    """
+
+    def __init__(self, step: str):
+        self.profile = StepProfile(step=step)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "StepProfiler":
+        self._token = _current_profiler.set(self)
+        with _active_lock:
+            _active_profilers.append(self)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        profile = self.profile
+        profile.wall_time = round(time.perf_counter() - self._wall_start, 3)
+        profile.cpu_time = round(time.process_time() - self._cpu_start, 3)
+        profile.peak_rss_mb = _peak_rss_mb()
+        if tracemalloc.is_tracing():
+            profile.peak_traced_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        profile.llm_latency_p50 = _percentile(profile.latencies, 50)
+        profile.llm_latency_p95 = _percentile(profile.latencies, 95)
+
+        _current_profiler.reset(self._token)
+        with _active_lock:
+            _active_profilers.remove(self)
+
+    def set_tokens(self, token_usage: int, token_input: int, token_output: int) -> None:
+        self.profile.token_usage = token_usage
+        self.profile.token_input = token_input
+        self.profile.token_output = token_output
+
+    def record_call(self, latency: float, success: bool) -> None:
+        with self._lock:
+            self.profile.llm_requests += 1
+            self.profile.latencies.append(latency)
+            if not success:
+                self.profile.llm_errors += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.profile.llm_retries += 1
+
+
+def _profiler_for_current_thread() -> StepProfiler | None:
+    profiler = _current_profiler.get()
+    if profiler is not None:
+        return profiler
+    with _active_lock:
+        return _active_profilers[-1] if _active_profilers else None
+
+
+def record_llm_call(latency: float, success: bool = True) -> None:
+    """LLM / 埋め込み API へのリクエスト 1 回分を、実行中のステップに記録する"""
+    profiler = _profiler_for_current_thread()
+    if profiler is not None:
+        profiler.record_call(latency, success)
+
+
+def record_llm_retry(retry_state: Any = None) -> None:
+    """レート制限などによるリトライを記録する (tenacity の ``before_sleep`` にも使える)"""
+    profiler = _profiler_for_current_thread()
+    if profiler is not None:
+        profiler.record_retry()
+
+
+@contextmanager
+def llm_call_timer() -> Iterator[None]:
+    """Record the latency and outcome of one LLM request."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        record_llm_call(time.perf_counter() - start, success=False)
+        raise
+    record_llm_call(time.perf_counter() - start, success=True)
+
+
+def format_profile_table(profiles: list[dict[str, Any]]) -> str:
+    """プロファイルの一覧を CLI 表示用の表に整形する"""
+    headers = ["step", "wall(s)", "cpu(s)", "rss(MB)", "llm", "p50(s)", "p95(s)", "retry", "tokens"]
+    rows = [
+        [
+            str(profile.get("step", "")),
+            _format_number(profile.get("wall_time")),
+            _format_number(profile.get("cpu_time")),
+            _format_number(profile.get("peak_rss_mb"), 0),
+            str(profile.get("llm_requests", 0)),
+            _format_number(profile.get("llm_latency_p50"), 2),
+            _format_number(profile.get("llm_latency_p95"), 2),
+            str(profile.get("llm_retries", 0)),
+            str(profile.get("token_usage", 0)),
+        ]
+        for profile in profiles
+    ]
+    widths = [max(len(row[i]) for row in [headers, *rows]) for i in range(len(headers))]
+    lines = [
+        "  ".join(value.ljust(w) if i == 0 else value.rjust(w) for i, (value, w) in enumerate(zip(row, widths)))
+        for row in [headers, *rows]
+    ]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def _format_number(value: float | None, digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def _percentile(values: list[float], percentile: float) -> float | None:
+    """最近傍法によるパーセンタイル"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(percentile / 100 * len(ordered)) - 1)
+    return round(ordered[index], 3)
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB 単位、macOS はバイト単位
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
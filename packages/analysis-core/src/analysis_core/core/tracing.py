@@ -0,0 +1,219 @@
+"""Optional OpenTelemetry-compatible tracing written to a local OTLP-JSON file.
+
+環境変数 ``KOUCHOU_TRACE_FILE`` にファイルパスを指定すると、パイプライン全体・各ステップ・LLM 呼び出しの
+スパンを OTLP/JSON 形式 (``ExportTraceServiceRequest`` を 1 行 1 件) で追記する。OpenTelemetry Collector の
+``otlpjsonfile`` レシーバーなどで読み込めば、任意のビューアでオフラインに確認できる。
+
+親プロセス (API) からは W3C Trace Context 形式の ``TRACEPARENT`` 環境変数でスパンを引き継ぐ。
+指定がなければスパンは作られず、呼び出し側のオーバーヘッドはほぼない。
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+TRACE_FILE_ENV = "KOUCHOU_TRACE_FILE"
+TRACEPARENT_ENV = "TRACEPARENT"
+SERVICE_NAME = "analysis-core"
+
+# OTLP の SpanKind / StatusCode
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_trace_span", default=None)
+# ステップ内で独自に起動したスレッドにはコンテキストが引き継がれないため、
+# 親が見つからないスパンは最後に開始したステップ (またはパイプライン) のスパンにぶら下げる
+_thread_roots: list["Span"] = []
+_lock = threading.Lock()
+
+
+class Span:
+    """A single span. Attributes can be updated until the span ends."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: str | None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Mapping[str, Any] | None = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: int | None = None
+        self.status_code = STATUS_OK
+        self.status_message = ""
+        self._attribute_lock = threading.Lock()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        with self._attribute_lock:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Mapping[str, Any]) -> None:
+        with self._attribute_lock:
+            self.attributes.update(attributes)
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        with self._attribute_lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def set_error(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items() if value is not None],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled."""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Mapping[str, Any]) -> None:
+        pass
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        pass
+
+    def set_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def trace_file() -> str | None:
+    """スパンの書き出し先。トレースが無効なら None"""
+    return os.environ.get(TRACE_FILE_ENV) or None
+
+
+def current_span() -> Span | _NoopSpan:
+    """呼び出したスレッドで実行中のスパン (なければ何もしないスパン)"""
+    return _parent_span() or NOOP_SPAN
+
+
+@contextmanager
+def start_span(
+    name: str,
+    attributes: Mapping[str, Any] | None = None,
+    kind: int = SPAN_KIND_INTERNAL,
+    thread_root: bool = False,
+) -> Iterator[Span | _NoopSpan]:
+    """Open a span for the duration of the ``with`` block.
+
+    Args:
+        name: スパン名
+        attributes: 開始時の属性
+        kind: OTLP の SpanKind (外部 API の呼び出しは ``SPAN_KIND_CLIENT``)
+        thread_root: True の場合、コンテキストを持たないスレッドで開始されたスパンの親になる
+    """
+    path = trace_file()
+    if path is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _parent_span()
+    if parent is not None:
+        trace_id, parent_span_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_span_id = _remote_parent()
+    span = Span(name, trace_id, parent_span_id, kind, attributes)
+
+    token = _current_span.set(span)
+    if thread_root:
+        with _lock:
+            _thread_roots.append(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        span.end_time_ns = time.time_ns()
+        _current_span.reset(token)
+        if thread_root:
+            with _lock:
+                _thread_roots.remove(span)
+        _export(span, path)
+
+
+def _parent_span() -> Span | None:
+    span = _current_span.get()
+    if span is not None:
+        return span
+    with _lock:
+        return _thread_roots[-1] if _thread_roots else None
+
+
+def _remote_parent() -> tuple[str, str | None]:
+    """``TRACEPARENT`` (``00-<trace-id>-<span-id>-<flags>``) から親を取り出す。なければ新しいトレースを始める"""
+    parts = os.environ.get(TRACEPARENT_ENV, "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return secrets.token_hex(16), None
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _export(span: Span, path: str) -> None:
+    """スパンを 1 行の OTLP/JSON として追記する。トレースの書き出し失敗でパイプラインは止めない"""
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        _otlp_attribute("service.name", SERVICE_NAME),
+                        _otlp_attribute("process.pid", os.getpid()),
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "analysis_core"}, "spans": [span.to_otlp()]}],
+            }
+        ]
+    }
+    line = json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n"
+    try:
+        with _lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        print(f"Warning: failed to write trace span to {path}: {e}")
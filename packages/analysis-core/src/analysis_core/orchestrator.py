@@ -14,13 +14,17 @@ from importlib import import_module
 from pathlib import Path
 from typing import Any, Callable
 
+from analysis_core.core.memory import is_low_memory
 from analysis_core.core.orchestration import (
     initialization,
     run_step,
+    skip_if_inputs_unchanged,
+    step_hashes,
     sync_without_html_keys,
     termination,
     update_status,
 )
+from analysis_core.core.tracing import start_span
 
 
 @dataclass
@@ -32,6 +36,7 @@ class StepResult:
     duration_seconds: float
     token_usage: int = 0
     error: str | None = None
+    profile: dict[str, Any] | None = None
 
 
 @dataclass
@@ -44,6 +49,7 @@ class PipelineResult:
     total_token_usage: int = 0
     error: str | None = None
     output_dir: Path | None = None
+    cancelled: bool = False
 
 
 DEFAULT_STEP_MODULES: dict[str, tuple[str, str]] = {
@@ -223,6 +229,7 @@ class PipelineOrchestrator:
                     raise ValueError(f"No function registered for step '{step_name}'")
 
                 step_start = datetime.now()
+                completed_before = len(self.config.get("completed_jobs", []))
                 try:
                     run_step(
                         step=step_name,
@@ -231,12 +238,15 @@ class PipelineOrchestrator:
                         output_base_dir=self.output_base_dir,
                     )
                     step_duration = (datetime.now() - step_start).total_seconds()
+                    # 実行された (省略されなかった) 場合は run_step が記録したプロファイルを引き継ぐ
+                    new_jobs = self.config.get("completed_jobs", [])[completed_before:]
                     step_results.append(
                         StepResult(
                             step_name=step_name,
                             success=True,
                             duration_seconds=step_duration,
                             token_usage=self.config.get("total_token_usage", 0),
+                            profile=new_jobs[-1].get("profile") if new_jobs else None,
                         )
                     )
                 except Exception as e:
@@ -275,7 +285,16 @@ class PipelineOrchestrator:
 
     def run_default(self) -> PipelineResult:
         """Execute the default pipeline path used by the CLI."""
-        return self.run_workflow()
+        attributes = {
+            "report.output_dir": self.config.get("output_dir"),
+            "analysis.mode": self.config.get("analysis_mode", "hierarchical"),
+            "llm.provider": self.config.get("provider"),
+            "llm.model": self.config.get("model"),
+        }
+        with start_span("pipeline", attributes, thread_root=True) as span:
+            result = self.run_workflow()
+            span.set_attributes({"pipeline.success": result.success, "llm.tokens.total": result.total_token_usage})
+            return result
 
     def _carry_forward_previous_jobs(self) -> None:
         """Preserve older completed jobs across reruns."""
@@ -445,9 +464,11 @@ class PipelineOrchestrator:
                     {
                         "step": legacy_step_name,
                         "completed": datetime.now().isoformat(),
-                        "duration": 0.0,
+                        "duration": result.profile["wall_time"] if result.profile else 0.0,
                         "params": self.config.get(legacy_step_name, {}),
                         "token_usage": step_token_usage,
+                        "profile": result.profile,
+                        **step_hashes(legacy_step_name, self.config, self.output_base_dir),
                     }
                 )
                 total_token_usage += step_token_usage
@@ -495,6 +516,17 @@ class PipelineOrchestrator:
 
             # Run workflow
             engine = WorkflowEngine()
+            # 依存関係のないステップを同時に実行する数。指定がなければ従来どおり順番に実行する
+            max_workers = int(self.config.get("workflow_max_workers", 1))
+            if is_low_memory(self.config):
+                # 低メモリモードではステップを同時に実行せず、メモリのピークを 1 ステップ分に抑える
+                max_workers = 1
+            run_options: dict[str, Any] = {"max_workers": max_workers} if max_workers > 1 else {}
+            if any(step.get("check_inputs") for step in self.config.get("plan", [])):
+                # 上流の出力が前回と同じステップは、依存ステップの完了後に省略する
+                run_options["skip_if"] = lambda step_name: skip_if_inputs_unchanged(
+                    workflow_step_to_legacy_name(step_name), self.config, self.output_base_dir
+                )
             workflow_result = engine.run(
                 workflow,
                 self.config,
@@ -502,6 +534,7 @@ class PipelineOrchestrator:
                 on_step_start=mark_step_started,
                 on_step_complete=mark_step_completed,
                 skip_steps=skip_steps,
+                **run_options,
             )
 
             self.config["total_token_usage"] = workflow_result.total_token_usage
@@ -513,9 +546,10 @@ class PipelineOrchestrator:
                 StepResult(
                     step_name=workflow_step_to_legacy_name(step_id),
                     success=result.success,
-                    duration_seconds=0.0,  # Not tracked in workflow mode
+                    duration_seconds=result.profile["wall_time"] if result.profile else 0.0,
                     token_usage=result.outputs.token_usage if result.outputs else 0,
                     error=result.error,
+                    profile=result.profile,
                 )
                 for step_id, result in workflow_result.step_results.items()
             ]
@@ -525,12 +559,17 @@ class PipelineOrchestrator:
 
             self._carry_forward_previous_jobs()
 
-            workflow_error = self._extract_workflow_error(workflow_result)
+            if workflow_result.cancelled:
+                workflow_error = "Pipeline was cancelled"
+                final_status = "cancelled"
+            else:
+                workflow_error = self._extract_workflow_error(workflow_result)
+                final_status = "completed" if workflow_result.success else "error"
 
             update_status(
                 self.config,
                 {
-                    "status": "completed" if workflow_result.success else "error",
+                    "status": final_status,
                     "end_time": datetime.now().isoformat(),
                     "total_token_usage": workflow_result.total_token_usage,
                     "token_usage_input": workflow_result.total_token_input,
@@ -547,6 +586,7 @@ class PipelineOrchestrator:
                 total_token_usage=workflow_result.total_token_usage,
                 error=None if workflow_result.success else workflow_error,
                 output_dir=output_path if output_path.exists() else None,
+                cancelled=workflow_result.cancelled,
             )
 
         except Exception as e:
@@ -22,6 +22,12 @@ def build_legacy_runtime_config(
     }
     if ctx.user_api_key:
         legacy_config["user_api_key"] = ctx.user_api_key
+    if inputs is not None:
+        # 低メモリモード (analysis_core.core.memory) と中間ファイルの形式 (analysis_core.core.artifacts) の
+        # 設定はすべてのステップに引き継ぐ
+        for key in ("low_memory", "memory_budget_mb", "artifact_format"):
+            if key in inputs.config:
+                legacy_config[key] = inputs.config[key]
 
     if include_input:
         input_name, input_base_dir = resolve_input_location(ctx, inputs)
@@ -6,6 +6,7 @@ Extracts opinions/arguments from comments using LLM.
 
 from typing import Any
 
+from analysis_core.core.artifacts import resolve_artifact_path
 from analysis_core.plugin import (
     StepContext,
     StepInputs,
@@ -61,8 +62,8 @@ def extraction_plugin(
     # Build outputs - use ctx.output_dir which already contains the full path
     return StepOutputs(
         artifacts={
-            "arguments": ctx.output_dir / "args.csv",
-            "relations": ctx.output_dir / "relations.csv",
+            "arguments": resolve_artifact_path(ctx.output_dir / "args.csv"),
+            "relations": resolve_artifact_path(ctx.output_dir / "relations.csv"),
         },
         token_usage=legacy_config.get("total_token_usage", 0),
         token_input=legacy_config.get("token_usage_input", 0),
@@ -37,6 +37,9 @@ def hierarchical_aggregation_plugin(
 
     Config options:
         - hidden_properties: Properties to hide in output
+        - sharded_output: Also write a manifest plus per-cluster argument shards
+        - streaming_output: Write arguments and propertyMap batch by batch instead of as one document
+        - property_map_encoding: "mapping" (default) or "categorical" (value dictionary plus code array per property)
     """
     from analysis_core.steps.hierarchical_aggregation import (
         hierarchical_aggregation as aggregation_impl,
@@ -50,6 +53,16 @@ def hierarchical_aggregation_plugin(
     )
     legacy_config["hierarchical_aggregation"] = {
         "hidden_properties": step_config.get("hidden_properties", {}),
+        "sharded_output": step_config.get(
+            "sharded_output", inputs.config.get("hierarchical_aggregation", {}).get("sharded_output", False)
+        ),
+        "streaming_output": step_config.get(
+            "streaming_output", inputs.config.get("hierarchical_aggregation", {}).get("streaming_output", False)
+        ),
+        "property_map_encoding": step_config.get(
+            "property_map_encoding",
+            inputs.config.get("hierarchical_aggregation", {}).get("property_map_encoding", "mapping"),
+        ),
     }
 
     # Ensure required fields exist
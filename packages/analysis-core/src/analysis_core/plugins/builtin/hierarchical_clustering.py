@@ -6,6 +6,7 @@ Performs UMAP dimensionality reduction and hierarchical clustering.
 
 from typing import Any
 
+from analysis_core.core.artifacts import resolve_artifact_path
 from analysis_core.plugin import (
     StepContext,
     StepInputs,
@@ -53,6 +54,6 @@ def hierarchical_clustering_plugin(
     # Use ctx.output_dir which already contains the full path
     return StepOutputs(
         artifacts={
-            "clusters": ctx.output_dir / "hierarchical_clusters.csv",
+            "clusters": resolve_artifact_path(ctx.output_dir / "hierarchical_clusters.csv"),
         },
     )
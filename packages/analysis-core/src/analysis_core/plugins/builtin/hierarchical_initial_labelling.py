@@ -6,6 +6,7 @@ Labels the finest-grained clusters using LLM.
 
 from typing import Any
 
+from analysis_core.core.artifacts import resolve_artifact_path
 from analysis_core.plugin import (
     StepContext,
     StepInputs,
@@ -40,6 +41,7 @@ def hierarchical_initial_labelling_plugin(
         - prompt: System prompt for labelling
         - model: LLM model to use
         - workers: Number of parallel workers
+        - use_cache: Reuse cached labels for clusters whose members are unchanged
     """
     from analysis_core.steps.hierarchical_initial_labelling import (
         hierarchical_initial_labelling as labelling_impl,
@@ -52,6 +54,9 @@ def hierarchical_initial_labelling_plugin(
         "prompt": step_config.get("prompt", ""),
         "model": step_config.get("model", ctx.model),
         "workers": step_config.get("workers", 3),
+        "use_cache": step_config.get(
+            "use_cache", inputs.config.get("hierarchical_initial_labelling", {}).get("use_cache", True)
+        ),
     }
 
     labelling_impl(legacy_config)
@@ -59,7 +64,7 @@ def hierarchical_initial_labelling_plugin(
     # Use ctx.output_dir which already contains the full path
     return StepOutputs(
         artifacts={
-            "initial_labels": ctx.output_dir / "hierarchical_initial_labels.csv",
+            "initial_labels": resolve_artifact_path(ctx.output_dir / "hierarchical_initial_labels.csv"),
         },
         token_usage=legacy_config.get("total_token_usage", 0),
         token_input=legacy_config.get("token_usage_input", 0),
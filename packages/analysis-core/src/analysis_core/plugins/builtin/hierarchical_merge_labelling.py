@@ -6,6 +6,7 @@ Merges and labels higher-level clusters by combining lower-level labels.
 
 from typing import Any
 
+from analysis_core.core.artifacts import resolve_artifact_path
 from analysis_core.plugin import (
     StepContext,
     StepInputs,
@@ -40,6 +41,7 @@ def hierarchical_merge_labelling_plugin(
         - prompt: System prompt for merge labelling
         - model: LLM model to use
         - workers: Number of parallel workers
+        - use_cache: Reuse cached labels for clusters whose members are unchanged
     """
     from analysis_core.steps.hierarchical_merge_labelling import (
         hierarchical_merge_labelling as merge_impl,
@@ -52,6 +54,9 @@ def hierarchical_merge_labelling_plugin(
         "prompt": step_config.get("prompt", ""),
         "model": step_config.get("model", ctx.model),
         "workers": step_config.get("workers", 3),
+        "use_cache": step_config.get(
+            "use_cache", inputs.config.get("hierarchical_merge_labelling", {}).get("use_cache", True)
+        ),
     }
 
     merge_impl(legacy_config)
@@ -59,7 +64,7 @@ def hierarchical_merge_labelling_plugin(
     # Use ctx.output_dir which already contains the full path
     return StepOutputs(
         artifacts={
-            "merge_labels": ctx.output_dir / "hierarchical_merge_labels.csv",
+            "merge_labels": resolve_artifact_path(ctx.output_dir / "hierarchical_merge_labels.csv"),
         },
         token_usage=legacy_config.get("total_token_usage", 0),
         token_input=legacy_config.get("token_usage_input", 0),
@@ -38,6 +38,11 @@ def hierarchical_overview_plugin(
     Config options:
         - prompt: System prompt for overview generation
         - model: LLM model to use
+        - target_level: Cluster level used as overview input
+        - map_reduce: Summarise each top-level subtree in parallel, then reduce
+        - max_input_tokens: Approximate input token budget per map-reduce call
+        - map_prompt: System prompt for the partial summaries of the map phase
+        - workers: Number of parallel workers for the map phase
     """
     from analysis_core.steps.hierarchical_overview import (
         hierarchical_overview as overview_impl,
@@ -45,10 +50,19 @@ def hierarchical_overview_plugin(
 
     step_config = config.get("hierarchical_overview", config)
     legacy_config = build_legacy_runtime_config(ctx, inputs, include_token_usage=True)
+    full_step_config = inputs.config.get("hierarchical_overview", {})
     legacy_config["hierarchical_overview"] = {
         "prompt": step_config.get("prompt", ""),
         "model": step_config.get("model", ctx.model),
     }
+    for key, default in (
+        ("target_level", 1),
+        ("map_reduce", False),
+        ("max_input_tokens", 8000),
+        ("map_prompt", ""),
+        ("workers", 1),
+    ):
+        legacy_config["hierarchical_overview"][key] = step_config.get(key, full_step_config.get(key, default))
 
     overview_impl(legacy_config)
 
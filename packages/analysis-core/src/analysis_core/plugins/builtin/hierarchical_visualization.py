@@ -38,6 +38,8 @@ def hierarchical_visualization_plugin(
     Config options:
         - report_html_title: Override the HTML title
         - report_url_pattern: Optional URL pattern used for source links
+        - report_html_max_points: Argument count above which the scatter is decimated
+        - report_html_compress: Embed the data gzip-compressed and base64-encoded
     """
     from analysis_core.steps.hierarchical_visualization import (
         hierarchical_visualization as viz_impl,
@@ -48,6 +50,8 @@ def hierarchical_visualization_plugin(
     legacy_config["report_dir"] = step_config.get("report_dir", "../report")
     legacy_config["report_html_title"] = step_config.get("report_html_title")
     legacy_config["report_url_pattern"] = step_config.get("report_url_pattern")
+    legacy_config["report_html_max_points"] = step_config.get("report_html_max_points")
+    legacy_config["report_html_compress"] = step_config.get("report_html_compress", False)
 
     viz_impl(legacy_config)
 
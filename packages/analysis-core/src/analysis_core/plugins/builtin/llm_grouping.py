@@ -2,6 +2,7 @@
 
 from typing import Any
 
+from analysis_core.core.artifacts import resolve_artifact_path
 from analysis_core.plugin import StepContext, StepInputs, StepOutputs, step_plugin
 from analysis_core.plugins.builtin._legacy_config import build_legacy_runtime_config
 
@@ -10,7 +11,7 @@ from analysis_core.plugins.builtin._legacy_config import build_legacy_runtime_co
     id="analysis.llm_grouping",
     version="1.0.0",
     name="LLM Grouping",
-    description="Assign arguments to top-level groups with LLM while preserving embedding-based coordinates",
+    description="Assign arguments to one or two levels of LLM groups while preserving embedding-based coordinates",
     inputs=["arguments", "embeddings"],
     outputs=["clusters", "merge_labels"],
     use_llm=True,
@@ -27,10 +28,17 @@ def llm_grouping_plugin(
     legacy_config = build_legacy_runtime_config(ctx, inputs, include_token_usage=True)
     legacy_config["question"] = inputs.config.get("question", "")
     legacy_config["hierarchical_clustering"] = inputs.config.get("hierarchical_clustering", {})
+    legacy_config["embedding"] = inputs.config.get("embedding", {})
+    legacy_config["is_embedded_at_local"] = inputs.config.get("is_embedded_at_local", False)
+    full_step_config = inputs.config.get("llm_grouping", {})
     legacy_config["llm_grouping"] = {
         "group_count": step_config.get("group_count"),
         "discovery_sample_size": step_config.get("discovery_sample_size", 80),
         "assignment_batch_size": step_config.get("assignment_batch_size", 25),
+        "workers": step_config.get("workers", full_step_config.get("workers", 1)),
+        "assignment_mode": step_config.get("assignment_mode", full_step_config.get("assignment_mode", "llm")),
+        "embedding_margin": step_config.get("embedding_margin", full_step_config.get("embedding_margin", 0.05)),
+        "sub_group_count": step_config.get("sub_group_count", full_step_config.get("sub_group_count")),
         "discovery_prompt": step_config.get("discovery_prompt", ""),
         "assignment_prompt": step_config.get("assignment_prompt", ""),
         "model": step_config.get("model", ctx.model),
@@ -40,8 +48,8 @@ def llm_grouping_plugin(
 
     return StepOutputs(
         artifacts={
-            "clusters": ctx.output_dir / "hierarchical_clusters.csv",
-            "merge_labels": ctx.output_dir / "hierarchical_merge_labels.csv",
+            "clusters": resolve_artifact_path(ctx.output_dir / "hierarchical_clusters.csv"),
+            "merge_labels": resolve_artifact_path(ctx.output_dir / "hierarchical_merge_labels.csv"),
         },
         token_usage=legacy_config.get("total_token_usage", 0),
         token_input=legacy_config.get("token_usage_input", 0),
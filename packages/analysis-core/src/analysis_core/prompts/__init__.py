@@ -102,6 +102,16 @@ OVERVIEW_PROMPT = """/system
 出力は日本語で行ってください。
 """
 
+OVERVIEW_MAP_PROMPT = """/system
+
+あなたはシンクタンクで働く専門のリサーチアシスタントです。
+チームは特定のテーマに関してパブリック・コンサルテーションを実施し、異なる選択肢の意見グループを分析し始めています。
+これから提供されるのは、レポート全体のうち一部の意見グループ（またはその部分的な要約）とその簡単な分析です。
+あなたの仕事は、この部分に含まれる論点を、後で他の部分の要約と統合できるように簡潔に要約することです。
+レポート全体の結論のようには書かず、この部分に含まれる主な論点と意見の傾向を最大で1段落にまとめてください。
+出力は日本語で行ってください。
+"""
+
 LLM_GROUPING_DISCOVERY_PROMPT = """あなたは意見分析のアシスタントです。
 与えられた意見群を、内容上まとまりのある少数のグループへ整理してください。
 
@@ -130,6 +140,7 @@ DEFAULT_PROMPTS = {
     "hierarchical_initial_labelling": INITIAL_LABELLING_PROMPT,
     "hierarchical_merge_labelling": MERGE_LABELLING_PROMPT,
     "hierarchical_overview": OVERVIEW_PROMPT,
+    "hierarchical_overview_map": OVERVIEW_MAP_PROMPT,
     "llm_grouping_discovery": LLM_GROUPING_DISCOVERY_PROMPT,
     "llm_grouping_assignment": LLM_GROUPING_ASSIGNMENT_PROMPT,
 }
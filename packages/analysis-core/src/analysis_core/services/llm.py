@@ -3,6 +3,7 @@ import os
 import random
 import threading
 import time
+from importlib import import_module
 from typing import Any
 
 import openai
@@ -11,12 +12,8 @@ from openai import AzureOpenAI, OpenAI
 from pydantic import BaseModel
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-try:  # Optional dependency
-    from google import genai
-    from google.genai import errors as genai_errors
-except (ModuleNotFoundError, ImportError):  # pragma: no cover - library might be unavailable in tests
-    genai = None
-    genai_errors = None
+from analysis_core.core.step_profile import llm_call_timer, record_llm_retry
+from analysis_core.core.tracing import SPAN_KIND_CLIENT, current_span, start_span
 
 # Load environment variables from .env file if present
 # Look in current directory first, then parent directories
@@ -24,11 +21,35 @@ load_dotenv()
 DEFAULT_REQUEST_TIMEOUT_SECONDS = 300
 
 
+# google-genai は Gemini を使う場合にだけ必要で import も重いため、_load_genai で使うときに読み込む
+genai = None
+genai_errors = None
+
+
+def _load_genai(with_errors: bool = True):
+    global genai, genai_errors
+    try:
+        if genai is None:
+            genai = import_module("google.genai")
+        if with_errors and genai_errors is None:
+            genai_errors = import_module("google.genai.errors")
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("google-genai is required for Gemini provider") from exc
+    return genai, genai_errors
+
+
+def _record_retry(retry_state=None) -> None:
+    """リトライをステップのプロファイルと LLM 呼び出しのスパンに記録する (tenacity の ``before_sleep``)"""
+    record_llm_retry(retry_state)
+    current_span().increment("llm.retries")
+
+
 @retry(
     retry=retry_if_exception_type(openai.RateLimitError),
     wait=wait_exponential(multiplier=3, min=3, max=20),
     stop=stop_after_attempt(3),
     reraise=True,
+    before_sleep=_record_retry,
 )
 def request_to_openai(
     messages: list[dict],
@@ -105,6 +126,7 @@ def request_to_openai(
     wait=wait_exponential(multiplier=1, min=2, max=20),
     stop=stop_after_attempt(3),
     reraise=True,
+    before_sleep=_record_retry,
 )
 def request_to_azure_chatcompletion(
     messages: list[dict],
@@ -217,8 +239,7 @@ def request_to_gemini_chatcompletion(
     token_usage_output = 0
     token_usage_total = 0
 
-    if genai is None or genai_errors is None:  # pragma: no cover - optional dependency
-        raise RuntimeError("google-genai is required for Gemini provider")
+    _load_genai()
 
     api_key = user_api_key or os.getenv("GEMINI_API_KEY")
     if not api_key:
@@ -390,6 +411,7 @@ def request_to_gemini_chatcompletion(
             )
             raise RuntimeError("Gemini API rate limit exceeded after retries")
         logging.info(f"Rate limit hit, retrying after {wait_time} seconds (attempt {attempt + 1}/{max_retries})")
+        _record_retry()
         time.sleep(wait_time)
 
     raise RuntimeError("Gemini API call failed after retries")
@@ -530,6 +552,29 @@ def request_to_chat_ai(
         - provider="openrouter": OpenRouter APIを使用（OpenAIやGeminiのモデルにアクセス可能）
         - provider="gemini": Google Gemini APIを使用
     """
+    # レイテンシと成否を実行中のステップのプロファイルとトレースに記録する
+    attributes = {"llm.provider": provider, "llm.model": model, "llm.json": is_json, "llm.retries": 0}
+    with start_span("llm.chat", attributes, kind=SPAN_KIND_CLIENT) as span, llm_call_timer():
+        response = _dispatch_chat_request(
+            messages, model, is_json, json_schema, provider, local_llm_address, user_api_key, timeout_seconds
+        )
+        _, token_total, token_input, token_output = response
+        span.set_attributes(
+            {"llm.tokens.total": token_total, "llm.tokens.input": token_input, "llm.tokens.output": token_output}
+        )
+        return response
+
+
+def _dispatch_chat_request(
+    messages: list[dict],
+    model: str,
+    is_json: bool,
+    json_schema: dict | type[BaseModel] | None,
+    provider: str,
+    local_llm_address: str | None,
+    user_api_key: str | None,
+    timeout_seconds: int,
+) -> tuple[str, int, int, int]:
     if provider == "azure":
         return request_to_azure_chatcompletion(messages, is_json, json_schema, user_api_key, timeout_seconds)
     elif provider == "openai":
@@ -597,6 +642,17 @@ def request_to_embed(
     local_llm_address: str | None = None,
     user_api_key: str | None = None,
 ):
+    attributes = {
+        "llm.provider": "local" if is_embedded_at_local else provider,
+        "llm.model": model,
+        "llm.embed.inputs": len(args),
+        "llm.retries": 0,
+    }
+    with start_span("llm.embed", attributes, kind=SPAN_KIND_CLIENT), llm_call_timer():
+        return _dispatch_embed_request(args, model, is_embedded_at_local, provider, local_llm_address, user_api_key)
+
+
+def _dispatch_embed_request(args, model, is_embedded_at_local, provider, local_llm_address, user_api_key):
     if is_embedded_at_local:
         return request_to_local_embed(args)
 
@@ -674,8 +730,7 @@ def extract_embedding_values(response: Any) -> list[float] | None:
 
 
 def request_to_gemini_embed(args, model, user_api_key: str | None = None):
-    if genai is None:
-        raise RuntimeError("google-genai is required for Gemini provider")
+    _load_genai(with_errors=False)
 
     api_key = user_api_key or os.getenv("GEMINI_API_KEY")
     if not api_key:
@@ -866,6 +921,7 @@ def _local_llm_test():
     wait=wait_exponential(multiplier=3, min=3, max=20),
     stop=stop_after_attempt(3),
     reraise=True,
+    before_sleep=_record_retry,
 )
 def request_to_openrouter_chatcompletion(
     messages: list[dict],
@@ -1,6 +1,10 @@
 """Pipeline step implementations."""
 
+import ast
+import io
 from importlib import import_module
+from importlib.util import find_spec
+from pathlib import Path
 from typing import Any
 
 _STEP_MODULES = {
@@ -38,3 +42,24 @@ def __getattr__(name: str) -> Any:
     value = getattr(module, name)
     globals()[name] = value
     return value
+
+
+def get_step_source(name: str) -> str | None:
+    """Return the source of a step function without importing its module.
+
+    ステップのモジュールは polars や LLM の SDK を import するため、--dry-run などで設定を確認するだけの場合に
+    import しなくて済むよう、ファイルを構文解析して ``inspect.getsource`` と同じ範囲 (デコレータを含む) を返す。
+    見つからない場合は None
+    """
+    module_path = _STEP_MODULES.get(name)
+    spec = find_spec(module_path) if module_path else None
+    if spec is None or not spec.origin:
+        return None
+
+    source = Path(spec.origin).read_text(encoding="utf-8")
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef) and node.name == name:
+            start = min([node.lineno, *(decorator.lineno for decorator in node.decorator_list)])
+            lines = io.StringIO(source).readlines()
+            return "".join(lines[start - 1 : node.end_lineno])
+    return None
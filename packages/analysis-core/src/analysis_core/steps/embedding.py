@@ -1,9 +1,10 @@
 import os
 import pickle
 
-import polars as pl
 from tqdm import tqdm
 
+from analysis_core.core.frames import read_artifact
+from analysis_core.core.memory import check_memory_budget
 from analysis_core.services.llm import request_to_embed
 
 
@@ -17,7 +18,7 @@ def embedding(config):
     dataset = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
     path = f"{output_base_dir}/{dataset}/embeddings.pkl"
-    arguments = pl.read_csv(f"{output_base_dir}/{dataset}/args.csv", columns=["arg-id", "argument"])
+    arguments = read_artifact(f"{output_base_dir}/{dataset}/args.csv", config, columns=["arg-id", "argument"])
     embeddings = []
     batch_size = 1000
     arg_ids = arguments["arg-id"].to_list()
@@ -33,6 +34,7 @@ def embedding(config):
             user_api_key=user_api_key,
         )
         embeddings.extend(embeds)
+        check_memory_budget(config, "embedding")
     # Store as list[dict] for polars compatibility
     embedding_data = [{"arg-id": arg_ids[i], "embedding": e} for i, e in enumerate(embeddings)]
     with open(path, "wb") as f:
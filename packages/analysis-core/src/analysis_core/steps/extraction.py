@@ -1,19 +1,25 @@
 import concurrent.futures
+import hashlib
 import json
 import logging
 import os
 import re
+from pathlib import Path
 
 import polars as pl
 from pydantic import BaseModel, Field
 from tqdm import tqdm
 
 from analysis_core.core import update_progress
+from analysis_core.core.cancellation import PipelineCancelled, raise_if_cancelled, wait_or_cancel
+from analysis_core.core.frames import write_artifact
 from analysis_core.services.llm import request_to_chat_ai
 from analysis_core.services.parse_json_list import parse_extraction_response
 
 COMMA_AND_SPACE_AND_RIGHT_BRACKET = re.compile(r",\s*(\])")
 EXTRACTION_WAIT_TIMEOUT_SECONDS = 300
+# キャンセル・異常終了した抽出の途中結果。次回の実行で同じコメントの LLM 呼び出しを省略する
+EXTRACTION_CHECKPOINT_FILENAME = "extraction_checkpoint.jsonl"
 
 
 class ExtractionResponse(BaseModel):
@@ -49,6 +55,43 @@ def filter_empty_comments(comments: pl.DataFrame) -> pl.DataFrame:
     return _filter_empty_comments(comments)
 
 
+def _text_hash(text) -> str:
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def _checkpoint_header(prompt: str, model: str, provider: str) -> dict:
+    return {"prompt": _text_hash(prompt), "model": model, "provider": provider}
+
+
+def load_extraction_checkpoint(path: Path, header: dict, bodies: dict[str, str]) -> dict[str, list[str]]:
+    """途中結果を読み込む。プロンプト・モデルが異なる場合や、コメント本文が変わったものは使わない
+
+    Args:
+        path: チェックポイントのファイル
+        header: 今回の実行のプロンプト・モデル (``_checkpoint_header``)
+        bodies: comment-id (文字列) からコメント本文への辞書
+
+    Returns:
+        comment-id (文字列) から抽出した意見のリストへの辞書
+    """
+    if not path.exists():
+        return {}
+    extracted = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            if json.loads(f.readline() or "null") != header:
+                return {}
+            for line in f:
+                entry = json.loads(line)
+                comment_id = entry["comment-id"]
+                if comment_id in bodies and entry["body"] == _text_hash(bodies[comment_id]):
+                    extracted[comment_id] = entry["arguments"]
+    except (OSError, ValueError, KeyError) as e:
+        # 書き込み途中で終了した最後の行などは読み飛ばし、それまでの結果を使う
+        logging.warning("Ignoring the rest of extraction checkpoint %s: %s", path, e)
+    return extracted
+
+
 def extraction(config):
     """Extract arguments from comments using LLM, skipping empty/whitespace-only entries."""
     dataset = config["output_dir"]
@@ -81,45 +124,70 @@ def extraction(config):
     comments_lookup = {row["comment-id"]: row for row in comments.iter_rows(named=True)}
     update_progress(config, total=len(comment_ids))
 
+    # 前回キャンセルされた実行の途中結果があれば、抽出済みのコメントは LLM を呼ばずに再利用する
+    checkpoint_path = Path(output_base_dir) / dataset / EXTRACTION_CHECKPOINT_FILENAME
+    checkpoint_header = _checkpoint_header(prompt, model, provider)
+    bodies = {str(id): comments_lookup[id]["comment-body"] for id in comment_ids}
+    extracted = load_extraction_checkpoint(checkpoint_path, checkpoint_header, bodies)
+    pending_ids = [id for id in comment_ids if str(id) not in extracted]
+    if extracted:
+        print(f"Extraction: reusing {len(extracted)} comments from {checkpoint_path.name}")
+        update_progress(config, incr=len(comment_ids) - len(pending_ids))
+
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(checkpoint_path, "w", encoding="utf-8") as checkpoint:
+        checkpoint.write(json.dumps(checkpoint_header) + "\n")
+        for comment_id, arguments in extracted.items():
+            _write_checkpoint_entry(checkpoint, comment_id, bodies[comment_id], arguments)
+
+        for i in tqdm(range(0, len(pending_ids), workers)):
+            raise_if_cancelled()
+            batch = pending_ids[i : i + workers]
+            batch_inputs = [comments_lookup[id]["comment-body"] for id in batch]
+            batch_results = extract_batch(
+                batch_inputs,
+                prompt,
+                model,
+                workers,
+                provider,
+                config.get("local_llm_address"),
+                config,
+                timeout_seconds,
+                user_api_key,
+            )
+
+            for comment_id, extracted_args in zip(batch, batch_results, strict=False):
+                extracted[str(comment_id)] = extracted_args
+                # 失敗・タイムアウトしたコメントは次回の実行で抽出し直す
+                if extracted_args:
+                    _write_checkpoint_entry(checkpoint, str(comment_id), bodies[str(comment_id)], extracted_args)
+            checkpoint.flush()
+
+            update_progress(config, incr=len(batch))
+
     argument_map = {}
     relation_rows = []
 
-    for i in tqdm(range(0, len(comment_ids), workers)):
-        batch = comment_ids[i : i + workers]
-        batch_inputs = [comments_lookup[id]["comment-body"] for id in batch]
-        batch_results = extract_batch(
-            batch_inputs,
-            prompt,
-            model,
-            workers,
-            provider,
-            config.get("local_llm_address"),
-            config,
-            timeout_seconds,
-            user_api_key,
-        )
-
-        for comment_id, extracted_args in zip(batch, batch_results, strict=False):
-            for j, arg in enumerate(extracted_args):
-                if arg not in argument_map:
-                    # argumentテーブルに追加
-                    arg_id = f"A{comment_id}_{j}"
-                    argument = arg
-                    argument_map[arg] = {
-                        "arg-id": arg_id,
-                        "argument": argument,
-                    }
-                else:
-                    arg_id = argument_map[arg]["arg-id"]
-
-                # relationテーブルにcommentとargの関係を追加
-                relation_row = {
+    # 結果の ID が途中結果の有無によらず同じになるよう、コメントの順に組み立てる
+    for comment_id in comment_ids:
+        for j, arg in enumerate(extracted.get(str(comment_id), [])):
+            if arg not in argument_map:
+                # argumentテーブルに追加
+                arg_id = f"A{comment_id}_{j}"
+                argument = arg
+                argument_map[arg] = {
                     "arg-id": arg_id,
-                    "comment-id": comment_id,
+                    "argument": argument,
                 }
-                relation_rows.append(relation_row)
+            else:
+                arg_id = argument_map[arg]["arg-id"]
 
-        update_progress(config, incr=len(batch))
+            # relationテーブルにcommentとargの関係を追加
+            relation_row = {
+                "arg-id": arg_id,
+                "comment-id": comment_id,
+            }
+            relation_rows.append(relation_row)
 
     # DataFrame化
     results = pl.DataFrame(list(argument_map.values()))
@@ -128,9 +196,15 @@ def extraction(config):
     if len(results) == 0:
         raise RuntimeError("result is empty, maybe bad prompt")
 
-    results.write_csv(path)
+    write_artifact(results, path, config)
     # comment-idとarg-idの関係を保存
-    relation_df.write_csv(f"{output_base_dir}/{dataset}/relations.csv")
+    write_artifact(relation_df, f"{output_base_dir}/{dataset}/relations.csv", config)
+    checkpoint_path.unlink(missing_ok=True)
+
+
+def _write_checkpoint_entry(checkpoint, comment_id: str, body, arguments: list[str]) -> None:
+    entry = {"comment-id": comment_id, "body": _text_hash(body), "arguments": arguments}
+    checkpoint.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
 
 def extract_batch(
@@ -145,25 +219,31 @@ def extract_batch(
     user_api_key=None,
 ):
     """Run argument extraction concurrently for a batch of comment texts."""
-    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-        futures_with_index = [
-            (
-                i,
-                executor.submit(
-                    extract_arguments,
-                    input,
-                    prompt,
-                    model,
-                    provider,
-                    local_llm_address,
-                    timeout_seconds,
-                    user_api_key,
-                ),
-            )
-            for i, input in enumerate(batch)
-        ]
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    futures_with_index = [
+        (
+            i,
+            executor.submit(
+                extract_arguments,
+                input,
+                prompt,
+                model,
+                provider,
+                local_llm_address,
+                timeout_seconds,
+                user_api_key,
+            ),
+        )
+        for i, input in enumerate(batch)
+    ]
+    try:
+        done, not_done = wait_or_cancel([f for _, f in futures_with_index], timeout=timeout_seconds)
+    except PipelineCancelled:
+        # 未開始の呼び出しは取り消し、実行中の呼び出しの完了は待たない
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
 
-        done, not_done = concurrent.futures.wait([f for _, f in futures_with_index], timeout=timeout_seconds)
+    with executor:
         results = [[] for _ in range(len(batch))]
         total_token_input = 0
         total_token_output = 0
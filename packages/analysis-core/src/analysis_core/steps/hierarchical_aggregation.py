@@ -1,37 +1,43 @@
 """Generate a convenient JSON output file."""
 
 import json
-from collections import defaultdict
-from typing import Any, TypedDict
+from pathlib import Path
+from typing import TypedDict
 
-import numpy as np
+import orjson
 import polars as pl
 
-
-def json_serialize_numpy(obj: Any) -> Any:
-    """
-    Recursively convert NumPy data types to native Python types for JSON serialization.
-
-    Args:
-        obj: Any Python object which might contain NumPy data types
-
-    Returns:
-        The same object structure with NumPy types converted to Python native types
-    """
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {k: json_serialize_numpy(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [json_serialize_numpy(item) for item in obj]
-    elif isinstance(obj, tuple):
-        return tuple(json_serialize_numpy(item) for item in obj)
-    else:
-        return obj
+from analysis_core.core.frames import (
+    column_names,
+    count_rows,
+    read_artifact,
+    scan_artifact,
+    scan_table,
+    spill_directory,
+    spill_frame,
+)
+from analysis_core.core.memory import check_memory_budget, is_low_memory
+from analysis_core.core.property_map import (
+    CATEGORICAL_ENCODING,
+    MAPPING_ENCODING,
+    PROPERTY_MAP_ENCODING_KEY,
+    encode_property_frame,
+)
+from analysis_core.core.result_shards import write_result_shards
+from analysis_core.core.result_stream import write_result_stream
+
+# hierarchical_result.json の arguments と同じ内容を列指向で保存したファイル
+ARGUMENTS_TABLE_FILENAME = "hierarchical_result_arguments.parquet"
+ARGUMENTS_TABLE_FORMAT_VERSION = 1
+# (階層, クラスタ, 属性, 値) ごとの意見数を縦持ちで保存したファイル
+ATTRIBUTE_STATS_FILENAME = "hierarchical_result_attribute_stats.parquet"
+
+LLM_PROVIDER_NAMES = {
+    "openai": "OpenAI API",
+    "azure": "Azure OpenAI API",
+    "openrouter": "OpenRouter API",
+    "local": "Local LLM",
+}
 
 
 class Argument(TypedDict):
@@ -59,62 +65,29 @@ class Cluster(TypedDict):
 def hierarchical_aggregation(config) -> bool:
     """Generate the final JSON output file.
 
+    Each input file is read once; the arguments table is built with polars joins and the result (including the
+    custom intro) is written in a single orjson pass.
+
     Config should contain:
         - output_dir: output directory name
         - input: input file name (without .csv extension)
         - pipeline_dir: (optional) base directory for pipeline operations
+        - hierarchical_aggregation.sharded_output: (optional) also write the manifest and per-cluster shards
+        - hierarchical_aggregation.streaming_output: (optional) write arguments and propertyMap batch by batch
+          (see ``analysis_core.core.result_stream``). Ignored when sharded_output is set, since the shards need
+          the whole result.
+        - hierarchical_aggregation.property_map_encoding: (optional) "mapping" (default) writes
+          ``{prop: {arg_id: value}}``; "categorical" writes a value dictionary and an integer code array aligned to
+          ``arguments`` per property (see ``analysis_core.core.property_map``).
+        - low_memory / memory_budget_mb: (optional, top level) memory-bounded mode (see ``_aggregate``)
     """
     try:
         # Get base directories from config
         output_base_dir = config.get("_output_base_dir", "outputs")
         input_base_dir = config.get("_input_base_dir", "inputs")
-
-        path = f"{output_base_dir}/{config['output_dir']}/hierarchical_result.json"
-        results = {
-            "arguments": [],
-            "clusters": [],
-            "comments": {},
-            "propertyMap": {},
-            "translations": {},
-            "overview": "",
-            "config": config,
-        }
-
-        arguments = pl.read_csv(f"{output_base_dir}/{config['output_dir']}/args.csv")
-        arg_num = len(arguments)
-        relation_df = pl.read_csv(f"{output_base_dir}/{config['output_dir']}/relations.csv")
-        comments = pl.read_csv(f"{input_base_dir}/{config['input']}.csv")
-        clusters = pl.read_csv(f"{output_base_dir}/{config['output_dir']}/hierarchical_clusters.csv")
-        labels = pl.read_csv(f"{output_base_dir}/{config['output_dir']}/hierarchical_merge_labels.csv")
-
-        hidden_properties_map: dict[str, list[str]] = config["hierarchical_aggregation"]["hidden_properties"]
-
-        results["arguments"] = _build_arguments(clusters, comments, relation_df, config)
-        results["clusters"] = _build_cluster_value(labels, arg_num)
-
-        # results["comments"] = _build_comments_value(
-        #     comments, arguments, hidden_properties_map
-        # )
-        results["comment_num"] = len(comments)
-        results["translations"] = _build_translations(config)
-        # 属性情報のカラムは、元データに対して指定したカラムとclassificationするカテゴリを合わせたもの
-        results["propertyMap"] = _build_property_map(arguments, comments, hidden_properties_map, config)
-
-        with open(f"{output_base_dir}/{config['output_dir']}/hierarchical_overview.txt") as f:
-            overview = f.read()
-        print("overview")
-        print(overview)
-        results["overview"] = overview
-
-        # Convert non-serializable NumPy types to native Python types
-        results = json_serialize_numpy(results)
-
-        with open(path, "w") as file:
-            json.dump(results, file, indent=2, ensure_ascii=False)
-        # TODO: サンプリングロジックを実装したいが、現状は全件抽出
-        create_custom_intro(config)
-        if config["is_pubcom"]:
-            add_original_comments(labels, arguments, relation_df, clusters, config)
+        output_dir = f"{output_base_dir}/{config['output_dir']}"
+        with spill_directory(output_dir) as spill_dir:
+            _aggregate(config, output_dir, f"{input_base_dir}/{config['input']}.csv", spill_dir)
         return True
     except Exception as e:
         print("error")
@@ -122,60 +95,133 @@ def hierarchical_aggregation(config) -> bool:
         return False
 
 
-def create_custom_intro(config):
-    output_base_dir = config.get("_output_base_dir", "outputs")
-    input_base_dir = config.get("_input_base_dir", "inputs")
+def _aggregate(config: dict, output_dir: str, input_path: str, spill_dir: Path) -> None:
+    """Write ``hierarchical_result.json`` and its companion files.
+
+    In low-memory mode (``analysis_core.core.memory``) the inputs are scanned lazily, the arguments table and
+    the property table are built with the streaming engine and spilled to Parquet under ``spill_dir``, and the
+    result is always written batch by batch (``streaming_output``) unless ``sharded_output`` is set.
+    """
+    path = f"{output_dir}/hierarchical_result.json"
+    low_memory = is_low_memory(config)
+
+    load = scan_artifact if low_memory else lambda path: read_artifact(path, config)
+    arguments = load(f"{output_dir}/args.csv")
+    relation_df = load(f"{output_dir}/relations.csv")
+    comments = scan_table(input_path) if low_memory else pl.read_csv(input_path)
+    clusters = load(f"{output_dir}/hierarchical_clusters.csv")
+    labels = read_artifact(f"{output_dir}/hierarchical_merge_labels.csv", config)
+    arg_num = count_rows(arguments)
+    comment_num = count_rows(comments)
+
+    hidden_properties_map: dict[str, list[str]] = config["hierarchical_aggregation"]["hidden_properties"]
+
+    with open(f"{output_dir}/hierarchical_overview.txt") as f:
+        overview = f.read()
+    print("overview")
+    print(overview)
+
+    argument_table = _build_argument_table(clusters, comments, relation_df, config)
+    # 属性情報のカラムは、元データに対して指定したカラムとclassificationするカテゴリを合わせたもの
+    property_frame = _build_property_frame(arguments, hidden_properties_map, config)
+    if low_memory:
+        argument_table = spill_frame(argument_table, spill_dir, "arguments")
+        property_frame = spill_frame(property_frame, spill_dir, "properties")
+    check_memory_budget(config, "hierarchical_aggregation")
+    attribute_stats = _build_attribute_stats(argument_table)
+    if isinstance(attribute_stats, pl.LazyFrame):
+        attribute_stats = attribute_stats.collect(engine="streaming")
+    categorical_properties = (
+        config["hierarchical_aggregation"].get("property_map_encoding", MAPPING_ENCODING) == CATEGORICAL_ENCODING
+    )
+    summary = {
+        "clusters": _build_cluster_value(labels, arg_num),
+        "comments": {},
+        # クラスタごとの属性値の内訳 (ビューアの属性フィルタ・API の内訳表示用)
+        "attributeStats": _attribute_stats_to_dict(attribute_stats),
+        "translations": _build_translations(config),
+        "overview": overview,
+        "config": {**config, "intro": create_custom_intro(config, comment_num, arg_num)},
+        "comment_num": comment_num,
+    }
+    if categorical_properties:
+        summary[PROPERTY_MAP_ENCODING_KEY] = CATEGORICAL_ENCODING
+
+    sharded_output = config["hierarchical_aggregation"].get("sharded_output", False)
+    streaming_output = config["hierarchical_aggregation"].get("streaming_output", False) or low_memory
+    if streaming_output and not sharded_output:
+        # 意見と propertyMap を dict に展開せず、バッチごとに書き出す
+        if categorical_properties:
+            # 符号化済みの propertyMap はプロパティごとに値の辞書とコード配列を 1 行で書き出す
+            write_result_stream(
+                path,
+                {"propertyMap": _encode_property_frame(property_frame, argument_table), **summary},
+                arguments=argument_table,
+            )
+        else:
+            write_result_stream(path, summary, arguments=argument_table, property_frame=property_frame)
+    else:
+        argument_table = _collect(argument_table)
+        property_frame = _collect(property_frame)
+        # TODO: サンプリングロジックを実装したいが、現状は全件抽出
+        results = {
+            "arguments": argument_table.to_dicts(),
+            "clusters": summary["clusters"],
+            "comments": summary["comments"],
+            "propertyMap": _encode_property_frame(property_frame, argument_table)
+            if categorical_properties
+            else _property_map_from_frame(property_frame),
+            **{key: value for key, value in summary.items() if key not in ("clusters", "comments")},
+        }
+        with open(path, "wb") as file:
+            file.write(orjson.dumps(results, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+        if sharded_output:
+            write_result_shards(results, output_dir)
+        del results
+    check_memory_budget(config, "hierarchical_aggregation")
+    _write_argument_table(
+        argument_table,
+        f"{output_dir}/{ARGUMENTS_TABLE_FILENAME}",
+        comment_num=comment_num,
+        cluster_num=labels.filter(pl.col("level") == 1).height,
+    )
+    # 属性がなくても空のファイルを書き出す (再実行時やストレージに前回の内訳が残らないようにする)
+    attribute_stats.write_parquet(f"{output_dir}/{ATTRIBUTE_STATS_FILENAME}", compression="zstd")
+    if config["is_pubcom"]:
+        add_original_comments(
+            labels.lazy() if low_memory else labels, arguments, relation_df, clusters, comments, config
+        )
+
+
+def _collect(frame: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+    if isinstance(frame, pl.LazyFrame):
+        return frame.collect(engine="streaming")
+    return frame
 
-    dataset = config["output_dir"]
-    args_path = f"{output_base_dir}/{dataset}/args.csv"
-    comments = pl.read_csv(f"{input_base_dir}/{config['input']}.csv")
-    result_path = f"{output_base_dir}/{dataset}/hierarchical_result.json"
 
-    input_count = len(comments)
-    args_count = len(pl.read_csv(args_path))
+def create_custom_intro(config: dict, input_count: int, args_count: int) -> str:
+    """Build the report intro shown in the viewer from the configured intro and the processing counts."""
     processed_num = min(input_count, config["extraction"]["limit"])
 
     print(f"Input count: {input_count}")
     print(f"Args count: {args_count}")
 
     # LLMプロバイダーとモデル名の判定
-    def get_llm_provider_display():
-        # configからプロバイダー情報を取得（優先）
-        provider = config.get("provider", "openai")
-        model = config.get("model", "unknown")
-
-        # プロバイダー名をマッピング
-        provider_names = {
-            "openai": "OpenAI API",
-            "azure": "Azure OpenAI API",
-            "openrouter": "OpenRouter API",
-            "local": "Local LLM",
-        }
-
-        provider_name = provider_names.get(provider, f"{provider} API")
-        return f"{provider_name} ({model})"
-
-    llm_provider = get_llm_provider_display()
+    provider = config.get("provider", "openai")
+    model = config.get("model", "unknown")
+    llm_provider = f"{LLM_PROVIDER_NAMES.get(provider, f'{provider} API')} ({model})"
 
     base_custom_intro = """{intro}
 分析対象となったデータの件数は{processed_num}件で、これらのデータに対して{llm_provider}を用いて{args_count}件の意見（議論）を抽出し、クラスタリングを行った。
 """
 
-    intro = config["intro"]
-    custom_intro = base_custom_intro.format(
-        intro=intro, processed_num=processed_num, args_count=args_count, llm_provider=llm_provider
+    return base_custom_intro.format(
+        intro=config["intro"], processed_num=processed_num, args_count=args_count, llm_provider=llm_provider
     )
 
-    with open(result_path) as f:
-        result = json.load(f)
-    result["config"]["intro"] = custom_intro
-    with open(result_path, "w") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-
 
-def add_original_comments(labels, arguments, relation_df, clusters, config):
+def add_original_comments(labels, arguments, relation_df, clusters, comments, config):
     output_base_dir = config.get("_output_base_dir", "outputs")
-    input_base_dir = config.get("_input_base_dir", "inputs")
 
     # 大カテゴリ（cluster-level-1）に該当するラベルだけ抽出
     labels_lv1 = (
@@ -192,8 +238,8 @@ def add_original_comments(labels, arguments, relation_df, clusters, config):
     # relation_df と結合
     merged = merged.join(relation_df, on="arg-id", how="left")
 
-    # 元コメント取得
-    comments = pl.read_csv(f"{input_base_dir}/{config['input']}.csv")
+    # 元コメント
+    comment_columns = column_names(comments)
     comments = comments.with_columns(pl.col("comment-id").cast(pl.Utf8))
     merged = merged.with_columns(pl.col("comment-id").cast(pl.Utf8))
 
@@ -205,12 +251,12 @@ def add_original_comments(labels, arguments, relation_df, clusters, config):
 
     # 基本カラム
     for col in ["x", "y", "source", "url"]:
-        if col in comments.columns:
+        if col in comment_columns:
             final_cols.append(col)
 
     # 属性カラムを追加
     attribute_columns = []
-    for col in comments.columns:
+    for col in comment_columns:
         # attributeプレフィックスが付いたカラムを探す
         if col.startswith("attribute_"):
             attribute_columns.append(col)
@@ -231,14 +277,23 @@ def add_original_comments(labels, arguments, relation_df, clusters, config):
     )
 
     # 保存
-    final_df.write_csv(f"{output_base_dir}/{config['output_dir']}/final_result_with_comments.csv")
+    final_path = f"{output_base_dir}/{config['output_dir']}/final_result_with_comments.csv"
+    if isinstance(final_df, pl.LazyFrame):
+        final_df.sink_csv(final_path)
+    else:
+        final_df.write_csv(final_path)
 
 
-def _build_arguments(
-    clusters: pl.DataFrame, comments: pl.DataFrame, relation_df: pl.DataFrame, config: dict
-) -> list[Argument]:
+def _build_argument_table(
+    clusters: pl.DataFrame | pl.LazyFrame,
+    comments: pl.DataFrame | pl.LazyFrame,
+    relation_df: pl.DataFrame | pl.LazyFrame,
+    config: dict,
+) -> pl.DataFrame | pl.LazyFrame:
     """
-    Build the arguments list including attribute information from original comments
+    Build the arguments table (one row per ``Argument``) including attribute information from original comments
+
+    Lazy inputs give a lazy table, so that the whole join can run on the streaming engine.
 
     Args:
         clusters: DataFrame containing cluster information for each argument
@@ -246,79 +301,139 @@ def _build_arguments(
         relation_df: DataFrame relating arguments to original comments
         config: Configuration dictionary containing enable_source_link setting
     """
-    cluster_columns = [col for col in clusters.columns if col.startswith("cluster-level-") and "id" in col]
+    cluster_columns = [col for col in column_names(clusters) if col.startswith("cluster-level-") and "id" in col]
+
+    # Find attribute columns in comments dataframe
+    comment_columns = column_names(comments)
+    attribute_columns = [col for col in comment_columns if col.startswith("attribute_")]
+    print(f"属性カラム検出: {attribute_columns}")
+
+    table = clusters.select(
+        pl.col("arg-id").cast(pl.Utf8),
+        pl.col("argument").cast(pl.Utf8),
+        pl.col("x").cast(pl.Float64),
+        pl.col("y").cast(pl.Float64),
+        pl.concat_list([pl.lit("0"), *[pl.col(col).cast(pl.Utf8) for col in cluster_columns]]).alias("cluster_ids"),
+    )
+
+    # Argument -> comment mapping (the last relation wins for duplicated arg-ids)
+    if "comment-id" in column_names(relation_df):
+        relations = relation_df.select(pl.col("arg-id").cast(pl.Utf8), pl.col("comment-id").cast(pl.Utf8)).unique(
+            subset="arg-id", keep="last", maintain_order=True
+        )
+        table = table.join(relations, on="arg-id", how="left", maintain_order="left")
+    else:
+        table = table.with_columns(pl.lit(None, dtype=pl.Utf8).alias("comment-id"))
+
+    with_source_link = config.get("enable_source_link", False) and "url" in comment_columns
+    value_columns = (["url"] if with_source_link else []) + attribute_columns
+    if value_columns:
+        comment_values = comments.select(
+            pl.col("comment-id").cast(pl.Utf8), *[pl.col(col) for col in value_columns]
+        ).unique(subset="comment-id", keep="last", maintain_order=True)
+        table = table.join(comment_values, on="comment-id", how="left", maintain_order="left")
+
+    if attribute_columns:
+        # Only add attributes when at least one of them is set; strip the "attribute_" prefix
+        attributes = (
+            pl.when(pl.any_horizontal([pl.col(col).is_not_null() for col in attribute_columns]))
+            .then(pl.struct([pl.col(col).alias(col[len("attribute_") :]) for col in attribute_columns]))
+            .otherwise(None)
+        )
+    else:
+        attributes = pl.lit(None)
+
+    return table.select(
+        pl.col("arg-id").alias("arg_id"),
+        pl.col("argument"),
+        pl.col("comment-id").fill_null("").alias("comment_id"),
+        pl.col("x"),
+        pl.col("y"),
+        pl.lit(0).alias("p"),  # NOTE: 一旦全部0でいれる
+        pl.col("cluster_ids"),
+        attributes.alias("attributes"),
+        (pl.col("url").cast(pl.Utf8) if with_source_link else pl.lit(None, dtype=pl.Utf8)).alias("url"),
+    )
+
+
+def _write_argument_table(
+    argument_table: pl.DataFrame | pl.LazyFrame, path: str, comment_num: int, cluster_num: int
+) -> None:
+    """Write the arguments table as Parquet so that readers can get counts and columns without parsing the JSON.
+
+    Coordinates are stored as float32 and every cluster level becomes a dictionary-encoded (categorical) column
+    ``cluster_level_{n}_id``. Report-level counts are stored in the file's key-value metadata.
+    """
+    level_count = _collect(argument_table.select(pl.col("cluster_ids").list.len().max())).item() or 1
+    columns = [
+        pl.col("arg_id"),
+        pl.col("argument"),
+        pl.col("comment_id"),
+        pl.col("x").cast(pl.Float32),
+        pl.col("y").cast(pl.Float32),
+        pl.col("p").cast(pl.Float32),
+        *[
+            pl.col("cluster_ids")
+            .list.get(level, null_on_oob=True)
+            .cast(pl.Categorical)
+            .alias(f"cluster_level_{level}_id")
+            for level in range(1, level_count)
+        ],
+        pl.col("url"),
+    ]
+    if argument_table.collect_schema()["attributes"] != pl.Null:
+        columns.append(pl.col("attributes"))
+    metadata = {
+        "format_version": str(ARGUMENTS_TABLE_FORMAT_VERSION),
+        "comment_num": str(comment_num),
+        "cluster_num": str(cluster_num),
+    }
+    if isinstance(argument_table, pl.LazyFrame):
+        argument_table.select(columns).sink_parquet(path, compression="zstd", metadata=metadata)
+    else:
+        argument_table.select(columns).write_parquet(path, compression="zstd", metadata=metadata)
 
-    # Prepare for merging with original comments to get attributes
-    comments_copy = comments.with_columns(pl.col("comment-id").cast(pl.Utf8))
 
-    # Get argument to comment mapping
-    arg_comment_map = {}
-    if "comment-id" in relation_df.columns:
-        relation_df_copy = relation_df.with_columns(pl.col("comment-id").cast(pl.Utf8))
-        arg_comment_map = dict(
-            zip(relation_df_copy["arg-id"].to_list(), relation_df_copy["comment-id"].to_list(), strict=False)
+def _build_attribute_stats(argument_table: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+    """Count arguments per (level, cluster, attribute, value) for every level including the root cluster.
+
+    Returns a long table with columns ``level``, ``cluster_id``, ``attribute``, ``value`` (as string) and
+    ``count``. Missing attribute values are not counted.
+    """
+    schema = argument_table.collect_schema()["attributes"]
+    if not isinstance(schema, pl.Struct):
+        return pl.DataFrame(
+            schema={
+                "level": pl.Int64,
+                "cluster_id": pl.Utf8,
+                "attribute": pl.Utf8,
+                "value": pl.Utf8,
+                "count": pl.UInt32,
+            }
         )
 
-    # Find attribute columns in comments dataframe
-    attribute_columns = [col for col in comments.columns if col.startswith("attribute_")]
-    print(f"属性カラム検出: {attribute_columns}")
+    attribute_names = [field.name for field in schema.fields]
+    return (
+        argument_table.select(
+            pl.int_ranges(0, pl.col("cluster_ids").list.len()).alias("level"),
+            pl.col("cluster_ids").alias("cluster_id"),
+            *[pl.col("attributes").struct.field(name).cast(pl.Utf8).alias(name) for name in attribute_names],
+        )
+        .explode("level", "cluster_id")
+        .unpivot(index=["level", "cluster_id"], on=attribute_names, variable_name="attribute", value_name="value")
+        .drop_nulls("value")
+        .group_by("level", "cluster_id", "attribute", "value")
+        .len(name="count")
+        .sort(["level", "cluster_id", "attribute", "count", "value"], descending=[False, False, False, True, False])
+    )
 
-    # Build comments lookup
-    comments_lookup = {row["comment-id"]: row for row in comments_copy.iter_rows(named=True)}
-
-    arguments: list[Argument] = []
-    for row in clusters.iter_rows(named=True):
-        cluster_ids = ["0"]
-        for cluster_column in cluster_columns:
-            cluster_ids.append(str(row[cluster_column]))  # Convert to string to ensure serializable
-
-        # Create base argument
-        comment_id = arg_comment_map.get(row["arg-id"], "")
-        argument: Argument = {
-            "arg_id": str(row["arg-id"]),  # Convert to string to ensure serializable
-            "argument": str(row["argument"]),
-            "comment_id": str(comment_id) if comment_id else "",
-            "x": float(row["x"]),  # Convert to native float
-            "y": float(row["y"]),  # Convert to native float
-            "p": 0,  # NOTE: 一旦全部0でいれる
-            "cluster_ids": cluster_ids,
-            "attributes": None,
-            "url": None,
-        }
 
-        # Add attributes and URL if available
-        if row["arg-id"] in arg_comment_map:
-            comment_id = arg_comment_map[row["arg-id"]]
-            comment_row = comments_lookup.get(comment_id)
-
-            if comment_row is not None:
-                # Add URL if available and enabled
-                if config.get("enable_source_link", False) and "url" in comment_row and comment_row["url"] is not None:
-                    argument["url"] = str(comment_row["url"])
-
-                # Add attributes if available
-                if attribute_columns:
-                    attributes = {}
-                    for attr_col in attribute_columns:
-                        # Remove "attribute_" prefix for cleaner attribute names
-                        attr_name = attr_col[len("attribute_") :]
-                        # Convert potential numpy types to Python native types
-                        attr_value = comment_row.get(attr_col, None)
-                        if attr_value is not None:
-                            if isinstance(attr_value, np.integer):
-                                attr_value = int(attr_value)
-                            elif isinstance(attr_value, np.floating):
-                                attr_value = float(attr_value)
-                            elif isinstance(attr_value, np.ndarray):
-                                attr_value = attr_value.tolist()
-                        attributes[attr_name] = attr_value
-
-                    # Only add non-empty attributes
-                    if any(v is not None for v in attributes.values()):
-                        argument["attributes"] = attributes
-
-        arguments.append(argument)
-    return arguments
+def _attribute_stats_to_dict(attribute_stats: pl.DataFrame) -> dict[str, dict[str, dict[str, int]]]:
+    """Nest the long attribute stats table as ``{attribute: {cluster_id: {value: count}}}``."""
+    nested: dict[str, dict[str, dict[str, int]]] = {}
+    for row in attribute_stats.iter_rows(named=True):
+        nested.setdefault(row["attribute"], {}).setdefault(row["cluster_id"], {})[row["value"]] = row["count"]
+    return nested
 
 
 def _build_cluster_value(melted_labels: pl.DataFrame, total_num: int) -> list[Cluster]:
@@ -334,37 +449,20 @@ def _build_cluster_value(melted_labels: pl.DataFrame, total_num: int) -> list[Cl
         )
     ]
 
-    for melted_label in melted_labels.iter_rows(named=True):
-        # Convert potential NumPy types to native Python types
-        level = (
-            int(melted_label["level"]) if isinstance(melted_label["level"], int | np.integer) else melted_label["level"]
-        )
-        cluster_id = str(melted_label["id"])
-        label = str(melted_label["label"])
-        takeaway = str(melted_label["description"])
-        value = (
-            int(melted_label["value"]) if isinstance(melted_label["value"], int | np.integer) else melted_label["value"]
-        )
-        parent = str(melted_label.get("parent", "全体"))
-
-        # Handle density_rank_percentile which might be None or a numeric value
-        density_rank = melted_label.get("density_rank_percentile")
-        if density_rank is not None:
-            if isinstance(density_rank, float | np.floating):
-                density_rank = float(density_rank)
-            elif isinstance(density_rank, int | np.integer):
-                density_rank = int(density_rank)
-
-        cluster_value = Cluster(
-            level=level,
-            id=cluster_id,
-            label=label,
-            takeaway=takeaway,
-            value=value,
-            parent=parent,
-            density_rank_percentile=density_rank,
-        )
-        results.append(cluster_value)
+    columns = melted_labels.columns
+    results.extend(
+        melted_labels.select(
+            pl.col("level"),
+            pl.col("id").cast(pl.Utf8),
+            pl.col("label").cast(pl.Utf8),
+            pl.col("description").cast(pl.Utf8).alias("takeaway"),
+            pl.col("value"),
+            pl.col("parent").cast(pl.Utf8) if "parent" in columns else pl.lit("全体").alias("parent"),
+            pl.col("density_rank_percentile")
+            if "density_rank_percentile" in columns
+            else pl.lit(None).alias("density_rank_percentile"),
+        ).to_dicts()
+    )
     return results
 
 
@@ -398,43 +496,50 @@ def _build_translations(config):
     return {}
 
 
-def _build_property_map(
-    arguments: pl.DataFrame, comments: pl.DataFrame, hidden_properties_map: dict[str, list[str]], config: dict
-) -> dict[str, dict[str, str]]:
+def _build_property_frame(
+    arguments: pl.DataFrame | pl.LazyFrame, hidden_properties_map: dict[str, list[str]], config: dict
+) -> pl.DataFrame | pl.LazyFrame:
+    """Build the ``propertyMap`` as a table with an ``arg_id`` column and one column per property."""
     property_columns = list(hidden_properties_map.keys()) + list(config["extraction"]["categories"].keys())
-    property_map = defaultdict(dict)
 
     # 指定された property_columns が arguments に存在するかチェック
-    missing_cols = [col for col in property_columns if col not in arguments.columns]
+    schema = arguments.collect_schema()
+    missing_cols = [col for col in property_columns if col not in schema]
     if missing_cols:
         raise ValueError(
             f"指定されたカラム {missing_cols} が args.csv に存在しません。"
             "設定ファイルaggregation / hidden_propertiesから該当カラムを取り除いてください。"
         )
 
-    for row in arguments.iter_rows(named=True):
-        arg_id = row["arg-id"]
-        for prop in property_columns:
-            value = row[prop]
-
-            # Convert NumPy types to Python native types
-            if value is not None:
-                if isinstance(value, np.integer):
-                    value = int(value)
-                elif isinstance(value, np.floating):
-                    value = float(value)
-                elif isinstance(value, np.ndarray):
-                    value = value.tolist()
-                else:
-                    # Convert any other types to string to ensure serialization
-                    try:
-                        value = str(value)
-                    except Exception as e:
-                        print(f"Error converting value to string: {e}")
-                        value = None
-
-            # Make sure arg_id is string
-            str_arg_id = str(arg_id)
-            property_map[prop][str_arg_id] = value
-
-    return property_map
+    # 値は str() と同じ表現の文字列に揃える。文字列・整数以外 (浮動小数点数・真偽値) は polars の cast と
+    # 表現が異なるため str() を使う
+    return arguments.select(
+        pl.col("arg-id").cast(pl.Utf8).alias("arg_id"),
+        *[
+            pl.col(prop).cast(pl.Utf8)
+            if schema[prop] == pl.Utf8 or schema[prop].is_integer()
+            else pl.col(prop).map_elements(str, return_dtype=pl.Utf8, skip_nulls=True)
+            for prop in dict.fromkeys(property_columns)
+        ],
+    )
+
+
+def _encode_property_frame(
+    property_frame: pl.DataFrame | pl.LazyFrame, argument_table: pl.DataFrame | pl.LazyFrame
+) -> dict[str, dict[str, list]]:
+    """Encode the property table with its codes in the row order of ``arguments``.
+
+    ``property_frame`` follows ``args.csv`` while the arguments follow ``hierarchical_clusters``, so the
+    property rows are left-joined onto the argument ids before the codes are taken by position.
+    """
+    aligned = argument_table.select("arg_id").join(property_frame, on="arg_id", how="left", maintain_order="left")
+    return encode_property_frame(_collect(aligned))
+
+
+def _property_map_from_frame(property_frame: pl.DataFrame) -> dict[str, dict[str, str]]:
+    arg_ids = property_frame["arg_id"].to_list()
+    return {
+        prop: dict(zip(arg_ids, property_frame[prop].to_list(), strict=True))
+        for prop in property_frame.columns
+        if prop != "arg_id"
+    }
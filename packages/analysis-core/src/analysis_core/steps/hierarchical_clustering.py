@@ -6,6 +6,9 @@ from importlib import import_module
 import numpy as np
 import polars as pl
 
+from analysis_core.core.frames import read_artifact, write_artifact
+from analysis_core.core.memory import check_memory_budget
+
 
 def _load_clustering_dependencies():
     error_message = (
@@ -56,7 +59,7 @@ def hierarchical_clustering(config):
     dataset = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
     path = f"{output_base_dir}/{dataset}/hierarchical_clusters.csv"
-    arguments_df = pl.read_csv(f"{output_base_dir}/{dataset}/args.csv", columns=["arg-id", "argument"])
+    arguments_df = read_artifact(f"{output_base_dir}/{dataset}/args.csv", config, columns=["arg-id", "argument"])
     arg_ids = arguments_df["arg-id"].to_list()
 
     with open(f"{output_base_dir}/{dataset}/embeddings.pkl", "rb") as f:
@@ -71,6 +74,7 @@ def hierarchical_clustering(config):
             if missing:
                 raise ValueError(f"embeddings.pkl に存在しない arg-id があります: {missing[:5]} ...")
             embeddings_array = np.asarray([embed_by_id[arg_id] for arg_id in arg_ids])
+            del embed_by_id
         else:
             embeddings_array = np.asarray([item["embedding"] for item in embeddings_data])
     else:
@@ -79,6 +83,10 @@ def hierarchical_clustering(config):
         # ["embedding"] カラムから値を取得する
         embeddings_array = np.asarray(embeddings_data["embedding"].values.tolist())
 
+    # 元のリストは numpy 配列に変換済みなので、クラスタリングの前に解放する
+    del embeddings_data
+    check_memory_budget(config, "hierarchical_clustering")
+
     # 件数一致の検証
     if embeddings_array.shape[0] != len(arg_ids):
         raise ValueError(
@@ -128,7 +136,7 @@ def hierarchical_clustering(config):
             )
         )
 
-    result_df.write_csv(path)
+    write_artifact(result_df, path, config)
 
 
 def generate_cluster_count_list(min_clusters: int, max_clusters: int):
@@ -1,14 +1,19 @@
 import json
 import os
-from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import TypedDict
 
 import polars as pl
 from pydantic import BaseModel, Field
 
+from analysis_core.core.cancellation import PipelineCancelled, cancellable_map
+from analysis_core.core.frames import read_artifact, write_artifact
+from analysis_core.core.label_cache import LabelCache, build_label_cache_key
 from analysis_core.services.llm import request_to_chat_ai
 
+LABEL_ERROR = "エラーでラベル名が取得できませんでした"
+DESCRIPTION_ERROR = "エラーで解説が取得できませんでした"
+
 
 class LabellingResult(TypedDict):
     """各クラスタのラベリング結果を表す型"""
@@ -29,12 +34,13 @@ def hierarchical_initial_labelling(config: dict) -> None:
                 - prompt: LLMへのプロンプト
                 - model: 使用するLLMモデル名
                 - workers: 並列処理のワーカー数
+                - use_cache: ラベルキャッシュを使うかどうか (デフォルト: True)
             - provider: LLMプロバイダー
     """
     dataset = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
     path = f"{output_base_dir}/{dataset}/hierarchical_initial_labels.csv"
-    clusters_argument_df = pl.read_csv(f"{output_base_dir}/{dataset}/hierarchical_clusters.csv")
+    clusters_argument_df = read_artifact(f"{output_base_dir}/{dataset}/hierarchical_clusters.csv", config)
 
     cluster_id_columns = [col for col in clusters_argument_df.columns if col.startswith("cluster-level-")]
     initial_cluster_id_column = cluster_id_columns[-1]
@@ -45,17 +51,27 @@ def hierarchical_initial_labelling(config: dict) -> None:
 
     # トークン使用量を追跡するための変数を初期化
     config["total_token_usage"] = config.get("total_token_usage", 0)
+    label_cache = LabelCache.from_config(config, "hierarchical_initial_labelling")
 
-    initial_label_df = initial_labelling(
-        initial_labelling_prompt,
-        clusters_argument_df,
-        sampling_num,
-        model,
-        workers,
-        config["provider"],
-        config.get("local_llm_address"),
-        config,  # configを渡して、トークン使用量を累積できるようにする
-    )
+    try:
+        initial_label_df = initial_labelling(
+            initial_labelling_prompt,
+            clusters_argument_df,
+            sampling_num,
+            model,
+            workers,
+            config["provider"],
+            config.get("local_llm_address"),
+            config,  # configを渡して、トークン使用量を累積できるようにする
+            label_cache,
+        )
+    except PipelineCancelled:
+        # キャンセルまでに付けたラベルは次回の実行で再利用する
+        label_cache.save()
+        raise
+    label_cache.save(prune=True)
+    if label_cache.hits:
+        print(f"Initial labelling: reused {label_cache.hits} cached labels")
     print("start initial labelling")
     initial_clusters_argument_df = clusters_argument_df.join(
         initial_label_df,
@@ -69,7 +85,7 @@ def hierarchical_initial_labelling(config: dict) -> None:
         }
     )
     print("end initial labelling")
-    initial_clusters_argument_df.write_csv(path)
+    write_artifact(initial_clusters_argument_df, path, config)
 
 
 def initial_labelling(
@@ -81,6 +97,7 @@ def initial_labelling(
     provider: str = "openai",
     local_llm_address: str | None = None,
     config: dict | None = None,  # configを追加
+    cache: LabelCache | None = None,
 ) -> pl.DataFrame:
     """各クラスタに対して初期ラベリングを実行する
 
@@ -93,6 +110,7 @@ def initial_labelling(
         provider: LLMプロバイダー
         local_llm_address: ローカルLLMのアドレス
         config: 設定情報を含む辞書（トークン使用量の累積に使用）
+        cache: ラベルキャッシュ（指定時はメンバーが変わらないクラスタのLLM呼び出しを省略）
 
     Returns:
         各クラスタのラベリング結果を含むDataFrame
@@ -110,9 +128,9 @@ def initial_labelling(
         provider=provider,
         local_llm_address=local_llm_address,
         config=config,  # configを渡す
+        cache=cache,
     )
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        results = list(executor.map(process_func, cluster_ids))
+    results = list(cancellable_map(process_func, cluster_ids, max_workers=workers))
     return pl.DataFrame(results)
 
 
@@ -133,6 +151,7 @@ def process_initial_labelling(
     provider: str = "openai",
     local_llm_address: str | None = None,
     config: dict | None = None,  # configを追加
+    cache: LabelCache | None = None,
 ) -> LabellingResult:
     """個別のクラスタに対してラベリングを実行する
 
@@ -146,11 +165,25 @@ def process_initial_labelling(
         provider: LLMプロバイダー
         local_llm_address: ローカルLLMのアドレス
         config: 設定情報を含む辞書（トークン使用量の累積に使用）
+        cache: ラベルキャッシュ
 
     Returns:
         クラスタのラベリング結果
     """
     cluster_data = df.filter(pl.col(target_column) == cluster_id)
+    cache_key = None
+    if cache is not None and "arg-id" in cluster_data.columns:
+        cache_key = build_label_cache_key(
+            step="hierarchical_initial_labelling",
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            members=list(zip(cluster_data["arg-id"].to_list(), cluster_data["argument"].to_list(), strict=True)),
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return LabellingResult(cluster_id=cluster_id, label=cached["label"], description=cached["description"])
+
     sampling_num = min(sampling_num, len(cluster_data))
     cluster = cluster_data.sample(n=sampling_num)
     input = "\n".join(cluster["argument"].to_list())
@@ -176,15 +209,17 @@ def process_initial_labelling(
             config["token_usage_output"] = config.get("token_usage_output", 0) + token_output
 
         response_json = json.loads(response_text) if isinstance(response_text, str) else response_text
+        if cache is not None and cache_key is not None and "label" in response_json and "description" in response_json:
+            cache.set(cache_key, response_json["label"], response_json["description"])
         return LabellingResult(
             cluster_id=cluster_id,
-            label=response_json.get("label", "エラーでラベル名が取得できませんでした"),
-            description=response_json.get("description", "エラーで解説が取得できませんでした"),
+            label=response_json.get("label", LABEL_ERROR),
+            description=response_json.get("description", DESCRIPTION_ERROR),
         )
     except Exception as e:
         print(e)
         return LabellingResult(
             cluster_id=cluster_id,
-            label="エラーでラベル名が取得できませんでした",
-            description="エラーで解説が取得できませんでした",
+            label=LABEL_ERROR,
+            description=DESCRIPTION_ERROR,
         )
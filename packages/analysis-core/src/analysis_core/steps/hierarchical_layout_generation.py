@@ -4,6 +4,11 @@ This step keeps the canonical argument-level ``x``/``y`` coordinates intact and
 adds optional named layouts under ``result["layouts"]``. The immediate use case
 is a cluster-first ``semantic_island_map`` for ``llm_grouping`` outputs, while
 still preserving the original embedding-derived scatter as ``embedding_umap``.
+
+With ``semantic_island_map.all_levels`` enabled, one island layout is also stored
+for every upper hierarchy level (``semantic_island_map_level_{n}``) so viewers can
+switch levels without recomputing anything. ``semantic_island_map.workers`` runs
+the per-cluster local PCA over a process pool.
 """
 
 from __future__ import annotations
@@ -14,6 +19,16 @@ import pickle
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from analysis_core.core.result_shards import has_result_shards, write_result_shards
+from analysis_core.core.result_stream import is_streamed_result, read_result, write_result_stream
+
+# 島どうしの最小間隔（半径の和に加える余白）
+OVERLAP_MIN_MARGIN = 0.6
+# これを超えるクラスタ数では、重なり判定を全ペアではなく KD-tree の近傍探索で行う
+OVERLAP_NEIGHBOR_SEARCH_THRESHOLD = 256
+
+SEMANTIC_LAYOUT_ID = "semantic_island_map"
+
 if TYPE_CHECKING:
     import numpy as np
 
@@ -31,7 +46,7 @@ def hierarchical_layout_generation(config: dict[str, Any]) -> None:
             "Run the hierarchical_aggregation step first."
         )
 
-    result = json.loads(result_path.read_text(encoding="utf-8"))
+    result = read_result(result_path)
     layouts = dict(result.get("layouts") or {})
     layouts["embedding_umap"] = _build_embedding_layout(result)
 
@@ -47,16 +62,27 @@ def hierarchical_layout_generation(config: dict[str, Any]) -> None:
                 f"embeddings.pkl not found at {embeddings_path}. "
                 "semantic_island_map requires embedding outputs."
             )
-        layouts["semantic_island_map"] = _build_semantic_island_layout(
-            result=result,
-            embeddings_path=embeddings_path,
-            center_scale=float(semantic_cfg.get("center_scale", 8.5)),
-            island_shrink=float(semantic_cfg.get("island_shrink", 0.72)),
+        layouts.update(
+            _build_semantic_island_layouts(
+                result=result,
+                embeddings_path=embeddings_path,
+                center_scale=float(semantic_cfg.get("center_scale", 8.5)),
+                island_shrink=float(semantic_cfg.get("island_shrink", 0.72)),
+                all_levels=bool(semantic_cfg.get("all_levels", False)),
+                workers=int(semantic_cfg.get("workers", 1)),
+            )
         )
 
     result["layouts"] = layouts
     result["default_layout_id"] = _resolve_default_layout_id(result, layout_config, enabled)
-    result_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if is_streamed_result(result_path):
+        # aggregation がストリーミング形式で書き出した場合は同じ形式で書き直す
+        write_result_stream(result_path, result)
+    else:
+        result_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    if has_result_shards(result_path.parent):
+        # シャード形式の出力がある場合はレイアウトを反映して書き直す
+        write_result_shards(result, result_path.parent)
 
 
 def _should_enable_semantic_layout(result: dict[str, Any]) -> bool:
@@ -93,52 +119,114 @@ def _build_embedding_layout(result: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def _build_semantic_island_layout(
+def _build_semantic_island_layouts(
     *,
     result: dict[str, Any],
     embeddings_path: Path,
     center_scale: float,
     island_shrink: float,
-) -> dict[str, Any]:
+    all_levels: bool = False,
+    workers: int = 1,
+) -> dict[str, dict[str, Any]]:
     import numpy as np
-    from sklearn.metrics.pairwise import cosine_distances
 
     args = result["arguments"]
     arg_ids = [arg["arg_id"] for arg in args]
     embeddings = _load_embeddings(embeddings_path, arg_ids)
+    depths = [len(arg["cluster_ids"]) for arg in args]
+
+    # 最下層のクラスタごとの埋め込みの和を一度だけ集計し、上位階層の重心はその和から求める
+    deepest_clusters, deepest_indices = _group_indices_by_cluster([arg["cluster_ids"][-1] for arg in args])
+    deepest_sums = np.vstack([embeddings[idx].sum(axis=0) for idx in deepest_indices])
+    deepest_counts = np.asarray([len(idx) for idx in deepest_indices], dtype=np.float64)
+    levels = {
+        SEMANTIC_LAYOUT_ID: (max(depths) - 1, deepest_clusters, deepest_indices, deepest_sums / deepest_counts[:, None])
+    }
+    if all_levels:
+        owner = np.empty(len(args), dtype=np.int64)
+        for k, idx in enumerate(deepest_indices):
+            owner[idx] = k
+        for level in range(1, min(min(depths), max(depths) - 1)):
+            levels[f"{SEMANTIC_LAYOUT_ID}_level_{level}"] = (
+                level,
+                *_aggregate_parent_level(args, level, owner, embeddings, deepest_indices, deepest_sums),
+            )
+
+    # 全階層の島内レイアウト (クラスタごとの PCA) をまとめて計算する
+    tasks = [embeddings[idx] for _, _, indices, _ in levels.values() for idx in indices]
+    local_points = iter(_compute_local_island_points(tasks, shrink=island_shrink, workers=workers))
+
+    layouts = {}
+    for layout_id, (level, clusters, indices, centroids) in levels.items():
+        layouts[layout_id] = _build_island_layout(
+            arg_ids=arg_ids,
+            clusters=clusters,
+            indices=indices,
+            centroids=centroids,
+            local_points=[next(local_points) for _ in indices],
+            center_scale=center_scale,
+            island_shrink=island_shrink,
+        )
+        layouts[layout_id]["meta"]["level"] = level
+    return layouts
+
+
+def _aggregate_parent_level(
+    args: list[dict[str, Any]],
+    level: int,
+    owner: np.ndarray,
+    embeddings: np.ndarray,
+    deepest_indices: list[np.ndarray],
+    deepest_sums: np.ndarray,
+) -> tuple[list[str], list[np.ndarray], np.ndarray]:
+    """Group arguments by their level-``level`` cluster and compute the centroids from the deepest-level sums."""
+    import numpy as np
+
+    level_ids = np.asarray([arg["cluster_ids"][level] for arg in args], dtype=object)
+    parent_of_deepest = level_ids[[idx[0] for idx in deepest_indices]]
+    if not np.array_equal(level_ids, parent_of_deepest[owner]):
+        # 階層が入れ子になっていない場合は、その階層の意見から直接重心を求める
+        clusters, indices = _group_indices_by_cluster(level_ids.tolist())
+        return clusters, indices, np.vstack([embeddings[idx].mean(axis=0) for idx in indices])
+
+    clusters, children = _group_indices_by_cluster(parent_of_deepest.tolist())
+    indices = [np.sort(np.concatenate([deepest_indices[child] for child in group])) for group in children]
+    sums = np.vstack([deepest_sums[group].sum(axis=0) for group in children])
+    counts = np.asarray([len(idx) for idx in indices], dtype=np.float64)
+    return clusters, indices, sums / counts[:, None]
+
 
-    cluster_ids = [arg["cluster_ids"][-1] for arg in args]
-    unique_clusters = list(dict.fromkeys(cluster_ids))
-    cluster_indices = {cid: [i for i, value in enumerate(cluster_ids) if value == cid] for cid in unique_clusters}
+def _build_island_layout(
+    *,
+    arg_ids: list[str],
+    clusters: list[str],
+    indices: list[np.ndarray],
+    centroids: np.ndarray,
+    local_points: list[np.ndarray],
+    center_scale: float,
+    island_shrink: float,
+) -> dict[str, Any]:
+    import numpy as np
+    from sklearn.metrics.pairwise import cosine_distances
 
-    centroids = np.vstack([embeddings[cluster_indices[cid]].mean(axis=0) for cid in unique_clusters])
     distance_matrix = cosine_distances(centroids)
     center_coords = _classical_mds(distance_matrix, scale=center_scale)
 
-    radii = {
-        cid: island_shrink * (1.3 + math.sqrt(len(cluster_indices[cid])) * 0.26)
-        for cid in unique_clusters
-    }
-    centers = {cid: center_coords[i].copy() for i, cid in enumerate(unique_clusters)}
-    _resolve_center_overlaps(centers, radii)
+    counts = np.asarray([len(idx) for idx in indices], dtype=np.float64)
+    radii = island_shrink * (1.3 + np.sqrt(counts) * 0.26)
+    centers = _resolve_center_overlaps(center_coords, radii)
 
-    point_layout: dict[str, dict[str, float]] = {}
+    coords = np.zeros((len(arg_ids), 2), dtype=np.float64)
     cluster_layout: dict[str, dict[str, float]] = {}
-    for cid in unique_clusters:
-        idx = cluster_indices[cid]
-        local_coords = _local_island_points(embeddings[idx], len(idx), shrink=island_shrink)
-        center = centers[cid]
+    for k, (cid, idx) in enumerate(zip(clusters, indices, strict=True)):
+        coords[idx] = centers[k] + local_points[k]
         cluster_layout[cid] = {
-            "cx": float(center[0]),
-            "cy": float(center[1]),
-            "radius": float(radii[cid]),
+            "cx": float(centers[k, 0]),
+            "cy": float(centers[k, 1]),
+            "radius": float(radii[k]),
             "count": len(idx),
         }
-        for local_idx, arg_idx in enumerate(idx):
-            point_layout[arg_ids[arg_idx]] = {
-                "x": float(center[0] + local_coords[local_idx, 0]),
-                "y": float(center[1] + local_coords[local_idx, 1]),
-            }
+    point_layout = {arg_id: {"x": x, "y": y} for arg_id, (x, y) in zip(arg_ids, coords.tolist(), strict=True)}
 
     return {
         "kind": "cluster_first",
@@ -153,6 +241,28 @@ def _build_semantic_island_layout(
     }
 
 
+def _compute_local_island_points(tasks: list[np.ndarray], shrink: float, workers: int) -> list[np.ndarray]:
+    """Run the per-cluster local PCA, spreading the clusters over a process pool when ``workers`` > 1."""
+    if workers <= 1 or len(tasks) < 2:
+        return [_local_island_points(embeddings, len(embeddings), shrink=shrink) for embeddings in tasks]
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers, len(tasks))
+    # スレッドを使う他のステップと同じプロセスで動くため、fork ではなく spawn で起動する
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(
+            executor.map(
+                _local_island_points,
+                tasks,
+                [len(embeddings) for embeddings in tasks],
+                [shrink] * len(tasks),
+                chunksize=max(1, len(tasks) // (workers * 4)),
+            )
+        )
+
+
 def _load_embeddings(embeddings_path: Path, arg_ids: list[str]) -> np.ndarray:
     import numpy as np
 
@@ -178,27 +288,70 @@ def _classical_mds(distance_matrix: np.ndarray, scale: float = 1.0) -> np.ndarra
     return coords * scale
 
 
-def _resolve_center_overlaps(centers: dict[str, np.ndarray], radii: dict[str, float], steps: int = 180) -> None:
+def _group_indices_by_cluster(cluster_ids: list[str]) -> tuple[list[str], list[np.ndarray]]:
+    """Group argument indices by cluster id in first-appearance order using a single stable argsort."""
     import numpy as np
 
-    cluster_ids = list(centers.keys())
-    original = {cid: centers[cid].copy() for cid in cluster_ids}
+    values, first_index, inverse = np.unique(
+        np.asarray(cluster_ids, dtype=object), return_index=True, return_inverse=True
+    )
+    order = np.argsort(inverse, kind="stable")
+    boundaries = np.cumsum(np.bincount(inverse, minlength=len(values)))[:-1]
+    groups = np.split(order, boundaries)
+    appearance = np.argsort(first_index, kind="stable")
+    return [str(values[k]) for k in appearance], [groups[k] for k in appearance]
+
+
+def _resolve_center_overlaps(
+    centers: np.ndarray,
+    radii: np.ndarray,
+    steps: int = 180,
+    neighbor_search_threshold: int = OVERLAP_NEIGHBOR_SEARCH_THRESHOLD,
+) -> np.ndarray:
+    """Push overlapping islands apart while pulling each one back towards its original position.
+
+    Each step computes the repulsive forces of all overlapping pairs at once. Up to ``neighbor_search_threshold``
+    clusters the pairs come from a dense pairwise distance matrix; above it a KD-tree only returns pairs that are
+    close enough to overlap, so each step stays near-linear in the number of clusters.
+    """
+    import numpy as np
+
+    original = np.asarray(centers, dtype=np.float64)
+    centers = original.copy()
+    radii = np.asarray(radii, dtype=np.float64)
+    n_clusters = len(centers)
+    if n_clusters < 2:
+        return centers
+
+    use_tree = n_clusters > neighbor_search_threshold
+    if use_tree:
+        from scipy.spatial import cKDTree
+
+        search_radius = 2 * float(radii.max()) + OVERLAP_MIN_MARGIN
+    else:
+        all_left, all_right = np.triu_indices(n_clusters, k=1)
 
     for _ in range(steps):
-        forces = {cid: np.zeros(2, dtype=np.float64) for cid in cluster_ids}
-        for i, left_id in enumerate(cluster_ids):
-            for right_id in cluster_ids[i + 1 :]:
-                delta = centers[right_id] - centers[left_id]
-                dist = np.linalg.norm(delta) or 1e-6
-                direction = delta / dist
-                min_gap = radii[left_id] + radii[right_id] + 0.6
-                if dist < min_gap:
-                    push = (min_gap - dist) * 0.18
-                    forces[left_id] -= direction * push
-                    forces[right_id] += direction * push
-        for cid in cluster_ids:
-            forces[cid] += (original[cid] - centers[cid]) * 0.01
-            centers[cid] += np.clip(forces[cid], -0.25, 0.25)
+        if use_tree:
+            pairs = cKDTree(centers).query_pairs(search_radius, output_type="ndarray")
+            left, right = pairs[:, 0], pairs[:, 1]
+        else:
+            left, right = all_left, all_right
+
+        delta = centers[right] - centers[left]
+        dist = np.linalg.norm(delta, axis=1)
+        dist[dist == 0] = 1e-6
+        min_gap = radii[left] + radii[right] + OVERLAP_MIN_MARGIN
+        overlapping = dist < min_gap
+        push = ((min_gap - dist) * 0.18)[overlapping]
+        pair_forces = delta[overlapping] / dist[overlapping, None] * push[:, None]
+
+        forces = np.zeros_like(centers)
+        np.subtract.at(forces, left[overlapping], pair_forces)
+        np.add.at(forces, right[overlapping], pair_forces)
+        forces += (original - centers) * 0.01
+        centers += np.clip(forces, -0.25, 0.25)
+    return centers
 
 
 def _local_island_points(embeddings: np.ndarray, n_points: int, shrink: float) -> np.ndarray:
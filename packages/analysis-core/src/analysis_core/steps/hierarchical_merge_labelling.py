@@ -1,6 +1,5 @@
 import json
 import os
-from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 
@@ -9,7 +8,11 @@ import polars as pl
 from pydantic import BaseModel, Field
 from tqdm import tqdm
 
+from analysis_core.core.cancellation import PipelineCancelled, cancellable_map
+from analysis_core.core.frames import read_artifact, write_artifact
+from analysis_core.core.label_cache import LabelCache, build_label_cache_key
 from analysis_core.services.llm import request_to_chat_ai
+from analysis_core.steps.hierarchical_initial_labelling import DESCRIPTION_ERROR, LABEL_ERROR
 
 
 @dataclass
@@ -52,12 +55,13 @@ def hierarchical_merge_labelling(config: dict) -> None:
                 - prompt: LLMへのプロンプト
                 - model: 使用するLLMモデル名
                 - workers: 並列処理のワーカー数
+                - use_cache: ラベルキャッシュを使うかどうか (デフォルト: True)
             - provider: LLMプロバイダー
     """
     dataset = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
     merge_path = f"{output_base_dir}/{dataset}/hierarchical_merge_labels.csv"
-    clusters_df = pl.read_csv(f"{output_base_dir}/{dataset}/hierarchical_initial_labels.csv")
+    clusters_df = read_artifact(f"{output_base_dir}/{dataset}/hierarchical_initial_labels.csv", config)
 
     cluster_id_columns: list[str] = _filter_id_columns(clusters_df.columns)
     # ボトムクラスタのラベル・説明とクラスタid付きの各argumentを入力し、各階層のクラスタラベル・説明を生成し、argumentに付けたdfを作成
@@ -72,7 +76,7 @@ def hierarchical_merge_labelling(config: dict) -> None:
     parent_child_df = _build_parent_child_mapping(merge_result_df, cluster_id_columns)
     melted_df = melted_df.join(parent_child_df, on=["level", "id"], how="left")
     density_df = calculate_cluster_density(melted_df, config)
-    density_df.write_csv(merge_path)
+    write_artifact(density_df, merge_path, config)
 
 
 def _build_parent_child_mapping(df: pl.DataFrame, cluster_id_columns: list[str]):
@@ -179,6 +183,22 @@ def merge_labelling(clusters_df: pl.DataFrame, cluster_id_columns: list[str], co
     Returns:
         マージラベリング結果を含むDataFrame
     """
+    label_cache = LabelCache.from_config(config, "hierarchical_merge_labelling")
+    try:
+        clusters_df = _merge_labelling_levels(clusters_df, cluster_id_columns, config, label_cache)
+    except PipelineCancelled:
+        # キャンセルまでに付けたラベルは次回の実行で再利用する
+        label_cache.save()
+        raise
+    label_cache.save(prune=True)
+    if label_cache.hits:
+        print(f"Merge labelling: reused {label_cache.hits} cached labels")
+    return clusters_df
+
+
+def _merge_labelling_levels(
+    clusters_df: pl.DataFrame, cluster_id_columns: list[str], config, label_cache: LabelCache
+) -> pl.DataFrame:
     for idx in tqdm(range(len(cluster_id_columns) - 1)):
         previous_columns = ClusterColumns.from_id_column(cluster_id_columns[idx])
         current_columns = ClusterColumns.from_id_column(cluster_id_columns[idx + 1])
@@ -189,16 +209,18 @@ def merge_labelling(clusters_df: pl.DataFrame, cluster_id_columns: list[str], co
             current_columns=current_columns,
             previous_columns=previous_columns,
             config=config,
+            cache=label_cache,
         )
 
         current_cluster_ids = sorted(clusters_df[current_columns.id].unique().to_list())
-        with ThreadPoolExecutor(max_workers=config["hierarchical_merge_labelling"]["workers"]) as executor:
-            responses = list(
-                tqdm(
-                    executor.map(process_fn, current_cluster_ids),
-                    total=len(current_cluster_ids),
-                )
+        responses = list(
+            tqdm(
+                cancellable_map(
+                    process_fn, current_cluster_ids, max_workers=config["hierarchical_merge_labelling"]["workers"]
+                ),
+                total=len(current_cluster_ids),
             )
+        )
 
         current_result_df = pl.DataFrame(responses)
         clusters_df = clusters_df.join(current_result_df, on=[current_columns.id], how="left")
@@ -218,6 +240,7 @@ def process_merge_labelling(
     current_columns: ClusterColumns,
     previous_columns: ClusterColumns,
     config,
+    cache: LabelCache | None = None,
 ):
     """個別のクラスタに対してマージラベリングを実行する
 
@@ -227,6 +250,7 @@ def process_merge_labelling(
         current_columns: 現在のレベルのカラム情報
         previous_columns: 前のレベルのカラム情報
         config: 設定情報を含む辞書
+        cache: ラベルキャッシュ（指定時はメンバーと子クラスタが変わらないクラスタのLLM呼び出しを省略）
 
     Returns:
         マージラベリング結果を含む辞書
@@ -259,6 +283,26 @@ def process_merge_labelling(
         raise ValueError(f"クラスタ {target_cluster_id} には前のレベルのクラスタが存在しません。")
 
     current_cluster_data = result_df.filter(pl.col(current_columns.id) == target_cluster_id)
+    cache_key = None
+    if cache is not None and "arg-id" in current_cluster_data.columns:
+        cache_key = build_label_cache_key(
+            step="hierarchical_merge_labelling",
+            prompt=config["hierarchical_merge_labelling"]["prompt"],
+            provider=config["provider"],
+            model=config["hierarchical_merge_labelling"]["model"],
+            members=list(
+                zip(current_cluster_data["arg-id"].to_list(), current_cluster_data["argument"].to_list(), strict=True)
+            ),
+            context="\n".join(sorted(value.to_prompt_text() for value in previous_values)),
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return {
+                current_columns.id: target_cluster_id,
+                current_columns.label: cached["label"],
+                current_columns.description: cached["description"],
+            }
+
     sampling_num = min(
         config["hierarchical_merge_labelling"]["sampling_num"],
         len(current_cluster_data),
@@ -289,24 +333,28 @@ def process_merge_labelling(
         print(f"Merge labelling: input={token_input}, output={token_output}, total={token_total} tokens")
 
         response_json = json.loads(response_text) if isinstance(response_text, str) else response_text
+        if cache is not None and cache_key is not None and "label" in response_json and "description" in response_json:
+            cache.set(cache_key, response_json["label"], response_json["description"])
         return {
             current_columns.id: target_cluster_id,
-            current_columns.label: response_json.get("label", "エラーでラベル名が取得できませんでした"),
-            current_columns.description: response_json.get("description", "エラーで解説が取得できませんでした"),
+            current_columns.label: response_json.get("label", LABEL_ERROR),
+            current_columns.description: response_json.get("description", DESCRIPTION_ERROR),
         }
     except Exception as e:
         print(f"エラーが発生しました: {e}")
         return {
             current_columns.id: target_cluster_id,
-            current_columns.label: "エラーでラベル名が取得できませんでした",
-            current_columns.description: "エラーで解説が取得できませんでした",
+            current_columns.label: LABEL_ERROR,
+            current_columns.description: DESCRIPTION_ERROR,
         }
 
 
 def calculate_cluster_density(melted_df: pl.DataFrame, config: dict):
     """クラスタ内の密度計算"""
     output_base_dir = config.get("_output_base_dir", "outputs")
-    hierarchical_cluster_df = pl.read_csv(f"{output_base_dir}/{config['output_dir']}/hierarchical_clusters.csv")
+    hierarchical_cluster_df = read_artifact(
+        f"{output_base_dir}/{config['output_dir']}/hierarchical_clusters.csv", config
+    )
 
     levels = melted_df["level"].to_list()
     ids = melted_df["id"].to_list()
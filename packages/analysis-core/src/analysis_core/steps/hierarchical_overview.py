@@ -3,13 +3,21 @@
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import polars as pl
 from pydantic import BaseModel, Field
 
+from analysis_core.core.frames import read_artifact
+from analysis_core.core.utils import estimate_tokens
+from analysis_core.prompts import get_default_prompt
 from analysis_core.services.llm import request_to_chat_ai
 
 OVERVIEW_TIMEOUT_SECONDS = 300
+DEFAULT_MAX_INPUT_TOKENS = 8000
+
+_token_usage_lock = threading.Lock()
 
 
 class OverviewResponse(BaseModel):
@@ -17,31 +25,60 @@ class OverviewResponse(BaseModel):
 
 
 def hierarchical_overview(config):
+    """クラスタ全体の要約を生成する
+
+    Args:
+        config: 設定情報を含む辞書
+            - hierarchical_overview: 要約の設定
+                - prompt: LLMへのプロンプト
+                - model: 使用するLLMモデル名
+                - target_level: 要約の入力に使うクラスタの階層 (デフォルト: 1)
+                - map_reduce: 上位クラスタの部分木ごとに要約してから統合するかどうか (デフォルト: False)
+                - map_prompt: map_reduce 時に部分ごとの要約に使うプロンプト (空ならデフォルト)
+                - max_input_tokens: map_reduce 時の1リクエストあたりの入力トークン上限の目安
+                - workers: map_reduce 時の並列処理のワーカー数
+    """
     dataset = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
     path = f"{output_base_dir}/{dataset}/hierarchical_overview.txt"
 
-    hierarchical_label_df = pl.read_csv(f"{output_base_dir}/{dataset}/hierarchical_merge_labels.csv")
+    hierarchical_label_df = read_artifact(f"{output_base_dir}/{dataset}/hierarchical_merge_labels.csv", config)
+
+    overview_config = config["hierarchical_overview"]
+    max_level = hierarchical_label_df["level"].max()
+    target_level = min(int(overview_config.get("target_level") or 1), max_level)
+
+    if overview_config.get("map_reduce", False):
+        summary = _map_reduce_overview(hierarchical_label_df, target_level, config)
+    else:
+        target_records = hierarchical_label_df.filter(pl.col("level") == target_level)
+        summary = _request_overview(_format_clusters(target_records), config)
+
+    with open(path, "w") as file:
+        file.write(summary)
 
-    prompt = config["hierarchical_overview"]["prompt"]
-    model = config["hierarchical_overview"]["model"]
 
-    # TODO: level1で固定にしているが、設定で変えられるようにする
-    target_level = 1
-    target_records = hierarchical_label_df.filter(pl.col("level") == target_level)
-    ids = target_records["id"].to_list()
-    labels = target_records["label"].to_list()
-    descriptions = target_records["description"].to_list()
+def _format_clusters(records: pl.DataFrame) -> str:
+    labels = records["label"].to_list()
+    descriptions = records["description"].to_list()
 
     input_text = ""
-    for i, _ in enumerate(ids):
-        input_text += f"# Cluster {i}/{len(ids)}: {labels[i]}\n\n"
+    for i, label in enumerate(labels):
+        input_text += f"# Cluster {i}/{len(labels)}: {label}\n\n"
         input_text += descriptions[i] + "\n\n"
+    return input_text
 
-    messages = [{"role": "system", "content": prompt}, {"role": "user", "content": input_text}]
+
+def _request_overview(input_text: str, config: dict, prompt: str | None = None) -> str:
+    """要約をLLMにリクエストし、トークン使用量を累積して要約本文を返す (prompt 省略時は最終要約のプロンプト)"""
+    overview_config = config["hierarchical_overview"]
+    messages = [
+        {"role": "system", "content": prompt or overview_config["prompt"]},
+        {"role": "user", "content": input_text},
+    ]
     response_text, token_input, token_output, token_total = request_to_chat_ai(
         messages=messages,
-        model=model,
+        model=overview_config["model"],
         provider=config["provider"],
         local_llm_address=config.get("local_llm_address"),
         user_api_key=config.get("user_api_key") or os.getenv("USER_API_KEY"),
@@ -49,10 +86,11 @@ def hierarchical_overview(config):
         timeout_seconds=OVERVIEW_TIMEOUT_SECONDS,
     )
 
-    # トークン使用量を累積
-    config["total_token_usage"] = config.get("total_token_usage", 0) + token_total
-    config["token_usage_input"] = config.get("token_usage_input", 0) + token_input
-    config["token_usage_output"] = config.get("token_usage_output", 0) + token_output
+    # トークン使用量を累積 (map_reduce 時は複数スレッドから呼ばれる)
+    with _token_usage_lock:
+        config["total_token_usage"] = config.get("total_token_usage", 0) + token_total
+        config["token_usage_input"] = config.get("token_usage_input", 0) + token_input
+        config["token_usage_output"] = config.get("token_usage_output", 0) + token_output
     print(f"Hierarchical overview: input={token_input}, output={token_output}, total={token_total} tokens")
 
     try:
@@ -61,18 +99,94 @@ def hierarchical_overview(config):
             parsed_response = response_text
         else:
             parsed_response = json.loads(response_text)
-
-        with open(path, "w") as file:
-            file.write(parsed_response["summary"])
+        return parsed_response["summary"]
 
     except Exception:
         # thinkタグが出力されるReasoningモデル用に、thinkタグを除去する
-        thinking_removed = re.sub(
+        return re.sub(
             r"<think\b[^>]*>.*?</think>",
             "",
             response_text,
             flags=re.DOTALL,
         )
 
-        with open(path, "w") as file:
-            file.write(thinking_removed)
+
+def _subtree_texts(label_df: pl.DataFrame, target_level: int, max_input_tokens: int) -> list[str]:
+    """level 1 クラスタごとに、その部分木に含まれる target_level のクラスタを入力テキストにまとめる
+
+    部分木が max_input_tokens に収まらない場合は、子クラスタ単位で複数のテキストに分け、
+    それぞれの先頭に上位クラスタの見出しを付ける。
+    """
+    parents = dict(zip(label_df["id"].to_list(), label_df["parent"].cast(pl.Utf8).to_list(), strict=True))
+    levels = dict(zip(label_df["id"].to_list(), label_df["level"].to_list(), strict=True))
+
+    def top_ancestor(cluster_id):
+        while levels.get(cluster_id, 1) > 1 and cluster_id in parents:
+            cluster_id = parents[cluster_id]
+        return cluster_id
+
+    top_records = label_df.filter(pl.col("level") == 1).sort("value", descending=True)
+    target_records = label_df.filter(pl.col("level") == target_level).sort("value", descending=True)
+    members: dict[str, list[dict]] = {cluster_id: [] for cluster_id in top_records["id"].to_list()}
+    for row in target_records.iter_rows(named=True):
+        members.setdefault(top_ancestor(row["id"]), []).append(row)
+
+    texts = []
+    for top in top_records.iter_rows(named=True):
+        header = _truncate_to_budget(f"# {top['label']}\n\n{top['description']}\n\n", max_input_tokens // 2)
+        children = [f"## {row['label']}\n\n{row['description']}\n\n" for row in members[top["id"]] if target_level > 1]
+        if estimate_tokens(header + "".join(children)) <= max_input_tokens:
+            texts.append(header + "".join(children))
+            continue
+        child_budget = max_input_tokens - estimate_tokens(header)
+        children = [_truncate_to_budget(child, child_budget) for child in children]
+        texts.extend(header + piece for piece in _pack_by_budget(children, child_budget) or [""])
+    return texts
+
+
+def _truncate_to_budget(text: str, max_tokens: int) -> str:
+    """1つのクラスタの説明などそれ以上分けられないテキストを、トークン数の目安に収まるように切り詰める"""
+    while text and estimate_tokens(text) > max_tokens:
+        text = text[: max(0, len(text) * max_tokens // estimate_tokens(text))]
+    return text
+
+
+def _pack_by_budget(texts: list[str], max_input_tokens: int) -> list[str]:
+    """テキストを順序を保ったまま、1チャンクあたりのトークン数の目安を超えないように詰める"""
+    chunks: list[str] = []
+    current = ""
+    for text in texts:
+        if current and estimate_tokens(current + text) > max_input_tokens:
+            chunks.append(current)
+            current = ""
+        current += text
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _map_reduce_overview(label_df: pl.DataFrame, target_level: int, config: dict) -> str:
+    """部分木ごとの要約を並列に作成し、入力が1リクエストに収まるまで繰り返し統合する"""
+    overview_config = config["hierarchical_overview"]
+    max_input_tokens = int(overview_config.get("max_input_tokens") or DEFAULT_MAX_INPUT_TOKENS)
+    workers = max(1, int(overview_config.get("workers") or 1))
+    # 部分ごとの要約はレポート全体の要約ではないため、最終要約とは別のプロンプトを使う
+    map_prompt = overview_config.get("map_prompt") or get_default_prompt("hierarchical_overview_map")
+
+    texts = _subtree_texts(label_df, target_level, max_input_tokens)
+    chunks = _pack_by_budget(texts, max_input_tokens)
+    while len(chunks) > 1:
+        print(f"Hierarchical overview: summarising {len(chunks)} chunks")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            partial_summaries = list(executor.map(lambda chunk: _request_overview(chunk, config, map_prompt), chunks))
+        texts = [
+            f"# Partial summary {i + 1}/{len(partial_summaries)}\n\n{summary}\n\n"
+            for i, summary in enumerate(partial_summaries)
+        ]
+        next_chunks = _pack_by_budget(texts, max_input_tokens)
+        if len(next_chunks) >= len(chunks):
+            # 要約が縮まらない場合は、各要約を上限の半分に切り詰めて2つずつ統合し、上限を超えずに収束させる
+            texts = [_truncate_to_budget(text, max_input_tokens // 2) for text in texts]
+            next_chunks = ["".join(texts[i : i + 2]) for i in range(0, len(texts), 2)]
+        chunks = next_chunks
+    return _request_overview(chunks[0] if chunks else "", config)
@@ -24,14 +24,25 @@ an already-generated ``hierarchical_result.json``).
 from __future__ import annotations
 
 import argparse
+import base64
+import gzip
+import heapq
 import html
 import json
 from collections import defaultdict
 from pathlib import Path
 from typing import Any
 
+from analysis_core.core.result_stream import read_result
+
 PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
 
+# Above this many arguments the scatter is drawn from density tiles plus a
+# stratified sample, and per-cluster argument lists are parsed on demand.
+DEFAULT_MAX_POINTS = 10_000
+# Number of density tiles along each axis of the scatter's bounding box.
+DENSITY_GRID_SIZE = 64
+
 # 40-color palette copied verbatim from
 # apps/public-viewer/components/charts/ScatterChart.tsx (softColors).
 SOFT_COLORS: list[str] = [
@@ -58,6 +69,10 @@ def hierarchical_visualization(config: dict[str, Any]) -> None:
             When set, scatter points become clickable (open in new tab) and a 🔗
             hint appears on hover, matching the public-viewer's
             ``enable_source_link`` behaviour.
+        report_html_max_points: number of arguments above which the report switches
+            to decimated rendering (see ``build_html``). Defaults to ``DEFAULT_MAX_POINTS``.
+        report_html_compress: embed the data gzip-compressed and base64-encoded
+            (see ``build_html``). Defaults to ``False``.
     """
     output_dir = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
@@ -70,11 +85,14 @@ def hierarchical_visualization(config: dict[str, Any]) -> None:
             "Run the hierarchical_aggregation step first."
         )
 
-    data = json.loads(result_path.read_text(encoding="utf-8"))
+    # propertyMap は表示に使わないので、ストリーミング形式の結果では読み飛ばす
+    data = read_result(result_path, include_property_map=False)
     html_str = build_html(
         data,
         title=config.get("report_html_title"),
         url_pattern=config.get("report_url_pattern"),
+        max_points=config.get("report_html_max_points") or DEFAULT_MAX_POINTS,
+        compress=bool(config.get("report_html_compress", False)),
     )
     html_path.write_text(html_str, encoding="utf-8")
     print(f"  report.html: {html_path} ({html_path.stat().st_size / 1024:.1f} KB)")
@@ -84,6 +102,8 @@ def build_html(
     data: dict[str, Any],
     title: str | None = None,
     url_pattern: str | None = None,
+    max_points: int | None = DEFAULT_MAX_POINTS,
+    compress: bool = False,
 ) -> str:
     """Render a ``hierarchical_result.json`` payload into a single HTML string.
 
@@ -93,6 +113,15 @@ def build_html(
         url_pattern: Python ``str.format``-style template with ``{comment_id}``.
             If provided, each scatter point becomes a clickable link to that URL
             (target=_blank) and a 🔗 hint is added to the hover label.
+        max_points: when the report has more arguments than this, the scatter is
+            rendered from per-level density tiles plus a sample of at most
+            ``max_points`` arguments stratified by cluster, and each leaf cluster's
+            full argument list is embedded as a separate JSON block that is only
+            parsed (and overlaid on the scatter) when its ``<details>`` is opened.
+            ``None`` always embeds every argument.
+        compress: embed the JSON blocks gzip-compressed and base64-encoded
+            (``data-encoding="gzip+base64"``). The viewer inflates them with the
+            browser's ``DecompressionStream``; the raw and embedded sizes are printed.
 
     Returns:
         Full HTML document as a single string. Embeds the entire ``data`` payload
@@ -120,8 +149,23 @@ def build_html(
         ]
         args = data["arguments"]
 
-    tree_html = _render_tree(data)
-    embedded = _safe_inline_json(data)
+    decimated = max_points is not None and n_args > max_points
+    detail_ids: dict[str, int] | None = None
+    details: dict[str, list[dict[str, Any]]] = {}
+    if decimated:
+        data, details = _decimate(data, max_points)
+        detail_ids = {cid: i for i, cid in enumerate(details)}
+
+    tree_html = _render_tree(data, detail_ids=detail_ids, lazy=compress)
+    scripts = [_inline_script("report-data", data, compress)]
+    scripts.extend(_inline_script(f"cluster-args-{i}", points, compress) for i, points in enumerate(details.values()))
+    if compress:
+        raw_size = sum(raw for _, raw, _ in scripts)
+        embedded_size = sum(embedded for _, _, embedded in scripts)
+        print(
+            f"  embedded payload: {raw_size / 1024:.1f} KB -> {embedded_size / 1024:.1f} KB "
+            f"(gzip+base64, {raw_size / max(embedded_size, 1):.1f}x)"
+        )
     level_options = "".join(
         f'<option value="{lvl}"{" selected" if lvl == default_level else ""}>'
         f"level {lvl} ({_count_at(data, lvl)} clusters)</option>"
@@ -137,7 +181,9 @@ def build_html(
         plotly_cdn=PLOTLY_CDN,
         level_options=level_options,
         tree=tree_html,
-        embedded_json=embedded,
+        report_data=scripts[0][0],
+        detail_scripts="\n".join(tag for tag, _, _ in scripts[1:]),
+        mst_checked="" if decimated else " checked",
         palette_js=json.dumps(SOFT_COLORS),
         enable_source_link_js="true" if url_pattern else "false",
     )
@@ -148,6 +194,140 @@ def _safe_inline_json(data: Any) -> str:
     return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
 
 
+def _inline_script(element_id: str, payload: Any, compress: bool) -> tuple[str, int, int]:
+    """Build the ``<script>`` block carrying ``payload``.
+
+    Returns the tag together with the raw JSON size and the embedded size in bytes.
+    """
+    raw = _safe_inline_json(payload).encode("utf-8")
+    if not compress:
+        return f'<script id="{element_id}" type="application/json">{raw.decode("utf-8")}</script>', len(raw), len(raw)
+    # mtime=0 keeps the output byte-identical across runs
+    encoded = base64.b64encode(gzip.compress(raw, compresslevel=9, mtime=0)).decode("ascii")
+    tag = f'<script id="{element_id}" type="application/octet-stream" data-encoding="gzip+base64">{encoded}</script>'
+    return tag, len(raw), len(encoded)
+
+
+def _decimate(data: dict[str, Any], max_points: int) -> tuple[dict[str, Any], dict[str, list[dict[str, Any]]]]:
+    """Reduce a large payload to what the scatter needs up front.
+
+    Returns a shallow copy of ``data`` whose ``arguments`` are a sample stratified
+    by leaf cluster (at most ``max_points``, but every cluster keeps at least one
+    point), whose layout catalog
+    only holds the default layout for those arguments, and which carries a
+    ``decimation`` block with per-level density tiles. The second value maps each
+    leaf cluster id to its full, compact argument list for on-demand rendering.
+    """
+    args = data["arguments"]
+    layout_id = data.get("default_layout_id") or "embedding_umap"
+    layout = (data.get("layouts") or {}).get(layout_id) or {}
+    layout_points = layout.get("points") or {}
+
+    xs: list[float] = []
+    ys: list[float] = []
+    for a in args:
+        point = layout_points.get(a["arg_id"])
+        xs.append(float(point["x"] if point else a["x"]))
+        ys.append(float(point["y"] if point else a["y"]))
+
+    members: dict[str, list[int]] = defaultdict(list)
+    for i, a in enumerate(args):
+        members[a["cluster_ids"][-1]].append(i)
+
+    quotas = _sample_quotas({cid: len(indices) for cid, indices in members.items()}, max_points)
+    sampled: list[int] = []
+    details: dict[str, list[dict[str, Any]]] = {}
+    for cid, indices in members.items():
+        quota = quotas[cid]
+        step = len(indices) / quota
+        sampled.extend(indices[int(k * step)] for k in range(quota))
+        details[cid] = [
+            {
+                "arg_id": args[i]["arg_id"],
+                "argument": args[i].get("argument", ""),
+                "comment_id": args[i].get("comment_id"),
+                "url": args[i].get("url"),
+                "x": xs[i],
+                "y": ys[i],
+            }
+            for i in indices
+        ]
+    sampled.sort()
+
+    decimated = {key: value for key, value in data.items() if key != "propertyMap"}
+    decimated["arguments"] = [args[i] for i in sampled]
+    if layout_points:
+        decimated["layouts"] = {
+            layout_id: {
+                **layout,
+                # Arguments missing from the layout fall back to their own x/y, as above
+                "points": {
+                    args[i]["arg_id"]: layout_points[args[i]["arg_id"]]
+                    for i in sampled
+                    if args[i]["arg_id"] in layout_points
+                },
+            }
+        }
+    decimated["decimation"] = {
+        "total": len(args),
+        "sampled": len(sampled),
+        "density": _density_tiles(data["clusters"], args, xs, ys),
+    }
+    return decimated, details
+
+
+def _sample_quotas(sizes: dict[str, int], max_points: int) -> dict[str, int]:
+    """Split ``max_points`` across clusters in proportion to their size.
+
+    Every cluster gets at least one point. When that floor pushes the total over
+    ``max_points``, the largest quotas are trimmed one point at a time.
+    """
+    ratio = max_points / sum(sizes.values())
+    quotas = {cid: max(1, round(size * ratio)) for cid, size in sizes.items()}
+    excess = sum(quotas.values()) - max_points
+    largest = [(-quota, cid) for cid, quota in quotas.items()]
+    heapq.heapify(largest)
+    while excess > 0 and -largest[0][0] > 1:
+        quota, cid = heapq.heappop(largest)
+        quotas[cid] = -quota - 1
+        heapq.heappush(largest, (quota + 1, cid))
+        excess -= 1
+    return quotas
+
+
+def _density_tiles(
+    clusters: list[dict[str, Any]],
+    args: list[dict[str, Any]],
+    xs: list[float],
+    ys: list[float],
+) -> dict[str, list[list[Any]]]:
+    """Count arguments per (grid tile, cluster) for every level.
+
+    Returns ``{level: [[tile_center_x, tile_center_y, count, cluster_id], ...]}``.
+    """
+    level_of = {c["id"]: c["level"] for c in clusters}
+    x_min, y_min = min(xs), min(ys)
+    width = (max(xs) - x_min) / DENSITY_GRID_SIZE
+    height = (max(ys) - y_min) / DENSITY_GRID_SIZE
+    last = DENSITY_GRID_SIZE - 1
+
+    counts: dict[tuple[int, int, int, str], int] = defaultdict(int)
+    for a, x, y in zip(args, xs, ys, strict=True):
+        gx = min(int((x - x_min) / width), last) if width else 0
+        gy = min(int((y - y_min) / height), last) if height else 0
+        for cid in a.get("cluster_ids", []):
+            level = level_of.get(cid, 0)
+            if level > 0:
+                counts[(level, gx, gy, cid)] += 1
+
+    tiles: dict[str, list[list[Any]]] = defaultdict(list)
+    for (level, gx, gy, cid), count in sorted(counts.items()):
+        tiles[str(level)].append(
+            [round(x_min + (gx + 0.5) * width, 6), round(y_min + (gy + 0.5) * height, 6), count, cid]
+        )
+    return dict(tiles)
+
+
 def _count_at(data: dict[str, Any], level: int) -> int:
     return sum(1 for c in data["clusters"] if c["level"] == level)
 
@@ -159,11 +339,14 @@ def _paragraph(text: str) -> str:
     return "\n".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
 
 
-def _render_tree(data: dict[str, Any]) -> str:
+def _render_tree(data: dict[str, Any], detail_ids: dict[str, int] | None = None, lazy: bool = False) -> str:
     """Render the cluster hierarchy as nested ``<details>`` blocks.
 
     Level 1 clusters are rendered as flat ``ClusterOverview``-style sections;
-    deeper levels live inside collapsible ``<details>``.
+    deeper levels live inside collapsible ``<details>``. With ``lazy`` (compressed
+    reports) leaf clusters get an empty list that the viewer fills from the
+    embedded data when the cluster is opened. When ``detail_ids`` is given
+    (decimated reports) that list is filled from the ``cluster-args-{n}`` block.
     """
     children_of: dict[str, list[dict[str, Any]]] = defaultdict(list)
     for c in data["clusters"]:
@@ -196,6 +379,12 @@ def _render_tree(data: dict[str, Any]) -> str:
             grand = render_children(cid)
             if grand:
                 inner.append(grand)
+            elif detail_ids is not None:
+                if cid in detail_ids:
+                    inner.append(_lazy_args_list(cid, detail_ids[cid]))
+            elif lazy:
+                if cid in args_in:
+                    inner.append(_lazy_args_list(cid))
             else:
                 members = args_in.get(cid, [])
                 if members:
@@ -229,7 +418,14 @@ def _render_tree(data: dict[str, Any]) -> str:
         ]
         if cluster.get("takeaway"):
             parts.append(f'<p class="cluster-takeaway">{html.escape(cluster["takeaway"])}</p>')
-        parts.append(render_children(cid))
+        children = render_children(cid)
+        if not children and detail_ids is not None and cid in detail_ids:
+            children = (
+                '<div class="sub-clusters">\n<details class="sub-cluster">'
+                '<summary><span class="sub-label">Arguments</span></summary>'
+                f"{_lazy_args_list(cid, detail_ids[cid])}</details>\n</div>"
+            )
+        parts.append(children)
         parts.append("</section>")
         return "\n".join(parts)
 
@@ -240,6 +436,11 @@ def _render_tree(data: dict[str, Any]) -> str:
     return "\n".join(render_level1(c) for c in level1)
 
 
+def _lazy_args_list(cluster_id: str, detail_id: int | None = None) -> str:
+    detail = f' data-detail="{detail_id}"' if detail_id is not None else ""
+    return f'<ul class="args"{detail} data-cluster="{html.escape(cluster_id)}"></ul>'
+
+
 _TEMPLATE = """<!DOCTYPE html>
 <html lang="ja">
 <head>
@@ -362,10 +563,10 @@ _TEMPLATE = """<!DOCTYPE html>
       <input type="checkbox" id="show-labels" checked> Show cluster labels
     </label>
     <label>
-      <input type="checkbox" id="show-mst" checked> Show MST skeleton
+      <input type="checkbox" id="show-mst"{mst_checked}> Show MST skeleton
     </label>
     <label>
-      <input type="checkbox" id="use-mst-layout" checked> Use MST layout
+      <input type="checkbox" id="use-mst-layout"{mst_checked}> Use MST layout
     </label>
     <span id="scatter-meta"></span>
   </div>
@@ -383,7 +584,8 @@ _TEMPLATE = """<!DOCTYPE html>
 
 </div>
 
-<script id="report-data" type="application/json">{embedded_json}</script>
+{report_data}
+{detail_scripts}
 <script>
 (function() {{
   const SOFT_COLORS = {palette_js};
@@ -816,9 +1018,17 @@ _TEMPLATE = """<!DOCTYPE html>
     return {{ x: xs, y: ys }};
   }}
 
-  function init() {{
+  // Blocks written with compress=True carry base64-encoded gzip instead of raw JSON.
+  async function readJson(el) {{
+    if (el.dataset.encoding !== "gzip+base64") return JSON.parse(el.textContent);
+    const bytes = Uint8Array.from(atob(el.textContent.trim()), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"));
+    return JSON.parse(await new Response(stream).text());
+  }}
+
+  async function init() {{
     if (typeof Plotly === "undefined") {{ setTimeout(init, 50); return; }}
-    const data = JSON.parse(document.getElementById("report-data").textContent);
+    const data = await readJson(document.getElementById("report-data"));
     const byId = Object.fromEntries(data.clusters.map(c => [c.id, c]));
     const layoutCatalog = data.layouts || {{}};
     const selectedLayoutId = data.default_layout_id || "embedding_umap";
@@ -833,6 +1043,50 @@ _TEMPLATE = """<!DOCTYPE html>
 
     const ANNOTATION_WIDTH = 228, ANNOTATION_FONT = 14;
 
+    // Decimated reports embed a sample of the arguments plus density tiles;
+    // the full argument list of a leaf cluster is parsed when it is opened.
+    // Compressed reports also fill the cluster lists from the data on demand.
+    const DECIMATION = data.decimation || null;
+    const detailPoints = {{}};
+
+    function ancestorAt(cid, level) {{
+      let c = byId[cid];
+      while (c && c.level > level) c = byId[c.parent];
+      return c && c.level === level ? c.id : null;
+    }}
+
+    async function renderDetail(ul) {{
+      const pts = ul.dataset.detail !== undefined
+        ? await readJson(document.getElementById("cluster-args-" + ul.dataset.detail))
+        : data.arguments.filter(a => a.cluster_ids.includes(ul.dataset.cluster));
+      if (!ul.dataset.loaded) {{
+        ul.innerHTML = pts.map(a => {{
+          const link = a.url
+            ? ' <a href="' + escapeHtml(a.url) + '" target="_blank" rel="noopener" class="src-link">↗</a>'
+            : "";
+          return '<li><span class="comment-id">#' + escapeHtml(a.comment_id ?? "") + "</span> " +
+            escapeHtml(a.argument) + link + "</li>";
+        }}).join("");
+        ul.dataset.loaded = "1";
+      }}
+      return pts;
+    }}
+
+    document.querySelectorAll("ul.args[data-cluster]").forEach(ul => {{
+      ul.closest("details").addEventListener("toggle", async ev => {{
+        if (!ev.target.open) {{
+          delete detailPoints[ul.dataset.cluster];
+          if (DECIMATION) redraw();
+          return;
+        }}
+        const pts = await renderDetail(ul);
+        if (DECIMATION) {{
+          detailPoints[ul.dataset.cluster] = pts;
+          redraw();
+        }}
+      }});
+    }});
+
     function build(level) {{
       const clusters = data.clusters.filter(c => c.level === level);
       const colorOf = {{}};
@@ -998,13 +1252,52 @@ _TEMPLATE = """<!DOCTYPE html>
         }});
       }}
 
-      const traces = mstToggle.checked
-        ? [
-            ...clusterEdgeTraces,
-            ...(bridgeTrace ? [bridgeTrace] : []),
-            ...pointTraces,
-          ]
-        : pointTraces;
+      const densityTraces = [];
+      const detailTraces = [];
+      if (DECIMATION && !mstLayoutToggle.checked) {{
+        const tiles = DECIMATION.density[String(level)] || [];
+        const maxCount = tiles.reduce((m, t) => Math.max(m, t[2]), 1);
+        densityTraces.push({{
+          type: "scattergl",
+          mode: "markers",
+          x: tiles.map(t => t[0]),
+          y: tiles.map(t => t[1]),
+          text: tiles.map(t => "<b>" + escapeHtml(byId[t[3]] ? byId[t[3]].label : t[3]) + "</b><br>" + t[2] + " args"),
+          hovertemplate: "%{{text}}<extra></extra>",
+          marker: {{
+            symbol: "square",
+            size: tiles.map(t => 6 + 14 * Math.sqrt(t[2] / maxCount)),
+            color: tiles.map(t => alpha(colorOf[t[3]] || "#999999", 0.25)),
+          }},
+          showlegend: false,
+        }});
+        Object.entries(detailPoints).forEach(([leafId, pts]) => {{
+          const cid = ancestorAt(leafId, level);
+          detailTraces.push({{
+            type: "scattergl",
+            mode: "markers",
+            x: pts.map(a => a.x),
+            y: pts.map(a => a.y),
+            text: pts.map(a => escapeHtml(a.argument).replace(/(.{{30}})/g, "$1<br>")),
+            customdata: pts.map(a => ({{ url: a.url || null, comment_id: a.comment_id }})),
+            hovertemplate: "%{{text}}<extra></extra>",
+            marker: {{ size: 6, color: cid ? colorOf[cid] : "#555555", line: {{ width: 1, color: "#ffffff" }} }},
+            showlegend: false,
+          }});
+        }});
+      }}
+
+      const traces = [
+        ...densityTraces,
+        ...(mstToggle.checked
+          ? [
+              ...clusterEdgeTraces,
+              ...(bridgeTrace ? [bridgeTrace] : []),
+              ...pointTraces,
+            ]
+          : pointTraces),
+        ...detailTraces,
+      ];
 
       const annotations = labelToggle.checked
         ? clusters.map(c => {{
@@ -1056,7 +1349,10 @@ _TEMPLATE = """<!DOCTYPE html>
         }});
         scatterEl._clickBound = true;
       }}
-      meta.textContent = clusters.length + " clusters / " + data.arguments.length + " args" +
+      meta.textContent = clusters.length + " clusters / " +
+        (DECIMATION
+          ? DECIMATION.sampled + " of " + DECIMATION.total + " args sampled (density tiles for the rest)"
+          : data.arguments.length + " args") +
         (mstLayoutToggle.checked ? " / layout=MST (" + selectedLayoutId + " base)" : " / layout=" + selectedLayoutId) +
         (mstToggle.checked ? " / " + mstEdgeCount + " intra-cluster MST edges / " + bridgeEdgeCount + " bridge edges" : "") +
         (ENABLE_SOURCE_LINK ? " (click a point to open source)" : "");
@@ -1097,10 +1393,24 @@ def _cli_main(argv: list[str] | None = None) -> int:
         help='Python str.format template with {comment_id} (e.g. "https://example.com/r/{comment_id}"). '
         "When set, scatter points become clickable and a 🔗 hint appears on hover.",
     )
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=DEFAULT_MAX_POINTS,
+        help="argument count above which the scatter is decimated (default: %(default)s)",
+    )
+    parser.add_argument("--compress", action="store_true", help="embed the data gzip-compressed and base64-encoded")
     args = parser.parse_args(argv)
 
-    data = json.loads(args.input.read_text(encoding="utf-8"))
-    args.output.write_text(build_html(data, title=args.title, url_pattern=args.url_pattern), encoding="utf-8")
+    data = read_result(args.input, include_property_map=False)
+    html_str = build_html(
+        data,
+        title=args.title,
+        url_pattern=args.url_pattern,
+        max_points=args.max_points,
+        compress=args.compress,
+    )
+    args.output.write_text(html_str, encoding="utf-8")
     print(f"wrote {args.output} ({args.output.stat().st_size / 1024:.1f} KB)")
     return 0
 
@@ -5,20 +5,26 @@ from __future__ import annotations
 import json
 import os
 import pickle
+import threading
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
 import numpy as np
 import polars as pl
 from pydantic import BaseModel, Field
 
-from analysis_core.services.llm import request_to_chat_ai
+from analysis_core.core.frames import read_artifact, write_artifact
+from analysis_core.services.llm import request_to_chat_ai, request_to_embed
 from analysis_core.steps.hierarchical_clustering import (
     _load_clustering_dependencies,
     calculate_recommended_cluster_nums,
 )
 
 LLM_GROUPING_TIMEOUT_SECONDS = 300
+DEFAULT_EMBEDDING_MARGIN = 0.05
+
+_token_usage_lock = threading.Lock()
 
 
 class ProposedGroup(BaseModel):
@@ -61,7 +67,7 @@ def llm_grouping(config: dict) -> None:
     """Generate `hierarchical_clusters.csv` and `hierarchical_merge_labels.csv` via LLM grouping."""
     dataset = config["output_dir"]
     output_base_dir = config.get("_output_base_dir", "outputs")
-    args_df = pl.read_csv(f"{output_base_dir}/{dataset}/args.csv", columns=["arg-id", "argument"])
+    args_df = read_artifact(f"{output_base_dir}/{dataset}/args.csv", config, columns=["arg-id", "argument"])
     arg_ids = args_df["arg-id"].to_list()
     arguments = args_df["argument"].to_list()
 
@@ -78,18 +84,32 @@ def llm_grouping(config: dict) -> None:
         local_llm_address=config.get("local_llm_address"),
         config=config,
     )
-    assignments = _assign_groups(
+    embeddings_array = _load_embeddings(output_base_dir, dataset, arg_ids)
+    workers = max(1, int(llm_config.get("workers") or 1))
+    assignments = _assign_arguments(
         arg_ids=arg_ids,
         arguments=arguments,
+        embeddings=embeddings_array,
         groups=groups,
-        batch_size=llm_config.get("assignment_batch_size", 25),
-        prompt=llm_config["assignment_prompt"],
-        model=llm_config["model"],
-        provider=config["provider"],
-        local_llm_address=config.get("local_llm_address"),
         config=config,
+        workers=workers,
     )
-    points = _project_embeddings_to_xy(output_base_dir, dataset, arg_ids)
+
+    sub_groups: dict[str, list[GroupDefinition]] = {}
+    sub_assignments: dict[str, str] = {}
+    sub_group_count = int(llm_config.get("sub_group_count") or 0)
+    if sub_group_count > 0:
+        sub_groups, sub_assignments = _discover_sub_groups(
+            arg_ids=arg_ids,
+            arguments=arguments,
+            embeddings=embeddings_array,
+            groups=groups,
+            assignments=assignments,
+            sub_group_count=sub_group_count,
+            config=config,
+            workers=workers,
+        )
+    points = _project_embeddings_to_xy(output_base_dir, dataset, arg_ids, embeddings_array=embeddings_array)
 
     clusters_path = f"{output_base_dir}/{dataset}/hierarchical_clusters.csv"
     merge_labels_path = f"{output_base_dir}/{dataset}/hierarchical_merge_labels.csv"
@@ -105,9 +125,11 @@ def llm_grouping(config: dict) -> None:
                 "cluster-level-1-id": assignments[arg_id],
             }
         )
+        if sub_assignments:
+            cluster_rows[-1]["cluster-level-2-id"] = sub_assignments[arg_id]
 
-    pl.DataFrame(cluster_rows).write_csv(clusters_path)
-    _write_merge_labels(merge_labels_path, groups, assignments)
+    write_artifact(pl.DataFrame(cluster_rows), clusters_path, config)
+    _write_merge_labels(merge_labels_path, config, groups, assignments, sub_groups, sub_assignments)
 
 
 def _resolve_group_count(config: dict, argument_count: int) -> int:
@@ -134,12 +156,15 @@ def _discover_groups(
     provider: str,
     local_llm_address: str | None,
     config: dict,
+    parent: GroupDefinition | None = None,
 ) -> list[GroupDefinition]:
     sample_n = min(len(arguments), max(1, sample_size))
     sample_df = pl.DataFrame({"argument": arguments}).sample(n=sample_n, shuffle=True, seed=0)
     sample_lines = "\n".join(f"- {argument}" for argument in sample_df["argument"].to_list())
+    parent_text = f"上位グループ:\n{parent.label}\n{parent.description}\n\n" if parent else ""
     user_message = (
         f"問い:\n{question}\n\n"
+        f"{parent_text}"
         f"以下の意見群を {group_count} 個前後のグループに整理してください。\n"
         "出力する group_id は g1, g2, ... の形式にしてください。\n\n"
         f"{sample_lines}"
@@ -185,18 +210,21 @@ def _assign_groups(
     provider: str,
     local_llm_address: str | None,
     config: dict,
+    workers: int = 1,
 ) -> dict[str, str]:
-    assignments: dict[str, str] = {}
+    """Assign every argument to a discovered group.
+
+    Batches are sent concurrently (bounded by ``workers``). Arguments that a batch response omits or assigns to an
+    unknown group are re-queued as single-argument requests as soon as that batch returns; if the retry still fails
+    they fall back to the first group. The result is ordered like ``arg_ids`` regardless of completion order.
+    """
     allowed_group_ids = {group.group_id for group in groups}
+    fallback_group_id = groups[0].group_id
     group_text = "\n".join(f"- {group.group_id}: {group.label}\n  {group.description}" for group in groups)
+    argument_by_id = dict(zip(arg_ids, arguments, strict=True))
 
-    safe_batch_size = max(1, batch_size)
-    for start in range(0, len(arg_ids), safe_batch_size):
-        batch_ids = arg_ids[start : start + safe_batch_size]
-        batch_arguments = arguments[start : start + safe_batch_size]
-        batch_lines = "\n".join(
-            f"- {arg_id}: {argument}" for arg_id, argument in zip(batch_ids, batch_arguments, strict=True)
-        )
+    def request_batch(batch_ids: list[str]) -> tuple[dict[str, str], int, int, int]:
+        batch_lines = "\n".join(f"- {arg_id}: {argument_by_id[arg_id]}" for arg_id in batch_ids)
         user_message = (
             "既知のグループ定義:\n"
             f"{group_text}\n\n"
@@ -216,26 +244,171 @@ def _assign_groups(
             user_api_key=os.getenv("USER_API_KEY"),
             timeout_seconds=LLM_GROUPING_TIMEOUT_SECONDS,
         )
-        _accumulate_token_usage(config, token_input, token_output, token_total)
         response_json = json.loads(response_text) if isinstance(response_text, str) else response_text
         batch_assignments = {
             assignment.get("arg_id"): assignment.get("group_id")
             for assignment in response_json.get("assignments", [])
             if assignment.get("arg_id")
         }
+        return batch_assignments, token_input, token_output, token_total
 
-        fallback_group_id = groups[0].group_id
-        for arg_id in batch_ids:
-            group_id = batch_assignments.get(arg_id, fallback_group_id)
-            if group_id not in allowed_group_ids:
-                group_id = fallback_group_id
-            assignments[arg_id] = group_id
+    safe_batch_size = max(1, batch_size)
+    resolved: dict[str, str] = {}
+    retried = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending: dict[Future, tuple[list[str], bool]] = {}
+        for start in range(0, len(arg_ids), safe_batch_size):
+            batch_ids = arg_ids[start : start + safe_batch_size]
+            pending[executor.submit(request_batch, batch_ids)] = (batch_ids, False)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch_ids, is_retry = pending.pop(future)
+                try:
+                    batch_assignments, token_input, token_output, token_total = future.result()
+                except Exception:
+                    for other in pending:
+                        other.cancel()
+                    raise
+                _accumulate_token_usage(config, token_input, token_output, token_total)
+
+                for arg_id in batch_ids:
+                    group_id = batch_assignments.get(arg_id)
+                    if group_id in allowed_group_ids:
+                        resolved[arg_id] = group_id
+                    elif is_retry or len(batch_ids) == 1:
+                        resolved[arg_id] = fallback_group_id
+                    else:
+                        retried += 1
+                        pending[executor.submit(request_batch, [arg_id])] = ([arg_id], True)
+
+    if retried:
+        print(f"llm_grouping: re-queued {retried} arguments missing from batch assignments")
+    return {arg_id: resolved[arg_id] for arg_id in arg_ids}
+
+
+def _assign_arguments(
+    *,
+    arg_ids: list[str],
+    arguments: list[str],
+    embeddings: np.ndarray,
+    groups: list[GroupDefinition],
+    config: dict,
+    workers: int,
+) -> dict[str, str]:
+    """Assign arguments to ``groups`` according to ``assignment_mode`` (LLM only, or embedding first then LLM)."""
+    llm_config = config["llm_grouping"]
+    assignments: dict[str, str] = {}
+    llm_arg_ids = arg_ids
+    if llm_config.get("assignment_mode", "llm") == "hybrid":
+        assignments = _pre_assign_by_embedding(
+            arg_ids=arg_ids,
+            embeddings=embeddings,
+            group_embeddings=_embed_groups(groups, config),
+            groups=groups,
+            margin=float(llm_config.get("embedding_margin", DEFAULT_EMBEDDING_MARGIN)),
+        )
+        llm_arg_ids = [arg_id for arg_id in arg_ids if arg_id not in assignments]
+        print(
+            f"llm_grouping: assigned {len(assignments)} arguments by embedding similarity, "
+            f"{len(llm_arg_ids)} uncertain arguments sent to LLM"
+        )
 
-    return assignments
+    if llm_arg_ids:
+        argument_by_id = dict(zip(arg_ids, arguments, strict=True))
+        assignments.update(
+            _assign_groups(
+                arg_ids=llm_arg_ids,
+                arguments=[argument_by_id[arg_id] for arg_id in llm_arg_ids],
+                groups=groups,
+                batch_size=llm_config.get("assignment_batch_size", 25),
+                prompt=llm_config["assignment_prompt"],
+                model=llm_config["model"],
+                provider=config["provider"],
+                local_llm_address=config.get("local_llm_address"),
+                config=config,
+                workers=workers,
+            )
+        )
+    return {arg_id: assignments[arg_id] for arg_id in arg_ids}
 
 
-def _project_embeddings_to_xy(output_base_dir: str, dataset: str, arg_ids: list[str]) -> np.ndarray:
-    UMAP, _, _ = _load_clustering_dependencies()
+def _discover_sub_groups(
+    *,
+    arg_ids: list[str],
+    arguments: list[str],
+    embeddings: np.ndarray,
+    groups: list[GroupDefinition],
+    assignments: dict[str, str],
+    sub_group_count: int,
+    config: dict,
+    workers: int,
+) -> tuple[dict[str, list[GroupDefinition]], dict[str, str]]:
+    """Discover and assign level-2 groups inside every top-level group.
+
+    Top-level groups are processed concurrently (bounded by ``workers``); the remaining worker budget is shared by
+    the assignment batches of each group. Sub-group ids are prefixed with the parent id (``g1-1``) so that they are
+    unique across the whole report. Groups too small to split get a single child that inherits the parent label.
+    """
+    llm_config = config["llm_grouping"]
+    members_by_group: dict[str, list[int]] = {group.group_id: [] for group in groups}
+    for index, arg_id in enumerate(arg_ids):
+        members_by_group[assignments[arg_id]].append(index)
+    inner_workers = max(1, workers // max(1, len(groups)))
+
+    def split_group(group: GroupDefinition) -> tuple[list[GroupDefinition], dict[str, str]]:
+        indices = members_by_group[group.group_id]
+        member_ids = [arg_ids[index] for index in indices]
+        count = min(sub_group_count, len(indices))
+        if count <= 1:
+            child = GroupDefinition(group_id=f"{group.group_id}-1", label=group.label, description=group.description)
+            return [child], {arg_id: child.group_id for arg_id in member_ids}
+
+        member_arguments = [arguments[index] for index in indices]
+        local_groups = _discover_groups(
+            arguments=member_arguments,
+            question=config.get("question", ""),
+            group_count=count,
+            sample_size=llm_config.get("discovery_sample_size", 80),
+            prompt=llm_config["discovery_prompt"],
+            model=llm_config["model"],
+            provider=config["provider"],
+            local_llm_address=config.get("local_llm_address"),
+            config=config,
+            parent=group,
+        )
+        local_assignments = _assign_arguments(
+            arg_ids=member_ids,
+            arguments=member_arguments,
+            embeddings=embeddings[indices],
+            groups=local_groups,
+            config=config,
+            workers=inner_workers,
+        )
+        global_ids = {local.group_id: f"{group.group_id}-{index}" for index, local in enumerate(local_groups, start=1)}
+        children = [
+            GroupDefinition(group_id=global_ids[local.group_id], label=local.label, description=local.description)
+            for local in local_groups
+        ]
+        return children, {arg_id: global_ids[local_id] for arg_id, local_id in local_assignments.items()}
+
+    non_empty_groups = [group for group in groups if members_by_group[group.group_id]]
+    sub_groups: dict[str, list[GroupDefinition]] = {}
+    sub_assignments: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(non_empty_groups)))) as executor:
+        for group, (children, child_assignments) in zip(
+            non_empty_groups, executor.map(split_group, non_empty_groups), strict=True
+        ):
+            sub_groups[group.group_id] = children
+            sub_assignments.update(child_assignments)
+
+    print(f"llm_grouping: discovered {sum(len(children) for children in sub_groups.values())} level-2 groups")
+    return sub_groups, {arg_id: sub_assignments[arg_id] for arg_id in arg_ids}
+
+
+def _load_embeddings(output_base_dir: str, dataset: str, arg_ids: list[str]) -> np.ndarray:
+    """Load `embeddings.pkl` as an array aligned with ``arg_ids``."""
     with open(f"{output_base_dir}/{dataset}/embeddings.pkl", "rb") as f:
         embeddings_data = pickle.load(f)
 
@@ -253,9 +426,65 @@ def _project_embeddings_to_xy(output_base_dir: str, dataset: str, arg_ids: list[
         if missing_arg_ids:
             raise ValueError(f"Missing embeddings for arg ids: {missing_arg_ids}")
 
-        embeddings_array = np.asarray([embed_by_id[arg_id] for arg_id in arg_ids])
-    else:
-        embeddings_array = np.asarray(embeddings_data["embedding"].values.tolist())
+        return np.asarray([embed_by_id[arg_id] for arg_id in arg_ids])
+    return np.asarray(embeddings_data["embedding"].values.tolist())
+
+
+def _embed_groups(groups: list[GroupDefinition], config: dict) -> np.ndarray:
+    """Embed each group's label and description with the same model used for the arguments."""
+    texts = [f"{group.label}: {group.description}" for group in groups]
+    embeds = request_to_embed(
+        texts,
+        config.get("embedding", {}).get("model", "text-embedding-3-small"),
+        config.get("is_embedded_at_local", False),
+        config["provider"],
+        local_llm_address=config.get("local_llm_address"),
+        user_api_key=config.get("user_api_key") or os.getenv("USER_API_KEY"),
+    )
+    return np.asarray(embeds, dtype=float)
+
+
+def _pre_assign_by_embedding(
+    *,
+    arg_ids: list[str],
+    embeddings: np.ndarray,
+    group_embeddings: np.ndarray,
+    groups: list[GroupDefinition],
+    margin: float,
+) -> dict[str, str]:
+    """Assign arguments whose best group wins by at least ``margin`` in cosine similarity.
+
+    Arguments below the margin are left out of the result so that the caller can send them to the LLM.
+    """
+    if len(groups) == 1:
+        return {arg_id: groups[0].group_id for arg_id in arg_ids}
+
+    def normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    similarities = normalize(embeddings.astype(float)) @ normalize(group_embeddings).T
+    top_two = np.argsort(similarities, axis=1)[:, -2:]
+    best = top_two[:, 1]
+    row_index = np.arange(len(arg_ids))
+    gaps = similarities[row_index, best] - similarities[row_index, top_two[:, 0]]
+
+    return {
+        arg_id: groups[best_index].group_id
+        for arg_id, best_index, gap in zip(arg_ids, best.tolist(), gaps.tolist(), strict=True)
+        if gap >= margin
+    }
+
+
+def _project_embeddings_to_xy(
+    output_base_dir: str,
+    dataset: str,
+    arg_ids: list[str],
+    embeddings_array: np.ndarray | None = None,
+) -> np.ndarray:
+    UMAP, _, _ = _load_clustering_dependencies()
+    if embeddings_array is None:
+        embeddings_array = _load_embeddings(output_base_dir, dataset, arg_ids)
 
     n_samples = embeddings_array.shape[0]
     n_neighbors = max(2, min(15, n_samples - 1)) if n_samples > 1 else 1
@@ -266,7 +495,30 @@ def _project_embeddings_to_xy(output_base_dir: str, dataset: str, arg_ids: list[
     return umap_model.fit_transform(embeddings_array)
 
 
-def _write_merge_labels(path: str, groups: list[GroupDefinition], assignments: dict[str, str]) -> None:
+def _write_merge_labels(
+    path: str,
+    config: dict,
+    groups: list[GroupDefinition],
+    assignments: dict[str, str],
+    sub_groups: dict[str, list[GroupDefinition]] | None = None,
+    sub_assignments: dict[str, str] | None = None,
+) -> None:
+    rows = _merge_label_rows(1, groups, assignments, parent_ids={})
+    if sub_groups and sub_assignments:
+        children = [child for group in groups for child in sub_groups.get(group.group_id, [])]
+        parent_ids = {
+            child.group_id: parent_id for parent_id, group_children in sub_groups.items() for child in group_children
+        }
+        rows.extend(_merge_label_rows(2, children, sub_assignments, parent_ids=parent_ids))
+    write_artifact(pl.DataFrame(rows), path, config)
+
+
+def _merge_label_rows(
+    level: int,
+    groups: list[GroupDefinition],
+    assignments: dict[str, str],
+    parent_ids: dict[str, str],
+) -> list[dict]:
     counts = Counter(assignments.values())
     sorted_groups = sorted(groups, key=lambda group: counts.get(group.group_id, 0), reverse=True)
     total_groups = max(1, len(sorted_groups))
@@ -274,21 +526,23 @@ def _write_merge_labels(path: str, groups: list[GroupDefinition], assignments: d
     for index, group in enumerate(sorted_groups):
         rows.append(
             {
-                "level": 1,
+                "level": level,
                 "id": group.group_id,
                 "label": group.label,
                 "description": group.description,
                 "value": counts.get(group.group_id, 0),
-                "parent": "0",
+                "parent": parent_ids.get(group.group_id, "0"),
                 "density_rank_percentile": (total_groups - index - 1) / max(1, total_groups - 1)
                 if total_groups > 1
                 else 0.0,
             }
         )
-    pl.DataFrame(rows).write_csv(path)
+    return rows
 
 
 def _accumulate_token_usage(config: dict, token_input: int, token_output: int, token_total: int) -> None:
-    config["total_token_usage"] = config.get("total_token_usage", 0) + token_total
-    config["token_usage_input"] = config.get("token_usage_input", 0) + token_input
-    config["token_usage_output"] = config.get("token_usage_output", 0) + token_output
+    # level-2 discovery calls this from several threads
+    with _token_usage_lock:
+        config["total_token_usage"] = config.get("total_token_usage", 0) + token_total
+        config["token_usage_input"] = config.get("token_usage_input", 0) + token_input
+        config["token_usage_output"] = config.get("token_usage_output", 0) + token_output
@@ -0,0 +1,78 @@
+"""
+Pre-warmed worker process for running one pipeline job.
+
+Usage:
+    python -m analysis_core.worker
+
+起動するとパイプラインの重い依存 (polars, numpy, LLM の SDK, クラスタリングのライブラリ) を先に import し、
+標準入力から 1 行の JSON でジョブを受け取るまで待機する。API は待機中のワーカーにジョブを渡すことで、
+レポートごとのインタプリタ起動と import の時間を省く。1 プロセスで実行するジョブは 1 件だけで、
+終了コードは ``kouchou-analyze`` と同じ。
+
+ジョブの形式::
+
+    {"args": ["--config", "config.json", ...], "env": {...}, "log_path": "outputs/slug/analysis.log"}
+
+標準入力が閉じられた (ジョブを受け取らずに終了を指示された) 場合は何もせずに終了する。
+"""
+
+import json
+import os
+import sys
+from importlib import import_module
+
+import analysis_core.steps as steps_module
+
+
+def preload() -> list[str]:
+    """Import the step modules and their optional dependencies. Returns the names that failed."""
+    failed = []
+    for name in steps_module.__all__:
+        try:
+            getattr(steps_module, name)
+        except Exception:
+            failed.append(name)
+    try:
+        import_module("analysis_core.steps.hierarchical_clustering")._load_clustering_dependencies()
+    except Exception:
+        failed.append("clustering dependencies")
+    import_module("analysis_core.plugins.builtin")
+    return failed
+
+
+def _redirect_output(log_path: str) -> None:
+    """標準出力と標準エラーをログファイルに向ける (subprocess で起動した場合と同じ出力先にする)"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    os.close(fd)
+
+
+def run_job(job: dict) -> int:
+    """受け取ったジョブを ``kouchou-analyze`` として実行する"""
+    if "env" in job:
+        os.environ.clear()
+        os.environ.update(job["env"])
+    if job.get("cwd"):
+        os.chdir(job["cwd"])
+    if job.get("log_path"):
+        _redirect_output(job["log_path"])
+
+    from analysis_core.__main__ import main as cli_main
+
+    sys.argv = ["kouchou-analyze", *job["args"]]
+    return cli_main()
+
+
+def main() -> int:
+    preload()
+    line = sys.stdin.readline()
+    if not line.strip():
+        return 0
+    return run_job(json.loads(line))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -76,6 +76,8 @@ class StepResult:
         outputs: Step outputs (artifacts and metadata)
         error: Error message if step failed
         skipped: Whether the step was skipped
+        profile: Performance profile of the step run (see ``analysis_core.core.step_profile``)
+        cancelled: Whether the step stopped because the run was cancelled
     """
 
     step_id: str
@@ -83,6 +85,8 @@ class StepResult:
     outputs: Any = None
     error: str | None = None
     skipped: bool = False
+    profile: dict[str, Any] | None = None
+    cancelled: bool = False
 
 
 @dataclass
@@ -97,10 +101,12 @@ class WorkflowResult:
         total_token_usage: Total tokens used across all steps
         total_token_input: Total input tokens
         total_token_output: Total output tokens
+        cancelled: Whether the run was cancelled before all steps finished
     """
 
     workflow_id: str
     success: bool = True
+    cancelled: bool = False
     step_results: dict[str, StepResult] = field(default_factory=dict)
     total_token_usage: int = 0
     total_token_input: int = 0
@@ -5,19 +5,28 @@ This module provides the WorkflowEngine class for executing workflows
 based on their definitions and configurations.
 """
 
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Any, Callable
 
+from analysis_core.core.artifacts import resolve_artifact_path
+from analysis_core.core.cancellation import PipelineCancelled, is_cancel_requested
+from analysis_core.core.step_profile import StepProfiler
+from analysis_core.core.tracing import start_span
 from analysis_core.plugin import (
     PluginRegistry,
     StepContext,
     StepInputs,
+    StepOutputs,
     get_registry,
 )
 from analysis_core.workflow.definition import (
     StepResult,
     WorkflowDefinition,
     WorkflowResult,
+    WorkflowStep,
 )
 from analysis_core.workflow.resolver import (
     evaluate_condition,
@@ -62,6 +71,8 @@ class WorkflowEngine:
         on_step_start: Callable[[str], None] | None = None,
         on_step_complete: Callable[[str, StepResult], None] | None = None,
         skip_steps: set[str] | None = None,
+        max_workers: int = 1,
+        skip_if: Callable[[str], bool] | None = None,
     ) -> WorkflowResult:
         """
         Execute a workflow.
@@ -70,6 +81,14 @@ class WorkflowEngine:
             workflow: Workflow definition to execute
             config: Full configuration including step configs
             ctx: Execution context (paths, provider, model)
+            on_step_start: Called when a step is about to run
+            on_step_complete: Called with the result of each step
+            skip_steps: Step IDs to mark as skipped without running
+            max_workers: Number of steps that may run at the same time. With more than one worker, steps
+                whose ``depends_on`` have all finished run concurrently in a thread pool; callbacks are still
+                invoked from the calling thread.
+            skip_if: Called with the step ID once its dependencies have finished; returning True marks the
+                step as skipped (e.g. when the outputs it depends on are unchanged)
 
         Returns:
             WorkflowResult with step results and aggregated statistics
@@ -88,143 +107,262 @@ class WorkflowEngine:
         # Track artifacts produced by each step
         artifacts = self._build_initial_artifacts(config, ctx)
 
+        if max_workers > 1:
+            self._run_concurrently(
+                workflow,
+                execution_order,
+                config,
+                ctx,
+                result,
+                artifacts,
+                on_step_start,
+                on_step_complete,
+                skip_steps,
+                max_workers,
+                skip_if,
+            )
+            return result
+
         # Execute steps in order
         for step_id in execution_order:
+            if is_cancel_requested():
+                self._mark_cancelled(result)
+                break
             step = workflow.get_step(step_id)
             if step is None:
                 continue
             if on_step_start:
                 on_step_start(step_id)
 
-            if skip_steps and step_id in skip_steps:
-                result.step_results[step_id] = StepResult(
-                    step_id=step_id,
-                    success=True,
-                    skipped=True,
-                )
-                if on_step_complete:
-                    on_step_complete(step_id, result.step_results[step_id])
-                continue
+            prepared = self._prepare_step(step, config, result, artifacts, skip_steps, skip_if)
+            if isinstance(prepared, StepResult):
+                step_result = prepared
+            else:
+                step_result = self._execute_step(step, ctx, *prepared)
+
+            if self._record_step_result(step_result, result, artifacts, on_step_complete):
+                break
+
+        return result
+
+    def _run_concurrently(
+        self,
+        workflow: WorkflowDefinition,
+        execution_order: list[str],
+        config: dict[str, Any],
+        ctx: StepContext,
+        result: WorkflowResult,
+        artifacts: dict[str, Path],
+        on_step_start: Callable[[str], None] | None,
+        on_step_complete: Callable[[str, StepResult], None] | None,
+        skip_steps: set[str] | None,
+        max_workers: int,
+        skip_if: Callable[[str], bool] | None = None,
+    ) -> None:
+        """
+        Run steps as soon as their dependencies have finished, up to ``max_workers`` at a time.
+
+        Preparation (conditions, plugin lookup, validation), result recording and callbacks happen on the
+        calling thread; only ``plugin.run`` is executed in the pool. After a required step fails or the run is
+        cancelled no new steps are started, but steps already running are allowed to finish and are recorded.
+        """
+        remaining_dependencies = {step.id: set(step.depends_on) for step in workflow.steps}
+        dependents: dict[str, list[str]] = {step_id: [] for step_id in execution_order}
+        for step in workflow.steps:
+            for dep_id in step.depends_on:
+                dependents[dep_id].append(step.id)
+
+        # 同時に実行可能になったステップはトポロジカル順に開始する
+        ready = deque(step_id for step_id in execution_order if not remaining_dependencies[step_id])
+        running: dict[Future, str] = {}
+        failed = False
+
+        def finish(step_id: str) -> None:
+            for dependent_id in dependents[step_id]:
+                remaining_dependencies[dependent_id].discard(step_id)
+                if not remaining_dependencies[dependent_id]:
+                    ready.append(dependent_id)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-step") as pool:
+            while running or (ready and not failed):
+                while ready and not failed:
+                    if is_cancel_requested():
+                        failed = self._mark_cancelled(result)
+                        break
+                    step_id = ready.popleft()
+                    step = workflow.get_step(step_id)
+                    if on_step_start:
+                        on_step_start(step_id)
+
+                    prepared = self._prepare_step(step, config, result, artifacts, skip_steps, skip_if)
+                    if isinstance(prepared, StepResult):
+                        failed = self._record_step_result(prepared, result, artifacts, on_step_complete) or failed
+                        finish(step_id)
+                    else:
+                        # ステップのスパンがパイプラインのスパンの子になるよう、呼び出し元のコンテキストを引き継ぐ
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, self._execute_step, step, ctx, *prepared)] = step_id
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: execution_order.index(running[f])):
+                    step_id = running.pop(future)
+                    failed = self._record_step_result(future.result(), result, artifacts, on_step_complete) or failed
+                    finish(step_id)
 
-            # Check condition
-            if not evaluate_condition(step.condition, config, result.step_results):
-                result.step_results[step_id] = StepResult(
+    def _prepare_step(
+        self,
+        step: WorkflowStep,
+        config: dict[str, Any],
+        result: WorkflowResult,
+        artifacts: dict[str, Path],
+        skip_steps: set[str] | None,
+        skip_if: Callable[[str], bool] | None = None,
+    ) -> StepResult | tuple[Any, StepInputs, dict[str, Any]]:
+        """
+        Resolve everything a step needs before it runs.
+
+        Returns a finished StepResult when the step does not need to run (skipped, condition not met,
+        optional plugin missing, validation failure), otherwise the plugin, inputs and resolved config.
+        """
+        step_id = step.id
+        if skip_steps and step_id in skip_steps:
+            return StepResult(step_id=step_id, success=True, skipped=True)
+        if skip_if and skip_if(step_id):
+            return StepResult(step_id=step_id, success=True, skipped=True)
+
+        # Check condition
+        if not evaluate_condition(step.condition, config, result.step_results):
+            return StepResult(step_id=step_id, success=True, skipped=True)
+
+        # Get plugin
+        plugin = self.registry.get_or_none(step.plugin)
+        if plugin is None:
+            if step.optional:
+                return StepResult(
                     step_id=step_id,
                     success=True,
                     skipped=True,
+                    error=f"Plugin '{step.plugin}' not found (optional step)",
                 )
-                if on_step_complete:
-                    on_step_complete(step_id, result.step_results[step_id])
-                continue
+            raise WorkflowExecutionError(f"Plugin '{step.plugin}' not found for step '{step_id}'")
 
-            # Get plugin
-            plugin = self.registry.get_or_none(step.plugin)
-            if plugin is None:
-                if step.optional:
-                    result.step_results[step_id] = StepResult(
-                        step_id=step_id,
-                        success=True,
-                        skipped=True,
-                        error=f"Plugin '{step.plugin}' not found (optional step)",
-                    )
-                    if on_step_complete:
-                        on_step_complete(step_id, result.step_results[step_id])
-                    continue
-                else:
-                    raise WorkflowExecutionError(f"Plugin '{step.plugin}' not found for step '{step_id}'")
-
-            # Build step inputs from previous step artifacts
-            step_artifacts = {}
-            for input_id in plugin.metadata.inputs:
-                # Look for artifact from any previous step that produces it
-                if input_id in artifacts:
-                    step_artifacts[input_id] = artifacts[input_id]
-
-            inputs = StepInputs(
-                artifacts=step_artifacts,
-                config=config,
-            )
+        # Build step inputs from previous step artifacts
+        step_artifacts = {}
+        for input_id in plugin.metadata.inputs:
+            # Look for artifact from any previous step that produces it
+            if input_id in artifacts:
+                step_artifacts[input_id] = artifacts[input_id]
 
-            # Get step-specific config
-            step_config = self._resolve_step_config(step.config, config)
+        inputs = StepInputs(
+            artifacts=step_artifacts,
+            config=config,
+        )
 
-            # Validate inputs and config before execution
-            input_errors = plugin.validate_inputs(inputs)
-            config_errors = plugin.validate_config(step_config)
+        # Get step-specific config
+        step_config = self._resolve_step_config(step.config, config)
 
-            if input_errors or config_errors:
-                all_errors = input_errors + config_errors
-                error_msg = f"Step '{step_id}' validation failed: {'; '.join(all_errors)}"
-                print(f"Validation error: {error_msg}")
+        # Validate inputs and config before execution
+        input_errors = plugin.validate_inputs(inputs)
+        config_errors = plugin.validate_config(step_config)
 
-                if step.optional:
-                    result.step_results[step_id] = StepResult(
-                        step_id=step_id,
-                        success=False,
-                        error=error_msg,
-                        skipped=True,
-                    )
-                    if on_step_complete:
-                        on_step_complete(step_id, result.step_results[step_id])
-                    continue
-                else:
-                    result.step_results[step_id] = StepResult(
-                        step_id=step_id,
-                        success=False,
-                        error=error_msg,
-                    )
-                    if on_step_complete:
-                        on_step_complete(step_id, result.step_results[step_id])
-                    result.success = False
-                    break
-
-            try:
-                # Execute step
-                print(f"Executing step: {step_id} ({step.plugin})")
+        if input_errors or config_errors:
+            all_errors = input_errors + config_errors
+            error_msg = f"Step '{step_id}' validation failed: {'; '.join(all_errors)}"
+            print(f"Validation error: {error_msg}")
+            return StepResult(step_id=step_id, success=False, error=error_msg, skipped=step.optional)
+
+        return plugin, inputs, step_config
+
+    def _execute_step(
+        self,
+        step: WorkflowStep,
+        ctx: StepContext,
+        plugin: Any,
+        inputs: StepInputs,
+        step_config: dict[str, Any],
+    ) -> StepResult:
+        """Run the plugin of a prepared step and wrap its outputs or error."""
+        profiler = StepProfiler(step.id)
+        try:
+            # Execute step
+            print(f"Executing step: {step.id} ({step.plugin})")
+            attributes = {"step.id": step.id, "step.plugin": step.plugin}
+            with start_span(f"step {step.id}", attributes, thread_root=True) as span, profiler:
                 outputs = plugin.run(ctx, inputs, step_config)
+                if isinstance(outputs, StepOutputs):
+                    profiler.set_tokens(outputs.token_usage, outputs.token_input, outputs.token_output)
+                    span.set_attributes(
+                        {
+                            "llm.tokens.total": outputs.token_usage,
+                            "llm.tokens.input": outputs.token_input,
+                            "llm.tokens.output": outputs.token_output,
+                        }
+                    )
+            return StepResult(step_id=step.id, success=True, outputs=outputs, profile=profiler.profile.to_dict())
+        except PipelineCancelled:
+            print(f"Step '{step.id}' cancelled")
+            return StepResult(
+                step_id=step.id,
+                success=False,
+                error=f"Step '{step.id}' was cancelled",
+                profile=profiler.profile.to_dict(),
+                cancelled=True,
+            )
+        except Exception as e:
+            error_msg = f"Step '{step.id}' failed: {str(e)}"
+            print(f"Error: {error_msg}")
+            return StepResult(
+                step_id=step.id,
+                success=False,
+                error=error_msg,
+                skipped=step.optional,
+                profile=profiler.profile.to_dict(),
+            )
 
-                # Store artifacts for downstream steps
-                for artifact_id, artifact_path in outputs.artifacts.items():
-                    artifacts[artifact_id] = artifact_path
+    def _record_step_result(
+        self,
+        step_result: StepResult,
+        result: WorkflowResult,
+        artifacts: dict[str, Path],
+        on_step_complete: Callable[[str, StepResult], None] | None,
+    ) -> bool:
+        """
+        Store a step result, its artifacts and token counts, and notify the callback.
 
-                # Update token counts
-                result.total_token_usage += outputs.token_usage
-                result.total_token_input += outputs.token_input
-                result.total_token_output += outputs.token_output
+        Returns:
+            True if a required step failed and the workflow must stop
+        """
+        outputs = step_result.outputs
+        if step_result.success and outputs is not None:
+            # Store artifacts for downstream steps
+            for artifact_id, artifact_path in outputs.artifacts.items():
+                artifacts[artifact_id] = artifact_path
 
-                result.step_results[step_id] = StepResult(
-                    step_id=step_id,
-                    success=True,
-                    outputs=outputs,
-                )
-                if on_step_complete:
-                    on_step_complete(step_id, result.step_results[step_id])
-
-            except Exception as e:
-                error_msg = f"Step '{step_id}' failed: {str(e)}"
-                print(f"Error: {error_msg}")
-
-                if step.optional:
-                    result.step_results[step_id] = StepResult(
-                        step_id=step_id,
-                        success=False,
-                        error=error_msg,
-                        skipped=True,
-                    )
-                    if on_step_complete:
-                        on_step_complete(step_id, result.step_results[step_id])
-                else:
-                    result.step_results[step_id] = StepResult(
-                        step_id=step_id,
-                        success=False,
-                        error=error_msg,
-                    )
-                    if on_step_complete:
-                        on_step_complete(step_id, result.step_results[step_id])
-                    result.success = False
-                    break
+            # Update token counts
+            result.total_token_usage += outputs.token_usage
+            result.total_token_input += outputs.token_input
+            result.total_token_output += outputs.token_output
 
-        return result
+        result.step_results[step_result.step_id] = step_result
+        if on_step_complete:
+            on_step_complete(step_result.step_id, step_result)
+
+        if step_result.cancelled:
+            return self._mark_cancelled(result)
+
+        if not step_result.success and not step_result.skipped:
+            result.success = False
+            return True
+        return False
+
+    @staticmethod
+    def _mark_cancelled(result: WorkflowResult) -> bool:
+        """Mark the workflow as cancelled. Returns True so callers can stop starting new steps."""
+        result.success = False
+        result.cancelled = True
+        return True
 
     def _build_initial_artifacts(
         self,
@@ -261,7 +399,7 @@ class WorkflowEngine:
             "html": "report.html",
         }
         for artifact_id, filename in output_artifacts.items():
-            artifact_path = ctx.output_dir / filename
+            artifact_path = resolve_artifact_path(ctx.output_dir / filename)
             if artifact_path.exists():
                 artifacts[artifact_id] = artifact_path
 
@@ -0,0 +1,74 @@
+"""Tests for the intermediate table artifact format."""
+
+import json
+
+import polars as pl
+import pytest
+
+from analysis_core.core.artifact_hash import step_output_paths
+from analysis_core.core.artifacts import artifact_format, resolve_artifact_path
+from analysis_core.core.frames import read_artifact, write_artifact
+from analysis_core.core.orchestration import _seed_reused_outputs
+
+
+def test_artifact_format_defaults_to_parquet_and_rejects_unknown_values():
+    assert artifact_format({}) == "parquet"
+    assert artifact_format({"artifact_format": "csv"}) == "csv"
+    with pytest.raises(ValueError):
+        artifact_format({"artifact_format": "json"})
+
+
+def test_write_artifact_uses_configured_format_and_removes_the_other(tmp_path):
+    path = tmp_path / "args.csv"
+    frame = pl.DataFrame({"arg-id": ["A1_0", "A2_0"], "argument": ["a", "b"], "comment-id": [1, 2]})
+
+    written = write_artifact(frame, path, {"artifact_format": "csv"})
+    assert written == path
+
+    written = write_artifact(frame, path, {})
+    assert written == tmp_path / "args.parquet"
+    assert not path.exists()
+    # comment-id は数値でも文字列として保存する
+    assert pl.read_parquet(written).schema["comment-id"] == pl.Utf8
+
+    write_artifact(frame, path, {"artifact_format": "csv"})
+    assert path.exists()
+    assert not (tmp_path / "args.parquet").exists()
+
+
+@pytest.mark.parametrize("config", [{}, {"low_memory": True}])
+def test_read_artifact_accepts_either_format_with_stable_dtypes(tmp_path, config):
+    path = tmp_path / "relations.csv"
+    path.write_text("arg-id,comment-id\nA1_0,1\nA2_0,2\n", encoding="utf-8")
+
+    from_csv = read_artifact(path, config)
+    assert from_csv.schema["comment-id"] == pl.Utf8
+    assert resolve_artifact_path(path) == path
+
+    write_artifact(from_csv, path, {})
+    assert resolve_artifact_path(path) == tmp_path / "relations.parquet"
+    assert read_artifact(path, config).equals(from_csv)
+
+
+def test_non_table_artifacts_keep_their_name(tmp_path):
+    assert resolve_artifact_path(tmp_path / "embeddings.pkl") == tmp_path / "embeddings.pkl"
+    with pytest.raises(ValueError):
+        write_artifact(pl.DataFrame({"a": [1]}), tmp_path / "embeddings.pkl", {})
+
+
+def test_hashes_and_reuse_follow_the_parquet_files(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    write_artifact(pl.DataFrame({"arg-id": ["A1_0"], "argument": ["a"]}), source / "args.csv", {})
+    write_artifact(pl.DataFrame({"arg-id": ["A1_0"], "comment-id": ["1"]}), source / "relations.csv", {})
+    (source / "hierarchical_status.json").write_text(
+        json.dumps({"completed_jobs": [{"step": "extraction", "params": {"limit": 10}}]}), encoding="utf-8"
+    )
+    spec = {"step": "extraction", "filename": "args.csv"}
+
+    assert step_output_paths(spec, source) == [source / "args.parquet", source / "relations.parquet"]
+
+    (tmp_path / "copy").mkdir()
+    _seed_reused_outputs(config={"output_dir": "copy", "reuse_from": "source"}, output_base_dir=tmp_path, specs=[spec])
+    assert (tmp_path / "copy" / "args.parquet").exists()
+    assert (tmp_path / "copy" / "relations.parquet").exists()
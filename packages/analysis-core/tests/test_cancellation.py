@@ -0,0 +1,188 @@
+"""Tests for cooperative cancellation of pipeline runs."""
+
+import json
+import threading
+import time
+from importlib import import_module
+
+import polars as pl
+import pytest
+
+from analysis_core.core.cancellation import (
+    PipelineCancelled,
+    cancellable_map,
+    clear_cancel_request,
+    request_cancel,
+)
+from analysis_core.plugin import PluginRegistry, StepContext, StepInputs, StepOutputs, step_plugin
+from analysis_core.steps.extraction import EXTRACTION_CHECKPOINT_FILENAME
+from analysis_core.workflow import WorkflowDefinition, WorkflowEngine, WorkflowStep
+
+# analysis_core.steps.extraction はステップ関数の名前でもあるため、モジュールは import_module で取得する
+extraction_module = import_module("analysis_core.steps.extraction")
+
+
+@pytest.fixture(autouse=True)
+def reset_cancel_request():
+    clear_cancel_request()
+    yield
+    clear_cancel_request()
+
+
+def test_cancellable_map_returns_results_in_order():
+    assert list(cancellable_map(lambda x: x * 2, [3, 1, 2], max_workers=2)) == [6, 2, 4]
+
+
+def test_cancellable_map_stops_without_waiting_for_running_calls():
+    started = []
+    release = threading.Event()
+
+    def slow(item):
+        started.append(item)
+        if item == 0:
+            request_cancel()
+        release.wait(5)
+        return item
+
+    begin = time.monotonic()
+    with pytest.raises(PipelineCancelled):
+        list(cancellable_map(slow, range(10), max_workers=2))
+    release.set()
+
+    assert time.monotonic() - begin < 2
+    # 未開始の呼び出しは取り消される
+    assert len(started) <= 2
+
+
+def _make_engine(*plugins):
+    registry = PluginRegistry()
+    for plugin in plugins:
+        registry.register(plugin)
+    return WorkflowEngine(registry=registry)
+
+
+def _make_context(tmp_path):
+    return StepContext(output_dir=tmp_path, input_dir=tmp_path, dataset="test", provider="openai", model="gpt-4o-mini")
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_engine_stops_after_a_cancelled_step(tmp_path, max_workers):
+    ran = []
+
+    @step_plugin(id="test.cancelling", version="1.0.0", inputs=[], outputs=[])
+    def cancelling(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+        ran.append("first")
+        request_cancel()
+        raise PipelineCancelled()
+
+    @step_plugin(id="test.after", version="1.0.0", inputs=[], outputs=[])
+    def after(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+        ran.append("second")
+        return StepOutputs()
+
+    workflow = WorkflowDefinition(
+        id="test",
+        version="1.0.0",
+        steps=[
+            WorkflowStep(id="first", plugin="test.cancelling"),
+            WorkflowStep(id="second", plugin="test.after", depends_on=["first"]),
+        ],
+    )
+    result = _make_engine(cancelling, after).run(workflow, {}, _make_context(tmp_path), max_workers=max_workers)
+
+    assert ran == ["first"]
+    assert not result.success
+    assert result.cancelled
+    assert result.step_results["first"].cancelled
+    assert "second" not in result.step_results
+
+
+def test_engine_does_not_start_steps_after_cancel_request(tmp_path):
+    @step_plugin(id="test.noop", version="1.0.0", inputs=[], outputs=[])
+    def noop(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+        return StepOutputs()
+
+    workflow = WorkflowDefinition(id="test", version="1.0.0", steps=[WorkflowStep(id="only", plugin="test.noop")])
+    request_cancel()
+    result = _make_engine(noop).run(workflow, {}, _make_context(tmp_path))
+
+    assert result.cancelled
+    assert result.step_results == {}
+
+
+def _extraction_config(tmp_path):
+    (tmp_path / "inputs").mkdir()
+    pl.DataFrame({"comment-id": [1, 2, 3, 4], "comment-body": ["a", "b", "c", "d"]}).write_csv(
+        tmp_path / "inputs" / "test.csv"
+    )
+    (tmp_path / "outputs" / "test").mkdir(parents=True)
+    return {
+        "input": "test",
+        "output_dir": "test",
+        "provider": "openai",
+        "_input_base_dir": str(tmp_path / "inputs"),
+        "_output_base_dir": str(tmp_path / "outputs"),
+        "extraction": {"model": "gpt-4o-mini", "prompt": "extract", "workers": 2, "limit": 100, "properties": []},
+    }
+
+
+def test_cancelled_extraction_resumes_from_checkpoint(monkeypatch, tmp_path):
+    config = _extraction_config(tmp_path)
+    output_dir = tmp_path / "outputs" / "test"
+    calls = []
+
+    def fake_extract_batch(batch_inputs, *args, **kwargs):
+        calls.append(list(batch_inputs))
+        if len(calls) == 2:
+            request_cancel()
+            raise PipelineCancelled()
+        return [[f"{text} opinion", "shared"] for text in batch_inputs]
+
+    monkeypatch.setattr(extraction_module, "extract_batch", fake_extract_batch)
+    with pytest.raises(PipelineCancelled):
+        extraction_module.extraction(config)
+
+    assert (output_dir / EXTRACTION_CHECKPOINT_FILENAME).exists()
+    assert not (output_dir / "args.parquet").exists()
+
+    clear_cancel_request()
+    calls.clear()
+    extraction_module.extraction(config)
+
+    # 抽出済みのコメントは LLM を呼ばずに再利用する
+    assert calls == [["c", "d"]]
+    assert not (output_dir / EXTRACTION_CHECKPOINT_FILENAME).exists()
+    args = pl.read_parquet(output_dir / "args.parquet")
+    assert args["arg-id"].to_list() == ["A1_0", "A1_1", "A2_0", "A3_0", "A4_0"]
+    assert args["argument"].to_list() == ["a opinion", "shared", "b opinion", "c opinion", "d opinion"]
+
+
+def test_cancelled_workflow_is_recorded_as_cancelled_status(monkeypatch, tmp_path):
+    from analysis_core import PipelineOrchestrator
+    from analysis_core.workflow.definition import StepResult as WorkflowStepResult
+    from analysis_core.workflow.definition import WorkflowResult
+
+    orchestrator = PipelineOrchestrator.from_dict(
+        config={"name": "demo", "input": "demo", "question": "Test?", "provider": "local", "model": "dummy"},
+        output_dir="demo",
+        output_base_dir=tmp_path / "outputs",
+        input_base_dir=tmp_path / "inputs",
+    )
+
+    class FakeEngine:
+        def run(self, workflow, config, ctx, on_step_start=None, on_step_complete=None, skip_steps=None):
+            result = WorkflowResult(workflow_id="test", success=False, cancelled=True)
+            result.step_results["extraction"] = WorkflowStepResult(
+                step_id="extraction", success=False, error="Step 'extraction' was cancelled", cancelled=True
+            )
+            return result
+
+    monkeypatch.setattr("analysis_core.workflow.WorkflowEngine", FakeEngine)
+
+    result = orchestrator.run_workflow()
+
+    assert result.cancelled
+    assert not result.success
+    status = json.loads((tmp_path / "outputs" / "demo" / "hierarchical_status.json").read_text(encoding="utf-8"))
+    assert status["status"] == "cancelled"
+    assert status["error"] == "Pipeline was cancelled"
@@ -0,0 +1,328 @@
+"""Tests for the hierarchical aggregation step."""
+
+import hashlib
+import json
+
+import polars as pl
+import pytest
+
+from analysis_core.core.frames import SPILL_DIRNAME
+from analysis_core.core.property_map import decode_property_map
+from analysis_core.core.result_shards import MANIFEST_FILENAME, SHARD_DIRNAME
+from analysis_core.core.result_stream import is_streamed_result
+from analysis_core.steps.hierarchical_aggregation import (
+    ARGUMENTS_TABLE_FILENAME,
+    ATTRIBUTE_STATS_FILENAME,
+    hierarchical_aggregation,
+)
+
+
+def _write_inputs(tmp_path, relations_with_comment_id=True):
+    input_dir = tmp_path / "inputs"
+    output_dir = tmp_path / "outputs" / "demo"
+    input_dir.mkdir()
+    output_dir.mkdir(parents=True)
+
+    pl.DataFrame(
+        {
+            "comment-id": [1, 2, 3],
+            "comment-body": ["電車とバス", "公園", "駅前"],
+            "url": ["https://example.com/1", None, "https://example.com/3"],
+            "attribute_age": [20, None, 40],
+        }
+    ).write_csv(input_dir / "comments.csv")
+    pl.DataFrame(
+        {
+            "arg-id": ["A1_0", "A1_1", "A2_0", "A3_0"],
+            "argument": ["電車を増やす", "バスを増やす", "公園を作る", "駅前を整備する"],
+            "comment-id": [1, 1, 2, 3],
+        }
+    ).write_csv(output_dir / "args.csv")
+    relations = {"arg-id": ["A1_0", "A1_1", "A2_0", "A3_0"]}
+    if relations_with_comment_id:
+        relations["comment-id"] = [1, 1, 2, 3]
+    pl.DataFrame(relations).write_csv(output_dir / "relations.csv")
+    pl.DataFrame(
+        {
+            "arg-id": ["A1_0", "A1_1", "A2_0", "A3_0"],
+            "argument": ["電車を増やす", "バスを増やす", "公園を作る", "駅前を整備する"],
+            "x": [0.0, 0.5, 1.0, 1.5],
+            "y": [1, 2, 3, 4],
+            "cluster-level-1-id": ["1_0", "1_0", "1_1", "1_1"],
+            "cluster-level-2-id": ["2_0", "2_1", "2_2", "2_2"],
+        }
+    ).write_csv(output_dir / "hierarchical_clusters.csv")
+    pl.DataFrame(
+        {
+            "level": [1, 1, 2, 2, 2],
+            "id": ["1_0", "1_1", "2_0", "2_1", "2_2"],
+            "label": ["交通", "街づくり", "電車", "バス", "公園と駅前"],
+            "description": ["交通の意見", "街の意見", "電車", "バス", "公園と駅前"],
+            "value": [2, 2, 1, 1, 2],
+            "parent": ["0", "0", "1_0", "1_0", "1_1"],
+            "density_rank_percentile": [0.5, 1.0, 0.2, 0.4, 0.6],
+        }
+    ).write_csv(output_dir / "hierarchical_merge_labels.csv")
+    (output_dir / "hierarchical_overview.txt").write_text("全体の要約", encoding="utf-8")
+    return output_dir
+
+
+def _config(tmp_path, **overrides):
+    return {
+        "output_dir": "demo",
+        "input": "comments",
+        "_output_base_dir": str(tmp_path / "outputs"),
+        "_input_base_dir": str(tmp_path / "inputs"),
+        "hierarchical_aggregation": {"hidden_properties": {}},
+        "extraction": {"limit": 2, "categories": {}},
+        "intro": "調査の概要",
+        "provider": "openai",
+        "model": "gpt-4o-mini",
+        "is_pubcom": False,
+        "enable_source_link": True,
+        **overrides,
+    }
+
+
+def test_aggregation_builds_arguments_clusters_and_intro(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+
+    assert hierarchical_aggregation(_config(tmp_path)) is True
+
+    result = json.loads((output_dir / "hierarchical_result.json").read_text(encoding="utf-8"))
+    assert result["arguments"][0] == {
+        "arg_id": "A1_0",
+        "argument": "電車を増やす",
+        "comment_id": "1",
+        "x": 0.0,
+        "y": 1.0,
+        "p": 0,
+        "cluster_ids": ["0", "1_0", "2_0"],
+        "attributes": {"age": 20},
+        "url": "https://example.com/1",
+    }
+    # 属性がすべて空の意見は attributes を持たない
+    assert result["arguments"][2]["attributes"] is None
+    assert result["arguments"][2]["url"] is None
+    assert [cluster["id"] for cluster in result["clusters"]] == ["0", "1_0", "1_1", "2_0", "2_1", "2_2"]
+    assert result["clusters"][0]["value"] == 4
+    assert result["clusters"][3] == {
+        "level": 2,
+        "id": "2_0",
+        "label": "電車",
+        "takeaway": "電車",
+        "value": 1,
+        "parent": "1_0",
+        "density_rank_percentile": 0.2,
+    }
+    assert result["comment_num"] == 3
+    assert result["overview"] == "全体の要約"
+    assert result["config"]["intro"].startswith("調査の概要\n")
+    assert "データの件数は2件" in result["config"]["intro"]
+    assert "OpenAI API (gpt-4o-mini)を用いて4件" in result["config"]["intro"]
+
+
+def test_aggregation_without_comment_relations_or_source_links(tmp_path):
+    output_dir = _write_inputs(tmp_path, relations_with_comment_id=False)
+
+    assert hierarchical_aggregation(_config(tmp_path, enable_source_link=False)) is True
+
+    result = json.loads((output_dir / "hierarchical_result.json").read_text(encoding="utf-8"))
+    assert {argument["comment_id"] for argument in result["arguments"]} == {""}
+    assert all(argument["attributes"] is None and argument["url"] is None for argument in result["arguments"])
+
+
+def test_aggregation_writes_original_comments_for_pubcom(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+
+    assert hierarchical_aggregation(_config(tmp_path, is_pubcom=True)) is True
+
+    final = pl.read_csv(output_dir / "final_result_with_comments.csv")
+    assert final["arg_id"].to_list() == ["A1_0", "A1_1", "A2_0", "A3_0"]
+    assert final["category"].to_list() == ["交通", "交通", "街づくり", "街づくり"]
+    assert final["original-comment"].to_list()[0] == "電車とバス"
+
+
+def test_aggregation_writes_sharded_output_when_enabled(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+    config = _config(tmp_path, hierarchical_aggregation={"hidden_properties": {}, "sharded_output": True})
+
+    assert hierarchical_aggregation(config) is True
+
+    shard_dir = output_dir / SHARD_DIRNAME
+    manifest = json.loads((shard_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert "arguments" not in manifest and "propertyMap" not in manifest
+    assert manifest["overview"] == "全体の要約"
+    assert manifest["argument_count"] == 4
+    assert [shard["cluster_id"] for shard in manifest["shards"]["arguments"]] == ["1_0", "1_1"]
+
+    for entry in [manifest["shards"]["points"], *manifest["shards"]["arguments"]]:
+        content = (shard_dir / entry["file"]).read_bytes()
+        assert hashlib.sha256(content).hexdigest() == entry["sha256"]
+
+    points = json.loads((shard_dir / manifest["shards"]["points"]["file"]).read_text(encoding="utf-8"))
+    assert points["arg_id"] == ["A1_0", "A1_1", "A2_0", "A3_0"]
+    assert points["cluster_ids"][2] == ["0", "1_1", "2_2"]
+
+    shard = json.loads((shard_dir / manifest["shards"]["arguments"][1]["file"]).read_text(encoding="utf-8"))
+    assert [argument["arg_id"] for argument in shard["arguments"]] == ["A2_0", "A3_0"]
+
+    # 全件の結果ファイルも従来どおり書き出される
+    assert len(json.loads((output_dir / "hierarchical_result.json").read_text(encoding="utf-8"))["arguments"]) == 4
+
+
+def test_aggregation_writes_compact_arguments_table(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+
+    assert hierarchical_aggregation(_config(tmp_path)) is True
+
+    table_path = output_dir / ARGUMENTS_TABLE_FILENAME
+    table = pl.read_parquet(table_path)
+    assert table.schema["x"] == pl.Float32 and table.schema["y"] == pl.Float32
+    assert table.schema["cluster_level_1_id"] == pl.Categorical
+    assert table["cluster_level_2_id"].cast(pl.Utf8).to_list() == ["2_0", "2_1", "2_2", "2_2"]
+    assert table["arg_id"].to_list() == ["A1_0", "A1_1", "A2_0", "A3_0"]
+    assert table["attributes"].to_list()[0] == {"age": 20}
+
+    metadata = pl.read_parquet_metadata(table_path)
+    assert metadata["comment_num"] == "3"
+    assert metadata["cluster_num"] == "2"
+
+
+def test_aggregation_streaming_output_matches_default_output(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+    result_path = output_dir / "hierarchical_result.json"
+    step_config = {"hidden_properties": {"comment-id": []}}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+    expected = json.loads(result_path.read_text(encoding="utf-8"))
+    assert expected["propertyMap"] == {"comment-id": {"A1_0": "1", "A1_1": "1", "A2_0": "2", "A3_0": "3"}}
+
+    step_config = {**step_config, "streaming_output": True}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+
+    assert is_streamed_result(result_path)
+    expected["config"]["hierarchical_aggregation"]["streaming_output"] = True
+    assert json.loads(result_path.read_text(encoding="utf-8")) == expected
+
+
+def test_aggregation_precomputes_attribute_stats_per_cluster(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+
+    assert hierarchical_aggregation(_config(tmp_path)) is True
+
+    result = json.loads((output_dir / "hierarchical_result.json").read_text(encoding="utf-8"))
+    # 属性が空の意見 (A2_0) は数えない
+    assert result["attributeStats"] == {
+        "age": {
+            "0": {"20": 2, "40": 1},
+            "1_0": {"20": 2},
+            "1_1": {"40": 1},
+            "2_0": {"20": 1},
+            "2_1": {"20": 1},
+            "2_2": {"40": 1},
+        }
+    }
+
+    stats = pl.read_parquet(output_dir / ATTRIBUTE_STATS_FILENAME)
+    assert stats.columns == ["level", "cluster_id", "attribute", "value", "count"]
+    assert stats.filter(pl.col("level") == 1).rows() == [(1, "1_0", "age", "20", 2), (1, "1_1", "age", "40", 1)]
+
+
+def test_aggregation_overwrites_attribute_stats_when_rerun_without_attributes(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+    assert hierarchical_aggregation(_config(tmp_path)) is True
+    assert (output_dir / ATTRIBUTE_STATS_FILENAME).exists()
+
+    comments_path = tmp_path / "inputs" / "comments.csv"
+    pl.read_csv(comments_path).drop("attribute_age").write_csv(comments_path)
+    assert hierarchical_aggregation(_config(tmp_path)) is True
+
+    result = json.loads((output_dir / "hierarchical_result.json").read_text(encoding="utf-8"))
+    assert result["attributeStats"] == {}
+    stats = pl.read_parquet(output_dir / ATTRIBUTE_STATS_FILENAME)
+    assert stats.is_empty()
+    assert stats.columns == ["level", "cluster_id", "attribute", "value", "count"]
+
+
+@pytest.mark.parametrize("streaming_output", [False, True])
+def test_aggregation_categorical_codes_follow_argument_order(tmp_path, streaming_output):
+    output_dir = _write_inputs(tmp_path)
+    # クラスタの行順を args.csv と逆にする
+    clusters_path = output_dir / "hierarchical_clusters.csv"
+    pl.read_csv(clusters_path).reverse().write_csv(clusters_path)
+    result_path = output_dir / "hierarchical_result.json"
+    step_config = {"hidden_properties": {"comment-id": []}, "streaming_output": streaming_output}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+    expected = json.loads(result_path.read_text(encoding="utf-8"))["propertyMap"]
+
+    step_config = {**step_config, "property_map_encoding": "categorical"}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+
+    result = json.loads(result_path.read_text(encoding="utf-8"))
+    assert [argument["arg_id"] for argument in result["arguments"]] == ["A3_0", "A2_0", "A1_1", "A1_0"]
+    assert (
+        decode_property_map(result) == expected == {"comment-id": {"A1_0": "1", "A1_1": "1", "A2_0": "2", "A3_0": "3"}}
+    )
+
+
+def test_aggregation_categorical_property_map_decodes_to_default_mapping(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+    result_path = output_dir / "hierarchical_result.json"
+    step_config = {"hidden_properties": {"comment-id": []}}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+    expected = json.loads(result_path.read_text(encoding="utf-8"))["propertyMap"]
+
+    step_config = {**step_config, "property_map_encoding": "categorical", "sharded_output": True}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+
+    result = json.loads(result_path.read_text(encoding="utf-8"))
+    assert result["propertyMapEncoding"] == "categorical"
+    assert result["propertyMap"] == {"comment-id": {"values": ["1", "2", "3"], "codes": [0, 0, 1, 2]}}
+    assert decode_property_map(result) == expected
+
+    # シャードには値の辞書とシャード内の意見に対応するコードだけが入る
+    shard_dir = output_dir / SHARD_DIRNAME
+    manifest = json.loads((shard_dir / MANIFEST_FILENAME).read_text(encoding="utf-8"))
+    assert manifest["propertyMapEncoding"] == "categorical"
+    shard = json.loads((shard_dir / manifest["shards"]["arguments"][1]["file"]).read_text(encoding="utf-8"))
+    assert shard["propertyMap"] == {"comment-id": {"values": ["1", "2", "3"], "codes": [1, 2]}}
+    assert decode_property_map(shard) == {"comment-id": {"A2_0": "2", "A3_0": "3"}}
+
+    # ストリーミング形式でも同じ内容になる
+    step_config = {**step_config, "sharded_output": False, "streaming_output": True}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config)) is True
+    assert is_streamed_result(result_path)
+    assert json.loads(result_path.read_text(encoding="utf-8"))["propertyMap"] == result["propertyMap"]
+
+
+def test_aggregation_low_memory_mode_matches_default_output(tmp_path):
+    output_dir = _write_inputs(tmp_path)
+    result_path = output_dir / "hierarchical_result.json"
+    step_config = {"hidden_properties": {"comment-id": []}}
+    assert hierarchical_aggregation(_config(tmp_path, hierarchical_aggregation=step_config, is_pubcom=True)) is True
+    expected = json.loads(result_path.read_text(encoding="utf-8"))
+    expected_table = pl.read_parquet(output_dir / ARGUMENTS_TABLE_FILENAME)
+    expected_stats = pl.read_parquet(output_dir / ATTRIBUTE_STATS_FILENAME)
+    expected_final = pl.read_csv(output_dir / "final_result_with_comments.csv").sort("arg_id")
+
+    config = _config(tmp_path, hierarchical_aggregation=step_config, is_pubcom=True, low_memory=True)
+    assert hierarchical_aggregation(config) is True
+
+    # 低メモリモードでは常にバッチごとに書き出す
+    assert is_streamed_result(result_path)
+    expected["config"]["low_memory"] = True
+    assert json.loads(result_path.read_text(encoding="utf-8")) == expected
+    assert pl.read_parquet(output_dir / ARGUMENTS_TABLE_FILENAME).equals(expected_table)
+    assert pl.read_parquet(output_dir / ATTRIBUTE_STATS_FILENAME).equals(expected_stats)
+    assert pl.read_csv(output_dir / "final_result_with_comments.csv").sort("arg_id").equals(expected_final)
+    # spill したファイルは残さない
+    assert not (output_dir / SPILL_DIRNAME).exists()
+
+
+def test_aggregation_fails_when_memory_budget_is_exceeded(monkeypatch, tmp_path):
+    output_dir = _write_inputs(tmp_path)
+    monkeypatch.setattr("analysis_core.core.memory.current_rss_mb", lambda: 4096.0)
+
+    assert hierarchical_aggregation(_config(tmp_path, memory_budget_mb=1024)) is False
+    assert not (output_dir / "hierarchical_result.json").exists()
+    assert not (output_dir / SPILL_DIRNAME).exists()
@@ -1,10 +1,19 @@
 """Tests for derived layout generation."""
 
 import json
+import os
 import pickle
+import time
 from pathlib import Path
 
-from analysis_core.steps.hierarchical_layout_generation import hierarchical_layout_generation
+import numpy as np
+import pytest
+
+from analysis_core.steps.hierarchical_layout_generation import (
+    _group_indices_by_cluster,
+    _resolve_center_overlaps,
+    hierarchical_layout_generation,
+)
 
 
 def _result_payload() -> dict:
@@ -76,3 +85,130 @@ def test_preserves_embedding_layout_as_default_when_semantic_disabled(tmp_path:
     updated = json.loads(result_path.read_text(encoding="utf-8"))
     assert updated["default_layout_id"] == "embedding_umap"
     assert set(updated["layouts"]) == {"embedding_umap"}
+
+
+def _write_multi_level_run(tmp_path: Path) -> Path:
+    run_dir = tmp_path / "demo"
+    run_dir.mkdir()
+    rng = np.random.default_rng(2)
+    payload = _result_payload()
+    payload["arguments"] = []
+    embeddings = []
+    for i in range(24):
+        parent = f"g{i % 3 + 1}"
+        payload["arguments"].append(
+            {"arg_id": f"a{i}", "x": 0.0, "y": 0.0, "cluster_ids": ["0", parent, f"{parent}-{i % 2 + 1}"]}
+        )
+        embeddings.append({"arg-id": f"a{i}", "embedding": (rng.normal(size=4) + i % 3).tolist()})
+    (run_dir / "hierarchical_result.json").write_text(json.dumps(payload), encoding="utf-8")
+    with open(run_dir / "embeddings.pkl", "wb") as fh:
+        pickle.dump(embeddings, fh)
+    return run_dir
+
+
+def test_generates_island_layouts_for_every_level(tmp_path: Path) -> None:
+    run_dir = _write_multi_level_run(tmp_path)
+    config = {"output_dir": "demo", "_output_base_dir": str(tmp_path)}
+
+    hierarchical_layout_generation(
+        {**config, "layout_generation": {"semantic_island_map": {"all_levels": True, "workers": 2}}}
+    )
+    layouts = json.loads((run_dir / "hierarchical_result.json").read_text(encoding="utf-8"))["layouts"]
+
+    assert set(layouts) == {"embedding_umap", "semantic_island_map", "semantic_island_map_level_1"}
+    level_1 = layouts["semantic_island_map_level_1"]
+    assert level_1["meta"]["level"] == 1
+    assert layouts["semantic_island_map"]["meta"]["level"] == 2
+    assert {cid: cluster["count"] for cid, cluster in level_1["clusters"].items()} == {"g1": 8, "g2": 8, "g3": 8}
+    assert len(layouts["semantic_island_map"]["clusters"]) == 6
+
+    # 最下層のレイアウトは全階層を計算しても、プロセスプールを使っても変わらない
+    hierarchical_layout_generation({**config, "layout_generation": {}})
+    deepest_only = json.loads((run_dir / "hierarchical_result.json").read_text(encoding="utf-8"))["layouts"]
+    assert "semantic_island_map_level_1" in deepest_only  # 既存のレイアウトは残る
+    for arg_id, point in deepest_only["semantic_island_map"]["points"].items():
+        assert point == pytest.approx(layouts["semantic_island_map"]["points"][arg_id])
+
+
+def _reference_resolve_center_overlaps(centers: np.ndarray, radii: np.ndarray, steps: int = 180) -> np.ndarray:
+    """The original pairwise loop, kept here as the reference for the vectorized solver."""
+    centers = [center.astype(np.float64).copy() for center in centers]
+    original = [center.copy() for center in centers]
+    for _ in range(steps):
+        forces = [np.zeros(2, dtype=np.float64) for _ in centers]
+        for i in range(len(centers)):
+            for j in range(i + 1, len(centers)):
+                delta = centers[j] - centers[i]
+                dist = np.linalg.norm(delta) or 1e-6
+                direction = delta / dist
+                min_gap = radii[i] + radii[j] + 0.6
+                if dist < min_gap:
+                    push = (min_gap - dist) * 0.18
+                    forces[i] -= direction * push
+                    forces[j] += direction * push
+        for i in range(len(centers)):
+            forces[i] += (original[i] - centers[i]) * 0.01
+            centers[i] += np.clip(forces[i], -0.25, 0.25)
+    return np.vstack(centers)
+
+
+def test_group_indices_by_cluster_keeps_first_appearance_order() -> None:
+    clusters, indices = _group_indices_by_cluster(["c2", "c1", "c2", "c3", "c1"])
+
+    assert clusters == ["c2", "c1", "c3"]
+    assert [idx.tolist() for idx in indices] == [[0, 2], [1, 4], [3]]
+
+
+def test_resolve_center_overlaps_matches_pairwise_reference() -> None:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=2.0, size=(40, 2))
+    centers[1] = centers[0]  # 同じ位置の島は押し出されない
+    radii = 0.5 + rng.random(40)
+
+    expected = _reference_resolve_center_overlaps(centers, radii)
+
+    np.testing.assert_allclose(_resolve_center_overlaps(centers, radii), expected, atol=1e-9)
+    np.testing.assert_allclose(
+        _resolve_center_overlaps(centers, radii, neighbor_search_threshold=0), expected, atol=1e-9
+    )
+
+
+def test_resolve_center_overlaps_handles_a_thousand_clusters() -> None:
+    rng = np.random.default_rng(1)
+    centers = rng.normal(scale=25.0, size=(1000, 2))
+    radii = 0.6 + rng.random(1000)
+
+    resolved = _resolve_center_overlaps(centers, radii)
+
+    # 近傍探索を使う経路と全ペアを比較する経路が同じ結果になる
+    np.testing.assert_allclose(
+        _resolve_center_overlaps(centers, radii, steps=10),
+        _resolve_center_overlaps(centers, radii, steps=10, neighbor_search_threshold=10_000),
+        atol=1e-9,
+    )
+    assert resolved.shape == (1000, 2)
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not os.getenv("ANALYSIS_CORE_BENCHMARK"), reason="set ANALYSIS_CORE_BENCHMARK=1 to run")
+def test_benchmark_resolve_center_overlaps_at_a_thousand_clusters() -> None:
+    """K=1000 で全ペアの経路と近傍探索の経路の実行時間を比べる (``ANALYSIS_CORE_BENCHMARK=1 pytest -s -m benchmark``)"""
+    rng = np.random.default_rng(1)
+    centers = rng.normal(scale=25.0, size=(1000, 2))
+    radii = 0.6 + rng.random(1000)
+
+    def timed(func, *args, **kwargs) -> float:
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        return time.perf_counter() - started
+
+    # 元の二重ループは 180 ステップだと数分かかるため、1 ステップを計測して換算する
+    reference = timed(_reference_resolve_center_overlaps, centers, radii, steps=1) * 180
+    all_pairs = timed(_resolve_center_overlaps, centers, radii, neighbor_search_threshold=10_000)
+    neighbor_search = timed(_resolve_center_overlaps, centers, radii)
+    print(
+        f"\nK=1000, 180 steps: original loop ~{reference:.1f}s, "
+        f"all pairs {all_pairs:.2f}s, neighbor search {neighbor_search:.2f}s"
+    )
+
+    assert neighbor_search < all_pairs < reference
@@ -0,0 +1,156 @@
+"""Tests for the hierarchical overview step."""
+
+import importlib
+
+import polars as pl
+
+from analysis_core.core.utils import estimate_tokens
+from analysis_core.prompts import OVERVIEW_MAP_PROMPT
+
+
+def _write_merge_labels(output_dir):
+    pl.DataFrame(
+        {
+            "level": [1, 1, 2, 2, 2],
+            "id": ["1_0", "1_1", "2_0", "2_1", "2_2"],
+            "label": ["交通", "公園", "電車", "バス", "緑地"],
+            "description": ["交通の意見" * 10, "公園の意見" * 10, "電車の本数", "バスの路線", "緑を増やす"],
+            "value": [6, 4, 3, 3, 4],
+            "parent": ["0", "0", "1_0", "1_0", "1_1"],
+        }
+    ).write_csv(output_dir / "hierarchical_merge_labels.csv")
+
+
+def _config(tmp_path, **overview_options):
+    return {
+        "output_dir": "demo",
+        "_output_base_dir": str(tmp_path / "outputs"),
+        "provider": "local",
+        "hierarchical_overview": {"prompt": "summarise", "model": "dummy-model", **overview_options},
+    }
+
+
+def _fake_llm(calls, prompts=None, summary_suffix=""):
+    def fake_request_to_chat_ai(**kwargs):
+        calls.append(kwargs["messages"][1]["content"])
+        if prompts is not None:
+            prompts.append(kwargs["messages"][0]["content"])
+        return {"summary": f"summary-{len(calls)}{summary_suffix}"}, 10, 5, 15
+
+    return fake_request_to_chat_ai
+
+
+def test_overview_uses_single_request_by_default(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_overview")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_merge_labels(output_dir)
+    calls = []
+    monkeypatch.setattr(step, "request_to_chat_ai", _fake_llm(calls))
+
+    config = _config(tmp_path)
+    step.hierarchical_overview(config)
+
+    assert len(calls) == 1
+    assert "# Cluster 0/2: 交通" in calls[0]
+    assert "電車" not in calls[0]
+    assert (output_dir / "hierarchical_overview.txt").read_text() == "summary-1"
+    assert config["total_token_usage"] == 15
+
+
+def test_overview_map_reduce_summarises_subtrees_then_reduces(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_overview")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_merge_labels(output_dir)
+    calls = []
+    prompts = []
+    monkeypatch.setattr(step, "request_to_chat_ai", _fake_llm(calls, prompts))
+
+    config = _config(tmp_path, map_reduce=True, target_level=2, max_input_tokens=20, workers=2)
+    step.hierarchical_overview(config)
+
+    # 部分木ごとに1回ずつ map し、最後に1回 reduce する
+    assert len(calls) == 3
+    # map は部分要約用のプロンプト、最後の要約だけが全体要約のプロンプトを使う
+    assert prompts == [OVERVIEW_MAP_PROMPT, OVERVIEW_MAP_PROMPT, "summarise"]
+    transport_input = next(text for text in calls[:2] if text.startswith("# 交通"))
+    park_input = next(text for text in calls[:2] if text.startswith("# 公園"))
+    assert "電車" in transport_input and "バス" in transport_input and "緑地" not in transport_input
+    assert "緑地" in park_input
+    assert "Partial summary" in calls[2]
+    assert (output_dir / "hierarchical_overview.txt").read_text() == "summary-3"
+    assert config["total_token_usage"] == 45
+
+
+def test_overview_target_level_is_clamped_to_available_levels(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_overview")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_merge_labels(output_dir)
+    calls = []
+    monkeypatch.setattr(step, "request_to_chat_ai", _fake_llm(calls))
+
+    step.hierarchical_overview(_config(tmp_path, target_level=5))
+
+    assert len(calls) == 1
+    assert "緑地" in calls[0]
+
+
+def test_overview_map_reduce_uses_configured_map_prompt(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_overview")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_merge_labels(output_dir)
+    calls = []
+    prompts = []
+    monkeypatch.setattr(step, "request_to_chat_ai", _fake_llm(calls, prompts))
+
+    step.hierarchical_overview(
+        _config(tmp_path, map_reduce=True, target_level=2, max_input_tokens=20, map_prompt="summarise part")
+    )
+
+    assert prompts == ["summarise part", "summarise part", "summarise"]
+
+
+def test_overview_map_reduce_splits_oversize_subtrees_by_child_cluster(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_overview")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    children = [f"2_{i}" for i in range(12)]
+    pl.DataFrame(
+        {
+            "level": [1] + [2] * len(children),
+            "id": ["1_0", *children],
+            "label": ["交通", *[f"路線{i}" for i in range(len(children))]],
+            "description": ["交通の意見", *[f"路線{i}の本数を増やしてほしい" * 3 for i in range(len(children))]],
+            "value": [len(children), *[1] * len(children)],
+            "parent": ["0", *["1_0"] * len(children)],
+        }
+    ).write_csv(output_dir / "hierarchical_merge_labels.csv")
+    calls = []
+    monkeypatch.setattr(step, "request_to_chat_ai", _fake_llm(calls))
+
+    step.hierarchical_overview(_config(tmp_path, map_reduce=True, target_level=2, max_input_tokens=60))
+
+    map_inputs = [text for text in calls if text.startswith("# 交通")]
+    assert len(map_inputs) > 1
+    assert all(estimate_tokens(text) <= 60 for text in calls)
+    # 子クラスタは分割されたどれか1つのリクエストに含まれる
+    for i in range(len(children)):
+        assert sum(f"## 路線{i}\n" in text for text in map_inputs) == 1
+
+
+def test_overview_map_reduce_stays_within_budget_when_summaries_do_not_shrink(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_overview")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_merge_labels(output_dir)
+    calls = []
+    # 要約が入力より長く、2つの要約を1リクエストに詰められない
+    monkeypatch.setattr(step, "request_to_chat_ai", _fake_llm(calls, summary_suffix="長い要約" * 20))
+
+    step.hierarchical_overview(_config(tmp_path, map_reduce=True, target_level=2, max_input_tokens=20))
+
+    assert len(calls) == 3
+    assert all(estimate_tokens(text) <= 20 for text in calls)
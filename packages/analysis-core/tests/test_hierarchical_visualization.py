@@ -1,5 +1,7 @@
 """Tests for the self-contained HTML report visualization step."""
 
+import base64
+import gzip
 import json
 from pathlib import Path
 
@@ -46,6 +48,49 @@ def _minimal_payload() -> dict:
     }
 
 
+def _large_payload(n_args: int = 300) -> dict:
+    """Two-level payload with uneven leaf clusters for the decimated mode."""
+    leaves = [("2_1", "1_1", 200), ("2_2", "1_1", 90), ("2_3", "1_2", 10)]
+    arguments = []
+    for leaf, parent, count in leaves:
+        for i in range(count * n_args // 300):
+            arguments.append(
+                {
+                    "arg_id": f"{leaf}-{i}",
+                    "argument": f"argument {leaf} {i}",
+                    "comment_id": str(len(arguments)),
+                    "x": float(i % 17),
+                    "y": float(i % 11) + (10 if parent == "1_2" else 0),
+                    "cluster_ids": ["0", parent, leaf],
+                    "url": None,
+                }
+            )
+    return {
+        "config": {"name": "large report", "question": "what?"},
+        "overview": "",
+        "comment_num": len(arguments),
+        "arguments": arguments,
+        "propertyMap": {"age": {a["arg_id"]: 20 for a in arguments}},
+        "clusters": [
+            {"id": "0", "level": 0, "label": "root", "value": len(arguments), "parent": "", "takeaway": ""},
+            {"id": "1_1", "level": 1, "label": "first", "value": 290, "parent": "0", "takeaway": ""},
+            {"id": "1_2", "level": 1, "label": "second", "value": 10, "parent": "0", "takeaway": ""},
+            *[
+                {"id": leaf, "level": 2, "label": f"leaf {leaf}", "value": count, "parent": parent, "takeaway": ""}
+                for leaf, parent, count in leaves
+            ],
+        ],
+    }
+
+
+def _embedded_data(out: str, element_id: str = "report-data") -> dict:
+    start = out.index(f'<script id="{element_id}"')
+    tag, body = out[start : out.index("</script>", start)].split(">", 1)
+    if 'data-encoding="gzip+base64"' in tag:
+        return json.loads(gzip.decompress(base64.b64decode(body)))
+    return json.loads(body)
+
+
 class TestBuildHtml:
     def test_returns_full_html_document(self) -> None:
         out = build_html(_minimal_payload())
@@ -145,6 +190,103 @@ class TestBuildHtml:
         assert "</script> second" not in out
 
 
+    def test_small_reports_are_not_decimated(self) -> None:
+        out = build_html(_large_payload(), max_points=1000)
+
+        data = _embedded_data(out)
+        assert len(data["arguments"]) == 300
+        assert "decimation" not in data
+        assert 'id="cluster-args-' not in out
+        assert "argument 2_1 0" in out
+
+    def test_large_reports_embed_stratified_sample_and_density_tiles(self) -> None:
+        out = build_html(_large_payload(), max_points=30)
+
+        data = _embedded_data(out)
+        sampled_leaves = [a["cluster_ids"][-1] for a in data["arguments"]]
+        assert {leaf: sampled_leaves.count(leaf) for leaf in set(sampled_leaves)} == {"2_1": 20, "2_2": 9, "2_3": 1}
+        assert data["decimation"]["total"] == 300
+        assert data["decimation"]["sampled"] == 30
+        assert "propertyMap" not in data
+        # Density tiles cover every argument at every level
+        for level in ("1", "2"):
+            assert sum(tile[2] for tile in data["decimation"]["density"][level]) == 300
+        assert {tile[3] for tile in data["decimation"]["density"]["1"]} == {"1_1", "1_2"}
+
+        # Leaf clusters get an empty list backed by a lazily parsed JSON block
+        assert out.count('id="cluster-args-') == 3
+        assert '<ul class="args" data-detail="2" data-cluster="2_3"></ul>' in out
+        assert [a["arg_id"] for a in _embedded_data(out, "cluster-args-2")] == [f"2_3-{i}" for i in range(10)]
+        # The O(n^2) MST views start switched off
+        assert 'id="show-mst" checked' not in out
+        assert 'id="use-mst-layout" checked' not in out
+
+    def test_decimated_layout_catalog_keeps_only_sampled_points(self) -> None:
+        payload = _large_payload()
+        payload["layouts"] = {
+            "semantic_island_map": {
+                "kind": "cluster_first",
+                "points": {a["arg_id"]: {"x": 100.0, "y": 100.0} for a in payload["arguments"]},
+            },
+            "embedding_umap": {"kind": "point_layout", "points": {}},
+        }
+        payload["default_layout_id"] = "semantic_island_map"
+
+        data = _embedded_data(build_html(payload, max_points=30))
+
+        assert list(data["layouts"]) == ["semantic_island_map"]
+        assert set(data["layouts"]["semantic_island_map"]["points"]) == {a["arg_id"] for a in data["arguments"]}
+        assert data["decimation"]["density"]["1"][0][:2] == [100.0, 100.0]
+
+    def test_decimated_layout_catalog_skips_arguments_missing_from_the_layout(self) -> None:
+        payload = _large_payload()
+        payload["layouts"] = {
+            "semantic_island_map": {
+                "kind": "cluster_first",
+                "points": {a["arg_id"]: {"x": 100.0, "y": 100.0} for a in payload["arguments"][1:]},
+            },
+        }
+        payload["default_layout_id"] = "semantic_island_map"
+
+        data = _embedded_data(build_html(payload, max_points=30))
+
+        assert data["arguments"][0]["arg_id"] == "2_1-0"
+        assert "2_1-0" not in data["layouts"]["semantic_island_map"]["points"]
+
+    def test_sample_never_exceeds_max_points_with_many_small_clusters(self) -> None:
+        payload = _large_payload()
+        for i, argument in enumerate(payload["arguments"][:100]):
+            argument["cluster_ids"] = ["0", "1_1", f"2_small_{i // 2}"]
+
+        data = _embedded_data(build_html(payload, max_points=80))
+
+        sampled_leaves = {a["cluster_ids"][-1] for a in data["arguments"]}
+        assert data["decimation"]["sampled"] == len(data["arguments"]) == 80
+        assert {f"2_small_{i}" for i in range(50)} <= sampled_leaves
+
+
+    def test_compressed_payload_round_trips_and_logs_sizes(self, capsys: pytest.CaptureFixture[str]) -> None:
+        payload = _large_payload()
+
+        out = build_html(payload, max_points=30, compress=True)
+
+        assert '<script id="report-data" type="application/octet-stream" data-encoding="gzip+base64">' in out
+        assert '<script id="report-data" type="application/json">' not in out
+        assert 'new DecompressionStream("gzip")' in out
+        assert _embedded_data(out)["decimation"]["total"] == 300
+        assert len(_embedded_data(out, "cluster-args-0")) == 200
+        assert "embedded payload:" in capsys.readouterr().out
+        # Deterministic output for the same input
+        assert build_html(payload, max_points=30, compress=True) == out
+
+    def test_compressed_report_renders_argument_lists_on_demand(self) -> None:
+        out = build_html(_large_payload(), max_points=None, compress=True)
+
+        assert '<ul class="args" data-cluster="2_1"></ul>' in out
+        assert "argument 2_1 0" not in out
+        assert len(_embedded_data(out)["arguments"]) == 300
+
+
 class TestHierarchicalVisualizationStep:
     def test_writes_report_html_next_to_input(self, tmp_path: Path) -> None:
         # Arrange: synthesize the minimum file the step expects.
@@ -1,7 +1,42 @@
 """Test that all package modules can be imported correctly."""
 
+import inspect
+import json
 import re
+import subprocess
 import sys
+from pathlib import Path
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+# CLI の起動 (--dry-run / --validate-config) で import してはいけない重い依存
+HEAVY_MODULES = {
+    "polars",
+    "numpy",
+    "pydantic",
+    "tqdm",
+    "openai",
+    "google.genai",
+    "umap",
+    "sklearn",
+    "scipy",
+    "sentence_transformers",
+}
+# ``import analysis_core`` にかかる時間の上限 (マイクロ秒)。手元では 150ms 程度
+IMPORT_TIME_BUDGET_US = 350_000
+
+
+def _importtime(args: list[str], cwd: Path = PACKAGE_ROOT) -> dict[str, int]:
+    """``python -X importtime`` を実行し、モジュール名から累積 import 時間 (マイクロ秒) への辞書を返す"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], capture_output=True, text=True, cwd=cwd, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
 
 
 class TestCoreImports:
@@ -181,6 +216,48 @@ class TestStepImports:
         assert len(steps) == 9
 
 
+class TestImportTime:
+    """Regression benchmark for CLI startup (``python -X importtime``)."""
+
+    def test_package_import_stays_within_budget(self):
+        cumulative = _importtime(["-c", "import analysis_core.__main__"])
+
+        assert not HEAVY_MODULES & cumulative.keys()
+        assert cumulative["analysis_core"] < IMPORT_TIME_BUDGET_US
+
+    def test_preflight_commands_do_not_import_step_dependencies(self, tmp_path):
+        config_path = tmp_path / "config.json"
+        config_path.write_text(json.dumps({"input": "test", "question": "Q?", "provider": "openai"}))
+        input_dir = tmp_path / "inputs"
+        input_dir.mkdir()
+        (input_dir / "test.csv").write_text("comment-id,comment-body\n1,test\n", encoding="utf-8")
+
+        for flag in ("--dry-run", "--validate-config", "--validate-input"):
+            cumulative = _importtime(
+                [
+                    "-m",
+                    "analysis_core",
+                    "--config",
+                    str(config_path),
+                    flag,
+                    "--input-dir",
+                    str(input_dir),
+                    "--output-dir",
+                    str(tmp_path / "outputs"),
+                ]
+            )
+            imported = {name for name in cumulative if name.startswith("analysis_core.steps.")}
+            assert not HEAVY_MODULES & cumulative.keys(), flag
+            assert not imported, flag
+
+    def test_step_source_without_import_matches_inspect(self):
+        """Source recorded for change detection must not change when it is read without importing."""
+        import analysis_core.steps as steps_module
+
+        for name in steps_module.__all__:
+            assert steps_module.get_step_source(name) == inspect.getsource(getattr(steps_module, name)), name
+
+
 class TestConfigModule:
     """Test configuration module."""
 
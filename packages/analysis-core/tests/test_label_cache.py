@@ -0,0 +1,171 @@
+"""Tests for the cluster label cache used by the labelling steps."""
+
+import importlib
+
+import polars as pl
+
+from analysis_core.core.label_cache import LABEL_CACHE_FILENAME, LabelCache, build_label_cache_key
+
+
+def _write_clusters(output_dir):
+    pl.DataFrame(
+        {
+            "arg-id": ["A1_0", "A2_0", "A3_0", "A4_0"],
+            "argument": ["電車を増やしてほしい", "バスの本数が足りない", "公園を増やしてほしい", "緑を増やしたい"],
+            "x": [0.0, 0.1, 1.0, 1.1],
+            "y": [0.0, 0.1, 1.0, 1.1],
+            "cluster-level-1-id": ["1_0", "1_0", "1_0", "1_0"],
+            "cluster-level-2-id": ["2_0", "2_0", "2_1", "2_1"],
+        }
+    ).write_csv(output_dir / "hierarchical_clusters.csv")
+
+
+def _labelling_config(tmp_path, step, **overrides):
+    return {
+        "output_dir": "demo",
+        "_output_base_dir": str(tmp_path / "outputs"),
+        "provider": "local",
+        step: {"sampling_num": 3, "prompt": "label", "model": "dummy-model", "workers": 1, **overrides},
+    }
+
+
+def test_cache_key_ignores_member_order_and_tracks_prompt_and_texts():
+    members = [("a2", "text2"), ("a1", "text1")]
+    key = build_label_cache_key(step="s", prompt="p", provider="openai", model="m", members=members)
+
+    assert key == build_label_cache_key(step="s", prompt="p", provider="openai", model="m", members=members[::-1])
+    assert key != build_label_cache_key(step="s", prompt="p2", provider="openai", model="m", members=members)
+    assert key != build_label_cache_key(step="s", prompt="p", provider="azure", model="m", members=members)
+    assert key != build_label_cache_key(step="s", prompt="p", provider="openai", model="m2", members=members)
+    # 抽出をやり直して同じ arg-id に別の本文が入った場合
+    assert key != build_label_cache_key(
+        step="s", prompt="p", provider="openai", model="m", members=[("a2", "changed"), ("a1", "text1")]
+    )
+
+
+def test_initial_labelling_reuses_cached_labels_on_rerun(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_initial_labelling")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_clusters(output_dir)
+
+    calls = []
+
+    def fake_request_to_chat_ai(**kwargs):
+        calls.append(kwargs)
+        return {"label": f"label-{len(calls)}", "description": "desc"}, 1, 1, 2
+
+    monkeypatch.setattr(step, "request_to_chat_ai", fake_request_to_chat_ai)
+
+    step.hierarchical_initial_labelling(_labelling_config(tmp_path, "hierarchical_initial_labelling"))
+    first = pl.read_parquet(output_dir / "hierarchical_initial_labels.parquet")
+    assert len(calls) == 2
+    assert (output_dir / LABEL_CACHE_FILENAME).exists()
+
+    # sampling_num だけを変えた再実行ではLLMを呼ばない
+    config = _labelling_config(tmp_path, "hierarchical_initial_labelling", sampling_num=1)
+    step.hierarchical_initial_labelling(config)
+    second = pl.read_parquet(output_dir / "hierarchical_initial_labels.parquet")
+
+    assert len(calls) == 2
+    assert config["total_token_usage"] == 0
+    assert first.sort("arg-id").equals(second.sort("arg-id"))
+
+    # プロンプトが変わればキャッシュは使われない
+    step.hierarchical_initial_labelling(_labelling_config(tmp_path, "hierarchical_initial_labelling", prompt="new"))
+    assert len(calls) == 4
+
+    # 抽出をやり直して arg-id は同じまま本文が変わったクラスタだけ LLM を呼ぶ
+    clusters = pl.read_csv(output_dir / "hierarchical_clusters.csv")
+    clusters.with_columns(
+        pl.when(pl.col("arg-id") == "A1_0")
+        .then(pl.lit("駅を新しくしてほしい"))
+        .otherwise(pl.col("argument"))
+        .alias("argument")
+    ).write_csv(output_dir / "hierarchical_clusters.csv")
+    step.hierarchical_initial_labelling(_labelling_config(tmp_path, "hierarchical_initial_labelling", prompt="new"))
+    assert len(calls) == 5
+
+
+def test_initial_labelling_can_disable_cache(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_initial_labelling")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_clusters(output_dir)
+
+    calls = []
+
+    def fake_request_to_chat_ai(**kwargs):
+        calls.append(kwargs)
+        return {"label": "label", "description": "desc"}, 1, 1, 2
+
+    monkeypatch.setattr(step, "request_to_chat_ai", fake_request_to_chat_ai)
+
+    config = _labelling_config(tmp_path, "hierarchical_initial_labelling", use_cache=False)
+    step.hierarchical_initial_labelling(config)
+    step.hierarchical_initial_labelling(config)
+
+    assert len(calls) == 4
+    assert not (output_dir / LABEL_CACHE_FILENAME).exists()
+
+
+def test_merge_labelling_reuses_cached_labels_on_rerun(tmp_path, monkeypatch):
+    step = importlib.import_module("analysis_core.steps.hierarchical_merge_labelling")
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    _write_clusters(output_dir)
+    clusters = pl.read_csv(output_dir / "hierarchical_clusters.csv")
+    clusters.with_columns(
+        pl.col("cluster-level-2-id").alias("cluster-level-2-label"),
+        pl.lit("説明").alias("cluster-level-2-description"),
+    ).write_csv(output_dir / "hierarchical_initial_labels.csv")
+
+    calls = []
+
+    def fake_request_to_chat_ai(**kwargs):
+        calls.append(kwargs)
+        return {"label": "交通と公園", "description": "まとめ"}, 1, 1, 2
+
+    monkeypatch.setattr(step, "request_to_chat_ai", fake_request_to_chat_ai)
+
+    step.hierarchical_merge_labelling(_labelling_config(tmp_path, "hierarchical_merge_labelling"))
+    assert len(calls) == 1
+
+    step.hierarchical_merge_labelling(_labelling_config(tmp_path, "hierarchical_merge_labelling", sampling_num=2))
+    assert len(calls) == 1
+
+    labels = pl.read_parquet(output_dir / "hierarchical_merge_labels.parquet")
+    assert labels.filter(pl.col("level") == 1)["label"].to_list() == ["交通と公園"]
+
+
+def test_label_cache_ignores_corrupt_file(tmp_path):
+    path = tmp_path / LABEL_CACHE_FILENAME
+    path.write_text("{not json", encoding="utf-8")
+
+    cache = LabelCache(path)
+    assert cache.get("missing") is None
+
+    cache.set("key", "label", "description")
+    cache.save()
+    assert LabelCache(path).get("key") == {"label": "label", "description": "description"}
+
+
+def test_label_cache_prunes_unused_entries_of_its_own_step(tmp_path):
+    path = tmp_path / LABEL_CACHE_FILENAME
+    initial = LabelCache(path, step="initial")
+    initial.set("old", "old", "old")
+    initial.set("kept", "kept", "kept")
+    initial.save()
+    merge = LabelCache(path, step="merge")
+    merge.set("merge", "merge", "merge")
+    merge.save()
+
+    rerun = LabelCache(path, step="initial")
+    assert rerun.get("merge") is None
+    assert rerun.get("kept") == {"label": "kept", "description": "kept"}
+    rerun.save(prune=True)
+
+    reloaded = LabelCache(path, step="initial")
+    assert reloaded.get("old") is None
+    assert reloaded.get("kept") is not None
+    assert LabelCache(path, step="merge").get("merge") is not None
@@ -149,8 +149,8 @@ def test_llm_grouping_step_creates_viewer_compatible_outputs(tmp_path, monkeypat
 
     llm_grouping_step.llm_grouping(config)
 
-    clusters = pl.read_csv(output_dir / "hierarchical_clusters.csv")
-    labels = pl.read_csv(output_dir / "hierarchical_merge_labels.csv")
+    clusters = pl.read_parquet(output_dir / "hierarchical_clusters.parquet")
+    labels = pl.read_parquet(output_dir / "hierarchical_merge_labels.parquet")
 
     assert clusters.columns == ["arg-id", "argument", "x", "y", "cluster-level-1-id"]
     assert clusters["cluster-level-1-id"].to_list() == ["g1", "g1", "g2"]
@@ -228,3 +228,217 @@ def test_assign_groups_uses_safe_batch_size_for_non_positive_input(monkeypatch):
 
     assert assignments == {"a1": "g1", "a2": "g1"}
     assert len(captured_messages) == 2
+
+
+def test_assign_groups_requeues_missing_and_invalid_ids_individually(monkeypatch):
+    """Concurrent batches should re-queue omitted or invalid arg-ids one by one and keep input order."""
+    llm_grouping_step = importlib.import_module("analysis_core.steps.llm_grouping")
+
+    requested_batches = []
+
+    def fake_request_to_chat_ai(**kwargs):
+        lines = kwargs["messages"][1]["content"].split("意見一覧:\n")[1].splitlines()
+        batch_ids = [line[2:].split(":")[0] for line in lines]
+        requested_batches.append(batch_ids)
+        if len(batch_ids) == 1:
+            return {"assignments": [{"arg_id": batch_ids[0], "group_id": "g2"}]}, 1, 1, 2
+        # a2 は欠落し、a3 は未知のグループに割り当てられる
+        assignments = [{"arg_id": arg_id, "group_id": "g1"} for arg_id in batch_ids if arg_id != "a2"]
+        assignments = [
+            {"arg_id": item["arg_id"], "group_id": "g9" if item["arg_id"] == "a3" else "g1"} for item in assignments
+        ]
+        return {"assignments": assignments}, 1, 1, 2
+
+    monkeypatch.setattr(llm_grouping_step, "request_to_chat_ai", fake_request_to_chat_ai)
+
+    groups = [
+        llm_grouping_step.GroupDefinition(group_id="g1", label="交通", description="公共交通"),
+        llm_grouping_step.GroupDefinition(group_id="g2", label="公園", description="公園整備"),
+    ]
+    config = {}
+    assignments = llm_grouping_step._assign_groups(
+        arg_ids=["a1", "a2", "a3", "a4", "a5"],
+        arguments=["電車", "バス", "公園", "道路", "広場"],
+        groups=groups,
+        batch_size=2,
+        prompt="assign",
+        model="dummy-model",
+        provider="local",
+        local_llm_address=None,
+        config=config,
+        workers=3,
+    )
+
+    assert list(assignments) == ["a1", "a2", "a3", "a4", "a5"]
+    assert assignments == {"a1": "g1", "a2": "g2", "a3": "g2", "a4": "g1", "a5": "g2"}
+    assert sorted(batch for batch in requested_batches if len(batch) == 1) == [["a2"], ["a3"], ["a5"]]
+    assert config["total_token_usage"] == 2 * len(requested_batches)
+
+
+def test_llm_grouping_hybrid_mode_sends_only_uncertain_arguments_to_llm(tmp_path, monkeypatch):
+    """Hybrid mode should assign confident arguments by embedding similarity and ask the LLM for the rest."""
+    llm_grouping_step = importlib.import_module("analysis_core.steps.llm_grouping")
+
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    pl.DataFrame(
+        {
+            "arg-id": ["a1", "a2", "a3"],
+            "argument": ["電車を増やしてほしい", "公園を増やしてほしい", "駅前に公園がほしい"],
+        }
+    ).write_csv(output_dir / "args.csv")
+    with open(output_dir / "embeddings.pkl", "wb") as f:
+        pickle.dump(
+            [
+                {"arg-id": "a1", "embedding": [1.0, 0.0]},
+                {"arg-id": "a2", "embedding": [0.0, 1.0]},
+                {"arg-id": "a3", "embedding": [0.7, 0.71]},
+            ],
+            f,
+        )
+
+    class FakeUMAP:
+        def __init__(self, n_components, n_neighbors):
+            pass
+
+        def fit_transform(self, embeddings):
+            return np.asarray(embeddings)
+
+    monkeypatch.setattr(llm_grouping_step, "_load_clustering_dependencies", lambda: (FakeUMAP, None, None))
+    monkeypatch.setattr(llm_grouping_step, "request_to_embed", lambda texts, *args, **kwargs: [[1.0, 0.0], [0.0, 1.0]])
+
+    assignment_messages = []
+
+    def fake_request_to_chat_ai(**kwargs):
+        if kwargs["json_schema"] is llm_grouping_step.GroupDiscoveryResponse:
+            return (
+                {
+                    "groups": [
+                        {"group_id": "g1", "label": "交通", "description": "公共交通に関する意見"},
+                        {"group_id": "g2", "label": "公園", "description": "公園整備に関する意見"},
+                    ]
+                },
+                1,
+                1,
+                2,
+            )
+        assignment_messages.append(kwargs["messages"][1]["content"])
+        return {"assignments": [{"arg_id": "a3", "group_id": "g1"}]}, 1, 1, 2
+
+    monkeypatch.setattr(llm_grouping_step, "request_to_chat_ai", fake_request_to_chat_ai)
+
+    config = {
+        "output_dir": "demo",
+        "_output_base_dir": str(tmp_path / "outputs"),
+        "question": "住みやすい街にするには？",
+        "provider": "local",
+        "embedding": {"model": "dummy-embedding"},
+        "llm_grouping": {
+            "group_count": 2,
+            "discovery_sample_size": 3,
+            "assignment_batch_size": 25,
+            "discovery_prompt": "discover",
+            "assignment_prompt": "assign",
+            "model": "dummy-model",
+            "assignment_mode": "hybrid",
+            "embedding_margin": 0.1,
+        },
+    }
+
+    llm_grouping_step.llm_grouping(config)
+
+    clusters = pl.read_parquet(output_dir / "hierarchical_clusters.parquet")
+    assert clusters["cluster-level-1-id"].to_list() == ["g1", "g2", "g1"]
+    assert len(assignment_messages) == 1
+    assert "a3:" in assignment_messages[0]
+    assert "a1:" not in assignment_messages[0] and "a2:" not in assignment_messages[0]
+
+
+def test_llm_grouping_discovers_level_2_groups_within_each_top_level_group(tmp_path, monkeypatch):
+    """sub_group_count should add a level-2 hierarchy in the format hierarchical_aggregation consumes."""
+    llm_grouping_step = importlib.import_module("analysis_core.steps.llm_grouping")
+
+    output_dir = tmp_path / "outputs" / "demo"
+    output_dir.mkdir(parents=True)
+    pl.DataFrame(
+        {
+            "arg-id": ["a1", "a2", "a3"],
+            "argument": ["電車を増やしてほしい", "バスの本数が足りない", "公園を増やしてほしい"],
+        }
+    ).write_csv(output_dir / "args.csv")
+    with open(output_dir / "embeddings.pkl", "wb") as f:
+        pickle.dump([{"arg-id": f"a{i}", "embedding": [0.1 * i, 0.2, 0.3]} for i in range(1, 4)], f)
+
+    class FakeUMAP:
+        def __init__(self, n_components, n_neighbors):
+            pass
+
+        def fit_transform(self, embeddings):
+            return np.asarray(embeddings[:, :2])
+
+    monkeypatch.setattr(llm_grouping_step, "_load_clustering_dependencies", lambda: (FakeUMAP, None, None))
+
+    discovery_messages = []
+
+    def fake_request_to_chat_ai(**kwargs):
+        message = kwargs["messages"][1]["content"]
+        if kwargs["json_schema"] is llm_grouping_step.GroupDiscoveryResponse:
+            discovery_messages.append(message)
+            if "上位グループ" not in message:
+                groups = [
+                    {"group_id": "g1", "label": "交通", "description": "公共交通"},
+                    {"group_id": "g2", "label": "公園", "description": "公園整備"},
+                ]
+            else:
+                groups = [
+                    {"group_id": "g1", "label": "電車", "description": "鉄道"},
+                    {"group_id": "g2", "label": "バス", "description": "路線バス"},
+                ]
+            return {"groups": groups}, 1, 1, 2
+        if "g1: 電車" in message:
+            assignments = [{"arg_id": "a1", "group_id": "g1"}, {"arg_id": "a2", "group_id": "g2"}]
+        else:
+            assignments = [
+                {"arg_id": "a1", "group_id": "g1"},
+                {"arg_id": "a2", "group_id": "g1"},
+                {"arg_id": "a3", "group_id": "g2"},
+            ]
+        return {"assignments": assignments}, 1, 1, 2
+
+    monkeypatch.setattr(llm_grouping_step, "request_to_chat_ai", fake_request_to_chat_ai)
+
+    config = {
+        "output_dir": "demo",
+        "_output_base_dir": str(tmp_path / "outputs"),
+        "question": "住みやすい街にするには？",
+        "provider": "local",
+        "llm_grouping": {
+            "group_count": 2,
+            "sub_group_count": 2,
+            "workers": 2,
+            "discovery_sample_size": 10,
+            "assignment_batch_size": 25,
+            "discovery_prompt": "discover",
+            "assignment_prompt": "assign",
+            "model": "dummy-model",
+        },
+    }
+
+    llm_grouping_step.llm_grouping(config)
+
+    clusters = pl.read_parquet(output_dir / "hierarchical_clusters.parquet")
+    labels = pl.read_parquet(output_dir / "hierarchical_merge_labels.parquet")
+
+    assert clusters["cluster-level-1-id"].to_list() == ["g1", "g1", "g2"]
+    assert clusters["cluster-level-2-id"].to_list() == ["g1-1", "g1-2", "g2-1"]
+    level_2 = labels.filter(pl.col("level") == 2).sort("id")
+    assert level_2.select(["id", "label", "parent", "value"]).to_dict(as_series=False) == {
+        "id": ["g1-1", "g1-2", "g2-1"],
+        "label": ["電車", "バス", "公園"],
+        "parent": ["g1", "g1", "g2"],
+        "value": [1, 1, 1],
+    }
+    # 1件しかない g2 は分割せず、上位グループのラベルを引き継ぐ
+    assert len(discovery_messages) == 2
+    assert "上位グループ:\n交通" in discovery_messages[1]
+    assert config["total_token_usage"] == 8
@@ -0,0 +1,48 @@
+"""Tests for the memory-bounded execution mode."""
+
+import pytest
+
+from analysis_core.core.frames import count_rows, read_table, scan_table, spill_frame
+from analysis_core.core.memory import (
+    MEMORY_BUDGET_ENV,
+    MemoryBudgetExceeded,
+    check_memory_budget,
+    is_low_memory,
+    memory_budget_mb,
+)
+
+
+def test_budget_comes_from_config_then_environment(monkeypatch):
+    monkeypatch.delenv(MEMORY_BUDGET_ENV, raising=False)
+    assert memory_budget_mb({}) is None
+    assert not is_low_memory({})
+    assert is_low_memory({"low_memory": True})
+
+    monkeypatch.setenv(MEMORY_BUDGET_ENV, "2048")
+    assert memory_budget_mb({}) == 2048
+    assert memory_budget_mb({"memory_budget_mb": 512}) == 512
+    assert is_low_memory({})
+
+
+def test_check_memory_budget_raises_only_above_budget(monkeypatch):
+    monkeypatch.delenv(MEMORY_BUDGET_ENV, raising=False)
+    monkeypatch.setattr("analysis_core.core.memory.current_rss_mb", lambda: 1500.0)
+
+    check_memory_budget({}, "step")
+    check_memory_budget({"memory_budget_mb": 2000}, "step")
+    with pytest.raises(MemoryBudgetExceeded, match="in step: RSS 1500 MB > budget 1000 MB"):
+        check_memory_budget({"memory_budget_mb": 1000}, "step")
+
+
+def test_low_memory_read_selects_columns_and_spills_to_parquet(tmp_path):
+    path = tmp_path / "args.csv"
+    path.write_text("arg-id,argument,comment-id\nA1_0,a,1\nA2_0,b,2\n", encoding="utf-8")
+
+    frame = read_table(path, {"low_memory": True}, columns=["arg-id", "comment-id"])
+    assert frame.columns == ["arg-id", "comment-id"]
+    assert frame.equals(read_table(path, {}, columns=["arg-id", "comment-id"]))
+
+    spilled = spill_frame(scan_table(path), tmp_path / ".spill", "args")
+    assert (tmp_path / ".spill" / "args.parquet").exists()
+    assert count_rows(spilled) == 2
+    assert scan_table(tmp_path / ".spill" / "args.parquet").collect().equals(spilled.collect())
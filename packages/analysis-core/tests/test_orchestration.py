@@ -610,6 +610,80 @@ class TestDecideWhatToRun:
         assert "skipping html" in viz_step["reason"]
 
 
+class TestContentHashInvalidation:
+    """Steps are skipped at run time when the outputs they depend on are unchanged."""
+
+    SPECS = [
+        {"step": "extraction", "filename": "args.csv", "dependencies": {"params": ["limit"], "steps": []}},
+        {"step": "embedding", "filename": "embeddings.pkl", "dependencies": {"params": [], "steps": ["extraction"]}},
+        {
+            "step": "hierarchical_clustering",
+            "filename": "hierarchical_clusters.csv",
+            "dependencies": {"params": [], "steps": ["embedding"]},
+        },
+    ]
+
+    def _run(self, tmp_path, previous, limit, args_content):
+        from analysis_core.core.orchestration import decide_what_to_run, load_specs, run_step, termination
+
+        specs_path = tmp_path / "specs.json"
+        specs_path.write_text(json.dumps(self.SPECS), encoding="utf-8")
+        specs = load_specs(specs_path)
+        output_dir = tmp_path / "demo"
+        output_dir.mkdir(exist_ok=True)
+        config = {
+            "output_dir": "demo",
+            "_output_base_dir": str(tmp_path),
+            "extraction": {"limit": limit},
+            "embedding": {},
+            "hierarchical_clustering": {},
+        }
+        if previous:
+            config["previous"] = previous
+        config["plan"] = decide_what_to_run(config, previous, specs, tmp_path)
+
+        executed = []
+
+        def writer(step, filename, content):
+            def run(cfg):
+                executed.append(step)
+                (output_dir / filename).write_text(content(), encoding="utf-8")
+
+            return run
+
+        run_step("extraction", writer("extraction", "args.csv", lambda: args_content), config, tmp_path)
+        (output_dir / "relations.csv").write_text("arg-id,comment-id\n", encoding="utf-8")
+        embeddings = lambda: "embedded:" + (output_dir / "args.csv").read_text(encoding="utf-8")  # noqa: E731
+        run_step("embedding", writer("embedding", "embeddings.pkl", embeddings), config, tmp_path)
+        run_step(
+            "hierarchical_clustering",
+            writer("hierarchical_clustering", "hierarchical_clusters.csv", lambda: "clusters"),
+            config,
+            tmp_path,
+        )
+        termination(config, output_base_dir=tmp_path)
+        status = json.loads((output_dir / "hierarchical_status.json").read_text(encoding="utf-8"))
+        return executed, config["plan"], status
+
+    def test_downstream_steps_skip_when_upstream_output_is_identical(self, tmp_path):
+        executed, _, status = self._run(tmp_path, None, 10, "A1_0,same")
+        assert executed == ["extraction", "embedding", "hierarchical_clustering"]
+        embedding_job = next(job for job in status["completed_jobs"] if job["step"] == "embedding")
+        assert embedding_job["output_hash"] and set(embedding_job["input_hashes"]) == {"extraction"}
+
+        # extraction のパラメータが変わって再実行されても、出力が同じなら下流は省略される
+        executed, plan, status = self._run(tmp_path, status, 20, "A1_0,same")
+        assert executed == ["extraction"]
+        assert [step["run"] for step in plan] == [True, False, False]
+        assert plan[1]["reason"] == "outputs of dependent steps are unchanged"
+        # 省略したステップの記録は引き継がれ、次の実行でも比較に使える
+        assert {job["step"] for job in status["previously_completed_jobs"]} == {"embedding", "hierarchical_clustering"}
+
+        executed, plan, _ = self._run(tmp_path, status, 30, "A1_0,changed")
+        assert executed == ["extraction", "embedding", "hierarchical_clustering"]
+        assert plan[2]["run"] is True
+
+
 class TestPipelineOrchestrator:
     """Test PipelineOrchestrator class."""
 
@@ -240,12 +240,12 @@ class TestPipelinePathsIntegration:
         hierarchical_clustering(sample_config)
 
         # Verify output file was created in the correct location
-        clusters_file = output_subdir / "hierarchical_clusters.csv"
-        assert clusters_file.exists(), f"hierarchical_clusters.csv not found at {clusters_file}"
+        clusters_file = output_subdir / "hierarchical_clusters.parquet"
+        assert clusters_file.exists(), f"hierarchical_clusters.parquet not found at {clusters_file}"
 
         # Verify hardcoded path was NOT used
-        hardcoded_clusters = Path("outputs") / sample_config["output_dir"] / "hierarchical_clusters.csv"
-        assert not hardcoded_clusters.exists(), "hierarchical_clusters.csv was created at hardcoded path!"
+        hardcoded_clusters = Path("outputs") / sample_config["output_dir"] / "hierarchical_clusters.parquet"
+        assert not hardcoded_clusters.exists(), "hierarchical_clusters.parquet was created at hardcoded path!"
 
     def test_hierarchical_clustering_auto_calculates_cluster_nums(self, temp_dirs, sample_config):
         """Test that hierarchical_clustering fills recommended cluster counts when omitted."""
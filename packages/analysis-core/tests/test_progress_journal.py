@@ -0,0 +1,80 @@
+"""Tests for the throttled progress journal and status snapshot."""
+
+import json
+
+from analysis_core.core.orchestration import update_progress, update_status
+from analysis_core.core.progress_journal import (
+    PROGRESS_JOURNAL_FILENAME,
+    STATUS_SNAPSHOT_FILENAME,
+    ProgressJournal,
+    read_status_snapshot,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _journal_entries(output_dir):
+    lines = (output_dir / PROGRESS_JOURNAL_FILENAME).read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_journal_coalesces_updates_within_interval(tmp_path):
+    clock = FakeClock()
+    journal = ProgressJournal(tmp_path, interval=1.0, clock=clock)
+
+    for progress in range(1, 101):
+        clock.now = progress * 0.05
+        journal.record("extraction", progress, 100)
+    journal.flush()
+
+    entries = _journal_entries(tmp_path)
+    # 5 秒間の 100 回の更新が、1 秒あたり 1 行程度にまとめられる
+    assert len(entries) <= 7
+    assert entries[-1]["progress"] == 100 and entries[-1]["tasks"] == 100
+    assert [entry["progress"] for entry in entries] == sorted(entry["progress"] for entry in entries)
+
+    snapshot = read_status_snapshot(tmp_path)
+    assert snapshot["current_job_progress"] == 100
+    assert "lock_until" in snapshot
+
+
+def test_status_update_flushes_pending_progress_and_writes_compact_snapshot(tmp_path):
+    clock = FakeClock()
+    journal = ProgressJournal(tmp_path, interval=1.0, clock=clock)
+    journal.record("extraction", 1, 10)
+    journal.record("extraction", 5, 10)
+
+    journal.update_snapshot({"status": "running", "current_job": "embedding", "extraction": {"prompt": "長い" * 1000}})
+
+    assert [entry["progress"] for entry in _journal_entries(tmp_path)] == [1, 5]
+    assert read_status_snapshot(tmp_path) == {"status": "running", "current_job": "embedding"}
+
+
+def test_update_progress_does_not_rewrite_status_file(tmp_path):
+    output_dir = tmp_path / "demo"
+    output_dir.mkdir()
+    config = {"output_dir": "demo", "_output_base_dir": str(tmp_path), "extraction": {"prompt": "p" * 5000}}
+    update_status(config, {"status": "running", "current_job": "extraction"})
+    update_progress(config, total=2000)
+    status_file = output_dir / "hierarchical_status.json"
+    status_before = status_file.read_bytes()
+
+    for _ in range(2000):
+        update_progress(config, incr=1)
+
+    assert status_file.read_bytes() == status_before
+    entries = _journal_entries(output_dir)
+    assert len(entries) < 20
+    # 最後の更新 (全件完了) は間隔に関係なく書き出される
+    assert entries[-1] == {**entries[-1], "job": "extraction", "progress": 2000, "tasks": 2000}
+
+    snapshot = json.loads((output_dir / STATUS_SNAPSHOT_FILENAME).read_text(encoding="utf-8"))
+    assert snapshot["status"] == "running"
+    assert snapshot["current_job_progress"] == 2000
+    assert "extraction" not in snapshot
@@ -0,0 +1,71 @@
+"""Tests for the streaming hierarchical_result.json writer and reader."""
+
+import json
+
+import polars as pl
+
+from analysis_core.core.result_stream import (
+    is_streamed_result,
+    iter_result_arguments,
+    read_result,
+    write_result_stream,
+)
+
+
+def _arguments() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "arg_id": [f"A{i}_0" for i in range(5)],
+            "argument": ["改行を\n含む", "}", "],", "b", "c"],
+            "cluster_ids": [["0", "1_0"]] * 5,
+        }
+    )
+
+
+def _summary() -> dict:
+    return {
+        "clusters": [{"level": 1, "id": "1_0"}],
+        "overview": "概要",
+        "comment_num": 5,
+    }
+
+
+def test_streamed_result_is_plain_json(tmp_path):
+    path = tmp_path / "hierarchical_result.json"
+    property_frame = pl.DataFrame({"arg_id": [f"A{i}_0" for i in range(5)], "age": ["20", None, "30", "}", "40"]})
+
+    write_result_stream(path, _summary(), arguments=_arguments(), property_frame=property_frame, batch_size=2)
+
+    assert is_streamed_result(path)
+    result = json.loads(path.read_text(encoding="utf-8"))
+    assert result["arguments"] == _arguments().to_dicts()
+    assert result["propertyMap"] == {"age": {"A0_0": "20", "A1_0": None, "A2_0": "30", "A3_0": "}", "A4_0": "40"}}
+    assert {key: result[key] for key in _summary()} == _summary()
+    assert read_result(path) == result
+
+
+def test_reader_skips_arguments_and_property_map(tmp_path):
+    path = tmp_path / "hierarchical_result.json"
+    property_frame = pl.DataFrame(
+        {"arg_id": ["A0_0"], "age": ["20"], "gender": [None]}, schema_overrides={"gender": pl.Utf8}
+    )
+    write_result_stream(path, _summary(), arguments=_arguments(), property_frame=property_frame, batch_size=2)
+
+    assert read_result(path, include_arguments=False, include_property_map=False) == _summary()
+    assert [len(batch) for batch in iter_result_arguments(path)] == [2, 2, 1]
+
+
+def test_rewrites_a_loaded_result_and_reads_legacy_files(tmp_path):
+    legacy = tmp_path / "legacy.json"
+    result = {"arguments": _arguments().to_dicts(), "propertyMap": {}, **_summary()}
+    legacy.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    assert not is_streamed_result(legacy)
+    assert read_result(legacy, include_property_map=False) == {"arguments": result["arguments"], **_summary()}
+    assert [len(batch) for batch in iter_result_arguments(legacy)] == [5]
+
+    streamed = tmp_path / "streamed.json"
+    write_result_stream(streamed, read_result(legacy), batch_size=3)
+    assert is_streamed_result(streamed)
+    assert read_result(streamed) == result
+    assert json.loads(streamed.read_text(encoding="utf-8")) == result
@@ -0,0 +1,99 @@
+"""Tests for per-step performance profiles."""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from analysis_core.core.step_profile import (
+    StepProfiler,
+    format_profile_table,
+    llm_call_timer,
+    record_llm_call,
+    record_llm_retry,
+)
+
+
+def test_profiler_records_llm_calls_retries_and_latency_percentiles():
+    with StepProfiler("extraction") as profiler:
+        for latency in [0.1 * i for i in range(1, 21)]:
+            record_llm_call(latency)
+        record_llm_retry()
+        with pytest.raises(RuntimeError), llm_call_timer():
+            raise RuntimeError("rate limited")
+
+    profile = profiler.profile.to_dict()
+    assert profile["step"] == "extraction"
+    assert profile["llm_requests"] == 21
+    assert profile["llm_errors"] == 1
+    assert profile["llm_retries"] == 1
+    assert profile["llm_latency_p50"] == pytest.approx(1.0)
+    assert profile["llm_latency_p95"] == pytest.approx(1.9)
+    assert profile["wall_time"] >= 0 and profile["cpu_time"] >= 0
+    assert "latencies" not in profile
+
+
+def test_calls_from_worker_threads_are_attributed_to_the_running_step():
+    def call():
+        with llm_call_timer():
+            time.sleep(0.01)
+
+    with StepProfiler("embedding") as profiler, ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: call(), range(8)))
+
+    assert profiler.profile.llm_requests == 8
+    assert profiler.profile.llm_latency_p50 >= 0.01
+
+
+def test_calls_outside_a_step_are_ignored():
+    record_llm_call(1.0)
+    record_llm_retry()
+
+    with StepProfiler("overview") as profiler:
+        pass
+    assert profiler.profile.llm_requests == 0
+    assert profiler.profile.llm_latency_p50 is None
+
+
+def test_format_profile_table():
+    table = format_profile_table(
+        [
+            {"step": "extraction", "wall_time": 12.345, "cpu_time": 1.2, "peak_rss_mb": 300.0, "llm_requests": 10},
+            {"step": "embedding", "wall_time": 3.0, "cpu_time": 0.5, "peak_rss_mb": None, "token_usage": 42},
+        ]
+    ).splitlines()
+
+    assert table[0].split() == ["step", "wall(s)", "cpu(s)", "rss(MB)", "llm", "p50(s)", "p95(s)", "retry", "tokens"]
+    assert table[2].split() == ["extraction", "12.3", "1.2", "300", "10", "-", "-", "0", "0"]
+    assert table[3].split() == ["embedding", "3.0", "0.5", "-", "0", "-", "-", "0", "42"]
+
+
+def test_run_step_persists_profile_in_status(tmp_path):
+    from analysis_core.core.orchestration import run_step
+
+    (tmp_path / "demo").mkdir()
+    config = {
+        "output_dir": "demo",
+        "_output_base_dir": str(tmp_path),
+        "plan": [{"step": "extraction", "run": True, "reason": "test"}],
+        "extraction": {},
+        "total_token_usage": 100,
+        "token_usage_input": 60,
+        "token_usage_output": 40,
+    }
+
+    def extraction(cfg):
+        for _ in range(3):
+            with llm_call_timer():
+                pass
+        cfg["total_token_usage"] += 30
+        cfg["token_usage_input"] += 20
+        cfg["token_usage_output"] += 10
+
+    run_step("extraction", extraction, config, tmp_path)
+
+    status = json.loads((tmp_path / "demo" / "hierarchical_status.json").read_text(encoding="utf-8"))
+    profile = status["completed_jobs"][-1]["profile"]
+    assert profile["llm_requests"] == 3
+    assert (profile["token_usage"], profile["token_input"], profile["token_output"]) == (30, 20, 10)
@@ -0,0 +1,103 @@
+"""Tests for OTLP-JSON file tracing."""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from analysis_core.core.tracing import NOOP_SPAN, start_span
+from analysis_core.plugin import PluginRegistry, StepContext, StepInputs, StepOutputs, step_plugin
+from analysis_core.services import llm
+from analysis_core.workflow import WorkflowDefinition, WorkflowEngine, WorkflowStep
+
+PARENT_TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+PARENT_SPAN_ID = "b7ad6b7169203331"
+
+
+def _read_spans(path):
+    spans = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return spans
+
+
+def _attributes(span):
+    return {attribute["key"]: next(iter(attribute["value"].values())) for attribute in span["attributes"]}
+
+
+def test_spans_are_disabled_without_trace_file(monkeypatch, tmp_path):
+    monkeypatch.delenv("KOUCHOU_TRACE_FILE", raising=False)
+
+    with start_span("pipeline") as span:
+        span.set_attribute("ignored", 1)
+
+    assert span is NOOP_SPAN
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pipeline_step_and_llm_spans_share_the_propagated_trace(monkeypatch, tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setenv("KOUCHOU_TRACE_FILE", str(trace_file))
+    monkeypatch.setenv("TRACEPARENT", f"00-{PARENT_TRACE_ID}-{PARENT_SPAN_ID}-01")
+
+    def fake_dispatch(messages, model, *args):
+        llm._record_retry()
+        return "ok", 30, 20, 10
+
+    monkeypatch.setattr(llm, "_dispatch_chat_request", fake_dispatch)
+
+    @step_plugin(id="test.llm", version="1.0.0", inputs=[], outputs=[])
+    def llm_plugin(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+        # ステップ内のスレッドプールからの呼び出しも、ステップのスパンにぶら下がる
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: llm.request_to_chat_ai([], model="gpt-4o-mini"), range(2)))
+        return StepOutputs(token_usage=60, token_input=40, token_output=20)
+
+    registry = PluginRegistry()
+    registry.register(llm_plugin)
+    workflow = WorkflowDefinition(id="test", version="1.0.0", steps=[WorkflowStep(id="extract", plugin="test.llm")])
+    ctx = StepContext(output_dir=tmp_path, input_dir=tmp_path, dataset="test", provider="openai", model="gpt-4o-mini")
+
+    with start_span("pipeline", thread_root=True):
+        result = WorkflowEngine(registry=registry).run(workflow, {}, ctx, max_workers=2)
+    assert result.success
+
+    spans = _read_spans(trace_file)
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span["name"], []).append(span)
+    pipeline = by_name["pipeline"][0]
+    step = by_name["step extract"][0]
+    chats = by_name["llm.chat"]
+
+    assert {span["traceId"] for span in spans} == {PARENT_TRACE_ID}
+    assert pipeline["parentSpanId"] == PARENT_SPAN_ID
+    assert step["parentSpanId"] == pipeline["spanId"]
+    assert len(chats) == 2
+    assert all(chat["parentSpanId"] == step["spanId"] and chat["kind"] == 3 for chat in chats)
+    assert _attributes(chats[0]) == {
+        "llm.provider": "openai",
+        "llm.model": "gpt-4o-mini",
+        "llm.json": False,
+        "llm.retries": "1",
+        "llm.tokens.total": "30",
+        "llm.tokens.input": "20",
+        "llm.tokens.output": "10",
+    }
+    assert _attributes(step)["llm.tokens.total"] == "60"
+
+
+def test_failed_span_records_error_status(monkeypatch, tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    monkeypatch.setenv("KOUCHOU_TRACE_FILE", str(trace_file))
+    monkeypatch.delenv("TRACEPARENT", raising=False)
+
+    with pytest.raises(ValueError), start_span("step extraction"):
+        raise ValueError("broken input")
+
+    (span,) = _read_spans(trace_file)
+    assert "parentSpanId" not in span
+    assert span["status"] == {"code": 2, "message": "ValueError: broken input"}
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
@@ -0,0 +1,60 @@
+"""Tests for the pre-warmed worker entry point."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run_worker(stdin: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "analysis_core.worker"],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        cwd=PACKAGE_ROOT,
+        timeout=120,
+    )
+
+
+class TestWorker:
+    """Test python -m analysis_core.worker."""
+
+    def test_worker_exits_without_job_when_stdin_is_closed(self):
+        result = _run_worker("")
+
+        assert result.returncode == 0
+        assert result.stdout == ""
+
+    def test_worker_runs_job_with_given_args_and_log_path(self, tmp_path):
+        config_path = tmp_path / "test_config.json"
+        config_path.write_text(json.dumps({"input": "test", "question": "Test question?", "provider": "openai"}))
+        input_dir = tmp_path / "inputs"
+        input_dir.mkdir()
+        (input_dir / "test.csv").write_text("comment-id,comment-body\n1,test\n", encoding="utf-8")
+        log_path = tmp_path / "analysis.log"
+        job = {
+            "args": [
+                "--config",
+                str(config_path),
+                "--dry-run",
+                "--input-dir",
+                str(input_dir),
+                "--output-dir",
+                str(tmp_path / "outputs"),
+            ],
+            "env": dict(os.environ),
+            "log_path": str(log_path),
+        }
+
+        result = _run_worker(json.dumps(job) + "\n")
+
+        assert result.returncode == 0
+        # 出力はジョブのログファイルに書かれる
+        assert result.stdout == ""
+        log = log_path.read_text(encoding="utf-8")
+        assert "Preflight validation passed." in log
+        assert "Execution Plan" in log
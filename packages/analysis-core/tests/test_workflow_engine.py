@@ -1,5 +1,7 @@
 """Tests for WorkflowEngine."""
 
+import threading
+import time
 from pathlib import Path
 
 import pytest
@@ -608,3 +610,175 @@ class TestWorkflowEngineOutputDir:
             assert (output_dir / "file2.txt").exists()
             assert (output_dir / "file1.txt").read_text() == "step1"
             assert (output_dir / "file2.txt").read_text() == "step2"
+
+
+class TestWorkflowEngineConcurrency:
+    """Tests for running independent steps concurrently."""
+
+    def _register_sleep_plugin(self, registry, plugin_id, seconds, events, fail=False, windows=None):
+        @step_plugin(id=plugin_id, version="1.0.0", inputs=[], outputs=[])
+        def sleep_plugin(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+            events.append(("run", plugin_id, threading.current_thread().name))
+            started = time.monotonic()
+            time.sleep(seconds)
+            if windows is not None:
+                windows[plugin_id] = (started, time.monotonic())
+            if fail:
+                raise RuntimeError(f"{plugin_id} failed")
+            return StepOutputs(token_usage=1)
+
+        registry.register(sleep_plugin)
+
+    def test_independent_branches_run_in_parallel(self, test_ctx, test_registry):
+        """Branches that do not depend on each other run at the same time."""
+        events = []
+        windows = {}
+        for name in ("root", "left", "right", "join"):
+            seconds = 0.3 if name in ("left", "right") else 0
+            self._register_sleep_plugin(test_registry, f"test.{name}", seconds, events, windows=windows)
+        workflow = WorkflowDefinition(
+            id="test-workflow",
+            version="1.0.0",
+            steps=[
+                WorkflowStep(id="root", plugin="test.root"),
+                WorkflowStep(id="left", plugin="test.left", depends_on=["root"]),
+                WorkflowStep(id="right", plugin="test.right", depends_on=["root"]),
+                WorkflowStep(id="join", plugin="test.join", depends_on=["left", "right"]),
+            ],
+        )
+        callback_threads = []
+        completed = []
+
+        def on_start(step_id):
+            callback_threads.append(threading.current_thread())
+
+        def on_complete(step_id, step_result):
+            callback_threads.append(threading.current_thread())
+            completed.append(step_id)
+
+        engine = WorkflowEngine(registry=test_registry)
+        result = engine.run(workflow, {}, test_ctx, on_step_start=on_start, on_step_complete=on_complete, max_workers=2)
+
+        assert result.success
+        assert result.total_token_usage == 4
+        # left と right の実行期間が重なっている
+        left_start, left_end = windows["test.left"]
+        right_start, right_end = windows["test.right"]
+        assert left_start < right_end and right_start < left_end
+        assert completed[0] == "root" and completed[-1] == "join"
+        assert set(completed[1:3]) == {"left", "right"}
+        # コールバックは呼び出し元のスレッドから、プラグインはワーカースレッドで実行される
+        assert all(thread is threading.current_thread() for thread in callback_threads)
+        assert all(thread_name.startswith("workflow-step") for _, _, thread_name in events)
+
+    def test_required_failure_stops_scheduling_but_lets_running_steps_finish(self, test_ctx, test_registry):
+        events = []
+        self._register_sleep_plugin(test_registry, "test.fail", 0.05, events, fail=True)
+        self._register_sleep_plugin(test_registry, "test.slow", 0.2, events)
+        self._register_sleep_plugin(test_registry, "test.after", 0, events)
+        workflow = WorkflowDefinition(
+            id="test-workflow",
+            version="1.0.0",
+            steps=[
+                WorkflowStep(id="fail", plugin="test.fail"),
+                WorkflowStep(id="slow", plugin="test.slow"),
+                WorkflowStep(id="after", plugin="test.after", depends_on=["slow"]),
+            ],
+        )
+
+        engine = WorkflowEngine(registry=test_registry)
+        result = engine.run(workflow, {}, test_ctx, max_workers=2)
+
+        assert not result.success
+        assert "fail failed" in result.step_results["fail"].error
+        assert result.step_results["slow"].success
+        assert "after" not in result.step_results
+
+    def test_optional_failure_and_unmet_condition_do_not_block_dependents(self, test_ctx, test_registry):
+        events = []
+        self._register_sleep_plugin(test_registry, "test.optional", 0, events, fail=True)
+        self._register_sleep_plugin(test_registry, "test.conditional", 0, events)
+        self._register_sleep_plugin(test_registry, "test.final", 0, events)
+        workflow = WorkflowDefinition(
+            id="test-workflow",
+            version="1.0.0",
+            steps=[
+                WorkflowStep(id="optional", plugin="test.optional", optional=True),
+                WorkflowStep(id="conditional", plugin="test.conditional", condition="${config.enabled}"),
+                WorkflowStep(id="final", plugin="test.final", depends_on=["optional", "conditional"]),
+            ],
+        )
+
+        engine = WorkflowEngine(registry=test_registry)
+        result = engine.run(workflow, {"enabled": False}, test_ctx, max_workers=4)
+
+        assert result.success
+        assert result.step_results["optional"].skipped and not result.step_results["optional"].success
+        assert result.step_results["conditional"].skipped
+        assert result.step_results["final"].success
+        assert [plugin_id for _, plugin_id, _ in events] == ["test.optional", "test.final"]
+
+    def test_skip_if_is_checked_after_dependencies_finish(self, test_ctx, test_registry):
+        events = []
+        self._register_sleep_plugin(test_registry, "test.first", 0, events)
+        self._register_sleep_plugin(test_registry, "test.second", 0, events)
+        workflow = WorkflowDefinition(
+            id="test-workflow",
+            version="1.0.0",
+            steps=[
+                WorkflowStep(id="first", plugin="test.first"),
+                WorkflowStep(id="second", plugin="test.second", depends_on=["first"]),
+            ],
+        )
+        checked = []
+
+        def skip_if(step_id):
+            checked.append((step_id, [plugin_id for _, plugin_id, _ in events]))
+            return step_id == "second"
+
+        engine = WorkflowEngine(registry=test_registry)
+        result = engine.run(workflow, {}, test_ctx, skip_if=skip_if)
+
+        assert result.success
+        assert result.step_results["second"].skipped
+        assert checked == [("first", []), ("second", ["test.first"])]
+
+
+class TestWorkflowEngineProfile:
+    """Tests for the per-step performance profile."""
+
+    def test_step_results_carry_profile(self, test_ctx, test_registry):
+        from analysis_core.core.step_profile import llm_call_timer, record_llm_retry
+
+        @step_plugin(id="test.llm", version="1.0.0", inputs=[], outputs=[])
+        def llm_plugin(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+            for _ in range(2):
+                with llm_call_timer():
+                    pass
+            record_llm_retry()
+            return StepOutputs(token_usage=30, token_input=20, token_output=10)
+
+        @step_plugin(id="test.broken", version="1.0.0", inputs=[], outputs=[])
+        def broken_plugin(ctx: StepContext, inputs: StepInputs, config: dict) -> StepOutputs:
+            raise RuntimeError("boom")
+
+        test_registry.register(llm_plugin)
+        test_registry.register(broken_plugin)
+        workflow = WorkflowDefinition(
+            id="test-workflow",
+            version="1.0.0",
+            steps=[
+                WorkflowStep(id="llm", plugin="test.llm"),
+                WorkflowStep(id="broken", plugin="test.broken", depends_on=["llm"], optional=True),
+            ],
+        )
+
+        engine = WorkflowEngine(registry=test_registry)
+        result = engine.run(workflow, {}, test_ctx)
+
+        profile = result.step_results["llm"].profile
+        assert profile["step"] == "llm"
+        assert profile["llm_requests"] == 2 and profile["llm_retries"] == 1
+        assert (profile["token_usage"], profile["token_input"], profile["token_output"]) == (30, 20, 10)
+        # 失敗したステップもそれまでの計測結果を持つ
+        assert result.step_results["broken"].profile["wall_time"] >= 0
@@ -46,9 +46,17 @@ PRESERVED_REPORT_FILES = (
     "hierarchical_initial_labels.csv",
     "hierarchical_merge_labels.csv",
     "hierarchical_result.json",
+    "hierarchical_result_arguments.parquet",
+    "hierarchical_result_attribute_stats.parquet",
     "args.csv",
     "hierarchical_clusters.csv",
     "relations.csv",
+    # analysis-core の artifact_format が parquet (既定) の場合の中間ファイル
+    "args.parquet",
+    "relations.parquet",
+    "hierarchical_clusters.parquet",
+    "hierarchical_initial_labels.parquet",
+    "hierarchical_merge_labels.parquet",
     "hierarchical_overview.txt",
 )
 